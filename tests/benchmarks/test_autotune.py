@@ -0,0 +1,101 @@
+import json
+from unittest import mock
+
+import pytest
+import torch
+
+from torchaug import transforms
+from torchaug.benchmarks import get_default_cache_file, tune_num_chunks
+from torchaug.ta_tensors import BatchImages
+
+
+def _make_transform():
+    return transforms.SequentialTransform(
+        [
+            transforms.RandomHorizontalFlip(p=0.5),
+            transforms.RandomColorJitter(brightness=0.5, p=1.0),
+            transforms.ToDtype(torch.float32, scale=True),
+        ],
+        optimize=False,
+    )
+
+
+def _make_input(batch_size=32):
+    return BatchImages(torch.randint(0, 256, (batch_size, 3, 8, 8), dtype=torch.uint8))
+
+
+def _fake_time_function(transform):
+    # The latency is 1 ms plus 0.1 ms per chunk of the color jitter.
+    def time_function(fn, runs, warmup, device):
+        fn()
+        return torch.tensor([1 + 0.1 * transform.transforms[1].num_chunks], dtype=torch.float64)
+
+    return time_function
+
+
+class TestTuneNumChunks:
+    @pytest.mark.parametrize(("max_slowdown", "expected"), [(1.0, 1), (1.5, 4), (2.0, 8), (5.0, -1)])
+    def test_budget(self, tmp_path, max_slowdown, expected):
+        transform = _make_transform()
+
+        with mock.patch("torchaug.benchmarks._autotune.time_function", _fake_time_function(transform)):
+            result = tune_num_chunks(
+                transform, _make_input(), max_slowdown=max_slowdown, cache_file=str(tmp_path / "cache.json")
+            )
+
+        assert result["num_chunks"] == expected
+        assert result["cached"] is False
+        # RandomColorJitter caps the number of chunks to 24, so 32 chunks are not measured.
+        assert list(result["medians"]) == ["1", "2", "4", "8", "16", "-1"]
+        assert result["medians"]["-1"] == pytest.approx(3.4)
+        # The flips apply the same operation to all the samples in one chunk.
+        assert transform.transforms[0].num_chunks == 1
+        assert transform.transforms[1].num_chunks == (24 if expected == -1 else expected)
+        assert transform.transforms_attributes_override["num_chunks"] == expected
+
+    def test_cache(self, tmp_path):
+        cache_file = tmp_path / "cache" / "num_chunks.json"
+        transform = _make_transform()
+        with mock.patch("torchaug.benchmarks._autotune.time_function", _fake_time_function(transform)):
+            result = tune_num_chunks(transform, _make_input(), cache_file=str(cache_file))
+
+        transform = _make_transform()
+        with mock.patch("torchaug.benchmarks._autotune.time_function") as time_function:
+            cached_result = tune_num_chunks(transform, _make_input(), cache_file=str(cache_file))
+            time_function.assert_not_called()
+
+        assert cached_result == {**result, "cached": True}
+        assert transform.transforms[1].num_chunks == result["num_chunks"]
+        assert len(json.loads(cache_file.read_text())) == 1
+
+        with mock.patch("torchaug.benchmarks._autotune.time_function", _fake_time_function(transform)):
+            tune_num_chunks(transform, _make_input(16), cache_file=str(cache_file))
+            tune_num_chunks(transform, _make_input(), max_slowdown=2.0, cache_file=str(cache_file))
+            tune_num_chunks(transform, _make_input(), cache_file=str(cache_file), use_cache=False)
+        assert len(json.loads(cache_file.read_text())) == 3
+
+    def test_measures(self, tmp_path):
+        transform = transforms.RandomColorJitter(brightness=0.5, p=1.0, batch_transform=True)
+        inpt = _make_input(4)
+        expected = inpt.clone()
+
+        result = tune_num_chunks(
+            transform, inpt, candidates=[2, -1], runs=2, warmup=0, cache_file=str(tmp_path / "cache.json")
+        )
+
+        assert list(result["medians"]) == ["1", "2", "-1"]
+        assert all(median > 0 for median in result["medians"].values())
+        assert transform.num_chunks == (4 if result["num_chunks"] == -1 else result["num_chunks"])
+        torch.testing.assert_close(inpt, expected)
+
+    def test_default_cache_file(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert get_default_cache_file() == str(tmp_path / "torchaug" / "num_chunks.json")
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="max_slowdown should be greater than or equal to 1"):
+            tune_num_chunks(_make_transform(), _make_input(), max_slowdown=0.5)
+        with pytest.raises(ValueError, match="no batch transform that accepts num_chunks"):
+            tune_num_chunks(transforms.RandomHorizontalFlip(), _make_input())
+        with pytest.raises(ValueError, match="candidates should be positive integers or -1"):
+            tune_num_chunks(_make_transform(), _make_input(), candidates=[0])
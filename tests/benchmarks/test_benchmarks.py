@@ -0,0 +1,331 @@
+import json
+
+import pytest
+import torch
+
+from torchaug.benchmarks import (
+    BenchmarkCase,
+    format_results,
+    get_cases,
+    main,
+    make_input,
+    measure_memory,
+    register_case,
+    run_benchmarks,
+    summarize_timings,
+    time_function,
+)
+from torchaug.benchmarks._cases import _BENCHMARK_CASES
+from torchaug.ta_tensors import BatchVideos
+
+
+class TestTimeFunction:
+    def test_calls(self):
+        calls = []
+        timings = time_function(lambda: calls.append(None), runs=5, warmup=3)
+
+        assert len(calls) == 8
+        assert timings.shape == (5,)
+        assert timings.dtype == torch.float64
+        assert (timings >= 0).all()
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="runs should be a positive integer"):
+            time_function(lambda: None, runs=0)
+        with pytest.raises(ValueError, match="warmup should be a non-negative integer"):
+            time_function(lambda: None, warmup=-1)
+
+
+class TestSummarizeTimings:
+    def test_stats(self):
+        stats = summarize_timings([float(i) for i in range(101)])
+
+        assert stats["median"] == 50
+        assert stats["mean"] == 50
+        assert stats["min"] == 0
+        assert stats["max"] == 100
+        assert stats["p5"] == 5
+        assert stats["p25"] == 25
+        assert stats["p75"] == 75
+        assert stats["p95"] == 95
+
+    def test_even(self):
+        assert summarize_timings([1.0, 2.0, 3.0, 4.0])["median"] == 2.5
+        assert summarize_timings([1.0])["std"] == 0
+
+    def test_empty(self):
+        with pytest.raises(ValueError, match="timings should not be empty"):
+            summarize_timings([])
+
+
+class TestMeasureMemory:
+    def test_allocation(self):
+        stats = measure_memory(lambda: torch.empty(2**18, dtype=torch.float32), runs=2, warmup=0)
+
+        assert stats["peak_allocated"] == pytest.approx(1.0)
+        assert stats["total_allocated"] == pytest.approx(1.0)
+        assert stats["num_allocations"] == 1
+        assert stats["python_peak"] >= 0
+
+    def test_inplace(self):
+        tensor = torch.zeros(2**18, dtype=torch.float32)
+
+        assert measure_memory(lambda: tensor.add_(1), runs=1)["peak_allocated"] < 0.01
+        assert measure_memory(lambda: tensor.add(1).add(1), runs=1)["peak_allocated"] == pytest.approx(2.0, abs=0.01)
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="runs should be a positive integer"):
+            measure_memory(lambda: None, runs=0)
+        with pytest.raises(ValueError, match="warmup should be a non-negative integer"):
+            measure_memory(lambda: None, warmup=-1)
+
+
+class TestCases:
+    def test_get_cases(self):
+        names = [case.name for case in get_cases()]
+        assert "RandomColorJitter" in names
+        assert [case.name for case in get_cases(["RandomSolarize"])] == ["RandomSolarize"]
+
+        with pytest.raises(ValueError, match="Unknown benchmark cases"):
+            get_cases(["Unknown"])
+
+    def test_register_case(self):
+        case = register_case(BenchmarkCase("Identity", lambda size, dtype: lambda x: x))
+        try:
+            assert get_cases(["Identity"]) == [case]
+        finally:
+            del _BENCHMARK_CASES["Identity"]
+
+    @pytest.mark.parametrize("dtype", [torch.uint8, torch.float32])
+    def test_make_input(self, dtype):
+        inpt = make_input(2, (5, 7), dtype)
+        assert inpt.shape == (2, 3, 5, 7)
+        assert inpt.dtype == dtype
+
+    def test_make_input_videos(self):
+        inpt = make_input(2, (5, 7), num_frames=4)
+        assert isinstance(inpt, BatchVideos)
+        assert inpt.shape == (2, 4, 3, 5, 7)
+
+    @pytest.mark.parametrize("case", get_cases(), ids=lambda case: case.name)
+    def test_cases_run(self, case):
+        inpt = make_input(2, (32, 32), torch.uint8)
+        kwargs = {"num_chunks": 2} if case.supports_num_chunks else {}
+        output = case.make_transform((32, 32), torch.uint8, **kwargs)(inpt)
+        baseline_output = torch.stack([case.make_baseline((32, 32), torch.uint8)(image) for image in inpt])
+
+        assert output.shape == baseline_output.shape
+        assert output.dtype == baseline_output.dtype
+
+
+class TestRunBenchmarks:
+    def test_grid(self):
+        benchmark = run_benchmarks(
+            ["RandomColorJitter", "RandomHorizontalFlip"],
+            batch_sizes=[2],
+            resolutions=[(8, 10)],
+            dtypes=[torch.uint8, torch.float32],
+            num_chunks=[1, 2],
+            num_threads=[1],
+            runs=2,
+            warmup=1,
+        )
+
+        assert benchmark["metadata"]["torch"] == torch.__version__
+        configs = [
+            (result["transform"], result["implementation"], result["dtype"], result["num_chunks"])
+            for result in benchmark["results"]
+        ]
+        assert configs == [
+            ("RandomColorJitter", "torchaug", "uint8", 1),
+            ("RandomColorJitter", "torchaug", "uint8", 2),
+            ("RandomColorJitter", "torchvision_per_sample", "uint8", None),
+            ("RandomColorJitter", "torchvision_batch", "uint8", None),
+            ("RandomColorJitter", "torchaug", "float32", 1),
+            ("RandomColorJitter", "torchaug", "float32", 2),
+            ("RandomColorJitter", "torchvision_per_sample", "float32", None),
+            ("RandomColorJitter", "torchvision_batch", "float32", None),
+            ("RandomHorizontalFlip", "torchaug", "uint8", None),
+            ("RandomHorizontalFlip", "torchvision_per_sample", "uint8", None),
+            ("RandomHorizontalFlip", "torchvision_batch", "uint8", None),
+            ("RandomHorizontalFlip", "torchaug", "float32", None),
+            ("RandomHorizontalFlip", "torchvision_per_sample", "float32", None),
+            ("RandomHorizontalFlip", "torchvision_batch", "float32", None),
+        ]
+        for result in benchmark["results"]:
+            assert result["batch_size"] == 2
+            assert result["resolution"] == [8, 10]
+            assert result["num_threads"] == 1
+            assert result["runs"] == 2
+            assert result["p5"] <= result["median"] <= result["p95"]
+            assert result["throughput"] == pytest.approx(2000 / result["median"])
+        json.dumps(benchmark)
+
+    def test_baselines(self):
+        benchmark = run_benchmarks(["RandomSolarize"], batch_sizes=[2], resolutions=[(8, 8)], baselines=[], runs=1)
+        assert [result["implementation"] for result in benchmark["results"]] == ["torchaug"]
+
+        with pytest.raises(ValueError, match="Unknown baseline"):
+            run_benchmarks(["RandomSolarize"], baselines=["torchaug"])
+
+    def test_num_threads_restored(self):
+        num_threads = torch.get_num_threads()
+        run_benchmarks(["RandomSolarize"], batch_sizes=[2], resolutions=[(8, 8)], num_threads=[2], runs=1)
+        assert torch.get_num_threads() == num_threads
+
+    def test_memory(self):
+        benchmark = run_benchmarks(
+            ["RandomColorJitter", "RandomResizedCrop"],
+            batch_sizes=[2],
+            resolutions=[(8, 8)],
+            num_chunks=[1],
+            batch_inplace=[False, True],
+            p=[0.5, 1.0],
+            baselines=["torchvision_batch"],
+            mode="memory",
+            runs=2,
+            warmup=1,
+        )
+
+        configs = [
+            (result["transform"], result["implementation"], result["batch_inplace"], result["p"])
+            for result in benchmark["results"]
+        ]
+        # RandomResizedCrop does not accept batch_inplace and p.
+        assert configs == [
+            ("RandomColorJitter", "torchaug", False, 0.5),
+            ("RandomColorJitter", "torchaug", False, 1.0),
+            ("RandomColorJitter", "torchaug", True, 0.5),
+            ("RandomColorJitter", "torchaug", True, 1.0),
+            ("RandomColorJitter", "torchvision_batch", None, None),
+            ("RandomResizedCrop", "torchaug", None, None),
+            ("RandomResizedCrop", "torchvision_batch", None, None),
+        ]
+        for result in benchmark["results"]:
+            assert result["mode"] == "memory"
+            assert result["unit"] == "MiB"
+            assert result["peak_allocated"] >= 0
+            assert result["total_allocated"] >= 0
+            assert "median" not in result
+        json.dumps(benchmark)
+
+    def test_format_grid(self):
+        benchmark = run_benchmarks(
+            ["RandomColorJitter"],
+            batch_sizes=[2],
+            resolutions=[(8, 8)],
+            num_chunks=[1],
+            batch_inplace=[False, True],
+            p=[0.5, None],
+            baselines=[],
+            runs=1,
+            warmup=0,
+        )
+
+        rows = format_results(benchmark["results"]).splitlines()[2:]
+        configs = [row.split("|")[6:10] for row in rows]
+        assert len(rows) == 4
+        assert len(set(map(tuple, configs))) == 4
+
+    def test_videos(self):
+        benchmark = run_benchmarks(
+            ["Pipeline"], batch_sizes=[2], resolutions=[(16, 16)], num_frames=3, num_chunks=[1, 2], runs=1, warmup=0
+        )
+
+        assert [result["implementation"] for result in benchmark["results"]] == [
+            "torchaug",
+            "torchaug",
+            "torchvision_per_sample",
+            "torchvision_batch",
+        ]
+        assert all(result["num_frames"] == 3 for result in benchmark["results"])
+
+    def test_invalid_args(self):
+        with pytest.raises(ValueError, match="Unknown mode"):
+            run_benchmarks(["RandomSolarize"], mode="speed")
+        with pytest.raises(ValueError, match="p should be in the interval"):
+            run_benchmarks(["RandomSolarize"], p=[1.5])
+
+
+class TestCli:
+    def test_main(self, tmp_path, capsys):
+        output = tmp_path / "benchmark.json"
+        exit_code = main(
+            [
+                "--transforms",
+                "RandomResizedCrop",
+                "--batch-sizes",
+                "2",
+                "--resolutions",
+                "8x12",
+                "--dtypes",
+                "float32",
+                "--num-chunks",
+                "1",
+                "2",
+                "--runs",
+                "2",
+                "--warmup",
+                "0",
+                "--output",
+                str(output),
+            ]
+        )
+
+        assert exit_code == 0
+        benchmark = json.loads(output.read_text())
+        assert len(benchmark["results"]) == 4
+        assert benchmark["results"][0]["resolution"] == [8, 12]
+        assert benchmark["results"][0]["dtype"] == "float32"
+        assert format_results(benchmark["results"]) in capsys.readouterr().out
+
+    def test_memory(self, tmp_path):
+        output = tmp_path / "benchmark.json"
+        exit_code = main(
+            [
+                "--transforms",
+                "RandomSolarize",
+                "--batch-sizes",
+                "2",
+                "--resolutions",
+                "8",
+                "--batch-inplace",
+                "false",
+                "none",
+                "--p",
+                "1",
+                "--baselines",
+                "--mode",
+                "memory",
+                "--runs",
+                "1",
+                "--warmup",
+                "0",
+                "--quiet",
+                "--output",
+                str(output),
+            ]
+        )
+
+        assert exit_code == 0
+        results = json.loads(output.read_text())["results"]
+        assert [(result["batch_inplace"], result["p"]) for result in results] == [(False, 1.0), (None, 1.0)]
+        assert all(result["unit"] == "MiB" for result in results)
+
+    def test_list(self, capsys):
+        assert main(["--list"]) == 0
+        assert capsys.readouterr().out.split() == [case.name for case in get_cases()]
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["--resolutions", "8x"],
+            ["--dtypes", "uint9"],
+            ["--baselines", "torchaug"],
+            ["--batch-inplace", "yes"],
+            ["--p", "high"],
+        ],
+    )
+    def test_invalid_args(self, args):
+        with pytest.raises(SystemExit):
+            main(args)
@@ -0,0 +1,199 @@
+import functools
+import json
+
+import pytest
+import torch
+
+from torchaug import ta_tensors
+from torchaug.benchmarks import (
+    SyntheticDetectionDataset,
+    SyntheticImageDataset,
+    SyntheticVideoDataset,
+    main,
+    make_pipeline_transforms,
+    run_dataloader_benchmark,
+)
+from torchaug.data.dataset import wrap_dataset_for_transforms_v2
+
+
+_make_transforms = functools.partial(make_pipeline_transforms, (8, 8))
+
+
+class TestSyntheticDatasets:
+    def test_image(self):
+        dataset = SyntheticImageDataset(num_samples=3, image_size=(10, 12), num_classes=5)
+        image, label = dataset[1]
+
+        assert len(dataset) == 3
+        assert type(image) is ta_tensors.Image
+        assert image.shape == (3, 10, 12)
+        assert image.dtype == torch.uint8
+        assert type(label) is ta_tensors.Labels
+        assert label.shape == (1,)
+        assert 0 <= label.item() < 5
+
+    def test_video(self):
+        video, label = SyntheticVideoDataset(num_samples=2, image_size=(10, 12), num_frames=4)[0]
+
+        assert type(video) is ta_tensors.Video
+        assert video.shape == (4, 3, 10, 12)
+        assert type(label) is ta_tensors.Labels
+
+    @pytest.mark.parametrize("with_masks", [False, True])
+    def test_detection(self, with_masks):
+        image, target = SyntheticDetectionDataset(
+            num_samples=2, image_size=(10, 12), max_objects=3, with_masks=with_masks
+        )[0]
+
+        assert image.shape == (3, 10, 12)
+        boxes = target["boxes"]
+        assert type(boxes) is ta_tensors.BoundingBoxes
+        assert boxes.canvas_size == (10, 12)
+        assert 1 <= boxes.shape[0] <= 3
+        assert (boxes[:, :2] <= boxes[:, 2:]).all()
+        assert (boxes[:, 2:] <= torch.tensor([12, 10])).all()
+        assert target["labels"].shape == (boxes.shape[0],)
+        if with_masks:
+            assert type(target["masks"]) is ta_tensors.Mask
+            assert target["masks"].shape == (boxes.shape[0], 10, 12)
+        else:
+            assert "masks" not in target
+
+    def test_deterministic(self):
+        dataset = SyntheticImageDataset(num_samples=3, image_size=(10, 12), size_jitter=2)
+        torch.testing.assert_close(dataset[2][0], dataset[2][0])
+        assert not torch.equal(
+            dataset[0][0], SyntheticImageDataset(num_samples=3, image_size=(10, 12), size_jitter=2, seed=1)[0][0]
+        )
+
+    def test_size_jitter(self):
+        dataset = SyntheticImageDataset(num_samples=20, image_size=(10, 12), size_jitter=2)
+        sizes = {tuple(dataset[i][0].shape[-2:]) for i in range(len(dataset))}
+
+        assert len(sizes) > 1
+        assert all(8 <= height <= 12 and 10 <= width <= 14 for height, width in sizes)
+
+    def test_transforms(self):
+        dataset = SyntheticImageDataset(num_samples=1, image_size=(10, 12), transform=lambda image: image.float())
+        assert dataset[0][0].dtype == torch.float32
+
+    def test_wrap(self):
+        dataset = wrap_dataset_for_transforms_v2(SyntheticDetectionDataset(num_samples=2, image_size=(10, 12)))
+        dataset.transforms = _make_transforms()
+        image, target = dataset[0]
+
+        assert image.shape == (3, 8, 8)
+        assert image.dtype == torch.float32
+        assert target["boxes"].canvas_size == (8, 8)
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="num_samples should be a positive integer"):
+            SyntheticImageDataset(num_samples=0)
+        with pytest.raises(ValueError, match="size_jitter should be non-negative"):
+            SyntheticImageDataset(image_size=(10, 12), size_jitter=10)
+        with pytest.raises(ValueError, match="max_objects should be a positive integer"):
+            SyntheticDetectionDataset(max_objects=0)
+        with pytest.raises(IndexError, match="out of range"):
+            SyntheticImageDataset(num_samples=1)[1]
+
+
+class TestRunDataLoaderBenchmark:
+    @pytest.mark.parametrize("dataset", ["image", "video", "detection"])
+    def test_grid(self, dataset):
+        benchmark = run_dataloader_benchmark(
+            datasets=[dataset],
+            num_workers=[0],
+            batch_size=2,
+            num_batches=2,
+            warmup_batches=1,
+            make_transforms=_make_transforms,
+            dataset_kwargs={dataset: {"image_size": (12, 12)}},
+        )
+
+        configs = [(result["transform_mode"], result["collate_fn"]) for result in benchmark["results"]]
+        assert configs == [
+            ("per_sample", "default"),
+            ("per_sample", "nested"),
+            ("batch", "default"),
+            ("batch", "nested"),
+        ]
+        for result in benchmark["results"]:
+            assert result["dataset"] == dataset
+            assert result["samples_per_second"] > 0
+            assert result["startup"] > 0
+            assert set(result["stages"]) == {"load", "transform", "collate", "wait"}
+            assert all(value > 0 for value in result["stages"].values())
+            # Without workers, the main process waits for the whole pipeline.
+            stages = result["stages"]
+            assert stages["wait"] >= stages["load"] + stages["transform"] + stages["collate"]
+        json.dumps(benchmark)
+
+    def test_workers(self):
+        benchmark = run_dataloader_benchmark(
+            num_workers=[1],
+            transform_modes=["batch"],
+            collate_fns=["nested"],
+            batch_size=2,
+            num_batches=2,
+            make_transforms=_make_transforms,
+            dataset_kwargs={"image": {"image_size": (12, 12)}},
+        )
+
+        (result,) = benchmark["results"]
+        assert result["num_workers"] == 1
+        assert result["stages"]["transform"] > 0
+
+    def test_skip_different_sizes(self):
+        benchmark = run_dataloader_benchmark(
+            num_workers=[0],
+            batch_size=2,
+            num_batches=1,
+            warmup_batches=0,
+            make_transforms=_make_transforms,
+            dataset_kwargs={"image": {"image_size": (12, 12), "size_jitter": 2}},
+        )
+
+        configs = [(result["transform_mode"], result["collate_fn"]) for result in benchmark["results"]]
+        assert configs == [("per_sample", "default"), ("per_sample", "nested"), ("batch", "nested")]
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="Unknown dataset"):
+            run_dataloader_benchmark(datasets=["audio"])
+        with pytest.raises(ValueError, match="Unknown transform mode"):
+            run_dataloader_benchmark(transform_modes=["chunk"])
+        with pytest.raises(ValueError, match="Unknown collate function"):
+            run_dataloader_benchmark(collate_fns=["packed"])
+        with pytest.raises(ValueError, match="num_batches should be a positive integer"):
+            run_dataloader_benchmark(num_batches=0)
+        with pytest.raises(ValueError, match="warmup_batches should be a non-negative integer"):
+            run_dataloader_benchmark(warmup_batches=-1)
+
+
+def test_cli(tmp_path, capsys):
+    output = tmp_path / "benchmark.json"
+    exit_code = main(
+        [
+            "dataloader",
+            "--datasets",
+            "video",
+            "--transform-modes",
+            "per_sample",
+            "--num-workers",
+            "0",
+            "--batch-size",
+            "2",
+            "--num-batches",
+            "1",
+            "--image-size",
+            "12",
+            "--output-size",
+            "8",
+            "--output",
+            str(output),
+        ]
+    )
+
+    assert exit_code == 0
+    benchmark = json.loads(output.read_text())
+    assert [result["collate_fn"] for result in benchmark["results"]] == ["default", "nested"]
+    assert "samples_per_second" in capsys.readouterr().out
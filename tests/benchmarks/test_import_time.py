@@ -0,0 +1,92 @@
+import ast
+import inspect
+import subprocess
+import sys
+
+import pytest
+
+import torchaug
+from torchaug import data, transforms
+from torchaug.benchmarks import main, measure_import_time, run_import_benchmark
+from torchaug.benchmarks._import_time import _parse_torchaug_self_time
+
+
+class TestLazyImports:
+    def test_import_transforms(self):
+        # The import guard: importing the transforms does not import the data utilities nor the transforms modules.
+        result = measure_import_time("torchaug.transforms", runs=1)
+        assert result["modules"] == ["torchaug", "torchaug._lazy", "torchaug.transforms"]
+        assert result["num_modules"] == 3
+        assert result["median"] > 0
+
+    def test_import_transform(self):
+        script = (
+            "import sys; from torchaug.transforms import RandomColorJitter; "
+            "print(sorted(m for m in sys.modules if m.startswith('torchaug.transforms._') or m == 'torchaug.data'))"
+        )
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        assert eval(output) == [
+            "torchaug.transforms._color",
+            "torchaug.transforms._executor",
+            "torchaug.transforms._profiling",
+            "torchaug.transforms._transform",
+            "torchaug.transforms._utils",
+        ]
+
+    @pytest.mark.parametrize("module", [torchaug, data, transforms])
+    def test_attributes(self, module):
+        for name in module.__all__:
+            assert getattr(module, name) is not None
+            assert name in dir(module)
+
+        with pytest.raises(AttributeError, match="has no attribute 'Unknown'"):
+            module.Unknown
+
+    @pytest.mark.parametrize("module", [torchaug, data, transforms])
+    def test_type_checking_imports(self, module):
+        # The imports for the type checkers list the same names as the lazy attributes.
+        tree = ast.parse(inspect.getsource(module))
+        (type_checking,) = [
+            node for node in tree.body if isinstance(node, ast.If) and ast.unparse(node.test) == "TYPE_CHECKING"
+        ]
+        names = [alias.asname or alias.name for node in type_checking.body for alias in node.names]
+
+        assert sorted(names) == sorted(getattr(module, "_lazy_all", module.__all__))
+
+    def test_star_import(self):
+        namespace = {}
+        exec("from torchaug.transforms import *", namespace)
+        assert namespace["SequentialTransform"] is transforms.SequentialTransform
+        assert namespace["functional"] is transforms.functional
+
+
+class TestImportTime:
+    def test_parse_torchaug_self_time(self):
+        importtime = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:      1000 |       2000 |   torch",
+                "import time:       500 |        600 |     torchaug.transforms",
+                "import time:       250 |       3000 | torchaug",
+                "Warning: unrelated line",
+            ]
+        )
+        assert _parse_torchaug_self_time(importtime) == 0.75
+
+    def test_run_import_benchmark(self, capsys):
+        benchmark = run_import_benchmark(modules=["torchaug"], runs=2)
+        assert benchmark["metadata"]["torchaug"] == torchaug.__version__
+        (result,) = benchmark["results"]
+        assert result["module"] == "torchaug"
+        assert result["runs"] == 2
+        assert result["unit"] == "ms"
+        assert result["modules"] == ["torchaug", "torchaug._lazy"]
+
+        assert main(["import", "--modules", "torchaug", "--runs", "1"]) == 0
+        assert "| torchaug " in capsys.readouterr().out
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="runs should be a positive integer"):
+            measure_import_time(runs=0)
+        with pytest.raises(RuntimeError, match="Failed to import torchaug.unknown"):
+            measure_import_time("torchaug.unknown", runs=1)
@@ -1,6 +1,15 @@
+import functools
+import json
+import pickle
+import threading
+import time
+
 import pytest
 import torch
+from torch.utils.data import DataLoader
 
+from torchaug import transforms
+from torchaug.data.dataloader import BatchBufferPool, TransformCollate, TransformPrefetcher
 from torchaug.data.dataloader._collate import default_collate
 from torchaug.ta_tensors import (
     BatchBoundingBoxes,
@@ -59,6 +68,16 @@ class TestDefaultCollate:
         assert actual.device.type == device
         assert actual.dtype == dtype
 
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    @pytest.mark.parametrize("make_input", [make_image, make_batch_images])
+    def test_images_channels_last(self, device, make_input):
+        images = [make_input((32, 32), device=device) for _ in range(4)]
+        actual = default_collate(images, channels_last=True)
+
+        assert_equal(actual, default_collate(images))
+        assert isinstance(actual, BatchImages)
+        assert actual.is_contiguous(memory_format=torch.channels_last)
+
     @pytest.mark.parametrize("device", cpu_and_cuda())
     @pytest.mark.parametrize("dtype", [torch.float32, torch.uint8])
     def test_video(self, device, dtype):
@@ -247,3 +266,313 @@ class TestDefaultCollate:
         assert type(collated_batch["mask2"]) is BatchMasks
         assert isinstance(collated_batch["string"], list)
         assert isinstance(collated_batch["tensor"], torch.Tensor)
+
+
+def _random_transform(batch):
+    return torch.rand(2)
+
+
+def _collate_is_shared(batch):
+    return torch.tensor(default_collate(batch).is_shared())
+
+
+class TestTransformCollate:
+    def test_transform(self):
+        images = [make_image((8, 10)) for _ in range(4)]
+        boxes = [make_bounding_boxes((8, 10)) for _ in range(4)]
+        collate_fn = TransformCollate(transforms.RandomHorizontalFlip(p=1.0, batch_transform=True))
+
+        actual_images, actual_boxes = collate_fn(list(zip(images, boxes)))
+
+        expected_images, expected_boxes = default_collate(list(zip(images, boxes)))
+        assert isinstance(actual_images, BatchImages)
+        assert isinstance(actual_boxes, BatchBoundingBoxes)
+        assert_equal(actual_images, expected_images.flip(-1))
+        assert_equal(actual_boxes, transforms.RandomHorizontalFlip(p=1.0, batch_transform=True)(expected_boxes))
+
+    def test_rng_isolation(self):
+        torch.manual_seed(0)
+        expected = TransformCollate(_random_transform)([torch.zeros(1)])
+
+        torch.manual_seed(0)
+        torch.rand(10)
+        state = torch.get_rng_state()
+        actual = TransformCollate(_random_transform)([torch.zeros(1)])
+
+        assert_equal(actual, expected)
+        assert_equal(torch.get_rng_state(), state)
+
+    def test_cuda_rng_not_seeded(self, mocker):
+        manual_seed_all = mocker.patch("torch.cuda.manual_seed_all")
+
+        TransformCollate(_random_transform)([torch.zeros(1)])
+
+        manual_seed_all.assert_not_called()
+
+    def test_dataloader_workers(self):
+        def run(seed):
+            dataloader = DataLoader(
+                [torch.zeros(1)] * 4,
+                batch_size=1,
+                num_workers=2,
+                collate_fn=TransformCollate(_random_transform),
+                generator=torch.Generator().manual_seed(seed),
+            )
+            return torch.stack(list(dataloader))
+
+        output = run(0)
+
+        assert_equal(output, run(0))
+        assert not torch.equal(output[0], output[1])
+        assert not torch.equal(output, run(1))
+
+    def test_shared_memory_in_workers(self):
+        images = [make_image((8, 10)) for _ in range(4)]
+        dataloader = DataLoader(images, batch_size=2, num_workers=1, collate_fn=_collate_is_shared)
+
+        assert all(is_shared for is_shared in dataloader)
+        assert not default_collate(images).is_shared()
+
+    def test_tracer_workers(self, tmp_path):
+        path = tmp_path / "trace.json"
+        transform = transforms.SequentialTransform([transforms.RandomHorizontalFlip(p=1)])
+        dataloader = DataLoader(
+            [make_image((8, 10)) for _ in range(8)],
+            batch_size=2,
+            num_workers=2,
+            collate_fn=TransformCollate(transform),
+        )
+
+        with transforms.TransformTracer(str(path)):
+            assert len(list(dataloader)) == 4
+
+        events = json.loads(path.read_text())["traceEvents"]
+        process_names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+        assert process_names == {"worker 0", "worker 1"}
+        batches = sorted(
+            (event["args"]["worker"], event["args"]["batch"])
+            for event in events
+            if event["name"] == "TransformCollate"
+        )
+        assert batches == [(0, 0), (0, 2), (1, 1), (1, 3)]
+        names = {event["name"] for event in events if event["ph"] == "X"}
+        assert names == {
+            "TransformCollate",
+            "default_collate",
+            "SequentialTransform",
+            "RandomHorizontalFlip",
+            "RandomHorizontalFlip chunk 0",
+        }
+
+    def test_pickle(self):
+        collate_fn = TransformCollate(_random_transform)
+        collate_fn([torch.zeros(1)])
+
+        unpickled = pickle.loads(pickle.dumps(collate_fn))
+
+        assert unpickled.transforms is _random_transform
+        assert unpickled._generator is None
+
+
+class TestBatchBufferPool:
+    def test_collate_in_buffers(self):
+        pool = BatchBufferPool(num_buffers=2, batch_size=4, sample_shape=(3, 8, 10), timeout=0.1)
+        images = [make_image((8, 10)) for _ in range(4)]
+
+        first = default_collate(images, buffer_pool=pool)
+        second = default_collate(images[:3], buffer_pool=pool)
+
+        assert isinstance(first, BatchImages)
+        assert_equal(first, default_collate(images))
+        assert_equal(second, default_collate(images[:3]))
+        assert first.is_shared()
+        assert first.untyped_storage().data_ptr() == second.untyped_storage().data_ptr()
+        assert first.data_ptr() != second.data_ptr()
+
+        with pytest.raises(RuntimeError, match="No buffer was released"):
+            default_collate(images, buffer_pool=pool)
+
+        pool.release(first)
+        third = default_collate(images, buffer_pool=pool)
+        assert third.data_ptr() == first.data_ptr()
+
+    def test_fallback(self):
+        pool = BatchBufferPool(num_buffers=1, batch_size=2, sample_shape=(3, 8, 10), timeout=0.1)
+        images = [make_image((8, 10)) for _ in range(4)]
+
+        output = default_collate(images, buffer_pool=pool)
+        assert_equal(output, default_collate(images))
+        output = default_collate([make_image((8, 12)) for _ in range(2)], buffer_pool=pool)
+        assert output.untyped_storage().data_ptr() != pool._buffers.untyped_storage().data_ptr()
+
+    def test_video_channels_last(self):
+        videos = [make_video((8, 10)) for _ in range(2)]
+        pool = BatchBufferPool(num_buffers=1, batch_size=2, sample_shape=videos[0].shape, timeout=0.1)
+
+        output = default_collate(videos, buffer_pool=pool)
+        assert isinstance(output, BatchVideos)
+        assert_equal(output, default_collate(videos))
+
+        images = [make_image((8, 10)) for _ in range(2)]
+        pool = BatchBufferPool(
+            num_buffers=1, batch_size=2, sample_shape=(3, 8, 10), memory_format=torch.channels_last, timeout=0.1
+        )
+        output = default_collate(images, buffer_pool=pool)
+        assert output.is_contiguous(memory_format=torch.channels_last)
+        assert_equal(output, default_collate(images))
+
+    def test_release_error(self):
+        pool = BatchBufferPool(num_buffers=1, batch_size=2, sample_shape=(3, 8, 10))
+        with pytest.raises(ValueError, match="not collated in a buffer of this pool"):
+            pool.release(torch.zeros(1, 3, 8, 10, dtype=torch.uint8))
+
+        # A batch of another pool with the same shape.
+        other_pool = BatchBufferPool(num_buffers=1, batch_size=2, sample_shape=(3, 8, 10))
+        other_batch = default_collate([make_image((8, 10)) for _ in range(2)], buffer_pool=other_pool)
+        with pytest.raises(ValueError, match="not collated in a buffer of this pool"):
+            pool.release(other_batch)
+
+        batch = default_collate([make_image((8, 10)) for _ in range(2)], buffer_pool=pool)
+        pool.release(batch)
+        with pytest.raises(ValueError, match="already released"):
+            pool.release(batch)
+        other_pool.release(other_batch)
+
+    def test_dataloader_workers(self):
+        images = [make_image((8, 10)) for _ in range(12)]
+        pool = BatchBufferPool(num_buffers=3, batch_size=2, sample_shape=(3, 8, 10), timeout=10)
+        dataloader = DataLoader(
+            images,
+            batch_size=2,
+            num_workers=1,
+            prefetch_factor=2,
+            collate_fn=functools.partial(default_collate, buffer_pool=pool),
+        )
+
+        for i, batch in enumerate(dataloader):
+            assert isinstance(batch, BatchImages)
+            assert_equal(batch, default_collate(images[2 * i : 2 * i + 2]))
+            pool.release(batch)
+            with pytest.raises(ValueError, match="already released"):
+                pool.release(batch)
+        assert i == 5
+
+    def test_release_all(self):
+        pool = BatchBufferPool(num_buffers=2, batch_size=2, sample_shape=(3, 8, 10), timeout=0.1)
+        images = [make_image((8, 10)) for _ in range(2)]
+        batch = default_collate(images, buffer_pool=pool)
+        default_collate(images, buffer_pool=pool)
+
+        pool.release_all()
+
+        default_collate(images, buffer_pool=pool)
+        default_collate(images, buffer_pool=pool)
+        with pytest.raises(RuntimeError, match="No buffer was released"):
+            default_collate(images, buffer_pool=pool)
+        pool.release(batch)
+
+    def test_dataloader_break(self):
+        images = [make_image((8, 10)) for _ in range(12)]
+        pool = BatchBufferPool(num_buffers=3, batch_size=2, sample_shape=(3, 8, 10), timeout=10)
+        dataloader = DataLoader(
+            images,
+            batch_size=2,
+            num_workers=1,
+            prefetch_factor=2,
+            collate_fn=functools.partial(default_collate, buffer_pool=pool),
+        )
+
+        # The batches prefetched when leaving the loop are never released.
+        for _ in range(3):
+            for i, batch in enumerate(dataloader):
+                assert_equal(batch, default_collate(images[2 * i : 2 * i + 2]))
+                pool.release(batch)
+                if i == 1:
+                    break
+
+
+class _CountingLoader:
+    def __init__(self, num_batches):
+        self.num_batches = num_batches
+        self.num_fetched = 0
+
+    def __iter__(self):
+        for i in range(self.num_batches):
+            self.num_fetched += 1
+            yield BatchImages(torch.full((2, 3, 4, 4), i, dtype=torch.uint8))
+
+    def __len__(self):
+        return self.num_batches
+
+
+def _prefetch_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "torchaug_prefetch"]
+
+
+class TestTransformPrefetcher:
+    def test_transform(self):
+        images = [make_image((8, 10)) for _ in range(8)]
+        loader = DataLoader(images, batch_size=2, collate_fn=default_collate)
+        transform = transforms.RandomHorizontalFlip(p=1.0, batch_transform=True)
+
+        actual = list(TransformPrefetcher(loader, transform))
+
+        assert len(actual) == len(loader) == 4
+        for actual_batch, expected_batch in zip(actual, loader):
+            assert isinstance(actual_batch, BatchImages)
+            assert_equal(actual_batch, expected_batch.flip(-1))
+        assert not _prefetch_threads()
+
+    def test_bounded_queue(self):
+        loader = _CountingLoader(10)
+        with TransformPrefetcher(loader, lambda batch: batch, num_prefetch=2) as prefetcher:
+            iterator = iter(prefetcher)
+            time.sleep(0.5)
+            # The queued batches and the one blocked on the full queue.
+            assert loader.num_fetched == 3
+            assert next(iterator)[0, 0, 0, 0] == 0
+            time.sleep(0.5)
+            assert loader.num_fetched == 4
+        assert not _prefetch_threads()
+
+    def test_exception(self):
+        def transform(batch):
+            if batch[0, 0, 0, 0] == 2:
+                raise ValueError("Invalid batch")
+            return batch
+
+        iterator = iter(TransformPrefetcher(_CountingLoader(5), transform))
+        assert next(iterator)[0, 0, 0, 0] == 0
+        assert next(iterator)[0, 0, 0, 0] == 1
+        with pytest.raises(ValueError, match="Invalid batch"):
+            next(iterator)
+        with pytest.raises(StopIteration):
+            next(iterator)
+        assert not _prefetch_threads()
+
+    def test_close(self):
+        loader = _CountingLoader(100)
+        prefetcher = TransformPrefetcher(loader, lambda batch: batch, num_prefetch=1)
+
+        # The iterator of the loop is deleted when leaving the loop early.
+        for _ in prefetcher:
+            break
+        assert not _prefetch_threads()
+
+        iterator = iter(prefetcher)
+        assert next(iterator)[0, 0, 0, 0] == 0
+        assert len(_prefetch_threads()) == 1
+        # A new iteration stops the thread of the previous one.
+        new_iterator = iter(prefetcher)
+        assert next(new_iterator)[0, 0, 0, 0] == 0
+        assert len(_prefetch_threads()) == 1
+        with pytest.raises(StopIteration):
+            next(iterator)
+
+        prefetcher.close()
+        assert not _prefetch_threads()
+        assert loader.num_fetched < 100
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="num_prefetch should be a positive integer"):
+            TransformPrefetcher(_CountingLoader(1), lambda batch: batch, num_prefetch=0)
@@ -1,9 +1,18 @@
+import json
+import os
+import pickle
 import re
 
+import PIL.Image
 import pytest
+import torch
+from torch.utils.data import DataLoader, default_convert
 from torchvision import datasets
 
+from torchaug import ta_tensors, transforms
 from torchaug.data.dataset import wrap_dataset_for_transforms_v2
+from torchaug.data.dataset._coco_index import CocoDetectionIndex
+from torchaug.transforms import functional as F
 
 
 class TestDatasetWrapper:
@@ -46,3 +55,157 @@ class TestDatasetWrapper:
         wrapped_dataset = wrap_dataset_for_transforms_v2(dataset)
 
         assert wrapped_dataset[0] is sentinel
+
+
+class TestCocoDetectionIndex:
+    @staticmethod
+    def _make_coco(root, sizes=((16, 20), (12, 10), (18, 14))):
+        images, annotations = [], []
+        for image_id, ((height, width), num_annotations) in enumerate(zip(sizes, [2, 0, 3]), 1):
+            file_name = f"{image_id}.png"
+            PIL.Image.new("RGB", (width, height)).save(root / file_name)
+            images.append({"id": image_id, "file_name": file_name, "height": height, "width": width})
+            for i in range(num_annotations):
+                x, y = 1.5 + i, 2.0 + i
+                annotations.append(
+                    {
+                        "id": len(annotations) + 1,
+                        "image_id": image_id,
+                        "category_id": i + 1,
+                        "bbox": [x, y, 4.0, 5.0],
+                        "area": 20.0,
+                        "iscrowd": 0,
+                        "segmentation": [[x, y, x + 4, y, x + 4, y + 5, x, y + 5]],
+                    }
+                )
+        ann_file = root / "annotations.json"
+        ann_file.write_text(
+            json.dumps(
+                {
+                    "images": images,
+                    "annotations": annotations,
+                    "categories": [{"id": i, "name": str(i)} for i in range(1, 4)],
+                }
+            )
+        )
+        return datasets.CocoDetection(str(root), str(ann_file))
+
+    def test_index_matches_wrapper(self, tmp_path):
+        dataset = self._make_coco(tmp_path)
+        target_keys = {"image_id", "boxes", "masks", "labels", "bbox", "category_id", "area", "iscrowd"}
+        expected_dataset = wrap_dataset_for_transforms_v2(dataset, target_keys=target_keys)
+        index_file = str(tmp_path / "index.pt")
+        indexed_dataset = wrap_dataset_for_transforms_v2(
+            self._make_coco(tmp_path), target_keys=target_keys, index_file=index_file
+        )
+
+        for i in range(len(dataset)):
+            expected_image, expected = expected_dataset[i]
+            image, actual = indexed_dataset[i]
+            torch.testing.assert_close(image, expected_image)
+            assert actual.keys() == expected.keys()
+            for key, value in expected.items():
+                if isinstance(value, torch.Tensor):
+                    assert type(actual[key]) is type(value)
+                    torch.testing.assert_close(actual[key], value)
+                    if key == "boxes":
+                        assert actual[key].canvas_size == value.canvas_size
+                else:
+                    assert actual[key] == value
+
+    def test_index_file_reused_and_rebuilt(self, tmp_path):
+        dataset = self._make_coco(tmp_path)
+        index_file = str(tmp_path / "index.pt")
+
+        index = CocoDetectionIndex.from_dataset(dataset, index_file)
+        assert len(index) == 3
+        assert [index.num_annotations(i) for i in range(3)] == [2, 0, 3]
+        mtime = os.path.getmtime(index_file)
+        CocoDetectionIndex.from_dataset(dataset, index_file)
+        assert os.path.getmtime(index_file) == mtime
+
+        dataset.ids = dataset.ids[:2]
+        index = CocoDetectionIndex.from_dataset(dataset, index_file)
+        assert len(index) == 2
+
+    def test_index_file_rebuilt_on_edited_annotation(self, tmp_path):
+        dataset = self._make_coco(tmp_path)
+        index_file = str(tmp_path / "index.pt")
+        CocoDetectionIndex.from_dataset(dataset, index_file)
+
+        ann_file = tmp_path / "annotations.json"
+        content = json.loads(ann_file.read_text())
+        content["annotations"][0]["bbox"] = [0.0, 0.0, 3.0, 3.0]
+        ann_file.write_text(json.dumps(content))
+        dataset = datasets.CocoDetection(str(tmp_path), str(ann_file))
+
+        index = CocoDetectionIndex.from_dataset(dataset, index_file)
+        assert index.get("bbox", 0)[0].tolist() == [0.0, 0.0, 3.0, 3.0]
+
+    def test_pickle(self, tmp_path):
+        index_file = str(tmp_path / "index.pt")
+        dataset = wrap_dataset_for_transforms_v2(self._make_coco(tmp_path), index_file=index_file)
+        unpickled = pickle.loads(pickle.dumps(dataset))
+
+        assert unpickled._index_file == index_file
+        assert unpickled[2][1]["labels"].tolist() == [1, 2, 3]
+
+    def test_index_file_not_supported(self):
+        with pytest.raises(ValueError, match="`index_file` is currently only supported for `CocoDetection`"):
+            wrap_dataset_for_transforms_v2(datasets.VOCSegmentation.__new__(datasets.VOCSegmentation), index_file="x")
+
+
+class TestBatchedFetching:
+    @staticmethod
+    def _make_coco(root):
+        return TestCocoDetectionIndex._make_coco(root, sizes=[(16, 20)] * 3)
+
+    def test_getitems_not_batched(self, tmp_path):
+        dataset = wrap_dataset_for_transforms_v2(self._make_coco(tmp_path))
+
+        samples = dataset.__getitems__([2, 0])
+
+        assert len(samples) == 2
+        assert samples[0][1]["labels"].tolist() == dataset[2][1]["labels"].tolist()
+
+    def test_getitems_batched(self, tmp_path):
+        dataset = wrap_dataset_for_transforms_v2(self._make_coco(tmp_path), target_keys={"boxes", "labels"})
+        batched_dataset = wrap_dataset_for_transforms_v2(
+            self._make_coco(tmp_path), target_keys={"boxes", "labels"}, batched=True
+        )
+        batched_dataset.transforms = transforms.RandomHorizontalFlip(p=1.0, batch_transform=True)
+
+        indices = [2, 0]
+        images, target = batched_dataset.__getitems__(indices)
+
+        assert isinstance(images, ta_tensors.BatchImages)
+        assert isinstance(target["boxes"], ta_tensors.BatchBoundingBoxes)
+        assert isinstance(target["labels"], ta_tensors.BatchLabels)
+        assert images.shape == (2, 3, 16, 20)
+        assert target["boxes"].samples_ranges == [(0, 3), (3, 5)]
+        for i, idx in enumerate(indices):
+            image, expected = dataset[idx]
+            torch.testing.assert_close(images[i], F.horizontal_flip(image))
+            torch.testing.assert_close(
+                target["boxes"].get_sample(i).as_subclass(torch.Tensor),
+                F.horizontal_flip(expected["boxes"]).as_subclass(torch.Tensor),
+            )
+
+    def test_dataloader(self, tmp_path):
+        dataset = wrap_dataset_for_transforms_v2(self._make_coco(tmp_path), batched=True)
+        dataloader = DataLoader(dataset, batch_size=2, sampler=[0, 2, 2], collate_fn=default_convert)
+
+        batches = list(dataloader)
+
+        assert len(batches) == 2
+        assert isinstance(batches[0][0], ta_tensors.BatchImages)
+        assert batches[0][0].shape[0] == 2
+        assert batches[0][1]["labels"].samples_ranges == [(0, 2), (2, 5)]
+        assert batches[1][1]["labels"].samples_ranges == [(0, 3)]
+
+    def test_pickle(self, tmp_path):
+        dataset = wrap_dataset_for_transforms_v2(self._make_coco(tmp_path), batched=True)
+        unpickled = pickle.loads(pickle.dumps(dataset))
+
+        assert unpickled._batched
+        assert isinstance(unpickled.__getitems__([0, 2])[0], ta_tensors.BatchImages)
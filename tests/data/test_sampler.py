@@ -0,0 +1,135 @@
+import os
+from unittest import mock
+
+import PIL.Image
+import pytest
+import torch
+from torch.utils.data import DataLoader, RandomSampler, SequentialSampler, Subset, SubsetRandomSampler
+from torchvision import datasets
+from torchvision import transforms as tv_transforms
+
+from torchaug.data.dataloader import default_collate
+from torchaug.data.dataset import wrap_dataset_for_transforms_v2
+from torchaug.data.sampler import GroupedBatchSampler, get_image_sizes, group_sizes
+from torchaug.ta_tensors import BatchImages
+
+from ..utils import assert_equal, make_image
+from . import test_dataset
+
+
+SIZES = [(16, 20), (12, 10), (16, 20), (12, 10), (16, 20), (8, 8), (16, 20)]
+
+
+class TestGroupSizes:
+    def test_identical_sizes(self):
+        assert group_sizes(SIZES) == [0, 1, 0, 1, 0, 2, 0]
+
+    def test_buckets(self):
+        buckets = [(10, 10), (10, 20), (20, 10)]
+        assert group_sizes([(16, 20), (12, 10), (5, 12), (30, 14), (9, 9)], buckets=buckets) == [0, 0, 1, 2, 0]
+
+    def test_empty_buckets(self):
+        with pytest.raises(ValueError, match="buckets should not be empty"):
+            group_sizes(SIZES, buckets=[])
+
+
+class _ListDataset(datasets.VisionDataset):
+    def __init__(self, images, transform=None):
+        super().__init__(root=None, transform=transform)
+        self.images = images
+
+    def __getitem__(self, idx):
+        image = self.images[idx]
+        return self.transform(image) if self.transform is not None else image
+
+    def __len__(self):
+        return len(self.images)
+
+
+class TestGetImageSizes:
+    def test_coco(self, tmp_path):
+        dataset = test_dataset.TestCocoDetectionIndex._make_coco(tmp_path)
+        expected = [(16, 20), (12, 10), (18, 14)]
+
+        assert get_image_sizes(dataset) == expected
+        assert get_image_sizes(wrap_dataset_for_transforms_v2(dataset)) == expected
+        assert get_image_sizes(Subset(dataset, [2, 0])) == [(18, 14), (16, 20)]
+
+    def test_load_samples(self):
+        dataset = [(make_image(size), 0) for size in SIZES]
+        assert get_image_sizes(dataset) == SIZES
+
+    def test_image_folder(self, tmp_path):
+        for i, (height, width) in enumerate(SIZES):
+            (tmp_path / "class").mkdir(exist_ok=True)
+            PIL.Image.new("RGB", (width, height)).save(tmp_path / "class" / f"{i}.png")
+        dataset = datasets.ImageFolder(str(tmp_path), transform=tv_transforms.RandomCrop(4))
+
+        expected = [SIZES[int(os.path.basename(path)[:-4])] for path, _ in dataset.samples]
+        with mock.patch.object(PIL.Image.Image, "load", side_effect=AssertionError("decoded")):
+            assert get_image_sizes(dataset) == expected
+
+    def test_transforms_disabled(self):
+        dataset = _ListDataset([make_image(size) for size in SIZES], transform=tv_transforms.RandomCrop(4))
+        assert get_image_sizes(dataset) == SIZES
+        assert dataset.transform is not None
+
+
+class TestGroupedBatchSampler:
+    @pytest.mark.parametrize("drop_last", [False, True])
+    def test_batches(self, drop_last):
+        group_ids = group_sizes(SIZES)
+        batch_sampler = GroupedBatchSampler(SequentialSampler(SIZES), group_ids, batch_size=2, drop_last=drop_last)
+
+        batches = list(batch_sampler)
+
+        expected = [[0, 2], [1, 3], [4, 6]] if drop_last else [[0, 2], [1, 3], [4, 6], [5]]
+        assert batches == expected
+        assert len(batch_sampler) == len(expected)
+
+    def test_random_sampler(self):
+        group_ids = group_sizes(SIZES)
+        batch_sampler = GroupedBatchSampler(
+            RandomSampler(SIZES, generator=torch.Generator().manual_seed(0)), group_ids, batch_size=3
+        )
+
+        batches = list(batch_sampler)
+
+        assert sorted(idx for batch in batches for idx in batch) == list(range(len(SIZES)))
+        for batch in batches:
+            assert len({SIZES[idx] for idx in batch}) == 1
+            assert len(batch) <= 3
+        assert len(batch_sampler) == len(batches)
+
+    def test_dataloader(self):
+        dataset = [make_image(size) for size in SIZES]
+        batch_sampler = GroupedBatchSampler(SequentialSampler(dataset), group_sizes(SIZES), batch_size=2)
+
+        for batch in DataLoader(dataset, batch_sampler=batch_sampler, collate_fn=default_collate):
+            assert isinstance(batch, BatchImages)
+
+    @pytest.mark.parametrize(
+        "make_sampler",
+        [
+            lambda: SequentialSampler(SIZES),
+            lambda: RandomSampler(SIZES),
+            lambda: SubsetRandomSampler([0, 1, 5, 6]),
+            lambda: RandomSampler(SIZES, replacement=True),
+        ],
+    )
+    def test_len(self, make_sampler):
+        batch_sampler = GroupedBatchSampler(make_sampler(), group_sizes(SIZES), batch_size=2)
+
+        torch.manual_seed(0)
+        expected = torch.rand(1)
+        torch.manual_seed(0)
+        length = len(batch_sampler)
+        assert_equal(torch.rand(1), expected)
+
+        if not isinstance(batch_sampler.sampler, RandomSampler) or not batch_sampler.sampler.replacement:
+            assert length == len(list(batch_sampler))
+
+    @pytest.mark.parametrize("batch_size", [0, -1, 1.5, True])
+    def test_batch_size_error(self, batch_size):
+        with pytest.raises(ValueError, match="batch_size should be a positive integer"):
+            GroupedBatchSampler(SequentialSampler(SIZES), group_sizes(SIZES), batch_size=batch_size)
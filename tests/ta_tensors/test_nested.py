@@ -1,9 +1,18 @@
+import functools
+import pickle
+from unittest import mock
+
 import pytest
 import torch
 
+import torchaug.transforms as transforms
+import torchaug.transforms.functional as F
+from torchaug.data.dataloader import default_nested_collate
 from torchaug.ta_tensors import (
     BatchBoundingBoxes,
+    BoundingBoxes,
     BoundingBoxesNestedTensors,
+    Image,
     ImageNestedTensors,
     LabelsNestedTensors,
     MaskNestedTensors,
@@ -13,6 +22,7 @@ from torchaug.ta_tensors import (
     convert_labels_to_batch_labels,
     convert_masks_to_batch_masks,
     set_return_type,
+    wrap,
 )
 
 from ..utils import (
@@ -665,3 +675,378 @@ class TestTANestedTensors:
 
         for tensor, result_tensor in zip(tensors, result):
             assert tensor is result_tensor
+
+
+_MAKE_INPUT_TYPE_NESTED = [
+    (make_image, ImageNestedTensors),
+    (make_video, VideoNestedTensors),
+    (make_bounding_boxes, BoundingBoxesNestedTensors),
+    (make_detection_masks, MaskNestedTensors),
+    (make_labels, LabelsNestedTensors),
+    (make_image_tensor, NestedTensors),
+]
+
+
+class TestPackedTANestedTensors:
+    def _make_tensors(self, make_input, device):
+        if make_input is make_bounding_boxes:
+            tensors = [make_input(num_boxes=n, device=device) for n in (2, 1, 5)]
+            return tensors[:1] + [wrap(tensors[1][:0], like=tensors[1])] + tensors[2:]
+        elif make_input is make_labels:
+            return [make_input(size=(n,), device=device) for n in (2, 0, 5)]
+        return [make_input(size=size, device=device) for size in [(3, 5), (7, 2), (4, 4)]]
+
+    @pytest.mark.parametrize("make_input,type_nested", _MAKE_INPUT_TYPE_NESTED)
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    def test_pack(self, make_input, type_nested, device):
+        tensors = self._make_tensors(make_input, device)
+        nested_tensors = type_nested(tensors)
+        assert not nested_tensors.is_packed
+        assert nested_tensors.packed_data is None
+
+        packed = nested_tensors.pack()
+
+        assert isinstance(packed, type_nested)
+        assert packed.is_packed
+        assert packed.pack() is packed
+        assert packed.packed_data.shape == (sum(tensor.numel() for tensor in tensors),)
+        for tensor, packed_tensor in zip(tensors, packed.tensors):
+            assert type(packed_tensor) is type(tensor)
+            assert_equal(packed_tensor, tensor)
+        if isinstance(tensors[0], BoundingBoxes):
+            assert all(packed_tensor.canvas_size == tensors[0].canvas_size for packed_tensor in packed.tensors)
+
+    def test_pack_out(self):
+        tensors = self._make_tensors(make_image, "cpu")
+        out = torch.empty(sum(tensor.numel() for tensor in tensors), dtype=torch.uint8)
+        packed = ImageNestedTensors(tensors).pack(out=out)
+        assert packed.packed_data.data_ptr() == out.data_ptr()
+
+    @pytest.mark.parametrize("make_input,type_nested", _MAKE_INPUT_TYPE_NESTED)
+    def test_ops(self, make_input, type_nested):
+        tensors = self._make_tensors(make_input, "cpu")
+        packed = type_nested(tensors).pack()
+
+        for result, expected in [
+            (packed + 1, [tensor + 1 for tensor in tensors]),
+            (packed * packed, [tensor * tensor for tensor in tensors]),
+            (packed.clone(), tensors),
+            (packed.to(dtype=torch.float64), [tensor.to(torch.float64) for tensor in tensors]),
+        ]:
+            assert result.is_packed
+            for tensor, result_tensor, expected_tensor in zip(tensors, result.tensors, expected):
+                assert type(result_tensor) is type(tensor)
+                assert_equal(result_tensor.as_subclass(torch.Tensor), expected_tensor.as_subclass(torch.Tensor))
+
+        # Tensors that are not scalars are not broadcast on the packed data.
+        image = ImageNestedTensors(self._make_tensors(make_image, "cpu")).pack()
+        result = image.mul(torch.tensor([1, 2, 3], dtype=torch.uint8).view(3, 1, 1))
+        assert not result.is_packed
+
+    def test_inplace_ops(self):
+        tensors = self._make_tensors(make_image, "cpu")
+        packed = ImageNestedTensors(tensors).pack()
+        data_ptr = packed.packed_data.data_ptr()
+
+        assert packed.add_(1) is packed
+        packed.mul_(packed)
+
+        assert packed.is_packed
+        assert packed.packed_data.data_ptr() == data_ptr
+        for tensor, packed_tensor in zip(tensors, packed.tensors):
+            assert_equal(packed_tensor, (tensor + 1) * (tensor + 1))
+
+    def test_unpacked_after_setitem(self):
+        tensors = self._make_tensors(make_image, "cpu")
+        packed = ImageNestedTensors(tensors).pack()
+        packed[1] = tensors[1].clone()
+        assert not packed.is_packed
+
+        result = packed + 1
+        assert not result.is_packed
+        assert_equal(result.tensors[1], tensors[1] + 1)
+
+    @pytest.mark.parametrize("make_input,type_nested", _MAKE_INPUT_TYPE_NESTED)
+    def test_pickle(self, make_input, type_nested):
+        tensors = self._make_tensors(make_input, "cpu")
+        nested_tensors = type_nested(tensors)
+        packed = nested_tensors.pack()
+
+        result = pickle.loads(pickle.dumps(packed))
+
+        assert isinstance(result, type_nested)
+        assert result.is_packed
+        assert result == nested_tensors
+        for tensor, result_tensor in zip(tensors, result.tensors):
+            assert type(result_tensor) is type(tensor)
+            if isinstance(tensor, BoundingBoxes):
+                assert result_tensor.canvas_size == tensor.canvas_size
+                assert result_tensor.format == tensor.format
+
+        unpacked = pickle.loads(pickle.dumps(nested_tensors))
+        assert not unpacked.is_packed
+        assert unpacked == nested_tensors
+
+    @pytest.mark.parametrize("num_workers", [0, 2])
+    def test_default_nested_collate(self, num_workers):
+        images = self._make_tensors(make_image, "cpu")
+        loader = torch.utils.data.DataLoader(
+            [(image, i) for i, image in enumerate(images)],
+            batch_size=3,
+            num_workers=num_workers,
+            collate_fn=functools.partial(default_nested_collate, packed=True),
+        )
+
+        batch_images, labels = next(iter(loader))
+
+        assert isinstance(batch_images, ImageNestedTensors)
+        assert batch_images.is_packed
+        assert batch_images == ImageNestedTensors(images)
+        assert_equal(labels, torch.tensor([0, 1, 2]))
+        if num_workers > 0:
+            assert batch_images.packed_data.is_shared()
+
+
+class TestTorchNestedTANestedTensors:
+    _make_tensors = TestPackedTANestedTensors._make_tensors
+
+    @pytest.mark.parametrize("make_input,type_nested", _MAKE_INPUT_TYPE_NESTED)
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    def test_to_torch_nested(self, make_input, type_nested, device):
+        tensors = self._make_tensors(make_input, device)
+        packed = type_nested(tensors).pack()
+
+        nested = packed.to_torch_nested()
+
+        assert nested.is_nested
+        for component, tensor in zip(nested.unbind(), packed.tensors):
+            assert component.shape == tensor.shape
+            if tensor.numel() > 0:
+                assert component.data_ptr() == tensor.data_ptr()
+
+    @pytest.mark.parametrize("make_input,type_nested", _MAKE_INPUT_TYPE_NESTED)
+    def test_from_torch_nested(self, make_input, type_nested):
+        tensors = self._make_tensors(make_input, "cpu")
+        packed = type_nested(tensors).pack()
+
+        result = type_nested.from_torch_nested(packed.to_torch_nested(), like=packed)
+
+        assert isinstance(result, type_nested)
+        assert result.is_packed
+        assert result.packed_data.data_ptr() == packed.packed_data.data_ptr()
+        assert result == packed
+        for tensor, result_tensor in zip(tensors, result.tensors):
+            assert type(result_tensor) is type(tensor)
+            if isinstance(tensor, BoundingBoxes):
+                assert result_tensor.canvas_size == tensor.canvas_size
+
+    def test_from_torch_nested_without_like(self):
+        images = self._make_tensors(make_image, "cpu")
+        nested = ImageNestedTensors(images).to_torch_nested()
+
+        result = ImageNestedTensors.from_torch_nested(nested * 2)
+
+        assert result.is_packed
+        assert all(type(tensor) is Image for tensor in result.tensors)
+        for result_tensor, image in zip(result.tensors, images):
+            assert_equal(result_tensor, image * 2)
+
+    def test_from_torch_nested_errors(self):
+        images = self._make_tensors(make_image, "cpu")
+        with pytest.raises(ValueError, match="Expected a torch.nested tensor"):
+            ImageNestedTensors.from_torch_nested(images[0])
+        with pytest.raises(ValueError, match="The number of tensors must be the same"):
+            ImageNestedTensors.from_torch_nested(
+                ImageNestedTensors(images).to_torch_nested(), like=ImageNestedTensors(images[:1])
+            )
+
+    def test_with_packed_data(self):
+        images = self._make_tensors(make_image, "cpu")
+        packed = ImageNestedTensors(images).pack()
+
+        result = packed.with_packed_data(packed.packed_data.float())
+
+        assert result.is_packed
+        assert result.dtype == torch.float32
+        for result_tensor, image in zip(result.tensors, images):
+            assert_equal(result_tensor, image.float())
+        with pytest.raises(ValueError, match="as many elements as the tensors"):
+            packed.with_packed_data(packed.packed_data[1:])
+
+
+class TestNestedKernels:
+    def _make_images(self, make_input=make_image, dtype=torch.uint8):
+        return make_input(size=(3, 5), dtype=dtype), make_input(size=(7, 2), dtype=dtype)
+
+    @pytest.mark.parametrize(
+        "make_input,type_nested", [(make_image, ImageNestedTensors), (make_video, VideoNestedTensors)]
+    )
+    @pytest.mark.parametrize("packed", [False, True])
+    @pytest.mark.parametrize(
+        "fn,kwargs,dtype",
+        [
+            (F.to_dtype, dict(dtype=torch.float32, scale=True), torch.uint8),
+            (F.normalize, dict(mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7]), torch.float32),
+            (F.to_dtype_normalize, dict(mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7]), torch.uint8),
+            (F.adjust_brightness, dict(brightness_factor=1.3), torch.uint8),
+            (F.adjust_gamma, dict(gamma=0.7), torch.uint8),
+            (F.posterize, dict(bits=3), torch.uint8),
+            (F.solarize, dict(threshold=100), torch.uint8),
+            (F.invert, {}, torch.uint8),
+        ],
+    )
+    def test_same_as_samples(self, make_input, type_nested, packed, fn, kwargs, dtype):
+        tensors = self._make_images(make_input, dtype)
+        nested_tensors = type_nested(tensors)
+        if packed:
+            nested_tensors = nested_tensors.pack()
+
+        result = fn(nested_tensors, **kwargs)
+
+        assert isinstance(result, type_nested)
+        assert result.is_packed
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            expected = fn(tensor, **kwargs)
+            assert type(result_tensor) is type(expected)
+            torch.testing.assert_close(result_tensor, expected)
+
+    def test_normalize_inplace(self):
+        images = [F.to_dtype(image, torch.float32) for image in self._make_images()]
+        expected = [F.normalize(image, mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7]) for image in images]
+
+        for nested_images in [
+            ImageNestedTensors(images).pack(),
+            ImageNestedTensors([image.clone() for image in images]),
+        ]:
+            result = F.normalize(nested_images, mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7], inplace=True)
+            assert result is nested_images
+            for result_tensor, expected_tensor in zip(result.tensors, expected):
+                torch.testing.assert_close(result_tensor, expected_tensor)
+
+    def test_errors(self):
+        nested_images = ImageNestedTensors(self._make_images())
+        with pytest.raises(TypeError, match="Input tensor should be a float tensor"):
+            F.normalize(nested_images, mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7])
+        with pytest.raises(ValueError, match="Expected mean and std of 3 channels"):
+            F.to_dtype_normalize(nested_images, mean=[0.1, 0.2], std=[0.5, 0.6])
+        with pytest.raises(ValueError, match="same number of channels"):
+            F.adjust_brightness(
+                ImageNestedTensors([make_image(size=(3, 5)), make_image(size=(3, 5), color_space="GRAY")]), 1.5
+            )
+        with pytest.raises(TypeError, match="permitted channel values are"):
+            F.adjust_brightness(ImageNestedTensors([make_image(size=(3, 5), color_space="RGBA")]), 1.5)
+
+    def test_transforms(self):
+        images = self._make_images()
+        boxes = [make_bounding_boxes(canvas_size=image.shape[-2:], num_boxes=2) for image in images]
+        nested_images, nested_boxes = ImageNestedTensors(images).pack(), BoundingBoxesNestedTensors(boxes)
+        transform = transforms.SequentialTransform(
+            [transforms.ToDtype(torch.float32, scale=True), transforms.Normalize([0.1, 0.2, 0.3], [0.5, 0.6, 0.7])]
+        )
+
+        result_images, result_boxes = transform(nested_images, nested_boxes)
+
+        assert isinstance(result_images, ImageNestedTensors)
+        assert result_images.is_packed
+        assert result_boxes is nested_boxes
+        for result_image, image in zip(result_images.tensors, images):
+            torch.testing.assert_close(result_image, transform(image))
+
+        with pytest.raises(ValueError, match="Expected a nested tensor, but got a single tensor"):
+            transforms.Normalize([0.1, 0.2, 0.3], [0.5, 0.6, 0.7])(nested_images.to(dtype=torch.float32), images[0])
+
+
+class TestForeachTANestedTensors:
+    _make_tensors = TestPackedTANestedTensors._make_tensors
+
+    @pytest.mark.parametrize("op", ["add", "sub", "mul", "div"])
+    @pytest.mark.parametrize("inplace", [False, True])
+    @pytest.mark.parametrize("other", ["scalar", "tensor", "nested"])
+    def test_ops(self, op, inplace, other):
+        tensors = [Image(tensor.float()) for tensor in self._make_tensors(make_image, "cpu")]
+        nested_tensors = ImageNestedTensors([tensor.clone() for tensor in tensors])
+        other_value = {
+            "scalar": 1.5,
+            "tensor": torch.tensor(3.0),
+            "nested": ImageNestedTensors([Image(tensor + 1) for tensor in tensors]),
+        }[other]
+        foreach_op = getattr(torch, f"_foreach_{op}_" if inplace else f"_foreach_{op}")
+
+        with mock.patch(f"torch._foreach_{op}{'_' if inplace else ''}", wraps=foreach_op) as mock_foreach_op:
+            result = getattr(nested_tensors, f"{op}_" if inplace else op)(other_value)
+
+        mock_foreach_op.assert_called_once()
+        assert (result is nested_tensors) == inplace
+        for i, (result_tensor, tensor) in enumerate(zip(result.tensors, tensors)):
+            other_tensor = other_value.tensors[i] if other == "nested" else other_value
+            assert type(result_tensor) is Image
+            assert_equal(result_tensor, getattr(tensor, op)(other_tensor))
+
+    def test_ops_metadata(self):
+        tensors = self._make_tensors(make_bounding_boxes, "cpu")
+        result = BoundingBoxesNestedTensors(tensors) * 2
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            assert type(result_tensor) is BoundingBoxes
+            assert result_tensor.canvas_size == tensor.canvas_size
+            assert result_tensor.format == tensor.format
+
+    def test_inplace_reduced_precision(self):
+        tensors = [Image(tensor.half()) for tensor in self._make_tensors(make_image, "cpu")]
+        result = ImageNestedTensors([tensor.clone() for tensor in tensors]).mul_(1 / 255)
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            assert_equal(result_tensor, tensor.mul(1 / 255))
+
+    @pytest.mark.parametrize("fn", [lambda x: x.clone(), lambda x: x.to(dtype=torch.float32)])
+    def test_copy(self, fn):
+        tensors = self._make_tensors(make_image, "cpu")
+        nested_tensors = ImageNestedTensors(tensors)
+
+        with mock.patch("torch._foreach_copy_", wraps=torch._foreach_copy_) as mock_foreach_copy:
+            result = fn(nested_tensors)
+
+        mock_foreach_copy.assert_called_once()
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            assert type(result_tensor) is Image
+            assert result_tensor.data_ptr() != tensor.data_ptr()
+            assert_equal(result_tensor, fn(tensor))
+
+    def test_copy_requires_grad(self):
+        tensors = [tensor.float().requires_grad_(True) for tensor in self._make_tensors(make_image, "cpu")]
+        result = NestedTensors([tensor.as_subclass(torch.Tensor) for tensor in tensors]).clone()
+        assert all(tensor.grad_fn is not None for tensor in result.tensors)
+
+    @pytest.mark.parametrize("packed", [False, True])
+    @pytest.mark.parametrize(
+        ("input_dtype", "dtype", "scale"),
+        [
+            (torch.uint8, torch.float32, True),
+            (torch.uint8, torch.float16, True),
+            (torch.uint8, torch.float32, False),
+            (torch.float32, torch.uint8, True),
+            (torch.uint8, torch.int16, True),
+        ],
+    )
+    def test_to_dtype_(self, packed, input_dtype, dtype, scale):
+        tensors = [F.to_dtype(tensor, input_dtype, scale=True) for tensor in self._make_tensors(make_image, "cpu")]
+        nested_tensors = ImageNestedTensors(tensors)
+        if packed:
+            nested_tensors = nested_tensors.pack()
+
+        result = nested_tensors.to_dtype_(dtype, scale=scale)
+
+        assert result is nested_tensors
+        assert result.dtype == dtype
+        assert result.is_packed == packed
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            assert type(result_tensor) is Image
+            assert_equal(result_tensor, F.to_dtype(tensor, dtype, scale=scale))
+
+    def test_to_dtype_no_scaling(self):
+        tensors = self._make_tensors(make_detection_masks, "cpu")
+        result = MaskNestedTensors(tensors).to_dtype_(torch.float32, scale=True)
+        for result_tensor, tensor in zip(result.tensors, tensors):
+            assert_equal(result_tensor, tensor.float())
+
+    def test_to_dtype_unsafe(self):
+        with pytest.raises(RuntimeError, match="cannot be performed safely"):
+            ImageNestedTensors([make_image(dtype=torch.float32)]).to_dtype_(torch.int32, scale=True)
@@ -0,0 +1,217 @@
+import pytest
+import torch
+
+import torchaug.transforms.functional as F
+from torchaug import ta_tensors
+from torchaug.data.dataloader import default_collate
+from torchaug.ta_tensors import (
+    BatchMasks,
+    BatchPackedMasks,
+    Mask,
+    PackedMasks,
+    convert_batch_packed_masks_to_packed_masks,
+    convert_packed_masks_to_batch_packed_masks,
+)
+
+
+def _make_masks(num_masks, height=7, width=9, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    return torch.randint(0, 2, (num_masks, height, width), dtype=torch.uint8, generator=generator)
+
+
+def _make_batch_masks(num_masks=(3, 10, 0), height=7, width=9):
+    masks = [Mask(_make_masks(n, height, width, seed=i)) for i, n in enumerate(num_masks)]
+    return ta_tensors.convert_masks_to_batch_masks(masks)
+
+
+class TestPackedMasks:
+    @pytest.mark.parametrize("num_masks", [0, 1, 8, 9, 17])
+    def test_round_trip(self, num_masks):
+        masks = _make_masks(num_masks)
+        packed = PackedMasks.from_masks(masks)
+
+        assert isinstance(packed, PackedMasks)
+        assert packed.dtype == torch.uint8
+        assert packed.shape == ((num_masks + 7) // 8, 7, 9)
+        assert packed.num_masks == num_masks
+
+        unpacked = packed.to_masks()
+        assert isinstance(unpacked, Mask)
+        torch.testing.assert_close(unpacked.as_subclass(torch.Tensor), masks)
+
+    def test_to_masks_dtype(self):
+        masks = _make_masks(3)
+        unpacked = PackedMasks.from_masks(masks).to_masks(dtype=torch.bool)
+        assert unpacked.dtype == torch.bool
+        torch.testing.assert_close(unpacked.as_subclass(torch.Tensor), masks.bool())
+
+    def test_non_binary_values(self):
+        masks = torch.tensor([[[0, 3], [255, 0]]], dtype=torch.uint8)
+        unpacked = PackedMasks.from_masks(masks).to_masks()
+        torch.testing.assert_close(unpacked.as_subclass(torch.Tensor), masks.ne(0).to(torch.uint8))
+
+    def test_wrong_channels(self):
+        with pytest.raises(ValueError, match="Expected 2 channels for 9 masks"):
+            PackedMasks(torch.zeros(1, 2, 2, dtype=torch.uint8), num_masks=9)
+
+    def test_wrong_dtype(self):
+        with pytest.raises(ValueError, match="Expected a torch.uint8 tensor"):
+            PackedMasks(torch.zeros(1, 2, 2), num_masks=1)
+
+    def test_wrap(self):
+        packed = PackedMasks.from_masks(_make_masks(10))
+        output = ta_tensors.wrap(packed.as_subclass(torch.Tensor).flip(-1), like=packed)
+        assert isinstance(output, PackedMasks)
+        assert output.num_masks == 10
+
+
+class TestBatchPackedMasks:
+    def test_round_trip(self):
+        batch_masks = _make_batch_masks()
+        packed = BatchPackedMasks.from_batch_masks(batch_masks)
+
+        assert packed.num_masks == [3, 10, 0]
+        assert packed.samples_ranges == [(0, 1), (1, 3), (3, 3)]
+
+        unpacked = packed.to_batch_masks()
+        assert isinstance(unpacked, BatchMasks)
+        assert unpacked.samples_ranges == batch_masks.samples_ranges
+        torch.testing.assert_close(unpacked.as_subclass(torch.Tensor), batch_masks.as_subclass(torch.Tensor))
+
+    def test_convert(self):
+        masks = [PackedMasks.from_masks(_make_masks(n, seed=n)) for n in (3, 10)]
+        batch = convert_packed_masks_to_batch_packed_masks(masks)
+        assert batch.num_masks == [3, 10]
+
+        samples = convert_batch_packed_masks_to_packed_masks(batch)
+        for sample, expected in zip(samples, masks):
+            assert isinstance(sample, PackedMasks)
+            assert sample.num_masks == expected.num_masks
+            torch.testing.assert_close(sample.as_subclass(torch.Tensor), expected.as_subclass(torch.Tensor))
+
+    def test_cat(self):
+        packed = BatchPackedMasks.from_batch_masks(_make_batch_masks())
+        result = BatchPackedMasks.cat([packed, packed])
+        assert result.num_masks == [3, 10, 0, 3, 10, 0]
+        assert result.samples_ranges == [(0, 1), (1, 3), (3, 3), (3, 4), (4, 6), (6, 6)]
+
+    def test_get_chunk_and_update_chunk(self):
+        packed = BatchPackedMasks.from_batch_masks(_make_batch_masks())
+        chunk_indices = torch.tensor([1, 0])
+
+        chunk = packed.get_chunk(chunk_indices)
+        assert chunk.num_masks == [10, 3]
+        assert chunk.samples_ranges == [(0, 2), (2, 3)]
+
+        flipped = F.horizontal_flip(chunk)
+        packed.update_chunk_(flipped, chunk_indices)
+        torch.testing.assert_close(
+            packed.get_sample(0).to_masks().as_subclass(torch.Tensor),
+            _make_masks(3, seed=0).flip(-1),
+        )
+
+    def test_masked_select(self):
+        batch_masks = _make_batch_masks()
+        packed = BatchPackedMasks.from_batch_masks(batch_masks)
+        keep = torch.rand(batch_masks.num_data) > 0.5
+
+        result = BatchPackedMasks.masked_select(packed, keep)
+        expected = BatchMasks.masked_select(batch_masks, keep)
+
+        assert isinstance(result, BatchPackedMasks)
+        unpacked = result.to_batch_masks()
+        assert unpacked.samples_ranges == expected.samples_ranges
+        torch.testing.assert_close(unpacked.as_subclass(torch.Tensor), expected.as_subclass(torch.Tensor))
+
+    def test_collate(self):
+        masks = [PackedMasks.from_masks(_make_masks(n, seed=n)) for n in (3, 10)]
+        batch = default_collate(masks)
+        assert isinstance(batch, BatchPackedMasks)
+        assert batch.num_masks == [3, 10]
+
+        batch = default_collate([batch, batch])
+        assert isinstance(batch, BatchPackedMasks)
+        assert batch.num_masks == [3, 10, 3, 10]
+
+
+class TestPackedMasksKernels:
+    @pytest.mark.parametrize(
+        ("fn", "kwargs"),
+        [
+            (F.horizontal_flip, {}),
+            (F.vertical_flip, {}),
+            (F.crop, dict(top=1, left=-2, height=5, width=8)),
+            (F.center_crop, dict(output_size=[5, 11])),
+            (F.pad, dict(padding=[1, 2])),
+            (F.pad, dict(padding=[1, 2], fill=1)),
+            (F.pad, dict(padding=[1, 2], padding_mode="reflect")),
+            (F.resize, dict(size=[13, 5])),
+            (F.resized_crop, dict(top=1, left=2, height=4, width=5, size=[10, 12])),
+            (F.affine, dict(angle=30.0, translate=[1.0, -2.0], scale=1.2, shear=[5.0, 0.0])),
+            (F.affine, dict(angle=30.0, translate=[1.0, -2.0], scale=0.8, shear=[5.0, 0.0], fill=1)),
+            (F.rotate, dict(angle=45.0, expand=True)),
+            (
+                F.perspective,
+                dict(startpoints=[[0, 0], [8, 0], [8, 6], [0, 6]], endpoints=[[1, 0], [8, 1], [7, 6], [0, 5]]),
+            ),
+            (F.elastic, dict(displacement=torch.rand(1, 7, 9, 2) * 0.2 - 0.1)),
+        ],
+    )
+    def test_same_as_masks(self, fn, kwargs):
+        masks = Mask(_make_masks(10))
+        packed = PackedMasks.from_masks(masks)
+
+        output = fn(packed, **kwargs)
+        expected = fn(masks, **kwargs)
+
+        assert isinstance(output, PackedMasks)
+        assert output.num_masks == 10
+        torch.testing.assert_close(output.to_masks().as_subclass(torch.Tensor), expected.as_subclass(torch.Tensor))
+
+    def test_batch_same_as_masks(self):
+        batch_masks = _make_batch_masks()
+        packed = BatchPackedMasks.from_batch_masks(batch_masks)
+
+        output = F.resized_crop(packed, top=1, left=2, height=4, width=5, size=[10, 12])
+        expected = F.resized_crop(batch_masks, top=1, left=2, height=4, width=5, size=[10, 12])
+
+        assert isinstance(output, BatchPackedMasks)
+        torch.testing.assert_close(
+            output.to_batch_masks().as_subclass(torch.Tensor), expected.as_subclass(torch.Tensor)
+        )
+
+    def test_elastic_batch_same_as_masks(self):
+        batch_masks = _make_batch_masks()
+        packed = BatchPackedMasks.from_batch_masks(batch_masks)
+        displacement = torch.rand(3, 7, 9, 2) * 0.2 - 0.1
+
+        output = F.elastic_batch(packed, displacement=displacement)
+        expected = F.elastic_batch(batch_masks, displacement=displacement)
+
+        assert isinstance(output, BatchPackedMasks)
+        torch.testing.assert_close(
+            output.to_batch_masks().as_subclass(torch.Tensor), expected.as_subclass(torch.Tensor)
+        )
+
+    def test_get_size(self):
+        assert F.get_size(PackedMasks.from_masks(_make_masks(10))) == [7, 9]
+        assert F.get_size(BatchPackedMasks.from_batch_masks(_make_batch_masks())) == [7, 9]
+
+    @pytest.mark.parametrize("fill", [2, [0, 1], 0.5])
+    def test_fill_error(self, fill):
+        packed = PackedMasks.from_masks(_make_masks(10))
+        with pytest.raises(ValueError, match="Packed masks can only be filled with 0 or 1"):
+            F.pad(packed, padding=[1], fill=fill)
+
+    def test_sanitize_bounding_boxes(self):
+        from torchaug.transforms import SanitizeBoundingBoxes
+
+        masks = _make_masks(3)
+        boxes = ta_tensors.BoundingBoxes([[0, 0, 4, 4], [1, 1, 1, 1], [2, 2, 6, 5]], format="XYXY", canvas_size=(7, 9))
+        sample = {"boxes": boxes, "masks": PackedMasks.from_masks(masks), "labels": torch.tensor([1, 2, 3])}
+
+        output = SanitizeBoundingBoxes()(sample)
+
+        assert isinstance(output["masks"], PackedMasks)
+        assert output["masks"].num_masks == 2
+        torch.testing.assert_close(output["masks"].to_masks().as_subclass(torch.Tensor), masks[[0, 2]])
@@ -0,0 +1,354 @@
+import pytest
+import torch
+from torchvision.transforms import InterpolationMode
+
+import torchaug.transforms as transforms
+import torchaug.transforms.functional as F
+from torchaug import ta_tensors
+from torchaug.data.dataloader import default_collate, default_nested_collate
+from torchaug.ta_tensors import BatchBoundingBoxes, BatchMasks, Image, PaddedBatchImages
+
+
+_SIZES = [(5, 7), (8, 4), (6, 6)]
+
+
+def _make_images(sizes=_SIZES, dtype=torch.uint8):
+    generator = torch.Generator().manual_seed(0)
+    return [
+        Image(torch.randint(0, 256, (3, h, w), dtype=torch.uint8, generator=generator).to(dtype)) for h, w in sizes
+    ]
+
+
+def _assert_samples_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for sample, expected_sample in zip(actual, expected):
+        assert isinstance(sample, Image)
+        torch.testing.assert_close(sample.as_subclass(torch.Tensor), expected_sample.as_subclass(torch.Tensor))
+
+
+class TestPaddedBatchImages:
+    def test_from_images(self):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images, fill=7)
+
+        assert isinstance(batch, PaddedBatchImages)
+        assert batch.shape == (3, 3, 8, 7)
+        assert batch.batch_size == 3
+        assert batch.samples_ranges == [(0, 1), (1, 2), (2, 3)]
+        torch.testing.assert_close(batch.image_sizes, torch.tensor(_SIZES))
+        torch.testing.assert_close(
+            batch.valid_regions, torch.tensor([[0, 0, 7, 5], [0, 0, 4, 8], [0, 0, 6, 6]], dtype=torch.float32)
+        )
+        assert (batch[0, :, 5:] == 7).all()
+        _assert_samples_equal(batch.to_samples(), images)
+
+    def test_new(self):
+        data = torch.rand(2, 3, 4, 5)
+        batch = PaddedBatchImages(data)
+        torch.testing.assert_close(batch.image_sizes, torch.tensor([[4, 5], [4, 5]]))
+
+        batch = PaddedBatchImages(data, image_sizes=[[2, 3], [4, 1]])
+        torch.testing.assert_close(batch.image_sizes, torch.tensor([[2, 3], [4, 1]]))
+
+        batch = PaddedBatchImages(data, valid_regions=[[1, 1, 3, 4], [0, 0, 5, 4]])
+        torch.testing.assert_close(batch.image_sizes, torch.tensor([[3, 2], [4, 5]]))
+
+    def test_new_errors(self):
+        data = torch.rand(2, 3, 4, 5)
+        with pytest.raises(ValueError, match="Only one of image_sizes and valid_regions"):
+            PaddedBatchImages(data, image_sizes=[[2, 3], [4, 1]], valid_regions=[[0, 0, 3, 2], [0, 0, 1, 4]])
+        with pytest.raises(ValueError, match="Expected valid regions of shape"):
+            PaddedBatchImages(data, image_sizes=[[2, 3]])
+        with pytest.raises(ValueError, match="Expected a 4D tensor"):
+            PaddedBatchImages(torch.rand(3, 4, 5))
+
+    def test_valid_mask(self):
+        batch = PaddedBatchImages(torch.rand(2, 3, 4, 5), valid_regions=[[1, 0, 3, 2], [0.0, 0.6, 5, 4]])
+        mask = batch.valid_mask()
+
+        assert mask.shape == (2, 1, 4, 5)
+        expected = torch.zeros(2, 1, 4, 5, dtype=torch.bool)
+        expected[0, :, :2, 1:3] = True
+        expected[1, :, 1:, :] = True
+        torch.testing.assert_close(mask, expected)
+
+    def test_wrap(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+        output = ta_tensors.wrap(batch.as_subclass(torch.Tensor) + 1, like=batch)
+        assert isinstance(output, PaddedBatchImages)
+        torch.testing.assert_close(output.valid_regions, batch.valid_regions)
+
+        with ta_tensors.set_return_type("TATensor"):
+            output = batch.float()
+        assert isinstance(output, PaddedBatchImages)
+        torch.testing.assert_close(output.valid_regions, batch.valid_regions)
+
+    def test_cat(self):
+        images = _make_images()
+        batch1 = PaddedBatchImages.from_images(images[:1])
+        batch2 = PaddedBatchImages.from_images(images[1:])
+
+        output = PaddedBatchImages.cat([batch1, batch2])
+
+        assert output.shape == (3, 3, 8, 7)
+        torch.testing.assert_close(output.valid_regions, PaddedBatchImages.from_images(images).valid_regions)
+        _assert_samples_equal(output.to_samples(), images)
+
+    def test_get_chunk_and_update_chunk(self):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+        clone = batch.clone()
+        chunk_indices = torch.tensor([2, 0])
+
+        chunk = batch.get_chunk(chunk_indices)
+        _assert_samples_equal(chunk.to_samples(), [images[2], images[0]])
+
+        flipped = F.horizontal_flip(chunk)
+        batch.update_chunk_(flipped, chunk_indices)
+
+        torch.testing.assert_close(batch.valid_regions[0], torch.tensor([0.0, 0.0, 7.0, 5.0]))
+        torch.testing.assert_close(batch.valid_regions[2], torch.tensor([1.0, 0.0, 7.0, 6.0]))
+        torch.testing.assert_close(clone.valid_regions, PaddedBatchImages.from_images(images).valid_regions)
+        _assert_samples_equal(
+            batch.to_samples(), [F.horizontal_flip(images[0]), images[1], F.horizontal_flip(images[2])]
+        )
+
+    def test_collate(self):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+        output = default_collate([batch, batch])
+        assert isinstance(output, PaddedBatchImages)
+        assert output.batch_size == 6
+
+
+class TestPaddedBatchImagesKernels:
+    @pytest.mark.parametrize(
+        ("fn", "kwargs"),
+        [
+            (F.horizontal_flip, {}),
+            (F.vertical_flip, {}),
+            (
+                F.resized_crop,
+                dict(top=0, left=0, height=4, width=3, size=[8, 6], interpolation=InterpolationMode.NEAREST),
+            ),
+            (F.adjust_brightness, dict(brightness_factor=1.3)),
+            (F.adjust_saturation, dict(saturation_factor=0.4)),
+            (F.adjust_hue, dict(hue_factor=0.2)),
+            (F.adjust_contrast, dict(contrast_factor=1.5)),
+            (F.normalize, dict(mean=[0.1, 0.2, 0.3], std=[0.5, 0.6, 0.7])),
+            (F.autocontrast, {}),
+            (F.equalize, {}),
+            (F.erase, dict(i=1, j=1, h=2, w=3, v=torch.zeros(3, 2, 3, dtype=torch.uint8))),
+        ],
+    )
+    def test_same_as_images(self, fn, kwargs):
+        dtype = torch.float32 if fn is F.normalize else torch.uint8
+        images = _make_images(dtype=dtype)
+        batch = PaddedBatchImages.from_images(images)
+
+        output = fn(batch, **kwargs)
+
+        assert isinstance(output, PaddedBatchImages)
+        _assert_samples_equal(output.to_samples(), [fn(image, **kwargs) for image in images])
+
+    def test_resize(self):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+
+        output = F.resize(batch, size=[16, 14], interpolation=InterpolationMode.NEAREST)
+
+        assert output.shape == (3, 3, 16, 14)
+        torch.testing.assert_close(output.image_sizes, 2 * batch.image_sizes)
+        _assert_samples_equal(
+            output.to_samples(),
+            [
+                F.resize(image, size=[2 * s for s in image.shape[-2:]], interpolation=InterpolationMode.NEAREST)
+                for image in images
+            ],
+        )
+
+    @pytest.mark.parametrize("padding_mode", ["constant", "reflect"])
+    def test_pad(self, padding_mode):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+
+        output = F.pad(batch, padding=[1, 2, 3, 0], padding_mode=padding_mode)
+
+        assert output.shape == (3, 3, 10, 11)
+        torch.testing.assert_close(output.valid_regions, batch.valid_regions + torch.tensor([1.0, 2.0, 1.0, 2.0]))
+        _assert_samples_equal(output.to_samples(), images)
+
+    def test_crop(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+
+        output = F.crop(batch, top=2, left=-1, height=5, width=6)
+
+        assert output.shape == (3, 3, 5, 6)
+        torch.testing.assert_close(
+            output.valid_regions, torch.tensor([[1, 0, 6, 3], [1, 0, 5, 5], [1, 0, 6, 4]], dtype=torch.float32)
+        )
+
+    def test_center_crop(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+
+        output = F.center_crop(batch, output_size=[4, 4])
+
+        assert output.shape == (3, 3, 4, 4)
+        torch.testing.assert_close(
+            output.valid_regions, torch.tensor([[0, 0, 4, 3], [0, 0, 2, 4], [0, 0, 4, 4]], dtype=torch.float32)
+        )
+
+    def test_contrast_batch(self):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+        contrast_factor = torch.tensor([0.5, 1.0, 1.5])
+
+        output = F.adjust_contrast_batch(batch, contrast_factor=contrast_factor)
+
+        _assert_samples_equal(
+            output.to_samples(),
+            [
+                F.adjust_contrast(image, contrast_factor=float(factor))
+                for image, factor in zip(images, contrast_factor)
+            ],
+        )
+
+    def test_equalize(self):
+        # The images have enough pixels for the equalization not to be the identity.
+        images = _make_images(sizes=[(20, 24), (30, 16), (18, 18)])
+        batch = PaddedBatchImages.from_images(images)
+
+        output = F.equalize(batch)
+
+        expected = [F.equalize(image) for image in images]
+        assert not torch.equal(expected[0], images[0])
+        _assert_samples_equal(output.to_samples(), expected)
+
+    @pytest.mark.parametrize(
+        ("fn", "kwargs"),
+        [
+            (F.affine, dict(angle=10.0, translate=[0, 0], scale=1.0, shear=[0.0, 0.0])),
+            (F.rotate, dict(angle=45.0)),
+            (F.perspective, dict(startpoints=None, endpoints=None, coefficients=[1, 0, 0, 0, 1, 0, 0, 0])),
+            (F.elastic, dict(displacement=torch.zeros(1, 8, 7, 2))),
+            (F.elastic_batch, dict(displacement=torch.zeros(3, 8, 7, 2))),
+            (F.gaussian_blur, dict(kernel_size=[3, 3], sigma=[1.0, 1.0])),
+            (F.gaussian_blur_batch, dict(kernel_size=[3, 3], sigma=torch.ones(3, 2))),
+            (F.adjust_sharpness, dict(sharpness_factor=2.0)),
+            (F.jpeg, dict(quality=50)),
+            (F.five_crop, dict(size=[2, 2])),
+            (F.ten_crop, dict(size=[2, 2])),
+        ],
+    )
+    def test_unsupported(self, fn, kwargs):
+        batch = PaddedBatchImages.from_images(_make_images())
+        with pytest.raises(TypeError, match="does not support inputs of type PaddedBatchImages"):
+            fn(batch, **kwargs)
+
+    def test_meta(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+        assert F.get_size(batch) == [8, 7]
+        assert F.get_dimensions(batch) == [3, 8, 7]
+        assert F.get_num_channels(batch) == 3
+
+    def test_to_dtype(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+        output = transforms.ToDtype(torch.float32, scale=True)(batch)
+        assert isinstance(output, PaddedBatchImages)
+        assert output.dtype == torch.float32
+
+
+class TestPaddedBatchImagesTransforms:
+    def _make_nested_sample(self):
+        images = _make_images()
+        boxes = [
+            ta_tensors.BoundingBoxes([[0, 0, 2, 3]], format="XYXY", canvas_size=image.shape[-2:]) for image in images
+        ]
+        masks = [ta_tensors.Mask(torch.ones(1, *image.shape[-2:], dtype=torch.uint8)) for image in images]
+        return images, default_nested_collate(list(zip(images, boxes, masks)))
+
+    def test_nested_to_batch(self):
+        images, nested = self._make_nested_sample()
+
+        batch_images, batch_boxes, batch_masks = transforms.NestedToBatch(padded=True)(*nested)
+
+        assert isinstance(batch_images, PaddedBatchImages)
+        _assert_samples_equal(batch_images.to_samples(), images)
+        assert isinstance(batch_boxes, BatchBoundingBoxes)
+        assert batch_boxes.canvas_size == (8, 7)
+        assert isinstance(batch_masks, BatchMasks)
+        assert batch_masks.shape == (3, 8, 7)
+        torch.testing.assert_close(batch_masks.bool(), batch_images.valid_mask()[:, 0])
+
+    def test_nested_to_batch_not_padded(self):
+        _, nested = self._make_nested_sample()
+        with pytest.raises(ValueError, match="All tensors must have the same shape"):
+            transforms.NestedToBatch()(*nested)
+
+    def _make_batch_with_boxes(self):
+        batch = PaddedBatchImages.from_images(_make_images())
+        boxes = BatchBoundingBoxes(
+            batch.valid_regions.clone(), format="XYXY", canvas_size=(8, 7), samples_ranges=batch.samples_ranges
+        )
+        return batch, boxes
+
+    @pytest.mark.parametrize(
+        "transform",
+        [
+            transforms.RandomHorizontalFlip(p=1.0, batch_transform=True),
+            transforms.RandomVerticalFlip(p=1.0, batch_transform=True),
+            transforms.RandomAutocontrast(p=1.0, batch_transform=True),
+        ],
+    )
+    def test_images_and_boxes(self, transform):
+        batch, boxes = self._make_batch_with_boxes()
+
+        output, output_boxes = transform(batch, boxes)
+
+        assert isinstance(output, PaddedBatchImages)
+        assert not torch.equal(output.as_subclass(torch.Tensor), batch.as_subclass(torch.Tensor))
+        # The valid regions are transformed like the boxes of the images.
+        torch.testing.assert_close(output.valid_regions, output_boxes.as_subclass(torch.Tensor))
+
+    @pytest.mark.parametrize(
+        "transform",
+        [
+            transforms.RandomRotation((45, 45), batch_transform=True),
+            transforms.RandomAffine(degrees=10, batch_transform=True),
+            transforms.RandomPerspective(p=1.0, batch_transform=True),
+            transforms.ElasticTransform(alpha=1.0, sigma=0.5, batch_transform=True),
+            transforms.RandomGaussianBlur(kernel_size=3, p=1.0, batch_transform=True),
+            transforms.RandomAdjustSharpness(2.0, p=1.0, batch_transform=True),
+            transforms.RandomCrop([6, 5]),
+            transforms.RandomResizedCrop([6, 5], batch_transform=True),
+        ],
+    )
+    def test_unsupported_images_and_boxes(self, transform):
+        batch, boxes = self._make_batch_with_boxes()
+        with pytest.raises(TypeError, match="does not support inputs of type PaddedBatchImages"):
+            transform(batch, boxes)
+
+    @pytest.mark.parametrize("permute_chunks", [False, True])
+    def test_sequential_transform(self, permute_chunks):
+        images = _make_images()
+        batch = PaddedBatchImages.from_images(images)
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomHorizontalFlip(p=1.0),
+                transforms.Resize([16, 14], interpolation=InterpolationMode.NEAREST),
+            ],
+            batch_transform=True,
+            num_chunks=2,
+            permute_chunks=permute_chunks,
+        )
+
+        output = transform(batch)
+
+        assert isinstance(output, PaddedBatchImages)
+        expected = [
+            F.resize(
+                F.horizontal_flip(image), [2 * s for s in image.shape[-2:]], interpolation=InterpolationMode.NEAREST
+            )
+            for image in images
+        ]
+        _assert_samples_equal(output.to_samples(), expected)
@@ -1,9 +1,11 @@
+import threading
 from copy import deepcopy
 
 import pytest
 import torch
 
 from torchaug import ta_tensors
+from torchaug.ta_tensors._torch_function_helpers import _local_return_type
 
 from ..utils import (
     assert_equal,
@@ -631,6 +633,40 @@ def test_set_return_type():
     ta_tensors.set_return_type("tensor")
 
 
+def test_local_return_type():
+    imgs = make_batch_images()
+    entered, release = threading.Event(), threading.Event()
+    thread_types = []
+
+    def set_in_thread():
+        with _local_return_type("TATensor"):
+            thread_types.append(type(imgs + 3))
+            entered.set()
+            release.wait()
+            thread_types.append(type(imgs + 3))
+
+    thread = threading.Thread(target=set_in_thread)
+    thread.start()
+    entered.wait()
+    # The return type set in the thread does not change the one of the other threads.
+    assert type(imgs + 3) is torch.Tensor
+    with ta_tensors.set_return_type("TATensor"):
+        assert type(imgs + 3) is ta_tensors.BatchImages
+    release.set()
+    thread.join()
+    assert thread_types == [ta_tensors.BatchImages, ta_tensors.BatchImages]
+
+    # It overrides the return type set for all the threads and restores it.
+    ta_tensors.set_return_type("TATensor")
+    with _local_return_type("Tensor"):
+        assert type(imgs + 3) is torch.Tensor
+    assert type(imgs + 3) is ta_tensors.BatchImages
+    ta_tensors.set_return_type("tensor")
+
+    with pytest.raises(ValueError, match="return_type must be"):
+        _local_return_type("typo")
+
+
 def test_return_type_input():
     imgs = make_batch_images()
 
@@ -410,6 +410,35 @@ class TestColorJitter:
         mae = (actual.float() - expected.float()).abs().mean()
         assert mae < 2
 
+    @pytest.mark.parametrize("compute_dtype", [torch.bfloat16, torch.float16])
+    def test_batch_transform_compute_dtype(self, compute_dtype):
+        images = make_batch_images(dtype=torch.uint8, device="cpu", batch_dims=(4,))
+        transform = transforms.RandomColorJitter(
+            brightness=0.4, contrast=0.4, saturation=0.4, hue=0.1, p=1, batch_transform=True, num_chunks=2
+        )
+        reduced_transform = transforms.RandomColorJitter(
+            brightness=0.4,
+            contrast=0.4,
+            saturation=0.4,
+            hue=0.1,
+            p=1,
+            batch_transform=True,
+            num_chunks=2,
+            compute_dtype=compute_dtype,
+        )
+
+        with freeze_rng_state():
+            expected = transform(images)
+        with freeze_rng_state():
+            actual = reduced_transform(images)
+
+        assert actual.dtype == torch.uint8
+        assert (actual.float() - expected.float()).abs().mean() < 1
+
+    def test_compute_dtype_error(self):
+        with pytest.raises(ValueError, match="compute_dtype should be a floating point dtype"):
+            transforms.RandomColorJitter(brightness=0.4, compute_dtype=torch.uint8)
+
     @pytest.mark.parametrize("brightness", [None, 0.1])
     @pytest.mark.parametrize("contrast", [None, 0.4])
     @pytest.mark.parametrize("saturation", [None, 0.7])
@@ -1316,6 +1345,17 @@ class TestAdjustContrast:
             e = F.adjust_contrast(tensor_images[i], contrast_factor=c)
             torch.testing.assert_close(a, e, rtol=0, atol=1)
 
+    @pytest.mark.parametrize(("compute_dtype", "atol"), [(torch.float32, 0), (torch.bfloat16, 3), (torch.float16, 1)])
+    def test_correctness_batch_images_compute_dtype(self, compute_dtype, atol):
+        images = make_batch_images(dtype=torch.uint8, device="cpu", batch_dims=(3,))
+        contrast_factor = torch.tensor([0.1, 0.5, 1.7])
+
+        actual = F.adjust_contrast_batch(images, contrast_factor=contrast_factor, compute_dtype=compute_dtype)
+        expected = F.adjust_contrast_batch(images, contrast_factor=contrast_factor)
+
+        assert actual.dtype == torch.uint8
+        torch.testing.assert_close(actual, expected, rtol=0, atol=atol)
+
 
 class TestAdjustGamma:
     @pytest.mark.parametrize("dtype", [torch.uint8, torch.float32])
@@ -1593,6 +1633,17 @@ class TestAdjustSaturation:
             e = F.adjust_saturation(tensor_images[i], saturation_factor=c)
             torch.testing.assert_close(a, e, rtol=0, atol=1)
 
+    @pytest.mark.parametrize(("compute_dtype", "atol"), [(torch.float32, 0), (torch.bfloat16, 3), (torch.float16, 1)])
+    def test_correctness_batch_images_compute_dtype(self, compute_dtype, atol):
+        images = make_batch_images(dtype=torch.uint8, device="cpu", batch_dims=(3,))
+        saturation_factor = torch.tensor([0.1, 0.5, 1.7])
+
+        actual = F.adjust_saturation_batch(images, saturation_factor=saturation_factor, compute_dtype=compute_dtype)
+        expected = F.adjust_saturation_batch(images, saturation_factor=saturation_factor)
+
+        assert actual.dtype == torch.uint8
+        torch.testing.assert_close(actual, expected, rtol=0, atol=atol)
+
 
 class TestAdjustBrightness:
     _CORRECTNESS_BRIGHTNESS_FACTORS = [0.5, 0.0, 1.0, 5.0]
@@ -1709,3 +1760,20 @@ class TestAdjustBrightness:
 
             e = F.adjust_brightness(tensor_images[i], brightness_factor=c)
             torch.testing.assert_close(a, e, rtol=0, atol=1)
+
+    @pytest.mark.parametrize(("compute_dtype", "atol"), [(torch.float32, 0), (torch.bfloat16, 3), (torch.float16, 1)])
+    def test_correctness_batch_images_compute_dtype(self, compute_dtype, atol):
+        images = make_batch_images(dtype=torch.uint8, device="cpu", batch_dims=(3,))
+        brightness_factor = torch.tensor([0.1, 0.5, 1.7])
+
+        actual = F.adjust_brightness_batch(images, brightness_factor=brightness_factor, compute_dtype=compute_dtype)
+        expected = F.adjust_brightness_batch(images, brightness_factor=brightness_factor)
+
+        assert actual.dtype == torch.uint8
+        torch.testing.assert_close(actual, expected, rtol=0, atol=atol)
+
+    def test_batch_kernel_compute_dtype_error(self):
+        with pytest.raises(ValueError, match="compute_dtype should be a floating point dtype"):
+            F.adjust_brightness_batch(
+                make_batch_images(dtype=torch.uint8), brightness_factor=0.5, compute_dtype=torch.int32
+            )
@@ -1,11 +1,17 @@
 import functools
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
+import torch
 from torch import nn
 
 import torchaug.transforms as transforms
 import torchaug.transforms.functional as F
+from torchaug import ta_tensors
+from torchaug.transforms._optimizer import _optimize_transforms
 
 from ..utils import (
     assert_equal,
@@ -244,3 +250,324 @@ class TestSequentialTransform:
 
         with pytest.raises(TypeError, match="Collection should be a list of modules."):
             transforms.SequentialTransform([transforms.RandomHorizontalFlip, lambda x: x])
+
+    @pytest.mark.parametrize("batch", [True, False])
+    def test_optimize_fuse_pointwise(self, batch):
+        def make_transforms():
+            return [
+                transforms.Identity(),
+                transforms.ToDtype(torch.float32, scale=True),
+                transforms.RandomHorizontalFlip(p=1),
+                transforms.Normalize([0.5, 0.4, 0.3], [0.2, 0.3, 0.4]),
+                transforms.Normalize([0.1], [2.0]),
+            ]
+
+        optimized = transforms.SequentialTransform(make_transforms(), batch_transform=batch)
+        not_optimized = transforms.SequentialTransform(make_transforms(), batch_transform=batch, optimize=False)
+
+        assert len(optimized.transforms) == 2
+        assert isinstance(optimized.transforms[1], transforms.RandomHorizontalFlip)
+        assert len(not_optimized.transforms) == 5
+        assert "optimization_plan" in repr(optimized)
+        assert "optimization_plan" not in repr(not_optimized)
+
+        input = make_image(dtype=torch.uint8) if not batch else make_batch_images(dtype=torch.uint8)
+
+        torch.testing.assert_close(optimized(input.clone()), not_optimized(input.clone()))
+
+    def test_optimize_resize(self):
+        def make_transforms():
+            return [transforms.Resize(16), transforms.Resize([32, 32]), transforms.Resize([32, 32])]
+
+        optimized = transforms.SequentialTransform(make_transforms())
+        not_optimized = transforms.SequentialTransform(make_transforms(), optimize=False)
+
+        # Only the identical resizes are collapsed, the first one changes the pixels of the output.
+        assert len(optimized.transforms) == 2
+        assert [t.size for t in optimized.transforms] == [[16], [32, 32]]
+
+        input = make_batch_images((24, 40))
+        assert_equal(optimized(input), not_optimized(input))
+
+    @pytest.mark.parametrize(("first_inplace", "second_inplace"), [(True, False), (False, True), (True, True)])
+    def test_optimize_normalize_inplace(self, first_inplace, second_inplace):
+        optimized, _ = _optimize_transforms(
+            [
+                transforms.Normalize([0.5], [0.5], inplace=first_inplace),
+                transforms.Normalize([0.1], [0.2], inplace=second_inplace),
+            ]
+        )
+
+        assert len(optimized) == 1
+        assert optimized[0].inplace == (first_inplace and second_inplace)
+
+    def test_optimize_no_rewrite(self):
+        transform = transforms.SequentialTransform(
+            [
+                transforms.ToDtype(torch.float32, scale=True),
+                transforms.RandomResizedCrop(16),
+                transforms.Normalize([0.5], [0.5]),
+            ],
+        )
+
+        assert [type(t) for t in transform.transforms] == [
+            transforms.ToDtype,
+            transforms.RandomResizedCrop,
+            transforms.Normalize,
+        ]
+
+    def test_channels_last(self):
+        def make_transform(channels_last):
+            return transforms.SequentialTransform(
+                [
+                    transforms.RandomHorizontalFlip(p=0.5),
+                    transforms.RandomCrop(12),
+                    transforms.RandomColorJitter(brightness=0.5, hue=0.2, p=0.5),
+                ],
+                channels_last=channels_last,
+            )
+
+        input = make_batch_images((16, 16), batch_dims=(4,))
+
+        torch.manual_seed(0)
+        expected = make_transform(False)(input.clone())
+        torch.manual_seed(0)
+        actual = make_transform(True)(input.clone())
+
+        assert isinstance(actual, ta_tensors.BatchImages)
+        assert actual.is_contiguous(memory_format=torch.channels_last)
+        assert not expected.is_contiguous(memory_format=torch.channels_last)
+        assert "channels_last=True" in repr(make_transform(True))
+        torch.testing.assert_close(actual, expected)
+
+    def test_keep_uint8_defer_float_conversion(self):
+        def make_transforms():
+            return [
+                transforms.ToDtype(torch.float32, scale=True),
+                transforms.RandomVerticalFlip(p=1),
+                transforms.CenterCrop(12),
+                transforms.Normalize([0.5], [0.5]),
+            ]
+
+        optimized = transforms.SequentialTransform(make_transforms(), keep_uint8=True)
+        not_optimized = transforms.SequentialTransform(make_transforms(), optimize=False, keep_uint8=True)
+
+        assert [type(t) for t in optimized.transforms] == [
+            transforms.RandomVerticalFlip,
+            transforms.CenterCrop,
+            transforms.ToDtypeNormalize,
+        ]
+        assert "defer ToDtype after RandomVerticalFlip, CenterCrop" in repr(optimized)
+
+        input = make_batch_images((16, 16), dtype=torch.uint8)
+        with pytest.warns(UserWarning, match="ToDtype at index 0"):
+            expected = not_optimized(input)
+        torch.testing.assert_close(optimized(input), expected)
+        assert optimized.upcast_stages == []
+        assert not_optimized.upcast_stages == ["0: ToDtype"]
+
+    def test_keep_uint8_upcast_stages(self):
+        transform = transforms.SequentialTransform(
+            [
+                transforms.ToDtype(torch.float32, scale=True),
+                transforms.RandomResizedCrop(8),
+                transforms.RandomColorJitter(brightness=0.5),
+            ],
+            keep_uint8=True,
+        )
+        input = make_batch_images((16, 16), dtype=torch.uint8)
+
+        with pytest.warns(UserWarning, match="ToDtype at index 0 converted uint8 data to torch.float32"):
+            output = transform(input)
+        assert output.dtype == torch.float32
+        assert transform.upcast_stages == ["0: ToDtype"]
+
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomResizedCrop(8),
+                transforms.RandomColorJitter(brightness=0.5),
+                transforms.ToDtype(torch.float32, scale=True),
+            ],
+            keep_uint8=True,
+        )
+        output = transform(input)
+        assert output.dtype == torch.float32
+        assert transform.upcast_stages == []
+
+    def test_compute_dtype_override(self):
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomColorJitter(brightness=0.5, contrast=0.5),
+                transforms.RandomGaussianBlur(kernel_size=3),
+                transforms.RandomHorizontalFlip(),
+            ],
+            compute_dtype=torch.bfloat16,
+        )
+        assert transform.transforms[0].compute_dtype == torch.bfloat16
+        assert transform.transforms[1].compute_dtype == torch.bfloat16
+        assert not hasattr(transform.transforms[2], "compute_dtype")
+
+        output = transform(make_batch_images((16, 16), dtype=torch.uint8))
+        assert output.dtype == torch.uint8
+
+
+class TestTransformProfiler:
+    def test_sequential_transform(self):
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomHorizontalFlip(p=0.5),
+                transforms.RandomColorJitter(brightness=0.5, p=1),
+                transforms.ToDtype(torch.float32, scale=True),
+            ],
+            num_chunks=2,
+            optimize=False,
+        )
+        input = make_batch_images((8, 8), batch_dims=(4,), dtype=torch.uint8)
+
+        with transforms.TransformProfiler() as profiler:
+            for _ in range(3):
+                transform(input)
+
+        stats = profiler.stats
+        assert list(stats) == ["0: RandomHorizontalFlip", "1: RandomColorJitter", "2: ToDtype"]
+        assert all(transform_stats.calls == 3 for transform_stats in stats.values())
+        assert all(transform_stats.total_time > 0 for transform_stats in stats.values())
+        assert stats["0: RandomHorizontalFlip"].num_samples == 6
+        assert stats["1: RandomColorJitter"].num_samples == 12
+        assert stats["1: RandomColorJitter"].num_chunks == 6
+        assert stats["1: RandomColorJitter"].kernels == {"adjust_brightness_batch_images": 6}
+        assert stats["2: ToDtype"].num_samples == 12
+        assert stats["2: ToDtype"].bytes_in == 3 * input.nbytes
+        assert stats["2: ToDtype"].bytes_out == 3 * 4 * input.nbytes
+        assert stats["1: RandomColorJitter"].mean_time == pytest.approx(stats["1: RandomColorJitter"].total_time / 3)
+
+        summary = profiler.summary()
+        assert "1: RandomColorJitter" in summary
+        assert "adjust_brightness_batch_images x6" in summary
+
+        profiler.reset()
+        assert profiler.stats == {}
+
+    def test_nested_containers(self):
+        transform = transforms.Compose(
+            [
+                transforms.RandomApply([transforms.RandomGaussianBlur(3, p=1)], p=1),
+                transforms.RandomChoice([transforms.RandomHorizontalFlip(p=1)]),
+                transforms.RandomOrder([transforms.RandomVerticalFlip(p=1)]),
+            ]
+        )
+
+        with transforms.TransformProfiler() as profiler:
+            transform(make_image((8, 8)))
+
+        assert list(profiler.stats) == [
+            "0: RandomApply",
+            "0: RandomApply/0: RandomGaussianBlur",
+            "1: RandomChoice",
+            "1: RandomChoice/0: RandomHorizontalFlip",
+            "2: RandomOrder",
+            "2: RandomOrder/0: RandomVerticalFlip",
+        ]
+        assert profiler.stats["0: RandomApply"].num_samples == 0
+        assert profiler.stats["0: RandomApply/0: RandomGaussianBlur"].num_samples == 1
+        assert profiler.stats["0: RandomApply/0: RandomGaussianBlur"].kernels == {"gaussian_blur_image": 1}
+
+    def test_threads(self):
+        transform = transforms.Compose(
+            [
+                transforms.RandomApply([transforms.RandomGaussianBlur(3, p=1)], p=1),
+                transforms.RandomHorizontalFlip(p=1),
+            ]
+        )
+
+        with transforms.TransformProfiler() as profiler, ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: transform(make_image((8, 8))), range(32)))
+
+        # Each thread tracks its own nested calls and the statistics of the threads are aggregated.
+        assert list(profiler.stats) == [
+            "0: RandomApply",
+            "0: RandomApply/0: RandomGaussianBlur",
+            "1: RandomHorizontalFlip",
+        ]
+        assert all(transform_stats.calls == 32 for transform_stats in profiler.stats.values())
+        assert profiler.stats["0: RandomApply/0: RandomGaussianBlur"].kernels == {"gaussian_blur_image": 32}
+        assert profiler.stats["1: RandomHorizontalFlip"].num_samples == 32
+
+    def test_record_functions(self):
+        transform = transforms.SequentialTransform([transforms.RandomHorizontalFlip(p=1)])
+
+        with torch.profiler.profile() as prof, transforms.TransformProfiler():
+            transform(make_batch_images((8, 8)))
+        assert "0: RandomHorizontalFlip" in [event.name for event in prof.events()]
+
+        with torch.profiler.profile() as prof, transforms.TransformProfiler(record_functions=False):
+            transform(make_batch_images((8, 8)))
+        assert "0: RandomHorizontalFlip" not in [event.name for event in prof.events()]
+
+    def test_inactive(self):
+        transform = transforms.SequentialTransform([transforms.RandomHorizontalFlip(p=1)])
+        profiler = transforms.TransformProfiler()
+
+        with profiler:
+            with transforms.TransformProfiler() as inner_profiler:
+                transform(make_batch_images((8, 8)))
+            transform(make_batch_images((8, 8)))
+        transform(make_batch_images((8, 8)))
+
+        assert profiler.stats["0: RandomHorizontalFlip"].calls == 1
+        assert inner_profiler.stats["0: RandomHorizontalFlip"].calls == 1
+
+
+class TestTransformTracer:
+    def test_spans(self, tmp_path):
+        path = tmp_path / "trace.json"
+        transform = transforms.SequentialTransform(
+            [transforms.RandomHorizontalFlip(p=1), transforms.RandomColorJitter(brightness=0.5, p=1)],
+            num_chunks=2,
+        )
+
+        with transforms.TransformTracer(str(path)) as tracer:
+            with tracer.span("step", step=0):
+                transform(make_batch_images((8, 8), batch_dims=(4,)))
+
+        events = json.loads(path.read_text())["traceEvents"]
+        assert events[0] == {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "main"}}
+        spans = [(event["cat"], event["name"]) for event in events[1:]]
+        assert spans == [
+            ("chunk", "RandomHorizontalFlip chunk 0"),
+            ("transform", "RandomHorizontalFlip"),
+            ("chunk", "RandomColorJitter chunk 0"),
+            ("chunk", "RandomColorJitter chunk 1"),
+            ("transform", "RandomColorJitter"),
+            ("user", "step"),
+        ]
+        for event in events[1:]:
+            assert event["ph"] == "X"
+            assert event["dur"] >= 0
+            assert event["args"]["worker"] is None
+            assert event["args"]["batch"] == 0
+        assert events[4]["args"]["chunk"] == 1
+        assert events[5]["args"]["index"] == 1
+        assert events[6]["args"]["step"] == 0
+        step, color_jitter = events[6], events[5]
+        assert step["ts"] <= color_jitter["ts"] <= color_jitter["ts"] + color_jitter["dur"] <= step["ts"] + step["dur"]
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_inactive(self, tmp_path):
+        transform = transforms.SequentialTransform([transforms.RandomHorizontalFlip(p=1)])
+        tracer = transforms.TransformTracer(str(tmp_path / "trace.json"))
+
+        with tracer:
+            pass
+        transform(make_batch_images((8, 8)))
+
+        assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"] == []
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(ValueError, match="flush_every should be a positive integer"):
+            transforms.TransformTracer(str(tmp_path / "trace.json"), flush_every=0)
+
+        tracer = transforms.TransformTracer(str(tmp_path / "trace.json"))
+        with tracer:
+            with pytest.raises(RuntimeError, match="The tracer is already active"):
+                tracer.__enter__()
@@ -27,6 +27,7 @@ from ..utils import (
     check_kernel,
     check_transform,
     cpu_and_cuda,
+    freeze_rng_state,
     make_batch_bounding_boxes,
     make_batch_detection_masks,
     make_batch_images,
@@ -607,6 +608,32 @@ class TestGaussianBlur:
             e = TVF.gaussian_blur_image(images[i], kernel_size=kernel_size, sigma=s)
             torch.testing.assert_close(a, e, rtol=0, atol=1)
 
+    @pytest.mark.parametrize(("compute_dtype", "atol"), [(torch.float32, 0), (torch.bfloat16, 2), (torch.float16, 1)])
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    def test_batch_images_compute_dtype(self, compute_dtype, atol, device):
+        images = make_batch_images(dtype=torch.uint8, device=device, batch_dims=(4,))
+        sigma = torch.tensor([0.5, 1.0, 1.5, 2.0], device=device)
+
+        actual = F.gaussian_blur_batch(images, kernel_size=[5, 5], sigma=sigma, compute_dtype=compute_dtype)
+        expected = F.gaussian_blur_batch(images, kernel_size=[5, 5], sigma=sigma)
+
+        assert actual.dtype == torch.uint8
+        torch.testing.assert_close(actual, expected, rtol=0, atol=atol)
+
+    def test_batch_transform_compute_dtype(self):
+        images = make_batch_images(dtype=torch.uint8, device="cpu", batch_dims=(4,))
+        transform = transforms.RandomGaussianBlur(kernel_size=3, p=1, batch_transform=True)
+        reduced_transform = transforms.RandomGaussianBlur(
+            kernel_size=3, p=1, batch_transform=True, compute_dtype=torch.bfloat16
+        )
+
+        with freeze_rng_state():
+            expected = transform(images)
+        with freeze_rng_state():
+            actual = reduced_transform(images)
+
+        torch.testing.assert_close(actual, expected, rtol=0, atol=2)
+
 
 class TestToDtype:
     @pytest.mark.parametrize(
@@ -851,6 +878,132 @@ class TestToDtype:
         assert out["mask"].dtype == mask_dtype
 
 
+class TestToDtypeNormalize:
+    MEAN, STD = (0.485, 0.456, 0.406), (0.229, 0.224, 0.225)
+
+    @pytest.mark.parametrize(
+        ("kernel", "make_input"),
+        [
+            (F.to_dtype_normalize_image, make_image_tensor),
+            (F.to_dtype_normalize_image, make_image),
+            (F.to_dtype_normalize_image, make_batch_images),
+            (F.to_dtype_normalize_video, make_video),
+            (F.to_dtype_normalize_video, make_batch_videos),
+        ],
+    )
+    @pytest.mark.parametrize("input_dtype", [torch.float32, torch.uint8])
+    @pytest.mark.parametrize("output_dtype", [torch.float32, torch.float64])
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    def test_kernel(self, kernel, make_input, input_dtype, output_dtype, device):
+        check_kernel(
+            kernel,
+            make_input(dtype=input_dtype, device=device),
+            mean=self.MEAN,
+            std=self.STD,
+            dtype=output_dtype,
+        )
+
+    @pytest.mark.parametrize(
+        "make_input", [make_image_tensor, make_image, make_video, make_batch_images, make_batch_videos]
+    )
+    def test_functional(self, make_input):
+        check_functional(F.to_dtype_normalize, make_input(dtype=torch.uint8), mean=self.MEAN, std=self.STD)
+
+    @pytest.mark.parametrize(
+        ("kernel", "input_type"),
+        [
+            (F.to_dtype_normalize_image, torch.Tensor),
+            (F.to_dtype_normalize_image, ta_tensors.Image),
+            (F.to_dtype_normalize_image, ta_tensors.BatchImages),
+            (F.to_dtype_normalize_video, ta_tensors.Video),
+            (F.to_dtype_normalize_video, ta_tensors.BatchVideos),
+        ],
+    )
+    def test_functional_signature(self, kernel, input_type):
+        check_functional_kernel_signature_match(F.to_dtype_normalize, kernel=kernel, input_type=input_type)
+
+    @pytest.mark.parametrize("make_input", ALL_IMAGES_MAKERS)
+    @pytest.mark.parametrize("device", cpu_and_cuda())
+    def test_transform(self, make_input, device):
+        check_transform(
+            transforms.ToDtypeNormalize(mean=self.MEAN, std=self.STD),
+            make_input(dtype=torch.uint8, device=device),
+        )
+
+    @pytest.mark.parametrize("make_input", [make_image, make_batch_images, make_video])
+    @pytest.mark.parametrize(
+        ("input_dtype", "output_dtype", "scale", "atol"),
+        [
+            (torch.uint8, torch.float32, True, 1e-5),
+            (torch.uint8, torch.float32, False, 1e-3),
+            (torch.uint8, torch.float16, True, 1e-2),
+            (torch.uint8, torch.bfloat16, True, 5e-2),
+            (torch.float32, torch.float32, True, 1e-5),
+            (torch.float64, torch.float64, True, 1e-7),
+        ],
+    )
+    @pytest.mark.parametrize("fn", [F.to_dtype_normalize, transform_cls_to_functional(transforms.ToDtypeNormalize)])
+    def test_correctness(self, make_input, input_dtype, output_dtype, scale, atol, fn):
+        input = make_input(dtype=input_dtype)
+
+        actual = fn(input, mean=self.MEAN, std=self.STD, dtype=output_dtype, scale=scale)
+        expected = F.normalize(F.to_dtype(input, dtype=torch.float64, scale=scale), mean=self.MEAN, std=self.STD).to(
+            output_dtype
+        )
+
+        assert type(actual) is type(input)
+        assert actual.dtype == output_dtype
+        torch.testing.assert_close(actual, expected, atol=atol, rtol=0, check_dtype=False)
+
+    @pytest.mark.parametrize("make_input", [make_image_tensor, make_image, make_batch_images])
+    def test_out(self, make_input):
+        input = make_input(dtype=torch.uint8)
+        out = torch.empty(input.shape, dtype=torch.float16)
+
+        actual = F.to_dtype_normalize(input, mean=self.MEAN, std=self.STD, dtype=torch.float16, out=out)
+        expected = F.to_dtype_normalize(input, mean=self.MEAN, std=self.STD, dtype=torch.float16)
+
+        assert type(actual) is type(input)
+        assert actual.data_ptr() == out.data_ptr()
+        assert_equal(actual, expected)
+
+    def test_errors(self):
+        image = make_image(dtype=torch.uint8)
+
+        with pytest.raises(ValueError, match="floating point dtype"):
+            F.to_dtype_normalize_image(image, mean=self.MEAN, std=self.STD, dtype=torch.uint8)
+
+        with pytest.raises(ValueError, match="tensor image of size"):
+            F.to_dtype_normalize_image(
+                torch.randint(0, 256, (16, 16), dtype=torch.uint8), mean=self.MEAN, std=self.STD
+            )
+
+        with pytest.raises(ValueError, match="std contains a zero value"):
+            F.to_dtype_normalize_image(image, mean=self.MEAN, std=[0, 1, 1])
+
+        with pytest.raises(ValueError, match="out should be a tensor of shape"):
+            F.to_dtype_normalize_image(
+                image, mean=self.MEAN, std=self.STD, dtype=torch.float16, out=torch.empty(image.shape)
+            )
+
+        with pytest.raises(ValueError, match="floating point torch.dtype"):
+            transforms.ToDtypeNormalize(mean=self.MEAN, std=self.STD, dtype=torch.uint8)
+
+    def test_passthrough(self):
+        masks = make_detection_masks()
+        boxes = make_bounding_boxes()
+
+        output = transforms.ToDtypeNormalize(mean=self.MEAN, std=self.STD)({"masks": masks, "boxes": boxes})
+
+        assert output["masks"] is masks
+        assert output["boxes"] is boxes
+
+    def test_repr(self):
+        assert "dtype=torch.float16" in repr(
+            transforms.ToDtypeNormalize(mean=self.MEAN, std=self.STD, dtype=torch.float16)
+        )
+
+
 class TestSanitizeBoundingBoxes:
     def _get_boxes_and_valid_mask(self, H=256, W=128, min_size=10, batch=False):
         boxes_and_validity = [
@@ -1,3 +1,7 @@
+import pickle
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 import numpy as np
@@ -23,6 +27,8 @@ from ..utils import (
     assert_equal,
     assert_not_equal,
     freeze_rng_state,
+    make_batch_bounding_boxes,
+    make_batch_detection_masks,
     make_batch_images,
     make_batch_videos,
     make_image,
@@ -350,3 +356,271 @@ class TestRandomApplyTransform:
 
         for nested, batch in zip(nested_output, batch_output):
             torch.testing.assert_close(nested, batch)
+
+    @pytest.mark.parametrize("p", [0.5, 1.0])
+    @pytest.mark.parametrize("num_chunks", [1, 2])
+    @pytest.mark.parametrize("batch_inplace", [False, True])
+    @pytest.mark.parametrize("seed", list(range(3)))
+    def test_forward_batch_channels_last(self, p, num_chunks, batch_inplace, seed):
+        transform = transforms.RandomColorJitter(
+            brightness=0.5,
+            hue=0.2,
+            p=p,
+            num_chunks=num_chunks,
+            batch_inplace=batch_inplace,
+            batch_transform=True,
+        )
+        images = make_batch_images(batch_dims=(4,))
+        channels_last_images = ta_tensors.wrap(
+            images.as_subclass(torch.Tensor).contiguous(memory_format=torch.channels_last), like=images
+        )
+
+        with freeze_rng_state():
+            torch.manual_seed(seed)
+            expected = transform(images.clone())
+
+        with freeze_rng_state():
+            torch.manual_seed(seed)
+            actual = transform(channels_last_images)
+
+        assert isinstance(actual, ta_tensors.BatchImages)
+        assert actual.is_contiguous(memory_format=torch.channels_last)
+        torch.testing.assert_close(actual, expected)
+
+
+class _RecordModeTransform(transforms.RandomColorJitter):
+    # Record the mode seen by the calls and block the calls on nested tensors until released.
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.nested_call_started = threading.Event()
+        self.release_nested_call = threading.Event()
+        self.modes = []
+
+    def forward_nested(self, flat_inputs):
+        self.modes.append(("nested", self.batch_transform))
+        self.nested_call_started.set()
+        self.release_nested_call.wait(timeout=10)
+        return super().forward_nested(flat_inputs)
+
+    def forward_batch(self, flat_inputs):
+        self.modes.append(("batch", self.batch_transform))
+        return super().forward_batch(flat_inputs)
+
+
+class TestConcurrentCalls:
+    def test_nested_call_does_not_change_attributes(self):
+        transform = _RecordModeTransform(
+            brightness=0.5, p=1.0, num_chunks=2, permute_chunks=True, batch_transform=True
+        )
+        nested_input = make_nested_images(batch_dims=2)
+        batch_input = make_batch_images(batch_dims=(4,))
+
+        thread = threading.Thread(target=transform, args=(nested_input,))
+        thread.start()
+        assert transform.nested_call_started.wait(timeout=10)
+        # The thread transforms the nested tensors sample per sample while this thread still sees the batch mode.
+        assert transform.batch_transform
+        assert transform.num_chunks == 2
+        assert transform.permute_chunks
+        output = transform(batch_input)
+        transform.release_nested_call.set()
+        thread.join()
+
+        assert isinstance(output, ta_tensors.BatchImages)
+        assert transform.modes == [("nested", False), ("batch", True)]
+        assert transform.batch_transform
+
+    @pytest.mark.parametrize("batch_transform", [False, True])
+    def test_many_threads(self, batch_transform):
+        # A fixed factor makes the transforms deterministic to compare the outputs of the threads.
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomColorJitter(brightness=(0.5, 0.5), p=1.0),
+                transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.2, 0.2, 0.2]),
+                transforms.CenterCrop(size=[6, 6]),
+            ],
+            num_chunks=2 if batch_transform else 1,
+            batch_transform=batch_transform,
+            optimize=False,
+        )
+        torch.manual_seed(0)
+        inputs = [
+            make_batch_images((8, 8), batch_dims=(4,), dtype=torch.float32)
+            if batch_transform and i % 2 == 0
+            else make_nested_images((8, 8), batch_dims=3, dtype=torch.float32)
+            for i in range(16)
+        ]
+        expected = [transform(inpt.clone()) for inpt in inputs]
+        modes = [module.batch_transform for module in transform.transforms]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda inpt: transform(inpt.clone()), inputs * 4))
+
+        for output, expected_output in zip(outputs, expected * 4):
+            assert type(output) is type(expected_output)
+            for tensor, expected_tensor in zip(
+                getattr(output, "tensors", [output]), getattr(expected_output, "tensors", [expected_output])
+            ):
+                assert type(tensor) is type(expected_tensor)
+                torch.testing.assert_close(tensor, expected_tensor)
+        assert [module.batch_transform for module in transform.transforms] == modes
+
+    def test_keep_uint8_upcast_stages(self):
+        transform = transforms.SequentialTransform(
+            [
+                transforms.ToDtype(torch.float32, scale=True),
+                transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.2, 0.2, 0.2]),
+            ],
+            keep_uint8=True,
+            optimize=False,
+        )
+        inpt = make_batch_images((8, 8), batch_dims=(2,), dtype=torch.uint8)
+
+        with warnings.catch_warnings(record=True) as records:
+            warnings.simplefilter("always")
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: transform(inpt.clone()), range(64)))
+
+        # The stage is recorded and warned about once by all the threads.
+        assert transform.upcast_stages == ["0: ToDtype"]
+        assert len([record for record in records if "converted uint8 data" in str(record.message)]) == 1
+
+
+class TestChunkExecutor:
+    @pytest.mark.parametrize(
+        "transform",
+        [
+            transforms.RandomColorJitter(brightness=0.5, contrast=0.5, hue=0.1, p=0.5, batch_transform=True),
+            transforms.RandomColorJitter(brightness=0.5, p=1.0, batch_inplace=True, batch_transform=True),
+            transforms.RandomResizedCrop([6, 6], batch_transform=True),
+            transforms.RandomResizedCrop([6, 6], permute_chunks=True, batch_transform=True),
+            transforms.RandomAffine(degrees=30, batch_transform=True),
+        ],
+    )
+    @pytest.mark.parametrize("num_chunks", [2, -1])
+    @pytest.mark.parametrize("seed", list(range(3)))
+    def test_same_outputs(self, transform, num_chunks, seed):
+        transform.num_chunks = num_chunks
+        images = make_batch_images((8, 8), batch_dims=(6,))
+        boxes = make_batch_bounding_boxes((8, 8), num_boxes=2, batch_dims=(6,))
+        masks = make_batch_detection_masks((8, 8), num_masks=2, batch_dims=(6,))
+        inputs = (images, boxes, masks) if not isinstance(transform, transforms.RandomColorJitter) else (images,)
+
+        with freeze_rng_state():
+            torch.manual_seed(seed)
+            expected = transform(*[inpt.clone() for inpt in inputs])
+
+        with transforms.ChunkExecutor(num_workers=3) as executor:
+            transform.chunk_executor = executor
+            with freeze_rng_state():
+                torch.manual_seed(seed)
+                actual = transform(*[inpt.clone() for inpt in inputs])
+        transform.chunk_executor = None
+
+        for actual_output, expected_output in zip(tree_flatten(actual)[0], tree_flatten(expected)[0]):
+            assert type(actual_output) is type(expected_output)
+            assert_equal(actual_output, expected_output)
+            if isinstance(expected_output, _BatchConcatenatedTATensor):
+                assert actual_output.samples_ranges == expected_output.samples_ranges
+
+    def test_sequential_transform(self):
+        executor = transforms.ChunkExecutor(num_workers=2, num_threads_per_worker=None)
+        transform = transforms.SequentialTransform(
+            [
+                transforms.RandomHorizontalFlip(p=0.5),
+                transforms.RandomColorJitter(brightness=0.5, p=1.0),
+                transforms.ToDtype(torch.float32, scale=True),
+            ],
+            num_chunks=4,
+            chunk_executor=executor,
+            optimize=False,
+        )
+        assert all(module.chunk_executor is executor for module in transform.transforms)
+
+        images = make_batch_images((8, 8), batch_dims=(8,), dtype=torch.uint8)
+        with transforms.TransformProfiler() as profiler:
+            output = transform(images)
+        executor.shutdown()
+
+        assert isinstance(output, ta_tensors.BatchImages)
+        # The kernels called by the threads of the pool are reported to the transform that called them.
+        assert profiler.stats["1: RandomColorJitter"].kernels == {"adjust_brightness_batch_images": 4}
+
+    def test_map(self):
+        executor = transforms.ChunkExecutor(num_workers=2, num_threads_per_worker=1)
+        assert repr(executor) == "ChunkExecutor(num_workers=2, num_threads_per_worker=1)"
+
+        # The threads of the pool use their own number of intra-op threads.
+        assert executor.map(lambda i: torch.get_num_threads(), 4) == [1] * 4
+        # A call from a thread of the pool is run serially instead of waiting for the busy pool.
+        assert executor.map(lambda i: executor.map(lambda j: i * 10 + j, 3), 2) == [[0, 1, 2], [10, 11, 12]]
+
+        def fail(i):
+            if i == 1:
+                raise RuntimeError("Chunk 1 failed.")
+            return i
+
+        with pytest.raises(RuntimeError, match="Chunk 1 failed."):
+            executor.map(fail, 3)
+
+        copied_executor = pickle.loads(pickle.dumps(executor))
+        assert copied_executor.map(lambda i: i, 3) == [0, 1, 2]
+        copied_executor.shutdown()
+        executor.shutdown()
+        # The pool is started again after a shutdown.
+        assert executor.map(lambda i: i, 2) == [0, 1]
+        executor.shutdown()
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="num_workers should be a positive integer"):
+            transforms.ChunkExecutor(num_workers=0)
+        with pytest.raises(ValueError, match="num_threads_per_worker should be a positive integer or None"):
+            transforms.ChunkExecutor(num_threads_per_worker=0)
+
+    def test_repr(self):
+        assert repr(transforms.RandomHorizontalFlip()) == "RandomHorizontalFlip(p=0.5)"
+        transform = transforms.RandomSolarize(threshold=128, p=1.0, batch_transform=True)
+        assert "chunk_executor" not in repr(transform)
+        assert "batch_transform=True" in repr(transform)
+
+        transform.chunk_executor = transforms.ChunkExecutor(num_workers=2)
+        assert repr(transform).endswith(
+            "batch_transform=True, chunk_executor=ChunkExecutor(num_workers=2, num_threads_per_worker=1))"
+        )
+
+
+class TestChannelsLast:
+    @pytest.mark.parametrize(
+        ("functional", "kwargs"),
+        [
+            (F.adjust_hue, dict(hue_factor=0.2)),
+            (F.adjust_hue_batch, dict(hue_factor=torch.tensor([0.2, -0.1, 0.0, 0.4]))),
+            (F.equalize, dict()),
+            (F.gaussian_blur_batch, dict(kernel_size=[3, 3], sigma=torch.tensor([[1.0, 1.0]] * 4))),
+            (F.affine, dict(angle=10.0, translate=[1.0, 1.0], scale=1.0, shear=[0.0, 0.0])),
+            (F.rotate, dict(angle=10.0)),
+            (
+                F.perspective,
+                dict(startpoints=[[0, 0], [15, 0], [15, 15], [0, 15]], endpoints=[[1, 1], [14, 0], [15, 15], [0, 14]]),
+            ),
+            (F.elastic, dict(displacement=torch.zeros(1, 16, 16, 2))),
+            (F.elastic_batch, dict(displacement=torch.zeros(4, 16, 16, 2))),
+            (F.horizontal_flip, dict()),
+            (F.resize, dict(size=[8, 8])),
+            (F.pad, dict(padding=[2])),
+            (F.to_dtype_normalize, dict(mean=[0.5], std=[0.5])),
+        ],
+    )
+    @pytest.mark.parametrize("dtype", [torch.uint8, torch.float32])
+    def test_kernels_preserve_channels_last(self, functional, kwargs, dtype):
+        images = make_batch_images((16, 16), batch_dims=(4,), dtype=dtype)
+        channels_last_images = ta_tensors.wrap(
+            images.as_subclass(torch.Tensor).contiguous(memory_format=torch.channels_last), like=images
+        )
+
+        actual = functional(channels_last_images, **kwargs)
+        expected = functional(images, **kwargs)
+
+        assert isinstance(actual, ta_tensors.BatchImages)
+        assert actual.is_contiguous(memory_format=torch.channels_last)
+        torch.testing.assert_close(actual, expected, atol=1 if dtype == torch.uint8 else 1e-5, rtol=0)
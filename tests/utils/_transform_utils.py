@@ -221,7 +221,13 @@ def check_kernel(
     # check that no inplace operation happened
     assert input._version == initial_input_version
 
-    if kernel not in {F.to_dtype_image, F.to_dtype_video, F.to_dtype}:
+    if kernel not in {
+        F.to_dtype_image,
+        F.to_dtype_video,
+        F.to_dtype,
+        F.to_dtype_normalize_image,
+        F.to_dtype_normalize_video,
+    }:
         assert output.dtype == input.dtype
     assert output.device == input.device
 
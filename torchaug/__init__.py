@@ -7,7 +7,18 @@
 # ruff: noqa: F401
 # ruff: noqa: D104
 
-from torchaug import data, ta_tensors, transforms
+from typing import TYPE_CHECKING
 
+from torchaug._lazy import _lazy_importer
+
+
+# The subpackages are imported on first access so that e.g. `import torchaug.transforms` does not import the data
+# utilities, which matters for the DataLoader workers started with spawn or forkserver that import them again.
+__getattr__, __dir__, _lazy_all = _lazy_importer(__name__, {}, submodules=["data", "ta_tensors", "transforms"])
+__all__ = ["__version__", *_lazy_all]
 
 __version__ = "0.6.0"
+
+# The eager imports of the lazy attributes for the type checkers and the IDEs.
+if TYPE_CHECKING:
+    from torchaug import data, ta_tensors, transforms
@@ -0,0 +1,47 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def _lazy_importer(
+    package: str, attributes: Dict[str, Sequence[str]], submodules: Sequence[str] = ()
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """Make the module ``__getattr__`` and ``__dir__`` of a package that imports its attributes on first access.
+
+    Example:
+        >>> __getattr__, __dir__, __all__ = _lazy_importer(__name__, {"_color": ["RandomColorJitter"]})
+
+    Args:
+        package: The name of the package.
+        attributes: The attributes of the package by the name of their submodule relative to the package.
+        submodules: The submodules of the package that are also attributes.
+
+    Returns:
+        The ``__getattr__`` and ``__dir__`` functions of the package and its ``__all__``.
+    """
+    attribute_to_submodule = {name: submodule for submodule, names in attributes.items() for name in names}
+    all_names = sorted([*submodules, *attribute_to_submodule])
+
+    def __getattr__(name: str) -> Any:
+        if name in attribute_to_submodule:
+            value = getattr(importlib.import_module(f".{attribute_to_submodule[name]}", package), name)
+        elif name in submodules:
+            value = importlib.import_module(f".{name}", package)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        # Cache the attribute so that the next accesses do not call __getattr__.
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*vars(sys.modules[package]), *all_names})
+
+    return __getattr__, __dir__, all_names
@@ -0,0 +1,18 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+# ruff: noqa: D104
+# ruff: noqa: F401
+
+from ._autotune import get_default_cache_file, tune_num_chunks
+from ._cases import BenchmarkCase, get_cases, make_input, make_pipeline_transforms, register_case
+from ._cli import format_results, get_dataloader_parser, get_import_parser, get_parser, main
+from ._dataloader import run_dataloader_benchmark
+from ._datasets import SyntheticDetectionDataset, SyntheticImageDataset, SyntheticVideoDataset
+from ._import_time import measure_import_time, run_import_benchmark
+from ._memory import measure_memory
+from ._runner import get_metadata, run_benchmarks
+from ._timing import summarize_timings, time_function
@@ -0,0 +1,14 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+# ruff: noqa: D100
+
+import sys
+
+from ._cli import main
+
+
+sys.exit(main())
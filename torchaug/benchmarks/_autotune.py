@@ -0,0 +1,183 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+import torch
+from torch import nn
+from torch.utils._pytree import tree_flatten, tree_map
+
+from torchaug.transforms import RandomApplyTransform, SequentialTransform
+
+from ._timing import summarize_timings, time_function
+
+
+def get_default_cache_file() -> str:
+    """Get the default path of the cache of :func:`~torchaug.benchmarks.tune_num_chunks`.
+
+    Returns:
+        ``$XDG_CACHE_HOME/torchaug/num_chunks.json``, with ``XDG_CACHE_HOME`` defaulting to ``~/.cache``.
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_dir, "torchaug", "num_chunks.json")
+
+
+def _chunked_modules(transform: nn.Module) -> List[RandomApplyTransform]:
+    # The batch transforms that accept num_chunks, like the transforms_attributes_override of SequentialTransform.
+    return [
+        module
+        for module in transform.modules()
+        if isinstance(module, RandomApplyTransform)
+        and module.batch_transform
+        and "num_chunks" in inspect.signature(module.__init__).parameters  # type: ignore[misc]
+    ]
+
+
+def _set_num_chunks(transform: nn.Module, num_chunks: int) -> None:
+    for module in _chunked_modules(transform):
+        module.num_chunks = num_chunks
+    for module in transform.modules():
+        if isinstance(module, SequentialTransform):
+            module.transforms_attributes_override["num_chunks"] = num_chunks
+
+
+def _cache_key(transform: nn.Module, flat_inputs: List[Any], max_slowdown: float) -> str:
+    tensors = [inpt for inpt in flat_inputs if isinstance(inpt, torch.Tensor)]
+    return json.dumps(
+        {
+            "transform": repr(transform),
+            "shapes": [list(tensor.shape) for tensor in tensors],
+            "dtypes": [str(tensor.dtype) for tensor in tensors],
+            "device": str(tensors[0].device),
+            "num_threads": torch.get_num_threads(),
+            "max_slowdown": max_slowdown,
+        },
+        sort_keys=True,
+    )
+
+
+def _read_cache(cache_file: str) -> Dict[str, Any]:
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_file: str, cache: Dict[str, Any]) -> None:
+    # Write to a temporary file and rename it so that concurrent processes never read a partial file.
+    cache_dir = os.path.dirname(os.path.abspath(cache_file))
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_file, cache_file)
+
+
+def tune_num_chunks(
+    transform: nn.Module,
+    inpt: Any,
+    max_slowdown: float = 1.5,
+    candidates: Optional[Sequence[int]] = None,
+    runs: int = 20,
+    warmup: int = 3,
+    cache_file: Optional[str] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Tune the number of chunks of a batch transform from its measured cost.
+
+    More chunks sample more random parameters per batch, which makes the augmentations more diverse, at the cost of
+    more kernel calls. The transform, or each batch transform of a :class:`~torchaug.transforms.SequentialTransform`
+    that accepts ``num_chunks``, is timed with :func:`~torchaug.benchmarks.time_function` on the input for each
+    candidate number of chunks, and the largest candidate whose median latency is within ``max_slowdown`` times the
+    median latency with one chunk is set on the transform. Candidates that give the same number of chunks as a smaller
+    one, such as the ones capped by :class:`~torchaug.transforms.RandomColorJitter`, are skipped.
+
+    The result is stored in a JSON cache file keyed by the representation of the transform with one chunk, the shapes
+    and dtypes of the input tensors, the device, the number of threads and ``max_slowdown``, so that later runs set
+    the tuned number of chunks without measuring.
+
+    Example:
+        >>> transforms = SequentialTransform([RandomResizedCrop(224), RandomColorJitter(0.4, 0.4, 0.4, p=0.8)])
+        >>> tune_num_chunks(transforms, next(iter(loader))[0], max_slowdown=1.2)["num_chunks"]
+        8
+
+    Args:
+        transform: The transform to tune. It is modified in place.
+        inpt: A representative input of the transform, e.g. a batch of images or a tuple of a batch of images and
+            their boxes. It is copied before the measures.
+        max_slowdown: The maximum ratio between the median latency of the chosen number of chunks and the one of a
+            single chunk.
+        candidates: The numbers of chunks to measure, ``-1`` for one chunk per sample. If ``None``, the powers of 2
+            lower than the batch size and ``-1``.
+        runs: The number of measured runs of each candidate.
+        warmup: The number of runs before the measured ones.
+        cache_file: The path of the cache. If ``None``, :func:`~torchaug.benchmarks.get_default_cache_file`.
+        use_cache: Whether to read and write the cache.
+
+    Returns:
+        A dictionary that can be serialized to JSON with the chosen ``"num_chunks"``, the median latency in
+        milliseconds of each measured candidate in ``"medians"`` and whether the result was read from the cache in
+        ``"cached"``.
+    """
+    if max_slowdown < 1.0:
+        raise ValueError(f"max_slowdown should be greater than or equal to 1. Got {max_slowdown}.")
+    elif not isinstance(transform, nn.Module) or not _chunked_modules(transform):
+        raise ValueError("The transform has no batch transform that accepts num_chunks.")
+
+    flat_inputs = tree_flatten(inpt)[0]
+    batch_size = RandomApplyTransform._get_input_batch_size(flat_inputs)
+    if candidates is None:
+        candidates = [2**i for i in range(batch_size.bit_length()) if 2**i < batch_size] + [-1]
+    elif not candidates or any(candidate < -1 or candidate == 0 for candidate in candidates):
+        raise ValueError(f"candidates should be positive integers or -1. Got {candidates}.")
+
+    _set_num_chunks(transform, 1)
+    cache_file = get_default_cache_file() if cache_file is None else cache_file
+    key = _cache_key(transform, flat_inputs, max_slowdown)
+    if use_cache:
+        result = _read_cache(cache_file).get(key)
+        if result is not None:
+            _set_num_chunks(transform, result["num_chunks"])
+            return {**result, "cached": True}
+
+    device = RandomApplyTransform._get_input_device(flat_inputs)
+    inpt = tree_map(lambda value: value.clone() if isinstance(value, torch.Tensor) else value, inpt)
+
+    medians: Dict[str, float] = {}
+    seen_num_chunks = []
+    for candidate in [1, *sorted(set(candidates) - {1}, key=lambda value: batch_size if value == -1 else value)]:
+        _set_num_chunks(transform, candidate)
+        num_chunks = [
+            min(batch_size if module.num_chunks == -1 else module.num_chunks, batch_size)
+            for module in _chunked_modules(transform)
+        ]
+        if num_chunks in seen_num_chunks:
+            continue
+        seen_num_chunks.append(num_chunks)
+        medians[str(candidate)] = summarize_timings(
+            time_function(lambda: transform(inpt), runs=runs, warmup=warmup, device=device)
+        )["median"]
+
+    max_latency = medians["1"] * max_slowdown
+    chosen = max(
+        (int(candidate) for candidate, median in medians.items() if median <= max_latency),
+        key=lambda value: batch_size if value == -1 else value,
+    )
+    _set_num_chunks(transform, chosen)
+
+    result = {"num_chunks": chosen, "medians": medians}
+    if use_cache:
+        cache = _read_cache(cache_file)
+        cache[key] = result
+        _write_cache(cache_file, cache)
+    return {**result, "cached": False}
@@ -0,0 +1,208 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import torch
+from torchvision.transforms import v2 as tv_transforms
+
+from torchaug import ta_tensors, transforms
+from torchaug.transforms.functional._utils import _max_value
+
+
+class BenchmarkCase:
+    """A transform to benchmark with its Torchvision baseline.
+
+    The factories receive the resolution ``(H, W)`` and the dtype of the input to set up the parameters that depend
+    on them, e.g. the output size of a crop or the threshold of a solarization.
+
+    Args:
+        name: The name of the case.
+        make_transform: The factory of the Torchaug batch transform. It receives ``num_chunks`` as a keyword argument
+            if ``supports_num_chunks`` is ``True``.
+        make_baseline: The factory of the Torchvision transform that is applied on each sample or on the whole batch.
+            If ``None``, the case has no baseline.
+        supports_num_chunks: Whether the Torchaug transform accepts ``num_chunks``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        make_transform: Callable[..., Callable],
+        make_baseline: Optional[Callable[[Tuple[int, int], torch.dtype], Callable]] = None,
+        supports_num_chunks: bool = False,
+    ) -> None:
+        self.name = name
+        self.make_transform = make_transform
+        self.make_baseline = make_baseline
+        self.supports_num_chunks = supports_num_chunks
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, supports_num_chunks={self.supports_num_chunks})"
+
+
+_BENCHMARK_CASES: Dict[str, BenchmarkCase] = {}
+
+
+def register_case(case: BenchmarkCase) -> BenchmarkCase:
+    """Register a case to benchmark.
+
+    Args:
+        case: The case to register. It replaces a registered case of the same name.
+
+    Returns:
+        The registered case.
+    """
+    _BENCHMARK_CASES[case.name] = case
+    return case
+
+
+def get_cases(names: Optional[Sequence[str]] = None) -> List[BenchmarkCase]:
+    """Get registered cases to benchmark.
+
+    Args:
+        names: The names of the cases. If ``None``, all the registered cases are returned.
+
+    Returns:
+        The cases.
+    """
+    if names is None:
+        return list(_BENCHMARK_CASES.values())
+
+    unknown_names = [name for name in names if name not in _BENCHMARK_CASES]
+    if unknown_names:
+        raise ValueError(f"Unknown benchmark cases {unknown_names}. Available cases are {list(_BENCHMARK_CASES)}.")
+    return [_BENCHMARK_CASES[name] for name in names]
+
+
+def make_pipeline_transforms(
+    output_size: Tuple[int, int] = (224, 224), batch_transform: bool = False, **transforms_attributes_override: Any
+) -> Callable:
+    """Make the augmentations of a typical training pipeline.
+
+    The samples are randomly resized and cropped, flipped, color jittered and converted to ``float32``.
+
+    Args:
+        output_size: The size ``(H, W)`` of the crops.
+        batch_transform: Whether the transforms are applied to batches.
+        transforms_attributes_override: Parameters of the transforms to override, see
+            :class:`~torchaug.transforms.SequentialTransform`.
+
+    Returns:
+        The transforms in a :class:`~torchaug.transforms.SequentialTransform`.
+    """
+    return transforms.SequentialTransform(
+        [
+            transforms.RandomResizedCrop(list(output_size), antialias=True),
+            transforms.RandomHorizontalFlip(p=0.5),
+            transforms.RandomColorJitter(0.4, 0.4, 0.4, 0.1, p=0.8),
+            transforms.ToDtype(torch.float32, scale=True),
+        ],
+        batch_transform=batch_transform,
+        **transforms_attributes_override,
+    )
+
+
+register_case(
+    BenchmarkCase(
+        "RandomColorJitter",
+        lambda size, dtype, num_chunks: transforms.RandomColorJitter(
+            0.5, 0.5, 0.5, 0.1, p=0.5, num_chunks=num_chunks, batch_transform=True
+        ),
+        lambda size, dtype: tv_transforms.RandomApply([tv_transforms.ColorJitter(0.5, 0.5, 0.5, 0.1)], p=0.5),
+        supports_num_chunks=True,
+    )
+)
+register_case(
+    BenchmarkCase(
+        "RandomGaussianBlur",
+        lambda size, dtype: transforms.RandomGaussianBlur([23, 23], [0.1, 2.0], p=0.5, batch_transform=True),
+        lambda size, dtype: tv_transforms.RandomApply([tv_transforms.GaussianBlur([23, 23], [0.1, 2.0])], p=0.5),
+    )
+)
+register_case(
+    BenchmarkCase(
+        "RandomGrayscale",
+        lambda size, dtype: transforms.RandomGrayscale(p=0.5, batch_transform=True),
+        lambda size, dtype: tv_transforms.RandomApply([tv_transforms.Grayscale(num_output_channels=3)], p=0.5),
+    )
+)
+register_case(
+    BenchmarkCase(
+        "RandomHorizontalFlip",
+        lambda size, dtype: transforms.RandomHorizontalFlip(p=0.5, batch_transform=True),
+        lambda size, dtype: tv_transforms.RandomHorizontalFlip(p=0.5),
+    )
+)
+register_case(
+    BenchmarkCase(
+        "RandomResizedCrop",
+        lambda size, dtype, num_chunks: transforms.RandomResizedCrop(
+            list(size), num_chunks=num_chunks, batch_transform=True
+        ),
+        lambda size, dtype: tv_transforms.RandomResizedCrop(list(size), antialias=True),
+        supports_num_chunks=True,
+    )
+)
+register_case(
+    BenchmarkCase(
+        "RandomSolarize",
+        lambda size, dtype: transforms.RandomSolarize(_max_value(dtype) / 2, p=0.5, batch_transform=True),
+        lambda size, dtype: tv_transforms.RandomSolarize(_max_value(dtype) / 2, p=0.5),
+    )
+)
+
+register_case(
+    BenchmarkCase(
+        "Pipeline",
+        lambda size, dtype, num_chunks: make_pipeline_transforms(size, batch_transform=True, num_chunks=num_chunks),
+        lambda size, dtype: tv_transforms.Compose(
+            [
+                tv_transforms.RandomResizedCrop(list(size), antialias=True),
+                tv_transforms.RandomHorizontalFlip(p=0.5),
+                tv_transforms.RandomApply([tv_transforms.ColorJitter(0.4, 0.4, 0.4, 0.1)], p=0.8),
+                tv_transforms.ToDtype(torch.float32, scale=True),
+            ]
+        ),
+        supports_num_chunks=True,
+    )
+)
+
+
+def make_input(
+    batch_size: int,
+    resolution: Tuple[int, int],
+    dtype: torch.dtype = torch.uint8,
+    device: Any = "cpu",
+    num_channels: int = 3,
+    num_frames: Optional[int] = None,
+) -> torch.Tensor:
+    """Make a random batch of images or videos to benchmark.
+
+    Args:
+        batch_size: The number of images or videos.
+        resolution: The size ``(H, W)`` of the images.
+        dtype: The dtype of the images. Integer images are in ``[0, 255]`` and floating images in ``[0, 1]``.
+        device: The device of the images.
+        num_channels: The number of channels of the images.
+        num_frames: If not ``None``, the number of frames of the videos.
+
+    Returns:
+        The batch of images of shape ``[B, C, H, W]`` or the :class:`~torchaug.ta_tensors.BatchVideos` of shape
+        ``[B, T, C, H, W]``.
+    """
+    shape = (
+        (batch_size, num_channels, *resolution)
+        if num_frames is None
+        else (batch_size, num_frames, num_channels, *resolution)
+    )
+    if dtype.is_floating_point:
+        inpt = torch.rand(shape, dtype=dtype, device=device)
+    else:
+        inpt = torch.randint(0, 256, shape, dtype=dtype, device=device)
+    return inpt if num_frames is None else ta_tensors.BatchVideos(inpt)
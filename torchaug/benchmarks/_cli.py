@@ -0,0 +1,336 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+from ._cases import get_cases, make_pipeline_transforms
+from ._dataloader import COLLATE_FNS, DATASETS, STAGES, TRANSFORM_MODES, run_dataloader_benchmark
+from ._import_time import run_import_benchmark
+from ._runner import IMPLEMENTATIONS, MODES, run_benchmarks
+
+
+_TABLE_COLUMNS = (
+    "transform",
+    "implementation",
+    "batch_size",
+    "resolution",
+    "dtype",
+    "num_frames",
+    "num_chunks",
+    "batch_inplace",
+    "p",
+    "num_threads",
+    "median",
+    "p5",
+    "p95",
+    "throughput",
+)
+_MEMORY_TABLE_COLUMNS = (
+    "transform",
+    "implementation",
+    "batch_size",
+    "resolution",
+    "dtype",
+    "num_frames",
+    "num_chunks",
+    "batch_inplace",
+    "p",
+    "peak_allocated",
+    "total_allocated",
+    "num_allocations",
+    "peak_rss_increase",
+)
+_DATALOADER_TABLE_COLUMNS = (
+    "dataset",
+    "transform_mode",
+    "collate_fn",
+    "num_workers",
+    "samples_per_second",
+    "startup",
+    *STAGES,
+    "wait",
+)
+_IMPORT_TABLE_COLUMNS = ("module", "median", "p5", "p95", "torchaug_time", "num_modules")
+
+
+def _parse_resolution(value: str) -> Tuple[int, int]:
+    sizes = value.lower().split("x")
+    if len(sizes) not in (1, 2) or not all(size.isdigit() for size in sizes):
+        raise argparse.ArgumentTypeError(f"Expected a resolution as H or HxW, got {value}.")
+    height = int(sizes[0])
+    return (height, int(sizes[-1]))
+
+
+def _parse_dtype(value: str) -> torch.dtype:
+    dtype = getattr(torch, value, None)
+    if not isinstance(dtype, torch.dtype):
+        raise argparse.ArgumentTypeError(f"Expected a torch dtype, got {value}.")
+    return dtype
+
+
+def _parse_optional_bool(value: str) -> Optional[bool]:
+    values = {"true": True, "false": False, "none": None}
+    if value.lower() not in values:
+        raise argparse.ArgumentTypeError(f"Expected true, false or none, got {value}.")
+    return values[value.lower()]
+
+
+def _parse_optional_float(value: str) -> Optional[float]:
+    if value.lower() == "none":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a float or none, got {value}.") from None
+
+
+def format_results(results: Sequence[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> str:
+    """Format benchmark results as a Markdown table.
+
+    Args:
+        results: The results returned by :func:`~torchaug.benchmarks.run_benchmarks`,
+            :func:`~torchaug.benchmarks.run_dataloader_benchmark` or :func:`~torchaug.benchmarks.run_import_benchmark`.
+        columns: The keys of the results to display. The keys of the nested dictionaries of the results, such as the
+            ``"stages"``, can be used directly. If ``None``, the configurations, the median, 5th and 95th percentiles
+            of the latencies in milliseconds and the throughput in images per second of
+            :func:`~torchaug.benchmarks.run_benchmarks` are displayed.
+
+    Returns:
+        The table.
+    """
+    columns = _TABLE_COLUMNS if columns is None else columns
+    rows: List[List[str]] = [list(columns)]
+    for result in results:
+        flat_result = dict(result)
+        for value in result.values():
+            if isinstance(value, dict):
+                flat_result.update(value)
+        row = []
+        for column in columns:
+            value = flat_result[column]
+            if column == "resolution":
+                value = "x".join(str(size) for size in value)
+            elif isinstance(value, float):
+                value = f"{value:.2f}"
+            row.append("" if value is None else str(value))
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    lines = ["| " + " | ".join(value.ljust(width) for value, width in zip(row, widths)) + " |" for row in rows]
+    lines.insert(1, "|" + "|".join("-" * (width + 2) for width in widths) + "|")
+    return "\n".join(lines)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Get the parser of the arguments of the benchmark command line."""
+    parser = argparse.ArgumentParser(
+        prog="torchaug-benchmark",
+        description=(
+            "Benchmark the wall-clock latency or the memory of Torchaug batch transforms against Torchvision. "
+            "Run `torchaug-benchmark dataloader --help` to benchmark data pipelines with a DataLoader and "
+            "`torchaug-benchmark import --help` to benchmark the import of Torchaug."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--transforms", nargs="+", default=None, help="Transforms to benchmark. Defaults to all.")
+    parser.add_argument("--list", action="store_true", help="List the transforms that can be benchmarked and exit.")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[64], help="Batch sizes.")
+    parser.add_argument(
+        "--resolutions", nargs="+", type=_parse_resolution, default=[(224, 224)], help="Resolutions as H or HxW."
+    )
+    parser.add_argument("--dtypes", nargs="+", type=_parse_dtype, default=[torch.uint8], help="Dtypes of the images.")
+    parser.add_argument("--num-chunks", nargs="+", type=int, default=[1], help="Number of chunks of the transforms.")
+    parser.add_argument(
+        "--batch-inplace",
+        nargs="+",
+        type=_parse_optional_bool,
+        default=[None],
+        help="Whether to apply the transforms in-place as true, false or none to keep the default of the transforms.",
+    )
+    parser.add_argument(
+        "--p",
+        nargs="+",
+        type=_parse_optional_float,
+        default=[None],
+        help="Probabilities to apply the transforms or none to keep the default of the transforms.",
+    )
+    parser.add_argument(
+        "--num-frames", type=int, default=None, help="Number of frames to benchmark videos instead of images."
+    )
+    parser.add_argument(
+        "--num-threads", nargs="+", type=int, default=None, help="Numbers of threads. Defaults to the current one."
+    )
+    parser.add_argument(
+        "--baselines",
+        nargs="*",
+        choices=IMPLEMENTATIONS[1:],
+        default=list(IMPLEMENTATIONS[1:]),
+        help="Torchvision baselines.",
+    )
+    parser.add_argument(
+        "--mode", choices=MODES, default="time", help="Measure the latency in milliseconds or the memory in MiB."
+    )
+    parser.add_argument("--device", type=str, default="cpu", help="Device of the images.")
+    parser.add_argument("--runs", type=int, default=100, help="Number of measured runs.")
+    parser.add_argument("--warmup", type=int, default=10, help="Number of runs before the measured ones.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON file to write the results to.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the progress and the table.")
+    return parser
+
+
+def get_dataloader_parser() -> argparse.ArgumentParser:
+    """Get the parser of the arguments of the DataLoader benchmark command line."""
+    parser = argparse.ArgumentParser(
+        prog="torchaug-benchmark dataloader",
+        description="Benchmark the throughput of data pipelines with a DataLoader on synthetic datasets.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=["image"], help="Datasets.")
+    parser.add_argument(
+        "--transform-modes", nargs="+", choices=TRANSFORM_MODES, default=list(TRANSFORM_MODES), help="Transform modes."
+    )
+    parser.add_argument(
+        "--collate-fns", nargs="+", choices=list(COLLATE_FNS), default=list(COLLATE_FNS), help="Collate functions."
+    )
+    parser.add_argument("--num-workers", nargs="+", type=int, default=[0, 2, 4], help="Numbers of workers.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size.")
+    parser.add_argument("--num-batches", type=int, default=20, help="Number of measured batches.")
+    parser.add_argument("--warmup-batches", type=int, default=2, help="Number of batches before the measured ones.")
+    parser.add_argument("--image-size", type=_parse_resolution, default=None, help="Size of the samples as H or HxW.")
+    parser.add_argument(
+        "--size-jitter", type=int, default=0, help="Maximum difference between the sizes of the samples and the size."
+    )
+    parser.add_argument("--output-size", type=_parse_resolution, default=(224, 224), help="Size of the crops.")
+    parser.add_argument("--pin-memory", action="store_true", help="Pin the memory of the batches.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the samples.")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON file to write the results to.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the progress and the table.")
+    return parser
+
+
+def get_import_parser() -> argparse.ArgumentParser:
+    """Get the parser of the arguments of the import benchmark command line."""
+    parser = argparse.ArgumentParser(
+        prog="torchaug-benchmark import",
+        description="Benchmark the time to import Torchaug modules in fresh interpreters.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=["torchaug", "torchaug.transforms", "torchaug.data.dataloader", "torchaug.data.dataset"],
+        help="Modules to import.",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Number of imports of each module.")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON file to write the results to.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the progress and the table.")
+    return parser
+
+
+def _main_import(argv: Sequence[str]) -> int:
+    args = get_import_parser().parse_args(argv)
+
+    benchmark = run_import_benchmark(modules=args.modules, runs=args.runs, verbose=not args.quiet)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(benchmark, f, indent=2)
+    if not args.quiet:
+        print(format_results(benchmark["results"], columns=_IMPORT_TABLE_COLUMNS))
+    return 0
+
+
+def _main_dataloader(argv: Sequence[str]) -> int:
+    args = get_dataloader_parser().parse_args(argv)
+
+    dataset_kwargs: Dict[str, Any] = {"size_jitter": args.size_jitter}
+    if args.image_size is not None:
+        dataset_kwargs["image_size"] = args.image_size
+    benchmark = run_dataloader_benchmark(
+        datasets=args.datasets,
+        transform_modes=args.transform_modes,
+        collate_fns=args.collate_fns,
+        num_workers=args.num_workers,
+        batch_size=args.batch_size,
+        num_batches=args.num_batches,
+        warmup_batches=args.warmup_batches,
+        make_transforms=functools.partial(make_pipeline_transforms, args.output_size),
+        dataset_kwargs=dict.fromkeys(args.datasets, dataset_kwargs),
+        pin_memory=args.pin_memory,
+        seed=args.seed,
+        verbose=not args.quiet,
+    )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(benchmark, f, indent=2)
+    if not args.quiet:
+        print(format_results(benchmark["results"], columns=_DATALOADER_TABLE_COLUMNS))
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmark command line.
+
+    The transforms are benchmarked by default, the data pipelines with a :class:`~torch.utils.data.DataLoader`
+    if the first argument is ``dataloader`` and the import of Torchaug if the first argument is ``import``.
+
+    Args:
+        argv: The arguments of the command line. If ``None``, the arguments of the process are used.
+
+    Returns:
+        The exit code.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["dataloader"]:
+        return _main_dataloader(argv[1:])
+    elif argv[:1] == ["import"]:
+        return _main_import(argv[1:])
+
+    args = get_parser().parse_args(argv)
+
+    if args.list:
+        print("\n".join(case.name for case in get_cases()))
+        return 0
+
+    benchmark = run_benchmarks(
+        cases=args.transforms,
+        batch_sizes=args.batch_sizes,
+        resolutions=args.resolutions,
+        dtypes=args.dtypes,
+        num_chunks=args.num_chunks,
+        batch_inplace=args.batch_inplace,
+        p=args.p,
+        num_threads=args.num_threads,
+        num_frames=args.num_frames,
+        baselines=args.baselines,
+        mode=args.mode,
+        device=args.device,
+        runs=args.runs,
+        warmup=args.warmup,
+        seed=args.seed,
+        verbose=not args.quiet,
+    )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(benchmark, f, indent=2)
+    if not args.quiet:
+        print(format_results(benchmark["results"], _MEMORY_TABLE_COLUMNS if args.mode == "memory" else None))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import collections
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from torchaug.data.dataloader import TransformCollate, default_collate, default_nested_collate
+from torchaug.data.dataset import wrap_dataset_for_transforms_v2
+
+from ._cases import make_pipeline_transforms
+from ._datasets import SyntheticDetectionDataset, SyntheticImageDataset, SyntheticVideoDataset
+from ._runner import get_metadata
+
+
+DATASETS = {
+    "image": SyntheticImageDataset,
+    "video": SyntheticVideoDataset,
+    "detection": SyntheticDetectionDataset,
+}
+COLLATE_FNS = {
+    "default": default_collate,
+    "nested": default_nested_collate,
+}
+TRANSFORM_MODES = ("per_sample", "batch")
+STAGES = ("load", "transform", "collate")
+
+# Time spent in each stage by the current process, main process or worker, since the last batch was reported.
+_STAGE_TIMES: Dict[str, float] = collections.defaultdict(float)
+
+
+class _TimedStage:
+    # Accumulate the time spent in a function of the data pipeline. It is pickled to the workers with the dataset
+    # or the collate function.
+    def __init__(self, stage: str, fn: Callable) -> None:
+        self.stage = stage
+        self.fn = fn
+
+    def __call__(self, *args: Any) -> Any:
+        start = time.perf_counter()
+        output = self.fn(*args)
+        _STAGE_TIMES[self.stage] += time.perf_counter() - start
+        return output
+
+
+class _TimedDataset(Dataset):
+    # Time the loading of the samples, excluding the transforms applied by the dataset.
+    def __init__(self, dataset: Dataset) -> None:
+        self.dataset = dataset
+
+    def __getitem__(self, idx: int) -> Any:
+        transform_time = _STAGE_TIMES["transform"]
+        start = time.perf_counter()
+        sample = self.dataset[idx]
+        _STAGE_TIMES["load"] += time.perf_counter() - start - (_STAGE_TIMES["transform"] - transform_time)
+        return sample
+
+    def __len__(self) -> int:
+        return len(self.dataset)  # type: ignore[arg-type]
+
+
+class _ReportStages:
+    # Return the times of the stages of the batch along with the batch, from the process that made it.
+    def __init__(self, collate_fn: Callable) -> None:
+        self.collate_fn = collate_fn
+
+    def __call__(self, batch: List[Any]) -> Tuple[Any, Dict[str, float]]:
+        output = self.collate_fn(batch)
+        stage_times = {stage: _STAGE_TIMES[stage] for stage in STAGES}
+        _STAGE_TIMES.clear()
+        return output, stage_times
+
+
+def run_dataloader_benchmark(
+    datasets: Sequence[str] = ("image",),
+    transform_modes: Sequence[str] = TRANSFORM_MODES,
+    collate_fns: Sequence[str] = ("default", "nested"),
+    num_workers: Sequence[int] = (0, 2, 4),
+    batch_size: int = 32,
+    num_batches: int = 20,
+    warmup_batches: int = 2,
+    make_transforms: Callable[..., Callable] = make_pipeline_transforms,
+    dataset_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+    pin_memory: bool = False,
+    seed: int = 0,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Benchmark the throughput of data pipelines with a :class:`~torch.utils.data.DataLoader`.
+
+    Synthetic datasets are wrapped with :func:`~torchaug.data.dataset.wrap_dataset_for_transforms_v2` and loaded
+    with each configuration of the grid of datasets, transform modes, collate functions and number of workers. In the
+    ``"per_sample"`` mode, the transforms are applied by the dataset to each sample before collation. In the
+    ``"batch"`` mode, they are applied to the collated batch in the workers with
+    :class:`~torchaug.data.dataloader.TransformCollate`.
+
+    The time spent in each stage is measured in the process that makes the batch: ``"load"`` to make the samples,
+    ``"transform"`` and ``"collate"``. The main process measures the time it waits for each batch in ``"wait"``,
+    which includes the transfer of the batch from the workers. The first ``warmup_batches`` batches, which include
+    the start of the workers, are excluded from the measures. The configurations that collate samples of different
+    sizes with :func:`~torchaug.data.dataloader.default_collate` before the transforms are skipped.
+
+    Args:
+        datasets: The synthetic datasets among ``"image"``, ``"video"`` and ``"detection"``.
+        transform_modes: The transform modes among ``"per_sample"`` and ``"batch"``.
+        collate_fns: The collate functions among ``"default"`` for
+            :func:`~torchaug.data.dataloader.default_collate` and ``"nested"`` for
+            :func:`~torchaug.data.dataloader.default_nested_collate`.
+        num_workers: The numbers of workers of the :class:`~torch.utils.data.DataLoader`.
+        batch_size: The batch size.
+        num_batches: The number of measured batches.
+        warmup_batches: The number of batches loaded before the measured ones.
+        make_transforms: The factory of the transforms called with ``batch_transform`` as a keyword argument. Defaults
+            to :func:`~torchaug.benchmarks.make_pipeline_transforms`.
+        dataset_kwargs: The keyword arguments of the synthetic datasets indexed by their name, e.g. to set the size of
+            the images.
+        pin_memory: Whether the :class:`~torch.utils.data.DataLoader` pins the memory of the batches.
+        seed: The seed of the samples and of the random generator of the :class:`~torch.utils.data.DataLoader`.
+        verbose: Whether to print the progress.
+
+    Returns:
+        A dictionary that can be serialized to JSON with the ``"metadata"`` of the environment and the ``"results"``.
+        Each result describes its configuration, the number of ``samples_per_second``, the time to get the first
+        batch in ``startup`` and the mean time per batch of each stage in ``stages``, in milliseconds. The stages of
+        the workers run in parallel, so their sum can exceed the time between two batches.
+    """
+    for name, values, available in [
+        ("dataset", datasets, DATASETS),
+        ("transform mode", transform_modes, TRANSFORM_MODES),
+        ("collate function", collate_fns, COLLATE_FNS),
+    ]:
+        for value in values:
+            if value not in available:
+                raise ValueError(f"Unknown {name} {value}. Available values are {list(available)}.")
+    if num_batches < 1:
+        raise ValueError(f"num_batches should be a positive integer. Got {num_batches}.")
+    elif warmup_batches < 0:
+        raise ValueError(f"warmup_batches should be a non-negative integer. Got {warmup_batches}.")
+    dataset_kwargs = dataset_kwargs or {}
+
+    results: List[Dict[str, Any]] = []
+    for dataset_name, transform_mode, collate_name, workers in itertools.product(
+        datasets, transform_modes, collate_fns, num_workers
+    ):
+        config = {
+            "dataset": dataset_name,
+            "transform_mode": transform_mode,
+            "collate_fn": collate_name,
+            "num_workers": workers,
+            "batch_size": batch_size,
+            "num_batches": num_batches,
+            "warmup_batches": warmup_batches,
+            "pin_memory": pin_memory,
+        }
+        dataset = DATASETS[dataset_name](
+            num_samples=(num_batches + warmup_batches) * batch_size,
+            seed=seed,
+            **dataset_kwargs.get(dataset_name, {}),
+        )
+        if dataset.size_jitter > 0 and transform_mode == "batch" and collate_name == "default":
+            # The samples of different sizes cannot be stacked before the transforms.
+            if verbose:
+                print(f"Skipping {config} as the samples of different sizes cannot be stacked.")
+            continue
+        elif verbose:
+            print(", ".join(f"{key}={value}" for key, value in list(config.items())[:4]))
+
+        dataset = wrap_dataset_for_transforms_v2(dataset)
+        pipeline_transforms = _TimedStage("transform", make_transforms(batch_transform=transform_mode == "batch"))
+        collate_fn: Callable = _TimedStage("collate", COLLATE_FNS[collate_name])
+        if transform_mode == "per_sample":
+            dataset.transforms = pipeline_transforms
+        else:
+            collate_fn = TransformCollate(pipeline_transforms, collate_fn)
+
+        loader = DataLoader(
+            _TimedDataset(dataset),
+            batch_size=batch_size,
+            num_workers=workers,
+            collate_fn=_ReportStages(collate_fn),
+            pin_memory=pin_memory,
+            drop_last=True,
+            generator=torch.Generator().manual_seed(seed),
+        )
+
+        _STAGE_TIMES.clear()
+        stage_times: Dict[str, float] = collections.defaultdict(float)
+        start = time.perf_counter()
+        iterator = iter(loader)
+        for i in range(num_batches + warmup_batches):
+            if i == warmup_batches:
+                measure_start = time.perf_counter()
+            wait_start = time.perf_counter()
+            _, batch_stage_times = next(iterator)
+            wait_time = time.perf_counter() - wait_start
+            if i == 0:
+                startup_time = time.perf_counter() - start
+            if i >= warmup_batches:
+                stage_times["wait"] += wait_time
+                for stage, value in batch_stage_times.items():
+                    stage_times[stage] += value
+        measure_time = time.perf_counter() - measure_start
+        del iterator
+
+        results.append(
+            {
+                **config,
+                "samples_per_second": num_batches * batch_size / measure_time,
+                "unit": "ms",
+                "startup": startup_time * 1000,
+                "stages": {stage: stage_times[stage] / num_batches * 1000 for stage in (*STAGES, "wait")},
+            }
+        )
+
+    return {"metadata": get_metadata(), "results": results}
@@ -0,0 +1,235 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import torch
+from torchvision.datasets import VisionDataset
+
+from torchaug import ta_tensors
+from torchaug.data.dataset._dataset_wrapper import WRAPPER_FACTORIES, identity_wrapper_factory
+
+
+class _SyntheticDataset(VisionDataset):
+    def __init__(
+        self,
+        num_samples: int = 1000,
+        image_size: Tuple[int, int] = (256, 256),
+        size_jitter: int = 0,
+        num_channels: int = 3,
+        num_classes: int = 1000,
+        seed: int = 0,
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        transforms: Optional[Callable] = None,
+    ) -> None:
+        super().__init__(
+            None,  # type: ignore[arg-type]
+            transforms=transforms,
+            transform=transform,
+            target_transform=target_transform,
+        )
+        if num_samples < 1:
+            raise ValueError(f"num_samples should be a positive integer. Got {num_samples}.")
+        elif size_jitter < 0 or size_jitter >= min(image_size):
+            raise ValueError(f"size_jitter should be non-negative and lower than the image size. Got {size_jitter}.")
+        self.num_samples = num_samples
+        self.image_size = tuple(image_size)
+        self.size_jitter = size_jitter
+        self.num_channels = num_channels
+        self.num_classes = num_classes
+        self.seed = seed
+
+    def _generator(self, idx: int) -> torch.Generator:
+        # The samples only depend on their index so that they are the same in every worker and epoch.
+        return torch.Generator().manual_seed(self.seed * self.num_samples + idx)
+
+    def _size(self, generator: torch.Generator) -> Tuple[int, int]:
+        if self.size_jitter == 0:
+            return self.image_size  # type: ignore[return-value]
+        jitters = torch.randint(-self.size_jitter, self.size_jitter + 1, (2,), generator=generator).tolist()
+        return (self.image_size[0] + jitters[0], self.image_size[1] + jitters[1])
+
+    def _make_sample(self, generator: torch.Generator) -> Tuple[Any, Any]:
+        raise NotImplementedError
+
+    def __getitem__(self, idx: int) -> Tuple[Any, Any]:
+        if not 0 <= idx < self.num_samples:
+            raise IndexError(f"Index {idx} out of range for a dataset of {self.num_samples} samples.")
+        sample, target = self._make_sample(self._generator(idx))
+        if self.transforms is not None:
+            sample, target = self.transforms(sample, target)
+        return sample, target
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+
+class SyntheticImageDataset(_SyntheticDataset):
+    """Synthetic image classification dataset.
+
+    Each sample is a random ``uint8`` :class:`~torchaug.ta_tensors.Image` of shape ``[C, H, W]`` with a random
+    class index in a :class:`~torchaug.ta_tensors.Labels` of shape ``[1]``, which can be transformed with the image
+    in batch and nested modes. The samples only depend on their index and the seed, so they can be generated in the
+    workers of a :class:`~torch.utils.data.DataLoader` without storage, like the decoded images of a real dataset.
+
+    Args:
+        num_samples: The number of samples.
+        image_size: The size ``(H, W)`` of the images.
+        size_jitter: The maximum difference between the height or width of an image and ``image_size``. The sizes
+            are drawn uniformly for each sample.
+        num_channels: The number of channels of the images.
+        num_classes: The number of classes.
+        seed: The seed of the samples.
+        transform: A function that transforms the image.
+        target_transform: A function that transforms the target.
+        transforms: A function that transforms the image and the target.
+    """
+
+    def _make_sample(self, generator: torch.Generator) -> Tuple[ta_tensors.Image, ta_tensors.Labels]:
+        image = torch.randint(
+            0, 256, (self.num_channels, *self._size(generator)), dtype=torch.uint8, generator=generator
+        )
+        label = torch.randint(self.num_classes, (1,), generator=generator)
+        return ta_tensors.Image(image), ta_tensors.Labels(label)
+
+
+class SyntheticVideoDataset(_SyntheticDataset):
+    """Synthetic video classification dataset.
+
+    Each sample is a random ``uint8`` :class:`~torchaug.ta_tensors.Video` of shape ``[T, C, H, W]`` with a random
+    class index in a :class:`~torchaug.ta_tensors.Labels` of shape ``[1]``. The samples only depend on their index
+    and the seed.
+
+    Args:
+        num_samples: The number of samples.
+        image_size: The size ``(H, W)`` of the frames.
+        size_jitter: The maximum difference between the height or width of a video and ``image_size``. The sizes are
+            drawn uniformly for each sample.
+        num_frames: The number of frames of the videos.
+        num_channels: The number of channels of the videos.
+        num_classes: The number of classes.
+        seed: The seed of the samples.
+        transform: A function that transforms the video.
+        target_transform: A function that transforms the target.
+        transforms: A function that transforms the video and the target.
+    """
+
+    def __init__(
+        self,
+        num_samples: int = 1000,
+        image_size: Tuple[int, int] = (128, 128),
+        size_jitter: int = 0,
+        num_frames: int = 8,
+        num_channels: int = 3,
+        num_classes: int = 400,
+        seed: int = 0,
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        transforms: Optional[Callable] = None,
+    ) -> None:
+        super().__init__(
+            num_samples=num_samples,
+            image_size=image_size,
+            size_jitter=size_jitter,
+            num_channels=num_channels,
+            num_classes=num_classes,
+            seed=seed,
+            transform=transform,
+            target_transform=target_transform,
+            transforms=transforms,
+        )
+        self.num_frames = num_frames
+
+    def _make_sample(self, generator: torch.Generator) -> Tuple[ta_tensors.Video, ta_tensors.Labels]:
+        shape = (self.num_frames, self.num_channels, *self._size(generator))
+        video = torch.randint(0, 256, shape, dtype=torch.uint8, generator=generator)
+        label = torch.randint(self.num_classes, (1,), generator=generator)
+        return ta_tensors.Video(video), ta_tensors.Labels(label)
+
+
+class SyntheticDetectionDataset(_SyntheticDataset):
+    """Synthetic object detection dataset.
+
+    Each sample is a random ``uint8`` :class:`~torchaug.ta_tensors.Image` of shape ``[C, H, W]`` with a target
+    dictionary in the format of the wrapped :class:`~torchvision.datasets.CocoDetection`: ``"boxes"`` in the ``XYXY``
+    format, ``"labels"`` and optionally ``"masks"`` with one mask per box. The number of objects is drawn uniformly
+    for each sample. The samples only depend on their index and the seed.
+
+    Args:
+        num_samples: The number of samples.
+        image_size: The size ``(H, W)`` of the images.
+        size_jitter: The maximum difference between the height or width of an image and ``image_size``. The sizes
+            are drawn uniformly for each sample.
+        max_objects: The maximum number of objects per image.
+        with_masks: Whether to add the masks of the objects to the target.
+        num_channels: The number of channels of the images.
+        num_classes: The number of classes.
+        seed: The seed of the samples.
+        transform: A function that transforms the image.
+        target_transform: A function that transforms the target.
+        transforms: A function that transforms the image and the target.
+    """
+
+    def __init__(
+        self,
+        num_samples: int = 1000,
+        image_size: Tuple[int, int] = (480, 640),
+        size_jitter: int = 0,
+        max_objects: int = 20,
+        with_masks: bool = False,
+        num_channels: int = 3,
+        num_classes: int = 80,
+        seed: int = 0,
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        transforms: Optional[Callable] = None,
+    ) -> None:
+        super().__init__(
+            num_samples=num_samples,
+            image_size=image_size,
+            size_jitter=size_jitter,
+            num_channels=num_channels,
+            num_classes=num_classes,
+            seed=seed,
+            transform=transform,
+            target_transform=target_transform,
+            transforms=transforms,
+        )
+        if max_objects < 1:
+            raise ValueError(f"max_objects should be a positive integer. Got {max_objects}.")
+        self.max_objects = max_objects
+        self.with_masks = with_masks
+
+    def _make_sample(self, generator: torch.Generator) -> Tuple[ta_tensors.Image, Dict[str, Any]]:
+        height, width = self._size(generator)
+        image = torch.randint(0, 256, (self.num_channels, height, width), dtype=torch.uint8, generator=generator)
+
+        num_objects = int(torch.randint(1, self.max_objects + 1, (), generator=generator))
+        corners = torch.rand(num_objects, 2, 2, generator=generator) * torch.tensor([width, height])
+        boxes = torch.cat([corners.min(1).values, corners.max(1).values], dim=-1)
+        target: Dict[str, Any] = {
+            "boxes": ta_tensors.BoundingBoxes(boxes, format="XYXY", canvas_size=(height, width)),
+            "labels": ta_tensors.Labels(torch.randint(self.num_classes, (num_objects,), generator=generator)),
+        }
+        if self.with_masks:
+            ys = torch.arange(height).view(1, -1, 1) + 0.5
+            xs = torch.arange(width).view(1, 1, -1) + 0.5
+            left, top, right, bottom = boxes.view(-1, 4, 1, 1).unbind(1)
+            masks = (ys >= top) & (ys < bottom) & (xs >= left) & (xs < right)
+            target["masks"] = ta_tensors.Mask(masks.to(torch.uint8))
+        return ta_tensors.Image(image), target
+
+
+for dataset_cls in [
+    SyntheticImageDataset,
+    SyntheticVideoDataset,
+    SyntheticDetectionDataset,
+]:
+    # The samples are already made of ta_tensors.
+    WRAPPER_FACTORIES.register(dataset_cls)(identity_wrapper_factory)
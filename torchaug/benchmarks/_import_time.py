@@ -0,0 +1,112 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Sequence
+
+from ._runner import get_metadata
+from ._timing import summarize_timings
+
+
+# Imports the module in a fresh interpreter and prints the import latency and the imported Torchaug modules.
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+modules = sorted(m for m in sys.modules if m.split(".")[0] == "torchaug")
+print(json.dumps({{"time": elapsed * 1000, "modules": modules}}))
+"""
+
+
+def _parse_torchaug_self_time(importtime: str) -> float:
+    # Sum the self time in microseconds of the Torchaug modules reported by `python -X importtime`.
+    total = 0
+    for line in importtime.splitlines():
+        fields = line.split(":", 1)[-1].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        if fields[2].strip().split(".")[0] == "torchaug":
+            total += int(fields[0])
+    return total / 1000
+
+
+def measure_import_time(module: str = "torchaug", runs: int = 5) -> Dict[str, Any]:
+    """Measure the time to import a module in fresh interpreters.
+
+    Each run imports the module in a new Python process with ``-X importtime``, so the latency includes the import of
+    the dependencies, e.g. PyTorch and Torchvision, and their files are likely in the cache of the file system after
+    the first run.
+
+    Args:
+        module: The name of the module to import.
+        runs: The number of imports.
+
+    Returns:
+        The statistics of the import latencies in milliseconds returned by
+        :func:`~torchaug.benchmarks.summarize_timings`, the median time in milliseconds spent in the Torchaug modules
+        themselves in ``"torchaug_time"``, and the number and the names of the imported Torchaug modules in
+        ``"num_modules"`` and ``"modules"``.
+    """
+    if runs < 1:
+        raise ValueError(f"runs should be a positive integer. Got {runs}.")
+
+    timings: List[float] = []
+    torchaug_timings: List[float] = []
+    modules: List[str] = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT.format(module=module)],
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Failed to import {module}:\n{process.stderr}")
+        output = json.loads(process.stdout.splitlines()[-1])
+        timings.append(output["time"])
+        torchaug_timings.append(_parse_torchaug_self_time(process.stderr))
+        modules = output["modules"]
+
+    return {
+        **summarize_timings(timings),
+        "torchaug_time": summarize_timings(torchaug_timings)["median"],
+        "num_modules": len(modules),
+        "modules": modules,
+    }
+
+
+def run_import_benchmark(
+    modules: Sequence[str] = ("torchaug", "torchaug.transforms", "torchaug.data.dataloader", "torchaug.data.dataset"),
+    runs: int = 5,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Benchmark the time to import Torchaug modules.
+
+    The subpackages of Torchaug and the transforms are imported on first access, so importing
+    :mod:`torchaug.transforms` does not import the data utilities nor the modules of the transforms. This matters
+    for the workers of a :class:`~torch.utils.data.DataLoader` started with ``spawn`` or ``forkserver`` that import
+    the modules again.
+
+    Args:
+        modules: The names of the modules to import.
+        runs: The number of imports of each module, see :func:`~torchaug.benchmarks.measure_import_time`.
+        verbose: Whether to print the progress.
+
+    Returns:
+        A dictionary that can be serialized to JSON with the ``"metadata"`` of the environment and the ``"results"``.
+        Each result describes the module and the statistics returned by
+        :func:`~torchaug.benchmarks.measure_import_time`.
+    """
+    results: List[Dict[str, Any]] = []
+    for module in modules:
+        if verbose:
+            print(f"module={module}")
+        results.append({"module": module, "runs": runs, "unit": "ms", **measure_import_time(module, runs=runs)})
+    return {"metadata": get_metadata(), "results": results}
@@ -0,0 +1,162 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+from ._timing import _synchronize
+
+
+_MIB = 2**20
+
+
+def _read_status(key: str) -> Optional[int]:
+    # Read a memory value of the process in bytes from /proc, only available on Linux.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{key}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> Optional[int]:
+    # Reset the peak resident set size of the process to the current one and return it.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    return _read_status("VmRSS")
+
+
+def _cpu_allocations(prof: profile) -> List[int]:
+    # The sizes of the allocations, positive, and frees, negative, of the CPU allocator in chronological order.
+    events = [
+        event
+        for event in prof.profiler.kineto_results.events()  # type: ignore[union-attr]
+        if event.name() == "[memory]" and event.device_type() == torch.autograd.DeviceType.CPU
+    ]
+    return [event.nbytes() for event in sorted(events, key=lambda event: event.start_us())]
+
+
+def _measure_cpu(fn: Callable[[], Any]) -> Dict[str, float]:
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        output = fn()
+        del output
+
+    current = peak = total = num_allocations = 0
+    for nbytes in _cpu_allocations(prof):
+        current += nbytes
+        peak = max(peak, current)
+        if nbytes > 0:
+            total += nbytes
+            num_allocations += 1
+    return {"peak_allocated": peak, "total_allocated": total, "num_allocations": num_allocations}
+
+
+def _measure_cuda(fn: Callable[[], Any], device: torch.device) -> Dict[str, float]:
+    _synchronize(device)
+    torch.cuda.reset_peak_memory_stats(device)
+    stats_before = torch.cuda.memory_stats(device)
+
+    output = fn()
+    _synchronize(device)
+    del output
+
+    stats_after = torch.cuda.memory_stats(device)
+    return {
+        "peak_allocated": stats_after["allocated_bytes.all.peak"] - stats_before["allocated_bytes.all.current"],
+        "total_allocated": (
+            stats_after["allocated_bytes.all.allocated"] - stats_before["allocated_bytes.all.allocated"]
+        ),
+        "num_allocations": stats_after["allocation.all.allocated"] - stats_before["allocation.all.allocated"],
+    }
+
+
+def measure_memory(
+    fn: Callable[[], Any],
+    runs: int = 10,
+    warmup: int = 1,
+    device: Union[torch.device, str] = "cpu",
+) -> Dict[str, Optional[float]]:
+    """Measure the memory allocated by a function.
+
+    The allocations of tensors are recorded by the PyTorch profiler on CPU and by the statistics of the caching
+    allocator on CUDA devices. The allocations of Python objects are traced with :mod:`tracemalloc` and the peak
+    resident set size of the process is reset before each run on Linux. The output of the function is freed at the
+    end of each run, so the tensors it returns count in the peaks but not in the memory that remains allocated.
+
+    Args:
+        fn: The function to measure, called without arguments.
+        runs: The number of measured runs. The allocations can vary between runs for random transforms applied with
+            a probability.
+        warmup: The number of runs before the measured ones.
+        device: The device on which the function runs.
+
+    Returns:
+        In MiB, the maximum over the runs of the peak of tensor memory allocated during a run ``"peak_allocated"``,
+        of the peak of Python memory ``"python_peak"``, of the peak resident set size of the process ``"peak_rss"``
+        and of its increase during a run ``"peak_rss_increase"``, and the mean memory of the tensors allocated by a
+        run ``"total_allocated"``. Also the mean number of tensor allocations ``"num_allocations"``. The resident set
+        sizes are ``None`` if they cannot be measured.
+    """
+    if runs < 1:
+        raise ValueError(f"runs should be a positive integer. Got {runs}.")
+    elif warmup < 0:
+        raise ValueError(f"warmup should be a non-negative integer. Got {warmup}.")
+
+    device = torch.device(device)
+    for _ in range(warmup):
+        fn()
+
+    measures: Dict[str, List[Optional[float]]] = {
+        key: []
+        for key in (
+            "peak_allocated",
+            "total_allocated",
+            "num_allocations",
+            "python_peak",
+            "peak_rss",
+            "peak_rss_increase",
+        )
+    }
+    for _ in range(runs):
+        gc.collect()
+        rss = _reset_peak_rss()
+        tracemalloc.start()
+        try:
+            allocations = _measure_cuda(fn, device) if device.type == "cuda" else _measure_cpu(fn)
+            python_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        peak_rss = _read_status("VmHWM") if rss is not None else None
+
+        for key, value in allocations.items():
+            measures[key].append(value)
+        measures["python_peak"].append(python_peak)
+        measures["peak_rss"].append(peak_rss)
+        measures["peak_rss_increase"].append(peak_rss - rss if peak_rss is not None and rss is not None else None)
+
+    stats: Dict[str, Optional[float]] = {}
+    for key, values in measures.items():
+        if any(value is None for value in values):
+            stats[key] = None
+        elif key in ("total_allocated", "num_allocations"):
+            stats[key] = sum(values) / len(values)  # type: ignore[arg-type]
+        else:
+            stats[key] = max(values)  # type: ignore[type-var]
+        if stats[key] is not None and key != "num_allocations":
+            stats[key] /= _MIB  # type: ignore[operator]
+    return stats
@@ -0,0 +1,235 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import datetime
+import inspect
+import itertools
+import platform
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import torch
+import torchvision
+
+import torchaug
+from torchaug.transforms import RandomApplyTransform
+
+from ._cases import BenchmarkCase, get_cases, make_input
+from ._memory import measure_memory
+from ._timing import summarize_timings, time_function
+
+
+IMPLEMENTATIONS = ("torchaug", "torchvision_per_sample", "torchvision_batch")
+MODES = ("time", "memory")
+
+
+def _override_attributes(transform: Callable, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # Override the parameters of the transforms that accept them like SequentialTransform and return the overridden
+    # parameters.
+    overridden: Dict[str, Any] = {}
+    if not isinstance(transform, torch.nn.Module):
+        return overridden
+    for module in transform.modules():
+        if isinstance(module, RandomApplyTransform):
+            parameters = inspect.signature(module.__init__).parameters  # type: ignore[misc]
+            for key, value in attributes.items():
+                if value is not None and key in parameters:
+                    setattr(module, key, value)
+                    overridden[key] = value
+    return overridden
+
+
+def _make_implementations(
+    case: BenchmarkCase,
+    inpt: torch.Tensor,
+    num_chunks: Sequence[int],
+    batch_inplace: Sequence[Optional[bool]],
+    p: Sequence[Optional[float]],
+    baselines: Sequence[str],
+) -> List[Tuple[Dict[str, Any], Callable[[], Any]]]:
+    resolution: Tuple[int, int] = tuple(inpt.shape[-2:])  # type: ignore[assignment]
+    implementations: List[Tuple[Dict[str, Any], Callable[[], Any]]] = []
+
+    seen_configs = []
+    for chunks, inplace, proba in itertools.product(
+        num_chunks if case.supports_num_chunks else [None], batch_inplace, p
+    ):
+        kwargs = {} if chunks is None else {"num_chunks": chunks}
+        transform = case.make_transform(resolution, inpt.dtype, **kwargs)
+        overridden = _override_attributes(transform, {"batch_inplace": inplace, "p": proba})
+        config = {
+            "implementation": "torchaug",
+            "num_chunks": chunks,
+            "batch_inplace": overridden.get("batch_inplace"),
+            "p": overridden.get("p"),
+        }
+        # The parameters that the transform does not accept give the same configuration.
+        if config in seen_configs:
+            continue
+        seen_configs.append(config)
+        if isinstance(transform, torch.nn.Module):
+            transform = transform.to(device=inpt.device)
+        implementations.append((config, lambda transform=transform: transform(inpt)))
+
+    if case.make_baseline is not None:
+        baseline = case.make_baseline(resolution, inpt.dtype)
+        # Torchvision passes through the tensor subclasses that it does not know.
+        pure_inpt = inpt.as_subclass(torch.Tensor)
+        config = {"num_chunks": None, "batch_inplace": None, "p": None}
+        if "torchvision_per_sample" in baselines:
+            implementations.append(
+                (
+                    {"implementation": "torchvision_per_sample", **config},
+                    lambda: torch.stack([baseline(sample) for sample in pure_inpt]),
+                )
+            )
+        if "torchvision_batch" in baselines:
+            implementations.append(({"implementation": "torchvision_batch", **config}, lambda: baseline(pure_inpt)))
+
+    return implementations
+
+
+def get_metadata(device: Union[torch.device, str] = "cpu") -> Dict[str, Any]:
+    """Get the metadata of the environment of a benchmark.
+
+    Args:
+        device: The device of the benchmark.
+
+    Returns:
+        The versions of Python, PyTorch, Torchvision and Torchaug, the platform, the device and the date.
+    """
+    device = torch.device(device)
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "torch": torch.__version__,
+        "torchvision": torchvision.__version__,
+        "torchaug": torchaug.__version__,
+        "device": str(device),
+        "device_name": torch.cuda.get_device_name(device) if device.type == "cuda" else None,
+        "default_num_threads": torch.get_num_threads(),
+    }
+
+
+def run_benchmarks(
+    cases: Optional[Sequence[Union[str, BenchmarkCase]]] = None,
+    batch_sizes: Sequence[int] = (64,),
+    resolutions: Sequence[Tuple[int, int]] = ((224, 224),),
+    dtypes: Sequence[torch.dtype] = (torch.uint8,),
+    num_chunks: Sequence[int] = (1,),
+    batch_inplace: Sequence[Optional[bool]] = (None,),
+    p: Sequence[Optional[float]] = (None,),
+    num_threads: Optional[Sequence[int]] = None,
+    num_frames: Optional[int] = None,
+    baselines: Sequence[str] = ("torchvision_per_sample", "torchvision_batch"),
+    mode: str = "time",
+    device: Union[torch.device, str] = "cpu",
+    runs: int = 100,
+    warmup: int = 10,
+    seed: int = 0,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Benchmark Torchaug batch transforms and their Torchvision baselines.
+
+    Each configuration of the grid of cases, batch sizes, resolutions, dtypes, number of chunks, in-place application,
+    probability of application and number of threads is either timed with :func:`~torchaug.benchmarks.time_function`
+    or measured with :func:`~torchaug.benchmarks.measure_memory` depending on the ``mode``. The baselines apply the
+    Torchvision transform on each sample and stack the outputs, which samples random parameters per sample like
+    Torchaug, or on the whole batch, which samples one set of parameters for the batch. They do not depend on the
+    number of chunks, in-place application and probability of application.
+
+    ``batch_inplace`` and ``p`` override the parameters of the transforms, and of the transforms of a
+    :class:`~torchaug.transforms.SequentialTransform`, that accept them, like the ``transforms_attributes_override``
+    of :class:`~torchaug.transforms.SequentialTransform`. ``None`` keeps the parameters of the case and is reported
+    for the transforms that do not accept them.
+
+    Args:
+        cases: The cases or the names of the registered cases to benchmark. If ``None``, all the registered cases are
+            benchmarked.
+        batch_sizes: The batch sizes.
+        resolutions: The resolutions ``(H, W)`` of the images.
+        dtypes: The dtypes of the images.
+        num_chunks: The number of chunks of the transforms that support it.
+        batch_inplace: Whether to apply the transforms in-place.
+        p: The probabilities to apply the transforms.
+        num_threads: The numbers of threads used by PyTorch. If ``None``, the current number of threads is used.
+        num_frames: If not ``None``, the inputs are :class:`~torchaug.ta_tensors.BatchVideos` of this number of
+            frames instead of batches of images.
+        baselines: The baselines to benchmark among ``"torchvision_per_sample"`` and ``"torchvision_batch"``.
+        mode: ``"time"`` to measure the latency or ``"memory"`` to measure the allocated memory.
+        device: The device of the images and transforms.
+        runs: The number of measured runs of each configuration.
+        warmup: The number of runs before the measured ones.
+        seed: The seed of the random generator set before each configuration.
+        verbose: Whether to print the progress.
+
+    Returns:
+        A dictionary that can be serialized to JSON with the ``"metadata"`` of the environment and the ``"results"``.
+        Each result describes its configuration and, in the ``"time"`` mode, the statistics of its latencies in
+        milliseconds returned by :func:`~torchaug.benchmarks.summarize_timings` along with the throughput in images or
+        videos per second based on the median latency or, in the ``"memory"`` mode, the statistics in MiB returned by
+        :func:`~torchaug.benchmarks.measure_memory`.
+    """
+    for baseline in baselines:
+        if baseline not in IMPLEMENTATIONS[1:]:
+            raise ValueError(f"Unknown baseline {baseline}. Available baselines are {list(IMPLEMENTATIONS[1:])}.")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode}. Available modes are {list(MODES)}.")
+    for proba in p:
+        if proba is not None and not 0.0 <= proba <= 1.0:
+            raise ValueError(f"p should be in the interval [0.0, 1.0]. Got {proba}.")
+
+    if cases is None:
+        cases = get_cases()
+    cases = [case if isinstance(case, BenchmarkCase) else get_cases([case])[0] for case in cases]
+    device = torch.device(device)
+
+    original_num_threads = torch.get_num_threads()
+    results: List[Dict[str, Any]] = []
+    try:
+        for threads in [original_num_threads] if num_threads is None else num_threads:
+            torch.set_num_threads(threads)
+            for case, batch_size, resolution, dtype in itertools.product(cases, batch_sizes, resolutions, dtypes):
+                torch.manual_seed(seed)
+                inpt = make_input(batch_size, tuple(resolution), dtype, device, num_frames=num_frames)  # type: ignore[arg-type]
+                for implementation_config, fn in _make_implementations(
+                    case, inpt, num_chunks, batch_inplace, p, baselines
+                ):
+                    config = {
+                        "transform": case.name,
+                        "implementation": implementation_config["implementation"],
+                        "batch_size": batch_size,
+                        "resolution": list(resolution),
+                        "num_frames": num_frames,
+                        "dtype": str(dtype).replace("torch.", ""),
+                        "num_chunks": implementation_config["num_chunks"],
+                        "batch_inplace": implementation_config["batch_inplace"],
+                        "p": implementation_config["p"],
+                        "num_threads": threads,
+                        "device": str(device),
+                        "mode": mode,
+                        "runs": runs,
+                        "warmup": warmup,
+                    }
+                    if verbose:
+                        print(", ".join(f"{key}={value}" for key, value in list(config.items())[:10]))
+
+                    torch.manual_seed(seed)
+                    if mode == "time":
+                        stats = summarize_timings(time_function(fn, runs=runs, warmup=warmup, device=device))
+                        results.append(
+                            {**config, "unit": "ms", **stats, "throughput": batch_size / stats["median"] * 1000}
+                        )
+                    else:
+                        stats = measure_memory(fn, runs=runs, warmup=warmup, device=device)
+                        results.append({**config, "unit": "MiB", **stats})
+    finally:
+        torch.set_num_threads(original_num_threads)
+
+    return {"metadata": get_metadata(device), "results": results}
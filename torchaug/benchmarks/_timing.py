@@ -0,0 +1,87 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Sequence, Union
+
+import torch
+
+
+_PERCENTILES = (5, 25, 75, 95)
+
+
+def _synchronize(device: torch.device) -> None:
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def time_function(
+    fn: Callable[[], Any],
+    runs: int = 100,
+    warmup: int = 10,
+    device: Union[torch.device, str] = "cpu",
+) -> torch.Tensor:
+    """Measure the wall-clock latency of a function.
+
+    The function is called ``warmup`` times before the measured runs to exclude the allocations, caches and lazy
+    initializations of the first calls. The device is synchronized before and after each run so that the asynchronous
+    CUDA kernels are included in the latency.
+
+    Args:
+        fn: The function to time, called without arguments.
+        runs: The number of measured runs.
+        warmup: The number of runs before the measured ones.
+        device: The device on which the function runs.
+
+    Returns:
+        The latencies of the runs in milliseconds.
+    """
+    if runs < 1:
+        raise ValueError(f"runs should be a positive integer. Got {runs}.")
+    elif warmup < 0:
+        raise ValueError(f"warmup should be a non-negative integer. Got {warmup}.")
+
+    device = torch.device(device)
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(runs):
+        _synchronize(device)
+        start = time.perf_counter()
+        fn()
+        _synchronize(device)
+        timings.append(time.perf_counter() - start)
+
+    return torch.tensor(timings, dtype=torch.float64) * 1000
+
+
+def summarize_timings(timings: Union[torch.Tensor, Sequence[float]]) -> Dict[str, float]:
+    """Compute the statistics of latencies.
+
+    Args:
+        timings: The latencies of the runs.
+
+    Returns:
+        The median, mean, standard deviation, minimum, maximum and the 5th, 25th, 75th and 95th percentiles of the
+        latencies, in the unit of the input.
+    """
+    timings = torch.as_tensor(timings, dtype=torch.float64)
+    if timings.numel() == 0:
+        raise ValueError("timings should not be empty.")
+
+    percentiles = torch.quantile(timings, torch.tensor(_PERCENTILES, dtype=torch.float64) / 100).tolist()
+    stats = {
+        "median": torch.quantile(timings, 0.5).item(),
+        "mean": timings.mean().item(),
+        "std": timings.std().item() if timings.numel() > 1 else 0.0,
+        "min": timings.min().item(),
+        "max": timings.max().item(),
+    }
+    stats.update({f"p{percentile}": value for percentile, value in zip(_PERCENTILES, percentiles)})
+    return stats
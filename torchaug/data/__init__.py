@@ -4,7 +4,17 @@
 # License: CECILL-C
 # ==================================
 
-# ruff: noqa: D104
 # ruff: noqa: F401
+# ruff: noqa: D104
+
+from typing import TYPE_CHECKING
+
+from torchaug._lazy import _lazy_importer
+
+
+# The subpackages are imported on first access, see `torchaug/__init__.py`.
+__getattr__, __dir__, __all__ = _lazy_importer(__name__, {}, submodules=["dataloader", "dataset", "sampler"])
 
-from . import dataloader, dataset
+# The eager imports of the lazy attributes for the type checkers and the IDEs.
+if TYPE_CHECKING:
+    from . import dataloader, dataset, sampler
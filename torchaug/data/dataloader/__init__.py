@@ -7,4 +7,7 @@
 # ruff: noqa: D104
 # ruff: noqa: F401
 
+from ._buffer_pool import BatchBufferPool
 from ._collate import default_collate, default_collate_fn_map, default_nested_collate
+from ._prefetcher import TransformPrefetcher
+from ._transform_collate import TransformCollate
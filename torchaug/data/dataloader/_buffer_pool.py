@@ -0,0 +1,209 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import queue
+import secrets
+from typing import Optional, Sequence
+
+import torch
+from torch.utils.data import get_worker_info
+
+
+_TOKEN_DTYPE = torch.int64
+_TOKEN_NBYTES = 8
+
+
+class BatchBufferPool:
+    """Pool of preallocated buffers recycled to collate batches of images or videos.
+
+    The pool allocates ``num_buffers`` buffers of ``batch_size`` samples of shape ``sample_shape`` once, in shared
+    memory to be filled by the workers of a :class:`~torch.utils.data.DataLoader` or in pinned memory to be filled
+    by the main process. :func:`~torchaug.data.dataloader.default_collate` stacks the samples of the matching shape
+    and dtype in a free buffer instead of allocating a new tensor for each batch, and the batch is sent to the main
+    process without copy as it is already in shared memory.
+
+    The consumer owns the buffer of a batch until it calls :meth:`release`, typically once the batch has been
+    copied to the device. The collation waits for a buffer to be released if none is free, so the pool should have
+    more buffers than the number of batches in flight: ``num_workers * prefetch_factor`` plus the batches held by
+    the consumer. The batch must be released as received from the :class:`~torch.utils.data.DataLoader`, which
+    excludes ``pin_memory=True`` and transforms that are not applied in place.
+
+    The buffers of the batches that were never released, e.g. the batches prefetched by the workers when the loop
+    over the :class:`~torch.utils.data.DataLoader` is left early, are given back to the pool by :meth:`release_all`.
+    It is called when the workers of a new iterator of the :class:`~torch.utils.data.DataLoader` collate their first
+    batch, so that a new epoch does not wait for them, and must be called before a new epoch when the batches are
+    collated in the main process. The batches of the previous epochs must not be used afterwards. With
+    ``persistent_workers=True``, the workers are not restarted and the batches must all be released.
+
+    Example:
+        >>> pool = BatchBufferPool(num_buffers=12, batch_size=64, sample_shape=(3, 224, 224))
+        >>> loader = DataLoader(
+        ...     dataset, batch_size=64, num_workers=4, collate_fn=functools.partial(default_collate, buffer_pool=pool)
+        ... )
+        >>> for images, labels in loader:
+        ...     images_gpu = images.to("cuda", non_blocking=False)
+        ...     pool.release(images)
+
+    Args:
+        num_buffers: Number of buffers.
+        batch_size: Maximum number of samples in a batch.
+        sample_shape: Shape of a sample.
+        dtype: Dtype of the samples.
+        pin_memory: Whether to allocate the buffers in pinned memory instead of shared memory. Pinned memory cannot
+            be shared between processes so the batches must be collated in the main process, with ``num_workers=0``.
+        memory_format: Memory format of the buffers.
+        timeout: Maximum number of seconds to wait for a free buffer. If ``None``, waits indefinitely, which hangs the
+            collation if the batches are not released.
+        multiprocessing_context: The multiprocessing context used by the :class:`~torch.utils.data.DataLoader` to
+            start the workers. If ``None``, uses the default context.
+    """
+
+    def __init__(
+        self,
+        num_buffers: int,
+        batch_size: int,
+        sample_shape: Sequence[int],
+        dtype: torch.dtype = torch.uint8,
+        pin_memory: bool = False,
+        memory_format: torch.memory_format = torch.contiguous_format,
+        timeout: Optional[float] = 60.0,
+        multiprocessing_context=None,
+    ) -> None:
+        if num_buffers < 1:
+            raise ValueError(f"num_buffers should be a positive integer, got {num_buffers}.")
+        elif batch_size < 1:
+            raise ValueError(f"batch_size should be a positive integer, got {batch_size}.")
+
+        self.num_buffers = num_buffers
+        self.batch_size = batch_size
+        self.sample_shape = tuple(sample_shape)
+        self.dtype = dtype
+        self.timeout = timeout
+
+        # The token of the pool is stored after the buffers, in the same storage, to recognize the batches of the
+        # pool in any process, where the storage of a batch received from a worker is mapped at another address.
+        num_samples = num_buffers * batch_size
+        data_nbytes = num_samples * math.prod(self.sample_shape) * torch.empty((), dtype=dtype).element_size()
+        self._token_offset = -(-data_nbytes // _TOKEN_NBYTES)
+        storage = torch.empty(
+            (self._token_offset + 1) * _TOKEN_NBYTES, dtype=torch.uint8, pin_memory=pin_memory
+        ).untyped_storage()
+        strides = torch.empty((num_samples, *self.sample_shape), memory_format=memory_format, device="meta").stride()
+        buffers = torch.empty(0, dtype=dtype).set_(storage, 0, (num_samples, *self.sample_shape), strides)
+        self._buffers = buffers if pin_memory else buffers.share_memory_()
+        self._buffer_numel = batch_size * math.prod(self.sample_shape)
+        self._token = secrets.randbits(62)
+        self._get_token_tensor(self._buffers.untyped_storage()).fill_(self._token)
+
+        context = multiprocessing_context or multiprocessing.get_context()
+        if isinstance(context, str):
+            context = multiprocessing.get_context(context)
+        self._free = context.Queue()
+        for idx in range(num_buffers):
+            self._free.put(idx)
+        # Whether each buffer is acquired and not yet released, shared with the workers that acquire them.
+        self._acquired = torch.zeros(num_buffers, dtype=torch.bool).share_memory_()
+        # Base seed of the workers of the last iterator of the DataLoader that acquired a buffer.
+        self._base_seed = torch.full((), -1, dtype=torch.int64).share_memory_()
+        self._lock = context.Lock()
+
+    def _get_token_tensor(self, storage: torch.UntypedStorage) -> torch.Tensor:
+        return torch.empty(0, dtype=_TOKEN_DTYPE).set_(storage, self._token_offset, (1,))
+
+    def accepts(self, sample: torch.Tensor, num_samples: int) -> bool:
+        """Whether a batch of samples can be collated in a buffer of the pool.
+
+        Args:
+            sample: A sample of the batch.
+            num_samples: Number of samples in the batch.
+
+        Returns:
+            ``True`` if the shape and dtype of the sample match the pool and the batch is not too large.
+        """
+        return (
+            tuple(sample.shape) == self.sample_shape
+            and sample.dtype == self.dtype
+            and sample.device == self._buffers.device
+            and num_samples <= self.batch_size
+        )
+
+    def acquire(self, num_samples: int) -> torch.Tensor:
+        """Take a free buffer from the pool, waiting for one to be released if needed.
+
+        Args:
+            num_samples: Number of samples in the batch.
+
+        Returns:
+            The buffer of shape ``[num_samples, *sample_shape]``.
+        """
+        worker_info = get_worker_info()
+        if worker_info is not None:
+            # The workers of each iterator of the DataLoader share a new base seed.
+            base_seed = worker_info.seed - worker_info.id
+            with self._lock:
+                if int(self._base_seed) != base_seed:
+                    self._base_seed.fill_(base_seed)
+                    self._release_all()
+        try:
+            idx = self._free.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(
+                f"No buffer was released after {self.timeout} seconds. Release the batches with "
+                "`BatchBufferPool.release` once they are consumed or increase `num_buffers`."
+            ) from None
+        with self._lock:
+            self._acquired[idx] = True
+        start = idx * self.batch_size
+        return self._buffers[start : start + num_samples]
+
+    def release(self, tensor: torch.Tensor) -> None:
+        """Give the buffer of a batch back to the pool.
+
+        The batch must not be used after its release as its buffer is overwritten by the next batches. A batch that
+        was not collated in a buffer of this pool, or whose buffer was already released, raises a ``ValueError``.
+
+        Args:
+            tensor: The batch collated in a buffer of the pool.
+        """
+        tensor = tensor.as_subclass(torch.Tensor)
+        storage = tensor.untyped_storage()
+        if (
+            storage.nbytes() != self._buffers.untyped_storage().nbytes()
+            or tensor.dtype != self.dtype
+            or tensor.storage_offset() % self._buffer_numel != 0
+            or self._get_token_tensor(storage).item() != self._token
+        ):
+            raise ValueError("The tensor was not collated in a buffer of this pool.")
+        idx = tensor.storage_offset() // self._buffer_numel
+        with self._lock:
+            if not self._acquired[idx]:
+                raise ValueError("The buffer of the tensor was already released.")
+            self._acquired[idx] = False
+        self._free.put(idx)
+
+    def release_all(self) -> None:
+        """Give the buffers of all the batches that were not released back to the pool.
+
+        No batch of the pool must be collated or used during and after the call.
+        """
+        with self._lock:
+            self._release_all()
+
+    def _release_all(self) -> None:
+        # The free buffers are already in the queue, only the acquired ones are put back to not duplicate them.
+        for idx in self._acquired.nonzero().flatten().tolist():
+            self._acquired[idx] = False
+            self._free.put(idx)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(num_buffers={self.num_buffers}, batch_size={self.batch_size}, "
+            f"sample_shape={self.sample_shape}, dtype={self.dtype})"
+        )
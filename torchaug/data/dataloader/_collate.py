@@ -11,9 +11,11 @@
 from __future__ import annotations
 
 import contextlib
+import functools
 from typing import Callable, Dict, Optional, Tuple, Type, Union
 
 import torch
+from torch.utils.data import get_worker_info
 from torch.utils.data._utils.collate import (
     collate,
     collate_float_fn,
@@ -30,6 +32,7 @@ from torchaug.ta_tensors import (
     BatchImages,
     BatchLabels,
     BatchMasks,
+    BatchPackedMasks,
     BatchVideos,
     BoundingBoxes,
     BoundingBoxesNestedTensors,
@@ -40,36 +43,81 @@ from torchaug.ta_tensors import (
     Mask,
     MaskNestedTensors,
     NestedTensors,
+    PackedMasks,
+    PaddedBatchImages,
     Video,
     VideoNestedTensors,
     convert_bboxes_to_batch_bboxes,
     convert_labels_to_batch_labels,
     convert_masks_to_batch_masks,
+    convert_packed_masks_to_batch_packed_masks,
 )
+from torchaug.transforms._profiling import _trace
+
+from ._buffer_pool import BatchBufferPool
+
+
+def _new_batch_out(
+    batch,
+    memory_format: torch.memory_format = torch.contiguous_format,
+    buffer_pool: Optional[BatchBufferPool] = None,
+) -> torch.Tensor:
+    elem = batch[0].as_subclass(torch.Tensor)
+    if buffer_pool is not None and buffer_pool.accepts(elem, len(batch)):
+        return buffer_pool.acquire(len(batch))
+    shape = (len(batch), *elem.shape)
+    if get_worker_info() is None:
+        return torch.empty(shape, dtype=elem.dtype, device=elem.device, memory_format=memory_format)
+    # In a worker, stack directly in shared memory to avoid a copy when the batch is sent to the main process.
+    storage = elem._typed_storage()._new_shared(sum(x.numel() for x in batch), device=elem.device)
+    return elem.new(storage).resize_(shape, memory_format=memory_format)
+
+
+def _new_packed_out(batch) -> Optional[torch.Tensor]:
+    if get_worker_info() is None:
+        return None
+    # In a worker, pack directly in shared memory to avoid a copy when the batch is sent to the main process.
+    elem = batch[0].as_subclass(torch.Tensor)
+    storage = elem._typed_storage()._new_shared(sum(x.numel() for x in batch), device=elem.device)
+    return elem.new(storage)
 
 
 def collate_ta_tensor_fn(
     batch,
     *,
     collate_fn_map: Optional[Dict[Union[Type, Tuple[Type, ...]], Callable]] = None,
+    memory_format: torch.memory_format = torch.contiguous_format,
+    buffer_pool: Optional[BatchBufferPool] = None,
 ):
     elem = batch[0]
     if isinstance(elem, Image):
-        return BatchImages(torch.stack(batch, 0))
+        # Stack directly in a channels_last buffer to avoid a conversion after collation.
+        out = _new_batch_out(batch, memory_format if elem.ndim == 3 else torch.contiguous_format, buffer_pool)
+        return BatchImages(torch.stack([image.as_subclass(torch.Tensor) for image in batch], 0, out=out))
     elif isinstance(elem, Video):
-        return BatchVideos(torch.stack(batch, 0))
+        out = _new_batch_out(batch, buffer_pool=buffer_pool)
+        return BatchVideos(torch.stack([video.as_subclass(torch.Tensor) for video in batch], 0, out=out))
     elif isinstance(elem, BoundingBoxes):
         return convert_bboxes_to_batch_bboxes(batch)
     elif isinstance(elem, Mask):
         return convert_masks_to_batch_masks(batch)
+    elif isinstance(elem, PackedMasks):
+        return convert_packed_masks_to_batch_packed_masks(batch)
     elif isinstance(elem, BatchImages):
-        return BatchImages.cat(batch)
+        output = BatchImages.cat(batch)
+        if memory_format == torch.channels_last and output.ndim == 4:
+            output = BatchImages(output.as_subclass(torch.Tensor).contiguous(memory_format=memory_format))
+        return output
+    elif isinstance(elem, PaddedBatchImages):
+        return PaddedBatchImages.cat(batch)
     elif isinstance(elem, BatchVideos):
         return BatchVideos.cat(batch)
     elif isinstance(elem, BatchBoundingBoxes):
         return BatchBoundingBoxes.cat(batch)
     elif isinstance(elem, BatchMasks):
         return BatchMasks.cat(batch)
+    elif isinstance(elem, BatchPackedMasks):
+        return BatchPackedMasks.cat(batch)
     elif isinstance(elem, BatchLabels):
         return BatchLabels.cat(batch)
     elif isinstance(elem, Labels):
@@ -82,22 +130,24 @@ def collate_ta_nested_tensor_fn(
     batch,
     *,
     collate_fn_map: Optional[Dict[Union[Type, Tuple[Type, ...]], Callable]] = None,
+    packed: bool = False,
 ):
     elem = batch[0]
     if isinstance(elem, Image):
-        return ImageNestedTensors(batch)
+        output = ImageNestedTensors(batch)
     elif isinstance(elem, Video):
-        return VideoNestedTensors(batch)
+        output = VideoNestedTensors(batch)
     elif isinstance(elem, BoundingBoxes):
-        return BoundingBoxesNestedTensors(batch)
+        output = BoundingBoxesNestedTensors(batch)
     elif isinstance(elem, Mask):
-        return MaskNestedTensors(batch)
+        output = MaskNestedTensors(batch)
     elif isinstance(elem, Labels):
-        return LabelsNestedTensors(batch)
+        output = LabelsNestedTensors(batch)
     elif isinstance(elem, torch.Tensor):
-        return NestedTensors(batch)
+        output = NestedTensors(batch)
     else:
         raise TypeError(default_collate_err_msg_format.format(type(batch)))
+    return output.pack(out=_new_packed_out(batch)) if packed else output
 
 
 default_collate_fn_map: Dict[Union[Type, Tuple[Type, ...]], Callable] = {torch.Tensor: collate_tensor_fn}
@@ -131,8 +181,11 @@ for ta_type in [
     Mask,
     BatchBoundingBoxes,
     BatchImages,
+    PaddedBatchImages,
     BatchVideos,
     BatchMasks,
+    PackedMasks,
+    BatchPackedMasks,
     BatchLabels,
     Labels,
 ]:
@@ -149,7 +202,7 @@ for ta_type in [
     default_nested_collate_fn_map[ta_type] = collate_ta_nested_tensor_fn
 
 
-def default_collate(batch):
+def default_collate(batch, *, channels_last: bool = False, buffer_pool: Optional[BatchBufferPool] = None):
     r"""Take in a batch of data and put the elements within the batch into a
     tensor or ta_tensor with an additional outer dimension - batch size if relevant.
 
@@ -168,14 +221,19 @@ def default_collate(batch):
         * :class:`~torchaug.ta_tensors.BoundingBoxes` ->
           :class:`~torchaug.ta_tensors._batch_bounding_boxes.BatchBoundingBoxes`
         * :class:`~torchaug.ta_tensors.Mask` -> :class:`~torchaug.ta_tensors.BatchMasks`
+        * :class:`~torchaug.ta_tensors.PackedMasks` -> :class:`~torchaug.ta_tensors.BatchPackedMasks`
         * :class:`~torchaug.ta_tensors.BatchImages` ->
           :class:`~torchaug.ta_tensors.BatchImages`
+        * :class:`~torchaug.ta_tensors.PaddedBatchImages` ->
+          :class:`~torchaug.ta_tensors.PaddedBatchImages`
         * :class:`~torchaug.ta_tensors.BatchVideos` ->
           :class:`~torchaug.ta_tensors.BatchVideos`
         * :class:`~torchaug.ta_tensors._batch_bounding_boxes.BatchBoundingBoxes` ->
           :class:`~torchaug.ta_tensors._batch_bounding_boxes.BatchBoundingBoxes`
         * :class:`~torchaug.ta_tensors.BatchMasks` ->
           :class:`~torchaug.ta_tensors.BatchMasks`
+        * :class:`~torchaug.ta_tensors.BatchPackedMasks` ->
+          :class:`~torchaug.ta_tensors.BatchPackedMasks`
         * NumPy Arrays -> :class:`torch.Tensor`
         * `float` -> :class:`torch.Tensor`
         * `int` -> :class:`torch.Tensor`
@@ -189,12 +247,33 @@ def default_collate(batch):
 
     Args:
         batch: a single batch to be collated
+        channels_last: whether to collate the :class:`~torchaug.ta_tensors.Image` and
+            :class:`~torchaug.ta_tensors.BatchImages` in a :class:`~torchaug.ta_tensors.BatchImages` with
+            the ``torch.channels_last`` memory format. Use :func:`functools.partial` to pass it to a
+            :class:`~torch.utils.data.DataLoader`.
+        buffer_pool: a pool of buffers in which the :class:`~torchaug.ta_tensors.Image` and
+            :class:`~torchaug.ta_tensors.Video` of the shape and dtype of the pool are stacked instead of new
+            tensors. See :class:`~torchaug.data.dataloader.BatchBufferPool`.
 
     """
-    return collate(batch, collate_fn_map=default_collate_fn_map)
+    collate_fn_map = default_collate_fn_map
+    if channels_last or buffer_pool is not None:
+        ta_tensor_collate_fn = functools.partial(
+            collate_ta_tensor_fn,
+            memory_format=torch.channels_last if channels_last else torch.contiguous_format,
+            buffer_pool=buffer_pool,
+        )
+        collate_fn_map = {
+            **default_collate_fn_map,
+            Image: ta_tensor_collate_fn,
+            Video: ta_tensor_collate_fn,
+            BatchImages: ta_tensor_collate_fn,
+        }
+    with _trace("default_collate", "collate"):
+        return collate(batch, collate_fn_map=collate_fn_map)
 
 
-def default_nested_collate(batch):
+def default_nested_collate(batch, *, packed: bool = False):
     r"""Take in a batch of data and put the elements within the batch into a nested tensor
     with an additional outer dimension - batch size if relevant.
 
@@ -226,6 +305,21 @@ def default_nested_collate(batch):
 
     Args:
         batch: a single batch to be collated
+        packed: whether to write the tensors of each nested tensors in a single contiguous buffer, in shared memory
+            in a worker, see :meth:`~torchaug.ta_tensors.TANestedTensors.pack`. Use :func:`functools.partial` to
+            pass it to a :class:`~torch.utils.data.DataLoader`.
 
     """
-    return collate(batch, collate_fn_map=default_nested_collate_fn_map)
+    collate_fn_map = default_nested_collate_fn_map
+    if packed:
+        ta_nested_tensor_collate_fn = functools.partial(collate_ta_nested_tensor_fn, packed=True)
+        collate_fn_map = {
+            **default_nested_collate_fn_map,
+            **{
+                ta_type: ta_nested_tensor_collate_fn
+                for ta_type, collate_fn in default_nested_collate_fn_map.items()
+                if collate_fn is collate_ta_nested_tensor_fn
+            },
+        }
+    with _trace("default_nested_collate", "collate"):
+        return collate(batch, collate_fn_map=collate_fn_map)
@@ -0,0 +1,174 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import queue
+import threading
+import weakref
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from torchaug.transforms._profiling import _trace
+
+
+# Kinds of the items sent by the thread of the prefetcher.
+_BATCH = "batch"
+_ERROR = "error"
+_END = "end"
+
+# Period in seconds at which blocked puts and gets check whether the other side stopped.
+_POLL_INTERVAL = 0.1
+
+
+def _put(items: queue.Queue, stop: threading.Event, item: Tuple[str, Any]) -> bool:
+    # Wait for a free slot in the queue unless the iterator is closed.
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _prefetch_loop(loader_iter: Iterator, transforms: Callable, items: queue.Queue, stop: threading.Event) -> None:
+    # Does not reference the iterator, so that it is deleted and stops the thread when the loop is left early.
+    try:
+        for batch in loader_iter:
+            if stop.is_set():
+                return
+            with _trace(type(transforms).__name__, "transform"):
+                batch = transforms(batch)
+            if not _put(items, stop, (_BATCH, batch)):
+                return
+    except BaseException as e:
+        _put(items, stop, (_ERROR, e))
+        return
+    _put(items, stop, (_END, None))
+
+
+class _PrefetchIterator:
+    def __init__(self, loader: Iterable, transforms: Callable, num_prefetch: int) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=num_prefetch)
+        self._stop = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(
+            target=_prefetch_loop,
+            args=(iter(loader), transforms, self._queue, self._stop),
+            name="torchaug_prefetch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __iter__(self) -> _PrefetchIterator:
+        return self
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        while True:
+            try:
+                kind, value = self._queue.get(timeout=_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                # The thread always sends an item before returning, unless it was closed.
+                if not self._thread.is_alive() and self._queue.empty():
+                    self.close()
+                    raise RuntimeError("The prefetching thread stopped without sending a batch.")
+        if kind == _BATCH:
+            return value
+        self.close()
+        if kind == _ERROR:
+            raise value
+        raise StopIteration
+
+    def close(self) -> None:
+        self._done = True
+        self._stop.set()
+        # Free the queue so that the thread is not blocked on a put, then wait for the batch it is transforming.
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(timeout=_POLL_INTERVAL)
+        # Release the remaining batches. The iterator of the loader, which shuts down the workers of a DataLoader,
+        # is released with the thread.
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def __del__(self) -> None:
+        if getattr(self, "_thread", None) is not None:
+            self.close()
+
+
+class TransformPrefetcher:
+    """Iterate over a loader and transform its batches in a background thread.
+
+    While the training loop consumes a batch, a thread fetches the next batches from ``loader``, applies
+    ``transforms`` to them, typically a :class:`~torchaug.transforms.SequentialTransform` with
+    ``batch_transform=True``, and stores at most ``num_prefetch`` transformed batches in a queue. The augmentation of
+    the next batch thus overlaps the step on the current one, e.g. for transforms on the GPU or on the batches
+    collated in the main process, and the batches are yielded in the order of the loader.
+
+    An exception raised by the loader or the transforms is raised again by the iterator when the batch that failed
+    is reached. Each call to :meth:`__iter__` starts a new thread and stops the one of the previous iteration. The
+    thread is also stopped when the iteration ends, on :meth:`close`, when exiting the context manager and when the
+    iterator is deleted, once the batch it is transforming, if any, is done.
+
+    The transforms run concurrently with the main thread and draw their parameters from the global random number
+    generator of PyTorch, so the augmentations are not reproducible. Use
+    :class:`~torchaug.data.dataloader.TransformCollate` to transform the batches with a seeded generator in the
+    workers of the loader instead.
+
+    Example:
+        >>> transforms = SequentialTransform([...], batch_transform=True)
+        >>> with TransformPrefetcher(DataLoader(dataset, batch_size=64, num_workers=8), transforms) as prefetcher:
+        >>>     for images, labels in prefetcher:
+        >>>         ...
+
+    Args:
+        loader: The iterable of the batches, e.g. a :class:`~torch.utils.data.DataLoader`.
+        transforms: The transforms to apply to each batch.
+        num_prefetch: The maximum number of transformed batches waiting to be consumed.
+    """
+
+    def __init__(self, loader: Iterable, transforms: Callable, num_prefetch: int = 2) -> None:
+        if num_prefetch < 1:
+            raise ValueError(f"num_prefetch should be a positive integer. Got {num_prefetch}.")
+        self.loader = loader
+        self.transforms = transforms
+        self.num_prefetch = num_prefetch
+        # A weak reference so that the iterator is deleted, and its thread stopped, when the loop is left early.
+        self._iterator: Optional[weakref.ReferenceType[_PrefetchIterator]] = None
+
+    def __iter__(self) -> Iterator[Any]:
+        self.close()
+        iterator = _PrefetchIterator(self.loader, self.transforms, self.num_prefetch)
+        self._iterator = weakref.ref(iterator)
+        return iterator
+
+    def __len__(self) -> int:
+        return len(self.loader)  # type: ignore[arg-type]
+
+    def __enter__(self) -> TransformPrefetcher:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the thread of the current iteration."""
+        iterator = self._iterator() if self._iterator is not None else None
+        if iterator is not None:
+            iterator.close()
+        self._iterator = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(loader={self.loader}, transforms={self.transforms}, "
+            f"num_prefetch={self.num_prefetch})"
+        )
@@ -0,0 +1,77 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+from torch.utils.data import get_worker_info
+
+from torchaug.transforms._profiling import _trace
+
+from ._collate import default_collate
+
+
+class TransformCollate:
+    """Collate function that applies a batch transform to the collated batch.
+
+    The samples are collated by ``collate_fn`` and the output is transformed by ``transforms``, typically a
+    :class:`~torchaug.transforms.SequentialTransform` with ``batch_transform=True``. Used as the ``collate_fn`` of a
+    :class:`~torch.utils.data.DataLoader`, the batch transforms run inside each worker process instead of the main
+    process.
+
+    The transforms draw their parameters from a random number generator owned by the collate function so that
+    the augmentations do not depend on the random numbers consumed by the dataset. In a worker, it is seeded with
+    the seed given by the :class:`~torch.utils.data.DataLoader` to the worker, which differs for each worker and
+    each epoch and is reproducible by passing a ``generator`` to the :class:`~torch.utils.data.DataLoader`. In the
+    main process, it is seeded with :func:`torch.initial_seed`.
+
+    In a worker, :func:`~torchaug.data.dataloader.default_collate` stacks the images and videos directly in shared
+    memory, so transforms applied in place with ``batch_inplace=True`` are sent to the main process without copy.
+
+    Example:
+        >>> transforms = SequentialTransform([...], batch_inplace=True, batch_transform=True)
+        >>> loader = DataLoader(dataset, batch_size=64, num_workers=8, collate_fn=TransformCollate(transforms))
+
+    Args:
+        transforms: The transforms to apply to the collated batch.
+        collate_fn: The function to collate the samples.
+    """
+
+    def __init__(self, transforms: Callable, collate_fn: Callable[[List[Any]], Any] = default_collate) -> None:
+        self.transforms = transforms
+        self.collate_fn = collate_fn
+        self._generator: Optional[torch.Generator] = None
+        self._pid: Optional[int] = None
+
+    def _next_seed(self) -> int:
+        # The collate function is copied in each worker process, possibly after being used in the main process.
+        pid = os.getpid()
+        if self._generator is None or self._pid != pid:
+            worker_info = get_worker_info()
+            seed = worker_info.seed if worker_info is not None else torch.initial_seed()
+            self._generator = torch.Generator().manual_seed(seed)
+            self._pid = pid
+        return int(torch.randint(2**62, (), generator=self._generator))
+
+    def __call__(self, batch: List[Any]) -> Any:
+        with _trace(type(self).__name__, "collate"):
+            batch = self.collate_fn(batch)
+            with torch.random.fork_rng(devices=[]), _trace(type(self.transforms).__name__, "transform"):
+                # Only the CPU generator is forked, torch.manual_seed would also reseed the CUDA generators.
+                torch.default_generator.manual_seed(self._next_seed())
+                return self.transforms(batch)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_generator"] = None
+        state["_pid"] = None
+        return state
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(transforms={self.transforms}, collate_fn={self.collate_fn})"
@@ -0,0 +1,233 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+from torchaug import ta_tensors
+from torchaug.transforms import functional as F
+
+
+class CocoDetectionIndex:
+    """Columnar index of the annotations of a :class:`torchvision.datasets.CocoDetection` dataset.
+
+    The annotations of all images are packed in contiguous tensors with per-image offsets so that retrieving the
+    target of an image is a slice instead of a conversion of a list of dicts. The segmentations are stored as
+    compressed RLE strings that are only decoded when the masks are requested.
+
+    The index is saved in a file that is loaded memory-mapped so that the workers of a
+    :class:`~torch.utils.data.DataLoader` share the same memory pages instead of receiving a pickled copy.
+
+    Args:
+        tensors: The tensors of the index.
+    """
+
+    _KEYS = (
+        "image_ids",
+        "offsets",
+        "bbox",
+        "boxes",
+        "category_id",
+        "area",
+        "iscrowd",
+        "rle_offsets",
+        "rle_counts",
+        "rle_sizes",
+        "fingerprint",
+    )
+
+    def __init__(self, tensors: Dict[str, torch.Tensor]) -> None:
+        missing = set(self._KEYS) - set(tensors)
+        if missing:
+            raise ValueError(f"The COCO index is missing the keys {sorted(missing)}.")
+        self._tensors = tensors
+
+    @staticmethod
+    def _fingerprint(dataset) -> torch.Tensor:
+        # Hash of the content of the annotation file, the dataset does not keep its path to check its modification.
+        content = {
+            "ids": list(dataset.ids),
+            "images": dataset.coco.dataset.get("images", []),
+            "annotations": dataset.coco.dataset.get("annotations", []),
+        }
+        digest = hashlib.sha256(json.dumps(content, separators=(",", ":")).encode()).digest()
+        return torch.tensor(list(digest), dtype=torch.uint8)
+
+    @classmethod
+    def build(cls, dataset) -> CocoDetectionIndex:
+        """Build the index from the annotations of a dataset.
+
+        Args:
+            dataset: The :class:`torchvision.datasets.CocoDetection` dataset.
+
+        Returns:
+            The index.
+        """
+        from pycocotools import mask  # noqa: I001
+
+        offsets = [0]
+        bbox: List[List[float]] = []
+        category_id: List[int] = []
+        area: List[float] = []
+        iscrowd: List[int] = []
+        rle_offsets = [0]
+        rle_counts: List[bytes] = []
+        rle_sizes: List[List[int]] = []
+
+        for image_id in dataset.ids:
+            image_info = dataset.coco.imgs[image_id]
+            height, width = image_info["height"], image_info["width"]
+            annotations = dataset.coco.loadAnns(dataset.coco.getAnnIds(image_id))
+
+            for annotation in annotations:
+                bbox.append([float(v) for v in annotation["bbox"]])
+                category_id.append(annotation["category_id"])
+                area.append(annotation.get("area", 0.0))
+                iscrowd.append(annotation.get("iscrowd", 0))
+
+                segmentation = annotation.get("segmentation")
+                if isinstance(segmentation, dict):
+                    rle = mask.frPyObjects(segmentation, height, width)
+                elif segmentation:
+                    rle = mask.merge(mask.frPyObjects(segmentation, height, width))
+                else:
+                    rle = mask.encode(np.zeros((height, width), dtype=np.uint8, order="F"))
+                counts = rle["counts"] if isinstance(rle["counts"], bytes) else rle["counts"].encode()
+                rle_counts.append(counts)
+                rle_offsets.append(rle_offsets[-1] + len(counts))
+                rle_sizes.append([int(size) for size in rle["size"]])
+
+            offsets.append(offsets[-1] + len(annotations))
+
+        bbox_tensor = torch.tensor(bbox, dtype=torch.float64).reshape(-1, 4)
+        boxes = F.convert_bounding_box_format(
+            bbox_tensor.to(torch.float32),
+            old_format=ta_tensors.BoundingBoxFormat.XYWH,
+            new_format=ta_tensors.BoundingBoxFormat.XYXY,
+        )
+
+        return cls(
+            {
+                "image_ids": torch.tensor(list(dataset.ids), dtype=torch.int64),
+                "offsets": torch.tensor(offsets, dtype=torch.int64),
+                "bbox": bbox_tensor,
+                "boxes": boxes,
+                "category_id": torch.tensor(category_id, dtype=torch.int64),
+                "area": torch.tensor(area, dtype=torch.float64),
+                "iscrowd": torch.tensor(iscrowd, dtype=torch.int64),
+                "rle_offsets": torch.tensor(rle_offsets, dtype=torch.int64),
+                "rle_counts": torch.from_numpy(np.frombuffer(b"".join(rle_counts), dtype=np.uint8).copy()),
+                "rle_sizes": torch.tensor(rle_sizes, dtype=torch.int64).reshape(-1, 2),
+                "fingerprint": cls._fingerprint(dataset),
+            }
+        )
+
+    def save(self, path: str) -> None:
+        """Save the index to a file.
+
+        The file is written next to its destination and then moved to be never read partially written.
+
+        Args:
+            path: The path of the file.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(self._tensors, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> CocoDetectionIndex:
+        """Load the index from a file.
+
+        Args:
+            path: The path of the file.
+            mmap: Whether to memory-map the file instead of reading it.
+
+        Returns:
+            The index.
+        """
+        return cls(torch.load(path, mmap=mmap, weights_only=True))
+
+    @classmethod
+    def from_dataset(cls, dataset, path: str) -> CocoDetectionIndex:
+        """Load the index of a dataset from a file, building and saving it first if needed.
+
+        The index is rebuilt if the hash of the images and annotations of the dataset saved in the file differs,
+        e.g. when the annotation file was edited.
+
+        Args:
+            dataset: The :class:`torchvision.datasets.CocoDetection` dataset.
+            path: The path of the file.
+
+        Returns:
+            The memory-mapped index.
+        """
+        if os.path.exists(path):
+            tensors = torch.load(path, mmap=True, weights_only=True)
+            # Files saved without a fingerprint are rebuilt as well.
+            if "fingerprint" in tensors and torch.equal(tensors["fingerprint"], cls._fingerprint(dataset)):
+                return cls(tensors)
+        cls.build(dataset).save(path)
+        return cls.load(path)
+
+    def __len__(self) -> int:
+        return self._tensors["image_ids"].shape[0]
+
+    def num_annotations(self, idx: int) -> int:
+        """Get the number of annotations of an image.
+
+        Args:
+            idx: The index of the image in the dataset.
+
+        Returns:
+            The number of annotations.
+        """
+        offsets = self._tensors["offsets"]
+        return int(offsets[idx + 1] - offsets[idx])
+
+    def get(self, key: str, idx: int) -> torch.Tensor:
+        """Get the annotations of an image for a key.
+
+        Args:
+            key: The key of the annotations. Can be ``"bbox"``, ``"boxes"``, ``"category_id"``, ``"area"`` or
+                ``"iscrowd"``.
+            idx: The index of the image in the dataset.
+
+        Returns:
+            A copy of the annotations that does not share memory with the index.
+        """
+        offsets = self._tensors["offsets"]
+        return self._tensors[key][int(offsets[idx]) : int(offsets[idx + 1])].clone()
+
+    def decode_masks(self, idx: int) -> torch.Tensor:
+        """Decode the segmentation masks of an image.
+
+        Args:
+            idx: The index of the image in the dataset.
+
+        Returns:
+            The masks of shape ``[N, H, W]``.
+        """
+        from pycocotools import mask  # noqa: I001
+
+        offsets = self._tensors["offsets"]
+        start, end = int(offsets[idx]), int(offsets[idx + 1])
+        rle_offsets = self._tensors["rle_offsets"][start : end + 1].tolist()
+        rle_counts = self._tensors["rle_counts"]
+        rle_sizes = self._tensors["rle_sizes"][start:end].tolist()
+
+        rles = [
+            {"size": size, "counts": rle_counts[rle_offsets[i] : rle_offsets[i + 1]].numpy().tobytes()}
+            for i, size in enumerate(rle_sizes)
+        ]
+        masks = mask.decode(rles)
+        return torch.from_numpy(np.ascontiguousarray(masks.transpose(2, 0, 1)))
@@ -20,10 +20,14 @@ from torchvision import datasets
 from torchvision.transforms.v2.functional._type_conversion import pil_to_tensor
 
 from torchaug import ta_tensors
+from torchaug.data.dataloader import default_collate
 from torchaug.transforms import functional as F
+from torchaug.transforms._profiling import _trace
 
+from ._coco_index import CocoDetectionIndex
 
-def wrap_dataset_for_transforms_v2(dataset, target_keys=None):
+
+def wrap_dataset_for_transforms_v2(dataset, target_keys=None, index_file=None, batched=False):
     """Wrap a ``torchvision.dataset`` for usage with ``torchaug.transforms``.
 
     Example:
@@ -92,6 +96,24 @@ def wrap_dataset_for_transforms_v2(dataset, target_keys=None):
             fine grained access. Currently only supported for :class:`torchvision.datasets.CocoDetection`,
             :class:`torchvision.datasets.VOCDetection`, :class:`torchvision.datasets.Kitti`, and
             :class:`torchvision.datasets.WIDERFace`. See above for details.
+        index_file: Path of a cache file for a columnar index of the annotations built once at wrap time. Each
+            target is then a slice of the index instead of a conversion of the raw annotations and the masks are
+            decoded from compressed RLEs only when requested. The file is memory-mapped so that the workers of a
+            :class:`~torch.utils.data.DataLoader` share it, and it is rebuilt if it does not match the dataset.
+            Currently only supported for :class:`torchvision.datasets.CocoDetection`.
+        batched: If ``True``, ``__getitems__`` fetches all the samples of a batch of a
+            :class:`~torch.utils.data.DataLoader`, collates them with :func:`~torchaug.data.dataloader.default_collate`
+            and calls the transforms once on the batch, so that transforms in batch mode run inside the workers. The
+            :class:`PIL.Image.Image` images are converted to :class:`~torchaug.ta_tensors.Image` and the
+            ``"labels"`` tensors of dict targets to :class:`~torchaug.ta_tensors.Labels` before collation, so the
+            images of a batch must have the same size. As the batch is already collated, the
+            :class:`~torch.utils.data.DataLoader` should not collate it again, for instance with
+            ``collate_fn=torch.utils.data.default_convert``.
+
+    Example:
+        >>> dataset = wrap_dataset_for_transforms_v2(dataset, batched=True)
+        >>> dataset.transforms = SequentialTransform([...], batch_transform=True)
+        >>> loader = DataLoader(dataset, batch_size=64, num_workers=8, collate_fn=default_convert)
     """
     if not (
         target_keys is None
@@ -109,7 +131,7 @@ def wrap_dataset_for_transforms_v2(dataset, target_keys=None):
         {},
     )
 
-    return wrapped_dataset_cls(dataset, target_keys)
+    return wrapped_dataset_cls(dataset, target_keys, index_file, batched)
 
 
 class WrapperFactories(dict):
@@ -129,7 +151,7 @@ WRAPPER_FACTORIES = WrapperFactories()
 
 
 class VisionDatasetTATensorWrapper:
-    def __init__(self, dataset, target_keys):
+    def __init__(self, dataset, target_keys, index_file=None, batched=False):
         dataset_cls = type(dataset)
 
         if not isinstance(dataset, datasets.VisionDataset):
@@ -153,6 +175,10 @@ class VisionDatasetTATensorWrapper:
                         f"`target_keys` is currently only supported for `CocoDetection`, `VOCDetection`, `Kitti`, "
                         f"and `WIDERFace`, but got {cls.__name__}."
                     )
+                if index_file is not None and cls is not datasets.CocoDetection:
+                    raise ValueError(
+                        f"`index_file` is currently only supported for `CocoDetection`, but got {cls.__name__}."
+                    )
                 break
             elif cls is datasets.VisionDataset:
                 # TODO: If we have documentation on how to do that, put a link in the error message.
@@ -166,7 +192,12 @@ class VisionDatasetTATensorWrapper:
 
         self._dataset = dataset
         self._target_keys = target_keys
-        self._wrapper = wrapper_factory(dataset, target_keys)
+        self._index_file = index_file
+        self._batched = batched
+        if index_file is None:
+            self._wrapper = wrapper_factory(dataset, target_keys)
+        else:
+            self._wrapper = wrapper_factory(dataset, target_keys, index_file=index_file)
 
         # We need to disable the transforms on the dataset here to be able to inject the wrapping before we apply them.
         # Although internally, `datasets.VisionDataset` merges `transform` and `target_transform` into the joint
@@ -185,19 +216,36 @@ class VisionDatasetTATensorWrapper:
         return getattr(self._dataset, item)
 
     def __getitem__(self, idx):
-        # This gets us the raw sample since we disabled the transforms for the underlying dataset in the constructor
-        # of this class
-        sample = self._dataset[idx]
+        with _trace(type(self._dataset).__name__, "dataset", index=idx):
+            # This gets us the raw sample since we disabled the transforms for the underlying dataset in the
+            # constructor of this class
+            sample = self._dataset[idx]
 
-        sample = self._wrapper(idx, sample)
+            sample = self._wrapper(idx, sample)
 
-        # Regardless of whether the user has supplied the transforms individually (`transform` and `target_transform`)
-        # or joint (`transforms`), we can access the full functionality through `transforms`
-        if self.transforms is not None:
-            sample = self.transforms(*sample)
+            # Regardless of whether the user has supplied the transforms individually (`transform` and
+            # `target_transform`) or joint (`transforms`), we can access the full functionality through `transforms`
+            if self.transforms is not None:
+                with _trace(type(self.transforms).__name__, "transform"):
+                    sample = self.transforms(*sample)
 
         return sample
 
+    def __getitems__(self, indices):
+        # Called by the DataLoader fetcher with all the indices of a batch.
+        if not self._batched:
+            return [self[idx] for idx in indices]
+
+        with _trace(type(self._dataset).__name__, "dataset", indices=list(indices)):
+            samples = [_to_batchable(self._wrapper(idx, self._dataset[idx])) for idx in indices]
+            batch = default_collate(samples)
+
+            if self.transforms is not None:
+                with _trace(type(self.transforms).__name__, "transform"):
+                    batch = self.transforms(*batch)
+
+        return batch
+
     def __len__(self):
         return len(self._dataset)
 
@@ -213,7 +261,18 @@ class VisionDatasetTATensorWrapper:
         dataset.transforms = self.transforms
         dataset.target_transform = self.target_transform
 
-        return wrap_dataset_for_transforms_v2, (dataset, self._target_keys)
+        return wrap_dataset_for_transforms_v2, (dataset, self._target_keys, self._index_file, self._batched)
+
+
+def _to_batchable(sample):
+    def convert(item):
+        if isinstance(item, PIL.Image.Image):
+            return ta_tensors.Image(pil_to_tensor(item))
+        elif isinstance(item, dict) and type(item.get("labels")) is torch.Tensor:
+            return {**item, "labels": ta_tensors.Labels(item["labels"])}
+        return item
+
+    return tuple(convert(item) for item in sample)
 
 
 def raise_not_supported(description):
@@ -341,7 +400,7 @@ def caltech101_wrapper_factory(dataset, target_keys):
 
 
 @WRAPPER_FACTORIES.register(datasets.CocoDetection)
-def coco_dectection_wrapper_factory(dataset, target_keys):
+def coco_dectection_wrapper_factory(dataset, target_keys, index_file=None):
     target_keys = parse_target_keys(
         target_keys,
         available={
@@ -370,6 +429,11 @@ def coco_dectection_wrapper_factory(dataset, target_keys):
         )
         return torch.from_numpy(mask.decode(segmentation))
 
+    if index_file is not None:
+        return _coco_detection_index_wrapper(
+            dataset, target_keys, CocoDetectionIndex.from_dataset(dataset, index_file)
+        )
+
     def wrapper(idx, sample):
         image_id = dataset.ids[idx]
 
@@ -420,6 +484,50 @@ def coco_dectection_wrapper_factory(dataset, target_keys):
     return wrapper
 
 
+def _coco_detection_index_wrapper(dataset, target_keys, index):
+    def wrapper(idx, sample):
+        image_id = dataset.ids[idx]
+
+        image, target = sample
+        if isinstance(image, PIL.Image.Image):
+            image = pil_to_tensor(image)
+        image = F.to_image(image)
+
+        if index.num_annotations(idx) == 0:
+            return image, {"image_id": image_id}
+
+        canvas_size = tuple(F.get_size(image))
+
+        output = {}
+
+        if "image_id" in target_keys:
+            output["image_id"] = image_id
+
+        if "boxes" in target_keys:
+            output["boxes"] = ta_tensors.BoundingBoxes(
+                index.get("boxes", idx),
+                format=ta_tensors.BoundingBoxFormat.XYXY,
+                canvas_size=canvas_size,
+            )
+
+        if "masks" in target_keys:
+            output["masks"] = ta_tensors.Mask(index.decode_masks(idx))
+
+        if "labels" in target_keys:
+            output["labels"] = ta_tensors.Labels(index.get("category_id", idx))
+
+        for target_key in target_keys - {"image_id", "boxes", "masks", "labels"}:
+            if target_key == "segmentation":
+                # Raw polygons are not indexed.
+                output[target_key] = [annotation[target_key] for annotation in target]
+            else:
+                output[target_key] = index.get(target_key, idx).tolist()
+
+        return image, output
+
+    return wrapper
+
+
 WRAPPER_FACTORIES.register(datasets.CocoCaptions)(identity_wrapper_factory)
 
 
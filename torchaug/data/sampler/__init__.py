@@ -0,0 +1,10 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+# ruff: noqa: D104
+# ruff: noqa: F401
+
+from ._grouped_batch_sampler import GroupedBatchSampler, get_image_sizes, group_sizes
@@ -0,0 +1,194 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from copy import copy
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import PIL.Image
+import torch
+from torch.utils.data import RandomSampler, Sampler, SequentialSampler, Subset, SubsetRandomSampler
+
+from torchaug.transforms import functional as F
+
+
+def _without_transforms(dataset):
+    # The transforms of the torchvision datasets can change the sizes of the images, e.g. a random crop.
+    names = [name for name in ("transform", "target_transform", "transforms") if getattr(dataset, name, None)]
+    if not names:
+        return dataset
+    dataset = copy(dataset)
+    for name in names:
+        setattr(dataset, name, None)
+    return dataset
+
+
+def get_image_sizes(dataset) -> List[Tuple[int, int]]:
+    """Get the sizes of the images of a dataset.
+
+    The sizes are read without applying the transforms of the dataset, which can change them:
+
+    - from the annotations of the datasets that have a COCO API, such as :class:`torchvision.datasets.CocoDetection`;
+    - from the headers of the image files of the :class:`torchvision.datasets.DatasetFolder` datasets that load
+      them with the default loader, such as :class:`torchvision.datasets.ImageFolder`, without decoding them;
+    - otherwise, by loading each sample, with the ``transform``, ``target_transform`` and ``transforms`` of the
+      dataset disabled, to get the size of its image, its first element if it is a sequence. This decodes every
+      image, so the sizes should rather be precomputed and given to :func:`~torchaug.data.sampler.group_sizes`
+      for large datasets.
+
+    The datasets wrapped by :func:`~torchaug.data.dataset.wrap_dataset_for_transforms_v2` and the
+    :class:`torch.utils.data.Subset` of the datasets above are supported.
+
+    Args:
+        dataset: The dataset.
+
+    Returns:
+        The sizes ``(height, width)`` of the images.
+    """
+    if isinstance(dataset, Subset):
+        sizes = get_image_sizes(dataset.dataset)
+        return [sizes[idx] for idx in dataset.indices]
+
+    # The wrapper of the datasets for the transforms applies its transforms on top of the wrapped dataset.
+    wrapped_dataset = getattr(dataset, "_dataset", None)
+    if wrapped_dataset is not None:
+        return get_image_sizes(wrapped_dataset)
+
+    coco = getattr(dataset, "coco", None)
+    ids = getattr(dataset, "ids", None)
+    if coco is not None and ids is not None:
+        return [(coco.imgs[image_id]["height"], coco.imgs[image_id]["width"]) for image_id in ids]
+
+    # Imported here as importing the datasets of torchvision is slow.
+    from torchvision.datasets.folder import default_loader, pil_loader
+
+    samples = getattr(dataset, "samples", None)
+    if samples is not None and getattr(dataset, "loader", None) in (default_loader, pil_loader):
+        sizes = []
+        for path, _ in samples:
+            # Opening an image only reads its header.
+            with PIL.Image.open(path) as image:
+                width, height = image.size
+            sizes.append((height, width))
+        return sizes
+
+    dataset = _without_transforms(dataset)
+    sizes = []
+    for idx in range(len(dataset)):
+        sample = dataset[idx]
+        image = sample[0] if isinstance(sample, (tuple, list)) else sample
+        if isinstance(image, PIL.Image.Image):
+            width, height = image.size
+        else:
+            height, width = F.get_size(image)
+        sizes.append((height, width))
+    return sizes
+
+
+def group_sizes(sizes: Sequence[Sequence[int]], buckets: Optional[Sequence[Sequence[int]]] = None) -> List[int]:
+    """Compute the group of each image from its size.
+
+    Args:
+        sizes: The sizes ``(height, width)`` of the images.
+        buckets: The resolutions ``(height, width)`` of the buckets. If ``None``, the images of identical sizes are
+            grouped. Otherwise, each image is assigned to the bucket of the closest aspect ratio, which the images
+            should be resized to before collation.
+
+    Returns:
+        The group of each image. If ``buckets`` is not ``None``, it is the index of its bucket.
+    """
+    if buckets is None:
+        groups: Dict[Tuple[int, ...], int] = {}
+        return [groups.setdefault(tuple(size), len(groups)) for size in sizes]
+    elif len(buckets) == 0:
+        raise ValueError("buckets should not be empty.")
+
+    bucket_ratios = torch.tensor([math.log(width / height) for height, width in buckets])
+    ratios = torch.tensor([math.log(width / height) for height, width in sizes])
+    return (ratios[:, None] - bucket_ratios[None, :]).abs().argmin(dim=1).tolist()
+
+
+class GroupedBatchSampler(Sampler[List[int]]):
+    """Batch sampler yielding batches of indices of the same group.
+
+    The indices of ``sampler`` are buffered per group and a batch is yielded as soon as a group has ``batch_size``
+    indices. The groups are typically images of the same size, see :func:`~torchaug.data.sampler.group_sizes`, so
+    that the batches can be collated by :func:`~torchaug.data.dataloader.default_collate` in
+    :class:`~torchaug.ta_tensors.BatchImages` and augmented in batch mode instead of with nested tensors.
+
+    The length is computed once from ``group_ids`` for the samplers that yield the same indices at each epoch:
+    :class:`~torch.utils.data.SequentialSampler`, :class:`~torch.utils.data.SubsetRandomSampler` and
+    :class:`~torch.utils.data.RandomSampler` without replacement. Other samplers are iterated at each call, without
+    changing the state of the global random number generator.
+
+    Example:
+        >>> group_ids = group_sizes(get_image_sizes(dataset))
+        >>> batch_sampler = GroupedBatchSampler(RandomSampler(dataset), group_ids, batch_size=16)
+        >>> loader = DataLoader(dataset, batch_sampler=batch_sampler, collate_fn=default_collate)
+
+    Args:
+        sampler: The sampler of the indices.
+        group_ids: The group of each index of the dataset.
+        batch_size: The size of the batches.
+        drop_last: Whether to drop the last incomplete batch of each group.
+    """
+
+    def __init__(
+        self,
+        sampler: Iterable[int],
+        group_ids: Sequence[int],
+        batch_size: int,
+        drop_last: bool = False,
+    ) -> None:
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise ValueError(f"batch_size should be a positive integer value, but got batch_size={batch_size}.")
+
+        self.sampler = sampler
+        self.group_ids = group_ids
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+        self._group_counts = self._count_groups()
+
+    def _count_groups(self) -> Optional[Counter]:
+        # The samplers that yield the same indices at each epoch are counted once without being iterated, which
+        # would consume the random number generator of a RandomSampler.
+        sampler = self.sampler
+        if isinstance(sampler, SubsetRandomSampler):
+            indices: Iterable[int] = sampler.indices
+        elif isinstance(sampler, SequentialSampler) or (
+            isinstance(sampler, RandomSampler)
+            and not sampler.replacement
+            and sampler.num_samples == len(sampler.data_source)  # type: ignore[arg-type]
+        ):
+            indices = range(len(sampler))
+        else:
+            return None
+        return Counter(self.group_ids[idx] for idx in indices)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        buffers: Dict[int, List[int]] = defaultdict(list)
+        for idx in self.sampler:
+            group_id = self.group_ids[idx]
+            buffers[group_id].append(idx)
+            if len(buffers[group_id]) == self.batch_size:
+                yield buffers.pop(group_id)
+
+        if not self.drop_last:
+            for batch in buffers.values():
+                yield batch
+
+    def __len__(self) -> int:
+        counts = self._group_counts
+        if counts is None:
+            # The indices of the other samplers can change at each epoch, e.g. with DistributedSampler.set_epoch.
+            with torch.random.fork_rng(devices=[]):
+                counts = Counter(self.group_ids[idx] for idx in self.sampler)
+        if self.drop_last:
+            return sum(count // self.batch_size for count in counts.values())
+        return sum(math.ceil(count / self.batch_size) for count in counts.values())
@@ -29,6 +29,13 @@ from ._bounding_boxes import BoundingBoxes, BoundingBoxFormat
 from ._image import Image
 from ._labels import Labels
 from ._mask import Mask
+from ._packed_masks import (
+    BatchPackedMasks,
+    PackedMasks,
+    convert_batch_packed_masks_to_packed_masks,
+    convert_packed_masks_to_batch_packed_masks,
+)
+from ._padded_batch_images import PaddedBatchImages
 from ._ta_tensor import TATensor
 from ._torch_function_helpers import set_return_type
 from ._video import Video
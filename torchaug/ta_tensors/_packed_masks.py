@@ -0,0 +1,394 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Union
+
+import torch
+from torch import Tensor
+from torch.utils._pytree import tree_flatten
+
+from ._batch_concatenated_ta_tensor import _BatchConcatenatedTATensor
+from ._batch_masks import BatchMasks
+from ._mask import Mask
+from ._ta_tensor import TATensor
+
+
+_CHECK_ATTRS = [
+    "requires_grad",
+    "device",
+]
+
+
+def _num_groups(num_masks: int) -> int:
+    return (num_masks + 7) // 8
+
+
+def _pack_masks(masks: Tensor) -> Tensor:
+    """Pack ``[..., N, H, W]`` binary masks into ``[..., ceil(N / 8), H, W]`` bytes.
+
+    The mask ``i`` is the bit ``i % 8`` of the channel ``i // 8``.
+    """
+    num_masks = masks.shape[-3]
+    num_groups = _num_groups(num_masks)
+    bits = masks.ne(0).to(torch.uint8)
+    padding = num_groups * 8 - num_masks
+    if padding > 0:
+        bits = torch.cat([bits, bits.new_zeros(bits.shape[:-3] + (padding,) + bits.shape[-2:])], dim=-3)
+    bits = bits.reshape(bits.shape[:-3] + (num_groups, 8) + bits.shape[-2:])
+    weights = torch.tensor([1 << i for i in range(8)], dtype=torch.uint8, device=masks.device).view(8, 1, 1)
+    return bits.mul_(weights).sum(dim=-3, dtype=torch.uint8)
+
+
+def _unpack_masks(packed: Tensor, num_masks: int, dtype: torch.dtype = torch.uint8) -> Tensor:
+    """Unpack ``[..., ceil(N / 8), H, W]`` bytes into ``[..., N, H, W]`` binary masks."""
+    shifts = torch.arange(8, dtype=torch.uint8, device=packed.device).view(8, 1, 1)
+    bits = packed.unsqueeze(-3).bitwise_right_shift(shifts).bitwise_and_(1)
+    bits = bits.flatten(-4, -3)[..., :num_masks, :, :]
+    return bits.to(dtype)
+
+
+def convert_packed_masks_to_batch_packed_masks(
+    masks: Sequence[PackedMasks],
+) -> BatchPackedMasks:
+    """Convert a sequence of :class:`~torchaug.ta_tensors.PackedMasks` objects to a
+    :class:`~torchaug.ta_tensors.BatchPackedMasks` object.
+    """
+    for mask in masks:
+        if not mask.shape[-2:] == masks[0].shape[-2:]:
+            raise ValueError("All masks must have the same size.")
+        for attr in _CHECK_ATTRS:
+            if getattr(mask, attr) != getattr(masks[0], attr):
+                raise ValueError(f"All masks must have the same {attr} attribute.")
+
+    samples_ranges = []
+    sum_groups = 0
+    for mask in masks:
+        samples_ranges.append((sum_groups, sum_groups + mask.shape[0]))
+        sum_groups += mask.shape[0]
+
+    return BatchPackedMasks(
+        torch.cat([mask.as_subclass(Tensor) for mask in masks]),
+        samples_ranges=samples_ranges,
+        num_masks=[mask.num_masks for mask in masks],
+    )
+
+
+def convert_batch_packed_masks_to_packed_masks(
+    batch_masks: BatchPackedMasks,
+) -> List[PackedMasks]:
+    """Convert :class:`~torchaug.ta_tensors.BatchPackedMasks` object to a list of
+    :class:`~torchaug.ta_tensors.PackedMasks` objects.
+    """
+    return [batch_masks.get_sample(i) for i in range(batch_masks.batch_size)]
+
+
+class PackedMasks(TATensor):
+    """:class:`torch.Tensor` subclass for binary detection masks packed in bits.
+
+    The ``N`` masks of shape ``[H, W]`` are stored in a ``torch.uint8`` tensor of shape ``[ceil(N / 8), H, W]``
+    where the mask ``i`` is the bit ``i % 8`` of the channel ``i // 8``. It takes up to 8 times less memory than a
+    :class:`~torchaug.ta_tensors.Mask` for crowded images. As the pixels are not modified by the packing, the
+    geometric transforms such as flips, crops, pads, resizes and affine transforms work directly on the packed data
+    with the nearest interpolation used for masks. The masks are only unpacked by
+    :meth:`~torchaug.ta_tensors.PackedMasks.to_masks`.
+
+    Args:
+        data: Any data that can be turned into a ``torch.uint8`` tensor of packed masks with
+            :func:`torch.as_tensor`. See :meth:`~torchaug.ta_tensors.PackedMasks.from_masks` to pack masks.
+        num_masks: Number of packed masks.
+        device: Desired device. If omitted and ``data`` is a
+            :class:`torch.Tensor`, the device is taken from it. Otherwise, the mask is constructed on the CPU.
+        requires_grad: Whether autograd should record operations. If omitted and
+            ``data`` is a :class:`torch.Tensor`, the value is taken from it. Otherwise, defaults to ``False``.
+    """
+
+    num_masks: int
+
+    @classmethod
+    def _wrap(cls, tensor: Tensor, *, num_masks: int, check_dims: bool = True) -> PackedMasks:  # type: ignore[override]
+        if check_dims:
+            if tensor.ndim != 3:
+                raise ValueError(f"Expected a 3D tensor, got {tensor.ndim}D tensor")
+            elif tensor.dtype != torch.uint8:
+                raise ValueError(f"Expected a torch.uint8 tensor, got {tensor.dtype}")
+            elif tensor.shape[0] != _num_groups(num_masks):
+                raise ValueError(
+                    f"Expected {_num_groups(num_masks)} channels for {num_masks} masks, got {tensor.shape[0]}"
+                )
+        packed_masks = tensor.as_subclass(cls)
+        packed_masks.num_masks = num_masks
+        return packed_masks
+
+    def __new__(
+        cls,
+        data: Any,
+        *,
+        num_masks: int,
+        device: Optional[Union[torch.device, str, int]] = None,
+        requires_grad: Optional[bool] = None,
+    ) -> PackedMasks:
+        tensor = cls._to_tensor(data, dtype=None, device=device, requires_grad=requires_grad)
+        return cls._wrap(tensor, num_masks=num_masks)
+
+    @classmethod
+    def from_masks(cls, masks: Tensor) -> PackedMasks:
+        """Pack binary masks.
+
+        Args:
+            masks: Masks of shape ``[N, H, W]`` or ``[H, W]``. Non-zero values are considered in the masks.
+
+        Returns:
+            The packed masks.
+        """
+        masks = masks.as_subclass(Tensor)
+        if masks.ndim == 2:
+            masks = masks.unsqueeze(0)
+        return cls._wrap(_pack_masks(masks), num_masks=masks.shape[0])
+
+    def to_masks(self, dtype: torch.dtype = torch.uint8) -> Mask:
+        """Unpack the masks.
+
+        Args:
+            dtype: The dtype of the masks.
+
+        Returns:
+            The masks of shape ``[N, H, W]``.
+        """
+        return Mask(_unpack_masks(self.as_subclass(Tensor), self.num_masks, dtype=dtype))
+
+    @classmethod
+    def _wrap_output(
+        cls,
+        output: Tensor,
+        args: Sequence[Any] = (),
+        kwargs: Optional[Mapping[str, Any]] = None,
+    ) -> PackedMasks:
+        flat_params, _ = tree_flatten(args + (tuple(kwargs.values()) if kwargs else ()))  # type: ignore[operator]
+        first_masks_from_args = next(x for x in flat_params if isinstance(x, PackedMasks))
+        num_masks = first_masks_from_args.num_masks
+
+        if isinstance(output, Tensor) and not isinstance(output, PackedMasks):
+            output = PackedMasks._wrap(output, num_masks=num_masks, check_dims=False)
+        elif isinstance(output, (tuple, list)):
+            output = type(output)(PackedMasks._wrap(part, num_masks=num_masks, check_dims=False) for part in output)
+        return output
+
+    def __repr__(self, *, tensor_contents: Any = None) -> str:  # type: ignore[override]
+        return self._make_repr(num_masks=self.num_masks)
+
+
+class BatchPackedMasks(_BatchConcatenatedTATensor):
+    """:class:`torch.Tensor` subclass for batch of binary detection masks packed in bits.
+
+    The packed masks of the samples, see :class:`~torchaug.ta_tensors.PackedMasks`, are concatenated along the
+    first dimension.
+
+    Args:
+        data: Any data that can be turned into a ``torch.uint8`` tensor of packed masks with
+            :func:`torch.as_tensor`.
+        samples_ranges: Each element is the range of the indices of the packed channels for each sample.
+        num_masks: Number of packed masks for each sample.
+        device: Desired device. If omitted and ``data`` is a
+            :class:`torch.Tensor`, the device is taken from it. Otherwise, the mask is constructed on the CPU.
+        requires_grad: Whether autograd should record operations. If omitted and
+            ``data`` is a :class:`torch.Tensor`, the value is taken from it. Otherwise, defaults to ``False``.
+    """
+
+    num_masks: List[int]
+
+    @classmethod
+    def cat(cls, masks_batches: Sequence[BatchPackedMasks]) -> BatchPackedMasks:
+        """Concatenates a sequence of :class:`~torchaug.ta_tensors.BatchPackedMasks` along the first dimension.
+
+        Args:
+            masks_batches: A sequence of :class:`~torchaug.ta_tensors.BatchPackedMasks` to concatenate.
+
+        Returns:
+            The concatenated :class:`~torchaug.ta_tensors.BatchPackedMasks`.
+        """
+        for batch_masks in masks_batches:
+            if not isinstance(batch_masks, BatchPackedMasks):
+                raise ValueError("All batches must be of type BatchPackedMasks.")
+            if not batch_masks.shape[-2:] == masks_batches[0].shape[-2:]:
+                raise ValueError("All batches of masks must have the same size.")
+            for attr in _CHECK_ATTRS:
+                if getattr(batch_masks, attr) != getattr(masks_batches[0], attr):
+                    raise ValueError(f"All batches of masks must have the same {attr} attribute.")
+
+        samples_ranges = []
+        num_masks = []
+        sum_groups = 0
+        for batch_masks in masks_batches:
+            for idx_start, idx_stop in batch_masks.samples_ranges:
+                samples_ranges.append((idx_start + sum_groups, idx_stop + sum_groups))
+            num_masks.extend(batch_masks.num_masks)
+            sum_groups += batch_masks.num_data
+
+        data = torch.cat([batch_masks.as_subclass(Tensor) for batch_masks in masks_batches], 0)
+
+        return cls(data, samples_ranges=samples_ranges, num_masks=num_masks)
+
+    @classmethod
+    def _wrap(
+        cls,
+        tensor: Tensor,
+        *,
+        samples_ranges: List[Tuple[int, int]],
+        num_masks: List[int],
+        check_dims: bool = True,
+    ) -> BatchPackedMasks:  # type: ignore[override]
+        if check_dims:
+            if tensor.ndim != 3:
+                raise ValueError(f"Expected a 3D tensor, got {tensor.ndim}D tensor")
+            elif tensor.dtype != torch.uint8:
+                raise ValueError(f"Expected a torch.uint8 tensor, got {tensor.dtype}")
+            elif len(num_masks) != len(samples_ranges):
+                raise ValueError("Expected the same number of samples for num_masks and samples_ranges.")
+            for (idx_start, idx_stop), n in zip(samples_ranges, num_masks):
+                if idx_stop - idx_start != _num_groups(n):
+                    raise ValueError(f"Expected {_num_groups(n)} channels for {n} masks, got {idx_stop - idx_start}")
+        batch_masks = tensor.as_subclass(cls)
+        batch_masks.samples_ranges = samples_ranges
+        batch_masks.num_masks = num_masks
+        return batch_masks
+
+    def __new__(
+        cls,
+        data: Any,
+        *,
+        samples_ranges: List[Tuple[int, int]],
+        num_masks: List[int],
+        device: Optional[Union[torch.device, str, int]] = None,
+        requires_grad: Optional[bool] = None,
+    ) -> BatchPackedMasks:
+        tensor = cls._to_tensor(data, dtype=None, device=device, requires_grad=requires_grad)
+
+        cls._check_samples_ranges(samples_ranges, tensor)
+
+        return cls._wrap(tensor, samples_ranges=samples_ranges, num_masks=num_masks)
+
+    @classmethod
+    def from_batch_masks(cls, batch_masks: BatchMasks) -> BatchPackedMasks:
+        """Pack a batch of binary masks.
+
+        Args:
+            batch_masks: The batch of masks of shape ``[N, H, W]``. Non-zero values are considered in the masks.
+
+        Returns:
+            The batch of packed masks.
+        """
+        return convert_packed_masks_to_batch_packed_masks(
+            [PackedMasks.from_masks(batch_masks.get_sample(i)) for i in range(batch_masks.batch_size)]
+        )
+
+    def to_batch_masks(self, dtype: torch.dtype = torch.uint8) -> BatchMasks:
+        """Unpack the batch of masks.
+
+        Args:
+            dtype: The dtype of the masks.
+
+        Returns:
+            The batch of masks.
+        """
+        masks = [self.get_sample(i).to_masks(dtype=dtype) for i in range(self.batch_size)]
+        samples_ranges = []
+        sum_masks = 0
+        for n in self.num_masks:
+            samples_ranges.append((sum_masks, sum_masks + n))
+            sum_masks += n
+        return BatchMasks(torch.cat([mask.as_subclass(Tensor) for mask in masks]), samples_ranges=samples_ranges)
+
+    @classmethod
+    def _wrap_output(
+        cls,
+        output: Tensor,
+        args: Sequence[Any] = (),
+        kwargs: Optional[Mapping[str, Any]] = None,
+    ) -> BatchPackedMasks:
+        flat_params, _ = tree_flatten(args + (tuple(kwargs.values()) if kwargs else ()))  # type: ignore[operator]
+        first_batch_masks_from_args = next(x for x in flat_params if isinstance(x, BatchPackedMasks))
+
+        samples_ranges = first_batch_masks_from_args.samples_ranges.copy()  # clone the list.
+        num_masks = first_batch_masks_from_args.num_masks.copy()
+
+        if isinstance(output, Tensor) and not isinstance(output, BatchPackedMasks):
+            output = BatchPackedMasks._wrap(
+                output, samples_ranges=samples_ranges, num_masks=num_masks, check_dims=False
+            )
+        elif isinstance(output, (tuple, list)):
+            output = type(output)(
+                BatchPackedMasks._wrap(part, samples_ranges=samples_ranges, num_masks=num_masks, check_dims=False)
+                for part in output
+            )
+        return output
+
+    def get_sample(self, idx: int) -> PackedMasks:
+        """Get the packed masks for a sample in the batch.
+
+        Args:
+            idx: The index of the sample to get.
+
+        Returns:
+            The packed masks for the sample.
+        """
+        masks = self[self.samples_ranges[idx][0] : self.samples_ranges[idx][1]]
+        return PackedMasks(
+            masks.as_subclass(Tensor),
+            num_masks=self.num_masks[idx],
+            device=self.device,
+            requires_grad=self.requires_grad,
+        )
+
+    def get_chunk(self, chunk_indices: Tensor) -> BatchPackedMasks:
+        """Get a chunk of the batch of packed masks.
+
+        Args:
+            chunk_indices: The indices of the chunk to get.
+
+        Returns:
+            The chunk of the batch of packed masks.
+        """
+        chunk_samples_ranges = self._get_chunk_samples_ranges_from_chunk_indices(chunk_indices)
+        data_indices = self._get_data_indices_from_chunk_indices(chunk_indices)
+        return BatchPackedMasks(
+            self[data_indices].as_subclass(Tensor),
+            samples_ranges=chunk_samples_ranges,
+            num_masks=[self.num_masks[i] for i in chunk_indices.tolist()],
+            device=self.device,
+            requires_grad=self.requires_grad,
+        )
+
+    def update_chunk_(self, chunk: BatchPackedMasks, chunk_indices: Tensor) -> BatchPackedMasks:
+        """Update a chunk of the batch of packed masks.
+
+        Args:
+            chunk: The chunk update.
+            chunk_indices: The indices of the chunk to update.
+
+        Returns:
+            The updated batch of packed masks.
+        """
+        data_indices = self._get_data_indices_from_chunk_indices(chunk_indices)
+        self[data_indices] = chunk
+        return self
+
+    @classmethod
+    def masked_select(cls, masks: BatchPackedMasks, mask: Tensor) -> BatchPackedMasks:
+        """Remove masks from the batch of packed masks.
+
+        Args:
+            masks: The batch of packed masks to remove masks from.
+            mask: A boolean mask over the unpacked masks to keep masks.
+
+        Returns:
+            The updated batch of packed masks.
+        """
+        return cls.from_batch_masks(BatchMasks.masked_select(masks.to_batch_masks(), mask))
+
+    def __repr__(self, *, tensor_contents: Any = None) -> str:  # type: ignore[override]
+        return self._make_repr(samples_ranges=self.samples_ranges, num_masks=self.num_masks)
@@ -0,0 +1,265 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Union
+
+import torch
+from torch import Tensor
+from torch.utils._pytree import tree_flatten
+
+from ._batch_concatenated_ta_tensor import _BatchConcatenatedTATensor
+from ._image import Image
+
+
+_CHECK_ATTRS = [
+    "requires_grad",
+    "device",
+    "dtype",
+]
+
+
+def _image_sizes_to_valid_regions(image_sizes: Tensor) -> Tensor:
+    heights, widths = image_sizes.unbind(-1)
+    zeros = torch.zeros_like(heights)
+    return torch.stack([zeros, zeros, widths, heights], dim=-1).to(torch.float32)
+
+
+class PaddedBatchImages(_BatchConcatenatedTATensor):
+    """:class:`torch.Tensor` subclass for batch of images of different sizes padded to the same size.
+
+    The images are stored in a tensor of shape ``[B, C, H, W]`` where ``H`` and ``W`` are the maximum height and width
+    of the images. The valid region of each image in the padded tensor is a box in the ``XYXY`` format stored in
+    :attr:`valid_regions` of shape ``[B, 4]``. The images are padded at the bottom and right, so that the valid
+    regions are ``[0, 0, w, h]``, until a geometric transform moves them.
+
+    The geometric transforms are applied to the whole padded tensor and the valid regions are transformed as
+    bounding boxes of the same canvas, which keeps them aligned with the
+    :class:`~torchaug.ta_tensors.BatchBoundingBoxes` and :class:`~torchaug.ta_tensors.BatchMasks` of the batch.
+    The color transforms that depend on statistics of the images, such as the contrast, only use the valid pixels.
+    The transforms that would mix the padded pixels with the valid ones, such as the rotations and the blurs, raise a
+    ``TypeError``, as do the random crops whose crops would be sampled over the padded canvas.
+
+    Args:
+        data: Any data that can be turned into a tensor with :func:`torch.as_tensor`.
+        image_sizes: The sizes ``(h, w)`` of the images, of shape ``[B, 2]``, anchored at the top left corner.
+            If omitted with ``valid_regions``, the images fill the padded tensor.
+        valid_regions: The valid regions of the images in the ``XYXY`` format, of shape ``[B, 4]``. Exclusive
+            with ``image_sizes``.
+        dtype: Desired data type. If omitted, will be inferred from
+            ``data``.
+        device: Desired device. If omitted and ``data`` is a
+            :class:`torch.Tensor`, the device is taken from it. Otherwise, the image is constructed on the CPU.
+        requires_grad: Whether autograd should record operations. If omitted and
+            ``data`` is a :class:`torch.Tensor`, the value is taken from it. Otherwise, defaults to ``False``.
+    """
+
+    valid_regions: Tensor
+
+    @classmethod
+    def _wrap(  # type: ignore[override]
+        cls,
+        tensor: Tensor,
+        *,
+        valid_regions: Tensor,
+        check_dims: bool = True,
+    ) -> PaddedBatchImages:
+        if check_dims:
+            if tensor.ndim != 4:
+                raise ValueError(f"Expected a 4D tensor, got {tensor.ndim}D tensor")
+            elif valid_regions.shape != (tensor.shape[0], 4):
+                raise ValueError(
+                    f"Expected valid regions of shape {(tensor.shape[0], 4)}, got {tuple(valid_regions.shape)}"
+                )
+        images = tensor.as_subclass(cls)
+        images.valid_regions = valid_regions
+        images.samples_ranges = [(i, i + 1) for i in range(valid_regions.shape[0])]
+        return images
+
+    def __new__(
+        cls,
+        data: Any,
+        *,
+        image_sizes: Optional[Any] = None,
+        valid_regions: Optional[Any] = None,
+        dtype: Optional[torch.dtype] = None,
+        device: Optional[Union[torch.device, str, int]] = None,
+        requires_grad: Optional[bool] = None,
+    ) -> PaddedBatchImages:
+        tensor = cls._to_tensor(data, dtype=dtype, device=device, requires_grad=requires_grad)
+
+        if image_sizes is not None and valid_regions is not None:
+            raise ValueError("Only one of image_sizes and valid_regions can be passed.")
+        elif image_sizes is not None:
+            valid_regions = _image_sizes_to_valid_regions(torch.as_tensor(image_sizes, device=tensor.device))
+        elif valid_regions is not None:
+            valid_regions = torch.as_tensor(valid_regions, dtype=torch.float32, device=tensor.device)
+        elif tensor.ndim == 4:
+            valid_regions = tensor.new_tensor([[0, 0, tensor.shape[-1], tensor.shape[-2]]], dtype=torch.float32)
+            valid_regions = valid_regions.expand(tensor.shape[0], 4).clone()
+        else:
+            raise ValueError(f"Expected a 4D tensor, got {tensor.ndim}D tensor")
+
+        return cls._wrap(tensor, valid_regions=valid_regions)
+
+    @classmethod
+    def from_images(cls, images: Sequence[Tensor], fill: Union[int, float] = 0) -> PaddedBatchImages:
+        """Pad images of different sizes at the bottom and right to batch them.
+
+        Args:
+            images: The images of shape ``[C, H_i, W_i]``.
+            fill: The value of the padded pixels.
+
+        Returns:
+            The padded batch of images.
+        """
+        if len(images) == 0:
+            raise ValueError("Expected at least one image.")
+        for image in images:
+            if image.ndim != 3:
+                raise ValueError(f"Expected 3D images, got {image.ndim}D image")
+            for attr in _CHECK_ATTRS:
+                if getattr(image, attr) != getattr(images[0], attr):
+                    raise ValueError(f"All images must have the same {attr} attribute.")
+
+        image_sizes = torch.tensor([image.shape[-2:] for image in images], device=images[0].device)
+        max_height, max_width = image_sizes.max(0).values.tolist()
+        data = images[0].as_subclass(Tensor).new_full((len(images), images[0].shape[0], max_height, max_width), fill)
+        for i, image in enumerate(images):
+            data[i, :, : image.shape[-2], : image.shape[-1]] = image.as_subclass(Tensor)
+
+        return cls._wrap(data, valid_regions=_image_sizes_to_valid_regions(image_sizes))
+
+    @property
+    def image_sizes(self) -> Tensor:
+        """The sizes ``(h, w)`` of the valid regions of shape ``[B, 2]``."""
+        regions = self.valid_regions.round().to(torch.long)
+        return torch.stack([regions[:, 3] - regions[:, 1], regions[:, 2] - regions[:, 0]], dim=-1)
+
+    def valid_mask(self) -> Tensor:
+        """Get the mask of the valid pixels.
+
+        A pixel is valid if its center is inside the valid region of its image.
+
+        Returns:
+            The boolean mask of shape ``[B, 1, H, W]``.
+        """
+        height, width = self.shape[-2:]
+        ys = torch.arange(height, device=self.device, dtype=torch.float32) + 0.5
+        xs = torch.arange(width, device=self.device, dtype=torch.float32) + 0.5
+        left, top, right, bottom = self.valid_regions[:, :, None].unbind(1)
+        valid_ys = (ys >= top) & (ys < bottom)
+        valid_xs = (xs >= left) & (xs < right)
+        return (valid_ys[:, :, None] & valid_xs[:, None, :]).unsqueeze(1)
+
+    @classmethod
+    def cat(cls, images_batches: Sequence[PaddedBatchImages]) -> PaddedBatchImages:
+        """Concatenates a sequence of :class:`~torchaug.ta_tensors.PaddedBatchImages` along the first dimension.
+
+        The batches are padded at the bottom and right to the largest size.
+
+        Args:
+            images_batches: A sequence of :class:`~torchaug.ta_tensors.PaddedBatchImages` to concatenate.
+
+        Returns:
+            The concatenated :class:`~torchaug.ta_tensors.PaddedBatchImages`.
+        """
+        for batch_images in images_batches:
+            if not isinstance(batch_images, PaddedBatchImages):
+                raise ValueError("All batches must be of type PaddedBatchImages.")
+            for attr in _CHECK_ATTRS:
+                if getattr(batch_images, attr) != getattr(images_batches[0], attr):
+                    raise ValueError(f"All batches of images must have the same {attr} attribute.")
+
+        max_height = max(batch_images.shape[-2] for batch_images in images_batches)
+        max_width = max(batch_images.shape[-1] for batch_images in images_batches)
+        data = torch.cat(
+            [
+                torch.nn.functional.pad(
+                    batch_images.as_subclass(Tensor),
+                    [0, max_width - batch_images.shape[-1], 0, max_height - batch_images.shape[-2]],
+                )
+                for batch_images in images_batches
+            ],
+            0,
+        )
+        valid_regions = torch.cat([batch_images.valid_regions for batch_images in images_batches], 0)
+
+        return cls._wrap(data, valid_regions=valid_regions)
+
+    @classmethod
+    def _wrap_output(
+        cls,
+        output: Tensor,
+        args: Sequence[Any] = (),
+        kwargs: Optional[Mapping[str, Any]] = None,
+    ) -> PaddedBatchImages:
+        flat_params, _ = tree_flatten(args + (tuple(kwargs.values()) if kwargs else ()))  # type: ignore[operator]
+        first_images_from_args = next(x for x in flat_params if isinstance(x, PaddedBatchImages))
+        valid_regions = first_images_from_args.valid_regions
+
+        if isinstance(output, Tensor) and not isinstance(output, PaddedBatchImages):
+            output = PaddedBatchImages._wrap(output, valid_regions=valid_regions, check_dims=False)
+        elif isinstance(output, (tuple, list)):
+            output = type(output)(
+                PaddedBatchImages._wrap(part, valid_regions=valid_regions, check_dims=False) for part in output
+            )
+        return output
+
+    def get_sample(self, idx: int) -> Image:
+        """Get the valid region of an image in the batch.
+
+        Args:
+            idx: The index of the image to get.
+
+        Returns:
+            The image cropped to its valid region.
+        """
+        left, top, right, bottom = self.valid_regions[idx].round().to(torch.long).tolist()
+        image = self[idx, :, max(top, 0) : max(bottom, 0), max(left, 0) : max(right, 0)]
+        return Image(image.as_subclass(Tensor), device=self.device, requires_grad=self.requires_grad)
+
+    def to_samples(self) -> List[Image]:  # type: ignore[override]
+        """Get the images cropped to their valid regions."""
+        return [self.get_sample(i).clone() for i in range(self.batch_size)]
+
+    def get_chunk(self, chunk_indices: Tensor) -> PaddedBatchImages:
+        """Get a chunk of the batch of images.
+
+        Args:
+            chunk_indices: The indices of the chunk to get.
+
+        Returns:
+            The chunk of the batch of images.
+        """
+        return PaddedBatchImages._wrap(
+            self[chunk_indices].as_subclass(Tensor),
+            valid_regions=self.valid_regions[chunk_indices.to(self.valid_regions.device)],
+        )
+
+    def update_chunk_(self, chunk: PaddedBatchImages, chunk_indices: Tensor) -> PaddedBatchImages:
+        """Update a chunk of the batch of images.
+
+        The chunk must have the same padded size as the batch.
+
+        Args:
+            chunk: The chunk update.
+            chunk_indices: The indices of the chunk to update.
+
+        Returns:
+            The updated batch of images.
+        """
+        self[chunk_indices] = chunk
+        # The valid regions can be shared with other batches, e.g. after a clone, so they are not updated in place.
+        valid_regions = self.valid_regions.clone()
+        valid_regions[chunk_indices.to(valid_regions.device)] = chunk.valid_regions
+        self.valid_regions = valid_regions
+        return self
+
+    def __repr__(self, *, tensor_contents: Any = None) -> str:  # type: ignore[override]
+        image_sizes: List[Tuple[int, int]] = [tuple(size) for size in self.image_sizes.tolist()]  # type: ignore[misc]
+        return self._make_repr(image_sizes=image_sizes)
@@ -13,6 +13,8 @@ from ._bounding_boxes import BoundingBoxes
 from ._image import Image
 from ._labels import Labels
 from ._mask import Mask
+from ._packed_masks import BatchPackedMasks, PackedMasks
+from ._padded_batch_images import PaddedBatchImages
 from ._video import Video
 from .nested import (
     BoundingBoxesNestedTensors,
@@ -24,8 +26,16 @@ from .nested import (
 )
 
 
-_SAMPLE_TA_TENSORS = [Image, Mask, BoundingBoxes, Labels, Video]
-_BATCH_TA_TENSORS = [BatchImages, BatchMasks, BatchBoundingBoxes, BatchLabels, BatchVideos]
+_SAMPLE_TA_TENSORS = [Image, Mask, PackedMasks, BoundingBoxes, Labels, Video]
+_BATCH_TA_TENSORS = [
+    BatchImages,
+    PaddedBatchImages,
+    BatchMasks,
+    BatchPackedMasks,
+    BatchBoundingBoxes,
+    BatchLabels,
+    BatchVideos,
+]
 _NESTED_TA_TENSORS = [
     NestedTensors,
     MaskNestedTensors,
@@ -7,11 +7,16 @@
 # Code partially based on Torchvision (BSD 3-Clause License), available at:
 #   https://github.com/pytorch/vision
 
+import threading
+
 import torch
 
 
 _TORCHFUNCTION_SUBCLASS = False
 
+# Return type set by the transforms and the nested tensors for the current thread only, see _local_return_type.
+_LOCAL_RETURN_TYPE = threading.local()
+
 
 class _ReturnTypeCM:
     def __init__(self, to_restore):
@@ -59,22 +64,48 @@ def set_return_type(return_type: str):
             img + 2  # This is an Image
         img + 2  # This is a pure Tensor
 
+    .. note::
+
+        The return type is shared by all the threads of the program. The transforms do not change it, they set the
+        return type they need for the current thread only, so they can be called concurrently from several threads.
+
     Args:
         return_type (str): Can be "TATensor" or "Tensor" (case-insensitive).
     """
     global _TORCHFUNCTION_SUBCLASS
     to_restore = _TORCHFUNCTION_SUBCLASS
 
+    _TORCHFUNCTION_SUBCLASS = _parse_return_type(return_type)
+
+    return _ReturnTypeCM(to_restore)
+
+
+def _parse_return_type(return_type: str) -> bool:
     try:
-        _TORCHFUNCTION_SUBCLASS = {"tensor": False, "tatensor": True}[return_type.lower()]
+        return {"tensor": False, "tatensor": True}[return_type.lower()]
     except KeyError:
         raise ValueError(f"return_type must be 'TATensor' or 'Tensor', got {return_type}") from None
 
-    return _ReturnTypeCM(to_restore)
+
+class _local_return_type:
+    # Context manager that sets the return type of torch operations in the current thread only, overriding the one of
+    # set_return_type. Torchaug uses it instead of set_return_type so that transforms can be called concurrently from
+    # several threads without changing the return type of the other threads.
+    def __init__(self, return_type: str) -> None:
+        self.value = _parse_return_type(return_type)
+
+    def __enter__(self) -> "_local_return_type":
+        self.to_restore = getattr(_LOCAL_RETURN_TYPE, "value", None)
+        _LOCAL_RETURN_TYPE.value = self.value
+        return self
+
+    def __exit__(self, *args) -> None:
+        _LOCAL_RETURN_TYPE.value = self.to_restore
 
 
 def _must_return_subclass():
-    return _TORCHFUNCTION_SUBCLASS
+    local_value = getattr(_LOCAL_RETURN_TYPE, "value", None)
+    return _TORCHFUNCTION_SUBCLASS if local_value is None else local_value
 
 
 # For those ops we always want to preserve the original subclass instead of returning a pure Tensor
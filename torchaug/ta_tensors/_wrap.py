@@ -13,6 +13,8 @@ from ._batch_bounding_boxes import BatchBoundingBoxes
 from ._batch_labels import BatchLabels
 from ._batch_masks import BatchMasks
 from ._bounding_boxes import BoundingBoxes
+from ._packed_masks import BatchPackedMasks, PackedMasks
+from ._padded_batch_images import PaddedBatchImages
 from ._ta_tensor import TATensor
 
 
@@ -28,8 +30,9 @@ def wrap(wrappee, *, like, **kwargs) -> TATensor:
         wrappee (Tensor): The tensor to convert.
         like (:class:`~torchaug.ta_tensors.TATensor`): The reference.
             ``wrappee`` will be converted into the same subclass as ``like``.
-        kwargs: Can contain "format" and "canvas_size" if ``like`` is a :class:`torchaug.ta_tensors.BoundingBoxes`.
-            Ignored otherwise.
+        kwargs: Can contain "format" and "canvas_size" if ``like`` is a :class:`torchaug.ta_tensors.BoundingBoxes`,
+            "num_masks" if ``like`` is a :class:`torchaug.ta_tensors.PackedMasks` and "valid_regions" if ``like`` is
+            a :class:`torchaug.ta_tensors.PaddedBatchImages`. Ignored otherwise.
     """
     if isinstance(like, BoundingBoxes):
         return BoundingBoxes._wrap(
@@ -44,6 +47,16 @@ def wrap(wrappee, *, like, **kwargs) -> TATensor:
             canvas_size=kwargs.get("canvas_size", like.canvas_size),
             samples_ranges=kwargs.get("samples_ranges", like.samples_ranges),
         )
+    elif isinstance(like, PackedMasks):
+        return PackedMasks._wrap(wrappee, num_masks=kwargs.get("num_masks", like.num_masks))
+    elif isinstance(like, BatchPackedMasks):
+        return BatchPackedMasks._wrap(
+            wrappee,
+            samples_ranges=kwargs.get("samples_ranges", like.samples_ranges),
+            num_masks=kwargs.get("num_masks", like.num_masks),
+        )
+    elif isinstance(like, PaddedBatchImages):
+        return PaddedBatchImages._wrap(wrappee, valid_regions=kwargs.get("valid_regions", like.valid_regions))
     elif isinstance(like, BatchMasks):
         return BatchMasks._wrap(
             wrappee,
@@ -13,6 +13,7 @@ from typing import (
 from torchaug.ta_tensors import (
     BatchBoundingBoxes,
     BoundingBoxes,
+    wrap,
 )
 from torchaug.ta_tensors._batch_bounding_boxes import convert_bboxes_to_batch_bboxes
 
@@ -29,3 +30,16 @@ class BoundingBoxesNestedTensors(TANestedTensors[BoundingBoxes, BatchBoundingBox
     def to_batch(self) -> BatchBoundingBoxes:
         """Return the batched tensor and the shapes of the nested tensors."""
         return convert_bboxes_to_batch_bboxes(self.tensors)
+
+    def to_padded_batch(self) -> BatchBoundingBoxes:
+        """Return the batched tensor on the canvas of the images padded at the bottom and right to the same size.
+
+        See :meth:`~torchaug.ta_tensors.ImageNestedTensors.to_padded_batch`.
+        """
+        canvas_size = (
+            max(bboxes.canvas_size[0] for bboxes in self.tensors),
+            max(bboxes.canvas_size[1] for bboxes in self.tensors),
+        )
+        return convert_bboxes_to_batch_bboxes(
+            [wrap(bboxes, like=bboxes, canvas_size=canvas_size) for bboxes in self.tensors]
+        )
@@ -8,11 +8,13 @@ from __future__ import annotations
 
 from typing import (
     List,
+    Union,
 )
 
 from torchaug.ta_tensors import (
     BatchImages,
     Image,
+    PaddedBatchImages,
 )
 
 from ._ta_nested_tensors import TANestedTensors
@@ -24,3 +26,11 @@ class ImageNestedTensors(TANestedTensors[Image, BatchImages]):
     tensors_type = Image
     batch_tensors_type = BatchImages
     tensors: List[Image]
+
+    def to_padded_batch(self, fill: Union[int, float] = 0) -> PaddedBatchImages:
+        """Return the images padded at the bottom and right to the same size in a batched tensor.
+
+        Args:
+            fill: The value of the padded pixels.
+        """
+        return PaddedBatchImages.from_images(self.tensors, fill=fill)
@@ -10,6 +10,8 @@ from typing import (
     List,
 )
 
+import torch
+
 from torchaug.ta_tensors import (
     BatchMasks,
     Mask,
@@ -29,3 +31,21 @@ class MaskNestedTensors(TANestedTensors[Mask, BatchMasks]):
     def to_batch(self) -> BatchMasks:
         """Return the batched mask of the nested masks."""
         return convert_masks_to_batch_masks(self.tensors)
+
+    def to_padded_batch(self) -> BatchMasks:
+        """Return the batched mask of the nested masks padded at the bottom and right to the same size.
+
+        See :meth:`~torchaug.ta_tensors.ImageNestedTensors.to_padded_batch`.
+        """
+        height = max(mask.shape[-2] for mask in self.tensors)
+        width = max(mask.shape[-1] for mask in self.tensors)
+        return convert_masks_to_batch_masks(
+            [
+                Mask(
+                    torch.nn.functional.pad(
+                        mask.as_subclass(torch.Tensor), [0, width - mask.shape[-1], 0, height - mask.shape[-2]]
+                    )
+                )
+                for mask in self.tensors
+            ]
+        )
@@ -6,9 +6,11 @@
 
 from __future__ import annotations
 
+import math
 from abc import ABC
 from numbers import Number
 from typing import (
+    Any,
     Generic,
     Iterator,
     List,
@@ -25,6 +27,7 @@ from torch._prims_common import DeviceLikeType
 from torch.types import (
     _complex,
 )
+from torchvision.transforms.v2.functional import to_dtype_image
 from typing_extensions import Self
 
 from torchaug import ta_tensors
@@ -40,8 +43,8 @@ from torchaug.ta_tensors import (
     Mask,
     TATensor,
     Video,
-    set_return_type,
 )
+from torchaug.ta_tensors._torch_function_helpers import _local_return_type
 
 
 T = TypeVar("T", Image, Video, Labels, BoundingBoxes, Mask, torch.Tensor)
@@ -58,6 +61,41 @@ def _assert_is_tensor(obj: object) -> None:
         raise TypeError(f"Expected a Tensor, but got {type(obj)}")
 
 
+def _foreach_to_dtype(tensors: List[Tensor], dtype: torch.dtype, scale: bool) -> List[Tensor]:
+    # Follow torchvision.transforms.v2.functional.to_dtype_image with multi-tensor kernels.
+    input_dtype = tensors[0].dtype
+    float_input, float_output = input_dtype.is_floating_point, dtype.is_floating_point
+    # The factors are passed as tensors, which unlike Python scalars are not rounded to reduced precision dtypes
+    # before the multiplication, as in Tensor.mul.
+    factor_kwargs = {"dtype": torch.float64, "device": tensors[0].device}
+    if scale and float_input and not float_output:
+        if (input_dtype == torch.float32 and dtype in (torch.int32, torch.int64)) or (
+            input_dtype == torch.float64 and dtype == torch.int64
+        ):
+            raise RuntimeError(f"The conversion from {input_dtype} to {dtype} cannot be performed safely.")
+        tensors = torch._foreach_mul(
+            tensors, torch.tensor(float(torch.iinfo(dtype).max) + 1.0 - 1e-3, **factor_kwargs)
+        )
+    elif scale and not float_input and not float_output:
+        # The bit shifts between integer dtypes have no multi-tensor kernel.
+        return [to_dtype_image(tensor, dtype=dtype, scale=True) for tensor in tensors]
+
+    if torch.is_grad_enabled() and any(tensor.requires_grad for tensor in tensors):
+        outputs = [tensor.to(dtype) for tensor in tensors]
+    else:
+        outputs = [torch.empty_like(tensor, dtype=dtype) for tensor in tensors]
+        torch._foreach_copy_(outputs, tensors)
+    if scale and not float_input and float_output:
+        torch._foreach_mul_(outputs, torch.tensor(1.0 / torch.iinfo(input_dtype).max, **factor_kwargs))
+    return outputs
+
+
+def _rebuild_packed_ta_nested_tensors(
+    cls: Type[TANestedTensors], data: Tensor, shapes: List[Size], likes: List[Tensor]
+) -> TANestedTensors:
+    return cls._from_packed(data, shapes, likes)
+
+
 class TANestedTensors(ABC, Generic[T, BATCH_T]):
     """TANestedTensors is a generic class to handle nested tensors.
 
@@ -76,11 +114,12 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def __init__(self, tensors: Sequence[T]) -> None:
         self.tensors = list(tensors)
+        self._packed_data: Optional[Tensor] = None
         self._check_tensors()
 
-    def _check_tensors(self) -> None:
+    def _check_tensors(self, tensors: Optional[Sequence[T]] = None) -> None:
         first_tensor = self.tensors[0]
-        for tensor in self.tensors:
+        for tensor in self.tensors if tensors is None else tensors:
             if tensor.device != first_tensor.device:
                 raise ValueError("All tensors must be on the same device")
             elif tensor.dtype != first_tensor.dtype:
@@ -95,6 +134,198 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
         """Return the shapes of the tensors."""
         return [tensor.size() for tensor in self.tensors]
 
+    @property
+    def is_packed(self) -> bool:
+        """Whether the tensors are views of a single contiguous buffer, see :meth:`pack`."""
+        if self._packed_data is None:
+            return False
+        # The tensors can be replaced or modified out of place, in which case they are no longer packed.
+        data_ptr, offset = self._packed_data.data_ptr(), 0
+        for tensor in self.tensors:
+            numel = tensor.numel()
+            if numel > 0 and (
+                not tensor.is_contiguous() or tensor.data_ptr() != data_ptr + offset * tensor.element_size()
+            ):
+                return False
+            offset += numel
+        return offset == self._packed_data.numel()
+
+    @property
+    def packed_data(self) -> Optional[Tensor]:
+        """The flat buffer of the tensors if they are packed, ``None`` otherwise."""
+        return self._packed_data if self.is_packed else None
+
+    def pack(self, out: Optional[Tensor] = None) -> Self:
+        """Return the nested tensors packed in a single contiguous buffer.
+
+        The tensors of the packed nested tensors are views of a flat buffer, so that moving them to a device,
+        pinning them, pickling them, cloning them and the elementwise operations are single operations on the buffer
+        instead of one operation per tensor.
+
+        Args:
+            out: The flat buffer to write the tensors to. Must have as many elements as the tensors.
+
+        Returns:
+            The packed nested tensors.
+        """
+        if self.is_packed and out is None:
+            return self
+        data = torch.cat([tensor.as_subclass(Tensor).reshape(-1) for tensor in self.tensors], out=out)
+        return self._from_packed(data, self.shapes, self.tensors)
+
+    @classmethod
+    def _from_packed(cls, data: Tensor, shapes: Sequence[Size], likes: Sequence[Tensor]) -> Self:
+        tensors = []
+        offset = 0
+        for shape, like in zip(shapes, likes):
+            numel = math.prod(shape)
+            tensors.append(ta_tensors.wrap(data[offset : offset + numel].view(shape), like=like))
+            offset += numel
+        nested_tensors = cls(tensors)
+        nested_tensors._packed_data = data
+        return nested_tensors
+
+    def with_packed_data(self, data: Tensor) -> Self:
+        """Return nested tensors of the same shapes and metadata whose tensors are views of a flat buffer.
+
+        Used by the kernels that transform the packed buffer of the tensors at once, possibly to another dtype.
+
+        Args:
+            data: The flat buffer, with as many elements as the tensors.
+
+        Returns:
+            The packed nested tensors.
+        """
+        if data.ndim != 1 or data.numel() != sum(math.prod(shape) for shape in self.shapes):
+            raise ValueError("The packed data should be a flat tensor with as many elements as the tensors.")
+        return self._from_packed(data, self.shapes, self.tensors)
+
+    def to_torch_nested(self) -> Tensor:
+        """Return the tensors as a :mod:`torch.nested` tensor.
+
+        The nested tensor has the strided layout, as the jagged layout only supports a single ragged dimension, and is
+        a view of the packed buffer of the tensors, see :meth:`pack`. It shares their memory if they are packed,
+        otherwise they are first copied in a new buffer.
+
+        Returns:
+            The :mod:`torch.nested` tensor.
+        """
+        packed = self.pack()
+        numels = [tensor.numel() for tensor in packed.tensors]
+        offsets = [0] + numels[:-1]
+        return torch._nested_view_from_buffer(
+            packed._packed_data.as_subclass(Tensor),
+            torch.tensor(packed.shapes, dtype=torch.long).view(len(numels), -1),
+            torch.tensor([tensor.stride() for tensor in packed.tensors], dtype=torch.long).view(len(numels), -1),
+            torch.tensor(offsets, dtype=torch.long).cumsum(0),
+        )
+
+    @classmethod
+    def from_torch_nested(cls, nested: Tensor, like: Optional[TANestedTensors] = None) -> Self:
+        """Create nested tensors from a :mod:`torch.nested` tensor without copy.
+
+        The tensors are views of the components of ``nested`` and are packed if ``nested`` is contiguous.
+
+        Args:
+            nested: The :mod:`torch.nested` tensor with the strided layout.
+            like: The nested tensors to take the metadata of the tensors from, e.g. the format and canvas size of
+                bounding boxes. If ``None``, the tensors are wrapped in :attr:`tensors_type`.
+
+        Returns:
+            The nested tensors.
+        """
+        if not nested.is_nested:
+            raise ValueError("Expected a torch.nested tensor.")
+        elif like is not None and len(like) != nested.size(0):
+            raise ValueError("The number of tensors must be the same")
+
+        components = nested.unbind()
+        if like is not None:
+            tensors = [ta_tensors.wrap(tensor, like=like_tensor) for tensor, like_tensor in zip(components, like)]
+        elif issubclass(cls.tensors_type, TATensor):
+            tensors = [cls.tensors_type(tensor) for tensor in components]
+        else:
+            tensors = list(components)
+        nested_tensors = cls(tensors)
+
+        if nested.is_contiguous():
+            # The buffer of the nested tensor starts at the offset of its first component.
+            numel = sum(component.numel() for component in components)
+            storage_offset = components[0].storage_offset() - int(nested._nested_tensor_storage_offsets()[0])
+            nested_tensors._packed_data = components[0].as_strided((numel,), (1,), storage_offset)
+        return nested_tensors
+
+    def _packed_op(self, op: str, other: Any = None) -> Optional[Self]:
+        # Apply an operation to the whole packed buffer, if both operands are packed similarly.
+        if not self.is_packed:
+            return None
+        elif isinstance(other, TANestedTensors):
+            if not other.is_packed or other.shapes != self.shapes:
+                return None
+            other = other._packed_data
+        elif isinstance(other, Tensor) and other.ndim > 0:
+            return None
+
+        data = self._packed_data
+        args = () if other is None else (other,)
+        if op.endswith("_"):
+            getattr(data, op)(*args)
+            return self
+        return self._from_packed(getattr(data, op)(*args), self.shapes, self.tensors)
+
+    def _foreach_op(self, op: str, other: Any) -> Optional[Self]:
+        # Apply an operation to all the tensors with the multi-tensor kernel of torch._foreach_*, if there is one.
+        foreach_op = getattr(torch, f"_foreach_{op}", None)
+        if foreach_op is None:
+            return None
+        elif isinstance(other, TANestedTensors):
+            if not isinstance(other, self.__class__) or len(other) != len(self):
+                return None
+            other = [tensor.as_subclass(Tensor) for tensor in other.tensors]
+        elif isinstance(other, Tensor):
+            other = other.as_subclass(Tensor)
+            if other.ndim > 0:
+                other = [other] * len(self)
+        elif not isinstance(other, (int, float)):
+            return None
+        elif isinstance(other, float) and op.endswith("_") and self.dtype.is_floating_point:
+            # The in-place multi-tensor kernels can round Python scalars to the dtype of reduced precision tensors.
+            other = torch.tensor(other, dtype=torch.float64, device=self.device)
+
+        outputs = foreach_op([tensor.as_subclass(Tensor) for tensor in self.tensors], other)
+        if op.endswith("_"):
+            return self
+        return self._wrap_tensors(outputs)
+
+    def _bulk_op(self, op: str, other: Any) -> Optional[Self]:
+        # Apply an operation at once on the packed buffer or with a multi-tensor kernel, None if neither applies.
+        output = self._packed_op(op, other)
+        return output if output is not None else self._foreach_op(op, other)
+
+    def _wrap_tensors(self, tensors: Sequence[Tensor]) -> Self:
+        if self._return_type == "TATensor":
+            return self.__class__(
+                [ta_tensors.wrap(output, like=tensor) for output, tensor in zip(tensors, self.tensors)]
+            )
+        return self.__class__(list(tensors))
+
+    def _copy_tensors(self, non_blocking: bool = False, **kwargs: Any) -> Optional[Self]:
+        # Copy the tensors to new tensors created with torch.empty_like(tensor, **kwargs) with a multi-tensor kernel.
+        # The copy is not recorded by autograd, so tensors that require grad are not handled.
+        if torch.is_grad_enabled() and any(tensor.requires_grad for tensor in self.tensors):
+            return None
+        tensors = [tensor.as_subclass(Tensor) for tensor in self.tensors]
+        outputs = [torch.empty_like(tensor, **kwargs) for tensor in tensors]
+        torch._foreach_copy_(outputs, tensors, non_blocking=non_blocking)
+        return self._wrap_tensors(outputs)
+
+    def __reduce_ex__(self, protocol):
+        if not self.is_packed:
+            return super().__reduce_ex__(protocol)
+        # Pickle the buffer once instead of the whole storage for each of its views.
+        likes = [ta_tensors.wrap(tensor.as_subclass(Tensor).new_empty(0), like=tensor) for tensor in self.tensors]
+        return (_rebuild_packed_ta_nested_tensors, (self.__class__, self._packed_data, self.shapes, likes))
+
     @property
     def batch_size(self) -> int:
         """Return the batch size of the nested tensors."""
@@ -178,9 +409,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
                 raise ValueError("The length of the value must be equal to the length of the index")
             for i, v in zip(index, value):
                 self.tensors[i] = v
+            self._check_tensors(value)
         else:
             self.tensors[index] = value
-        self._check_tensors()
+            self._check_tensors([value])
 
     def __iter__(self) -> Iterator[T]:
         return iter(self.tensors)
@@ -205,12 +437,21 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def clone(self, memory_format: Optional[memory_format] = None) -> Self:
         """Return a deep copy of the nested tensors."""
-        with set_return_type(self._return_type):
+        if memory_format in (None, torch.preserve_format, torch.contiguous_format):
+            bulk_output = self._packed_op("clone")
+            if bulk_output is None:
+                bulk_output = self._copy_tensors(memory_format=memory_format or torch.preserve_format)
+            if bulk_output is not None:
+                return bulk_output
+        with _local_return_type(self._return_type):
             return self.__class__([tensor.clone(memory_format=memory_format) for tensor in self.tensors])
 
     def add(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Add a tensor or a scalar to the nested tensors."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("add", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 return self.__class__([tensor + other for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -227,7 +468,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def add_(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Add a tensor or a scalar to the nested tensors in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("add_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 for tensor in self.tensors:
                     tensor.add_(other)
@@ -248,7 +492,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def sub(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Subtract a tensor or a scalar to the nested tensors."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("sub", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 return self.__class__([tensor.sub(other) for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -265,7 +512,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def sub_(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Subtract a tensor or a scalar to the nested tensors in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("sub_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 for tensor in self.tensors:
                     tensor.sub_(other)
@@ -286,7 +536,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def mul(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Multiply a tensor or a scalar to the nested tensors."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("mul", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 return self.__class__([tensor.mul(other) for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -304,7 +557,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def mul_(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Multiply a tensor or a scalar to the nested tensors in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("mul_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 for tensor in self.tensors:
                     tensor.mul_(other)
@@ -325,7 +581,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def div(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Divide the nested tensors by a tensor or a scalar."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("div", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 return self.__class__([tensor.div(other) for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -342,7 +601,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def div_(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Divide the nested tensors by a tensor or a scalar in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("div_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 for tensor in self.tensors:
                     tensor.div_(other)
@@ -363,7 +625,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def floor_divide(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Floor divide the nested tensors by a tensor or a scalar."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("floor_divide", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 return self.__class__([tensor.floor_divide(other) for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -380,7 +645,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def floor_divide_(self, other: Union[Self, T, Tensor, Number, _complex, torch.SymInt, torch.SymFloat]) -> Self:
         """Floor divide the nested tensors by a tensor or a scalar in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("floor_divide_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (self.tensors_type, Tensor, Number, _complex, torch.SymInt, torch.SymFloat)):
                 for tensor in self.tensors:
                     tensor.floor_divide_(other)
@@ -401,7 +669,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def remainder(self, other: Union[Self, T, Tensor, Number, _complex]) -> Self:
         """Return the remainder of the nested tensors by a tensor or a scalar."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("remainder", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (Tensor, Number, _complex)):
                 return self.__class__([tensor.remainder(other) for tensor in self.tensors])
             elif not isinstance(other, self.__class__):
@@ -418,7 +689,10 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
 
     def remainder_(self, other: Union[Self, T, Tensor, Number, _complex]) -> Self:
         """Return the remainder of the nested tensors by a tensor or a scalar in-place."""
-        with set_return_type(self._return_type):
+        bulk_output = self._bulk_op("remainder_", other)
+        if bulk_output is not None:
+            return bulk_output
+        with _local_return_type(self._return_type):
             if isinstance(other, (Tensor, Number, _complex)):
                 for tensor in self.tensors:
                     tensor.remainder_(other)
@@ -451,7 +725,23 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
         memory_format: Optional[torch.memory_format] = None,
     ) -> Self:
         """Move the nested tensors to a new device and/or dtype."""
-        with set_return_type(self._return_type):
+        if self.is_packed and memory_format in (None, torch.preserve_format, torch.contiguous_format):
+            data = self._packed_data.to(device=device, dtype=dtype, non_blocking=non_blocking, copy=copy)
+            return self._from_packed(data, self.shapes, self.tensors)
+        elif (
+            copy
+            or (dtype is not None and dtype != self.dtype)
+            or (device is not None and torch.device(device) != self.device)
+        ):
+            bulk_output = self._copy_tensors(
+                non_blocking=non_blocking,
+                dtype=dtype,
+                device=device,
+                memory_format=memory_format or torch.preserve_format,
+            )
+            if bulk_output is not None:
+                return bulk_output
+        with _local_return_type(self._return_type):
             return self.__class__(
                 [
                     tensor.to(
@@ -461,9 +751,40 @@ class TANestedTensors(ABC, Generic[T, BATCH_T]):
                 ]
             )
 
+    def to_dtype_(self, dtype: torch.dtype, scale: bool = False) -> Self:
+        """Convert the nested tensors to a dtype in-place, by replacing their tensors.
+
+        The conversion is a single operation on the buffer of packed nested tensors and uses multi-tensor kernels
+        otherwise.
+
+        Args:
+            dtype: The dtype to convert to.
+            scale: Whether to scale the values of images, videos and pure tensors from the input dtype range to the
+                output dtype range, see :func:`~torchaug.transforms.functional.to_dtype`. Ignored for other types.
+
+        Returns:
+            The converted nested tensors.
+        """
+        if dtype == self.dtype:
+            return self
+        scale = scale and (issubclass(self.tensors_type, (Image, Video)) or self.tensors_type is Tensor)
+
+        if self.is_packed:
+            [data] = _foreach_to_dtype([self._packed_data.as_subclass(Tensor)], dtype, scale)
+            converted = self._from_packed(data, self.shapes, self.tensors)
+        else:
+            converted = self._wrap_tensors(
+                _foreach_to_dtype([tensor.as_subclass(Tensor) for tensor in self.tensors], dtype, scale)
+            )
+        self.tensors = converted.tensors
+        self._packed_data = converted._packed_data
+        return self
+
     def pin_memory(self, device: Optional[DeviceLikeType] = None) -> Self:
         """Pin the memory of the nested tensors."""
-        with set_return_type(self._return_type):
+        if self.is_packed:
+            return self._from_packed(self._packed_data.pin_memory(device=device), self.shapes, self.tensors)
+        with _local_return_type(self._return_type):
             return self.__class__([tensor.pin_memory(device=device) for tensor in self.tensors])
 
     def to_batch(self) -> BATCH_T:
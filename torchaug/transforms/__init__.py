@@ -7,64 +7,132 @@
 # ruff: noqa: F401
 # ruff: noqa: D104
 
+from typing import TYPE_CHECKING
+
 from torchvision.transforms import AutoAugmentPolicy, InterpolationMode
 
-from . import functional
-from ._augment import JPEG, CutMix, MixUp, RandomErasing
-from ._auto_augment import AugMix, AutoAugment, RandAugment, TrivialAugmentWide
-from ._color import (
-    RGB,
-    ColorJitter,
-    Grayscale,
-    RandomAdjustSharpness,
-    RandomAutocontrast,
-    RandomChannelPermutation,
-    RandomColorJitter,
-    RandomEqualize,
-    RandomGrayscale,
-    RandomInvert,
-    RandomPhotometricDistort,
-    RandomPosterize,
-    RandomSolarize,
-)
-from ._container import (
-    Compose,
-    RandomApply,
-    RandomChoice,
-    RandomOrder,
-    SequentialTransform,
-)
-from ._geometry import (
-    CenterCrop,
-    ElasticTransform,
-    FiveCrop,
-    Pad,
-    RandomAffine,
-    RandomCrop,
-    RandomHorizontalFlip,
-    RandomIoUCrop,
-    RandomPerspective,
-    RandomResize,
-    RandomResizedCrop,
-    RandomRotation,
-    RandomShortestSize,
-    RandomVerticalFlip,
-    RandomZoomOut,
-    Resize,
-    ScaleJitter,
-    TenCrop,
-)
-from ._meta import ClampBoundingBoxes, ConvertBoundingBoxFormat
-from ._misc import (
-    GaussianBlur,
-    Identity,
-    Lambda,
-    LinearTransformation,
-    Normalize,
-    RandomGaussianBlur,
-    SanitizeBoundingBoxes,
-    ToDtype,
+from torchaug._lazy import _lazy_importer
+
+
+# The transforms are imported on first access so that only the modules of the used transforms are imported.
+__getattr__, __dir__, _lazy_all = _lazy_importer(
+    __name__,
+    {
+        "_augment": ["JPEG", "CutMix", "MixUp", "RandomErasing"],
+        "_auto_augment": ["AugMix", "AutoAugment", "RandAugment", "TrivialAugmentWide"],
+        "_color": [
+            "RGB",
+            "ColorJitter",
+            "Grayscale",
+            "RandomAdjustSharpness",
+            "RandomAutocontrast",
+            "RandomChannelPermutation",
+            "RandomColorJitter",
+            "RandomEqualize",
+            "RandomGrayscale",
+            "RandomInvert",
+            "RandomPhotometricDistort",
+            "RandomPosterize",
+            "RandomSolarize",
+        ],
+        "_container": ["Compose", "RandomApply", "RandomChoice", "RandomOrder", "SequentialTransform"],
+        "_executor": ["ChunkExecutor"],
+        "_geometry": [
+            "CenterCrop",
+            "ElasticTransform",
+            "FiveCrop",
+            "Pad",
+            "RandomAffine",
+            "RandomCrop",
+            "RandomHorizontalFlip",
+            "RandomIoUCrop",
+            "RandomPerspective",
+            "RandomResize",
+            "RandomResizedCrop",
+            "RandomRotation",
+            "RandomShortestSize",
+            "RandomVerticalFlip",
+            "RandomZoomOut",
+            "Resize",
+            "ScaleJitter",
+            "TenCrop",
+        ],
+        "_meta": ["ClampBoundingBoxes", "ConvertBoundingBoxFormat"],
+        "_misc": [
+            "GaussianBlur",
+            "Identity",
+            "Lambda",
+            "LinearTransformation",
+            "Normalize",
+            "RandomGaussianBlur",
+            "SanitizeBoundingBoxes",
+            "ToDtype",
+            "ToDtypeNormalize",
+        ],
+        "_profiling": ["TransformProfiler", "TransformStats", "TransformTracer"],
+        "_temporal": ["UniformTemporalSubsample"],
+        "_transform": ["RandomApplyTransform", "Transform"],
+        "_type_conversion": ["NestedToBatch", "NestedToList", "ToBatchImages", "ToImage", "ToPureTensor"],
+    },
+    submodules=["functional"],
 )
-from ._temporal import UniformTemporalSubsample
-from ._transform import RandomApplyTransform, Transform
-from ._type_conversion import NestedToBatch, NestedToList, ToBatchImages, ToImage, ToPureTensor
+__all__ = ["AutoAugmentPolicy", "InterpolationMode", *_lazy_all]
+
+# The eager imports of the lazy attributes for the type checkers and the IDEs.
+if TYPE_CHECKING:
+    from . import functional
+    from ._augment import JPEG, CutMix, MixUp, RandomErasing
+    from ._auto_augment import AugMix, AutoAugment, RandAugment, TrivialAugmentWide
+    from ._color import (
+        RGB,
+        ColorJitter,
+        Grayscale,
+        RandomAdjustSharpness,
+        RandomAutocontrast,
+        RandomChannelPermutation,
+        RandomColorJitter,
+        RandomEqualize,
+        RandomGrayscale,
+        RandomInvert,
+        RandomPhotometricDistort,
+        RandomPosterize,
+        RandomSolarize,
+    )
+    from ._container import Compose, RandomApply, RandomChoice, RandomOrder, SequentialTransform
+    from ._executor import ChunkExecutor
+    from ._geometry import (
+        CenterCrop,
+        ElasticTransform,
+        FiveCrop,
+        Pad,
+        RandomAffine,
+        RandomCrop,
+        RandomHorizontalFlip,
+        RandomIoUCrop,
+        RandomPerspective,
+        RandomResize,
+        RandomResizedCrop,
+        RandomRotation,
+        RandomShortestSize,
+        RandomVerticalFlip,
+        RandomZoomOut,
+        Resize,
+        ScaleJitter,
+        TenCrop,
+    )
+    from ._meta import ClampBoundingBoxes, ConvertBoundingBoxFormat
+    from ._misc import (
+        GaussianBlur,
+        Identity,
+        Lambda,
+        LinearTransformation,
+        Normalize,
+        RandomGaussianBlur,
+        SanitizeBoundingBoxes,
+        ToDtype,
+        ToDtypeNormalize,
+    )
+    from ._profiling import TransformProfiler, TransformStats, TransformTracer
+    from ._temporal import UniformTemporalSubsample
+    from ._transform import RandomApplyTransform, Transform
+    from ._type_conversion import NestedToBatch, NestedToList, ToBatchImages, ToImage, ToPureTensor
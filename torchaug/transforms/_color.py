@@ -18,6 +18,7 @@ import torch
 from . import functional as F
 from ._transform import RandomApplyTransform, Transform
 from ._utils import query_chw
+from .functional._utils import _get_compute_dtype
 
 
 class Grayscale(Transform):
@@ -130,6 +131,10 @@ class RandomColorJitter(RandomApplyTransform):
         num_chunks: number of chunks to split the input into.
         permute_chunks: whether to permute the chunks.
         batch_transform: whether to apply the transform in batch mode.
+        compute_dtype: floating dtype used in batch mode to adjust brightness, contrast and saturation of integer
+            inputs, e.g. ``torch.bfloat16`` or ``torch.float16`` to trade accuracy for speed and memory. The output
+            keeps the dtype of the input. If ``None``, ``torch.float32`` is used. Hue is always adjusted in
+            ``torch.float32`` as the conversion to HSV space requires a higher precision.
     """
 
     def __init__(
@@ -143,6 +148,7 @@ class RandomColorJitter(RandomApplyTransform):
         num_chunks: int = 1,
         permute_chunks: bool = False,
         batch_transform: bool = False,
+        compute_dtype: Optional[torch.dtype] = None,
     ) -> None:
         super().__init__(
             p=p,
@@ -151,6 +157,7 @@ class RandomColorJitter(RandomApplyTransform):
             permute_chunks=permute_chunks,
             batch_transform=batch_transform,
         )
+        self.compute_dtype = _get_compute_dtype(compute_dtype)
         self.brightness = self._check_input(brightness, "brightness")
         self.contrast = self._check_input(contrast, "contrast")
         self.saturation = self._check_input(saturation, "saturation")
@@ -288,24 +295,28 @@ class RandomColorJitter(RandomApplyTransform):
         contrast_factor = params["contrast_factor"]
         saturation_factor = params["saturation_factor"]
         hue_factor = params["hue_factor"]
+        batch_kwargs = {"compute_dtype": self.compute_dtype} if self.batch_transform else {}
         for fn_id in params["fn_idx"]:
             if fn_id == 0 and brightness_factor is not None:
                 output = self._call_kernel(
                     F.adjust_brightness_batch if self.batch_transform else F.adjust_brightness,  # type: ignore[arg-type]
                     output,
                     brightness_factor=brightness_factor,
+                    **batch_kwargs,
                 )
             elif fn_id == 1 and contrast_factor is not None:
                 output = self._call_kernel(
                     F.adjust_contrast_batch if self.batch_transform else F.adjust_contrast,  # type: ignore[arg-type]
                     output,
                     contrast_factor=contrast_factor,
+                    **batch_kwargs,
                 )
             elif fn_id == 2 and saturation_factor is not None:
                 output = self._call_kernel(
                     F.adjust_saturation_batch if self.batch_transform else F.adjust_saturation,  # type: ignore[arg-type]
                     output,
                     saturation_factor=saturation_factor,
+                    **batch_kwargs,
                 )
             elif fn_id == 3 and hue_factor is not None:
                 output = self._call_kernel(
@@ -343,6 +354,10 @@ class ColorJitter(RandomColorJitter):
         num_chunks: number of chunks to split the input into.
         permute_chunks: whether to permute the chunks.
         batch_transform: whether to apply the transform in batch mode.
+        compute_dtype: floating dtype used in batch mode to adjust brightness, contrast and saturation of integer
+            inputs, e.g. ``torch.bfloat16`` or ``torch.float16`` to trade accuracy for speed and memory. The output
+            keeps the dtype of the input. If ``None``, ``torch.float32`` is used. Hue is always adjusted in
+            ``torch.float32`` as the conversion to HSV space requires a higher precision.
     """
 
     def __init__(
@@ -355,6 +370,7 @@ class ColorJitter(RandomColorJitter):
         num_chunks: int = 1,
         permute_chunks: bool = False,
         batch_transform: bool = False,
+        compute_dtype: Optional[torch.dtype] = None,
     ) -> None:
         super().__init__(
             brightness=brightness,
@@ -366,6 +382,7 @@ class ColorJitter(RandomColorJitter):
             num_chunks=num_chunks,
             permute_chunks=permute_chunks,
             batch_transform=batch_transform,
+            compute_dtype=compute_dtype,
         )
 
     def extra_repr(self) -> str:  # type: ignore[override]
@@ -9,18 +9,28 @@
 
 from __future__ import annotations
 
+import threading
+import warnings
 from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 import torch
 from torch import nn
 from torch.utils._pytree import tree_flatten, tree_unflatten
 
+from torchaug import ta_tensors
 from torchaug._utils import _log_api_usage_once
-from torchaug.transforms._utils import _assert_list_of_modules
+from torchaug.transforms._utils import _assert_list_of_modules, is_pure_tensor
 
+from ._executor import ChunkExecutor
+from ._optimizer import _optimize_transforms
+from ._profiling import _call_transform
 from ._transform import RandomApplyTransform, Transform
 
 
+# Guards the upcast stages recorded by the concurrent calls of the sequential transforms.
+_UPCAST_STAGES_LOCK = threading.Lock()
+
+
 class Compose(Transform):
     """Composes several transforms together.
 
@@ -60,8 +70,8 @@ class Compose(Transform):
 
     def forward(self, *inputs: Any) -> Any:
         needs_unpacking = len(inputs) > 1
-        for transform in self.transforms:
-            outputs = transform(*inputs)
+        for i, transform in enumerate(self.transforms):
+            outputs = _call_transform(i, transform, *inputs)
             inputs = outputs if needs_unpacking else (outputs,)
         return outputs
 
@@ -109,8 +119,8 @@ class RandomApply(Transform):
         if torch.rand(1) >= self.p:
             return inputs if needs_unpacking else inputs[0]
 
-        for transform in self.transforms:
-            outputs = transform(*inputs)
+        for i, transform in enumerate(self.transforms):
+            outputs = _call_transform(i, transform, *inputs)
             inputs = outputs if needs_unpacking else (outputs,)
         return outputs
 
@@ -155,7 +165,7 @@ class RandomChoice(Transform):
     def forward(self, *inputs: Any) -> Any:
         idx = int(torch.multinomial(torch.tensor(self.p_choices), 1))
         transform = self.transforms[idx]
-        return transform(*inputs)
+        return _call_transform(idx, transform, *inputs)
 
 
 class RandomOrder(Transform):
@@ -175,9 +185,9 @@ class RandomOrder(Transform):
 
     def forward(self, *inputs: Any) -> Any:
         needs_unpacking = len(inputs) > 1
-        for idx in torch.randperm(len(self.transforms)):
+        for idx in torch.randperm(len(self.transforms)).tolist():
             transform = self.transforms[idx]
-            outputs = transform(*inputs)
+            outputs = _call_transform(idx, transform, *inputs)
             inputs = outputs if needs_unpacking else (outputs,)
         return outputs
 
@@ -202,8 +212,38 @@ class SequentialTransform(Transform):
 
         Passing `batch_transform=False` will make the transforms non-batched and not inplace.
 
+    .. note::
+        By default the list of transforms is optimized at construction: :class:`~torchaug.transforms.Identity`
+        transforms are dropped, adjacent pointwise transforms such as :class:`~torchaug.transforms.ToDtype`
+        followed by :class:`~torchaug.transforms.Normalize` are fused, consecutive identical
+        :class:`~torchaug.transforms.Resize` are collapsed and pointwise image transforms can be moved before flips
+        to be fused. The applied rewrites are displayed in the representation of the transform. Pass
+        `optimize=False` to keep the transforms as is.
+
+    .. note::
+        The kernels preserve the ``torch.channels_last`` memory format of
+        :class:`~torchaug.ta_tensors.BatchImages`. Pass `channels_last=True` to convert the input batches of
+        images to this memory format before the first transform, which guarantees channels-last outputs, e.g.
+        for models trained with ``torch.channels_last``.
+
+    .. note::
+        Pass `keep_uint8=True` to keep ``uint8`` images and videos between the transforms and convert them to
+        floats once at the end of the pipeline, which divides the memory traffic between transforms by 4. The
+        conversions to floats are moved after the following flips and crops that are exact on integers and the
+        transforms that still convert ``uint8`` data to another dtype before the last transform are reported in
+        :attr:`upcast_stages` with a warning.
+
+    .. note::
+        Pass a :class:`~torchaug.transforms.ChunkExecutor` as `chunk_executor` to transform the chunks of the batch
+        transforms concurrently in a pool of threads instead of serially.
+
     Args:
         transforms: A list of transforms.
+        optimize: Whether to optimize the list of transforms.
+        channels_last: Whether to emit batches of images in the ``torch.channels_last`` memory format.
+        keep_uint8: Whether to keep ``uint8`` images and videos between the transforms.
+        chunk_executor: The executor of the chunks of the transforms. If ``None``, the chunks are transformed
+            serially.
         transforms_attributes_override: Additional parameters to override the default parameters
             of the transforms if they exist. Useful to make transforms for batches. The list of
             parameters that can be overridden are:
@@ -212,6 +252,7 @@ class SequentialTransform(Transform):
                 - batch_transform: whether the transform is batched or not.
                 - num_chunks: number of chunks to split the input tensor.
                 - permute_chunks: whether to permute the chunks or not.
+                - compute_dtype: floating dtype used by the batch kernels on integer inputs.
     """
 
     _receive_flatten_inputs = False
@@ -219,6 +260,10 @@ class SequentialTransform(Transform):
     def __init__(
         self,
         transforms: List[RandomApplyTransform],
+        optimize: bool = True,
+        channels_last: bool = False,
+        keep_uint8: bool = False,
+        chunk_executor: Optional[ChunkExecutor] = None,
         **transforms_attributes_override: Dict[str, Any],
     ) -> None:
         super().__init__()
@@ -226,6 +271,16 @@ class SequentialTransform(Transform):
 
         _assert_list_of_modules(transforms)
 
+        self.optimize = optimize
+        self.channels_last = channels_last
+        self.keep_uint8 = keep_uint8
+        self.chunk_executor = chunk_executor
+        self._upcast_stages: List[str] = []
+        if optimize:
+            transforms, self._optimization_plan = _optimize_transforms(transforms, keep_uint8=keep_uint8)
+        else:
+            self._optimization_plan = []
+
         base_override: Dict[str, Any] = {
             "inplace": True,
             "batch_inplace": True,
@@ -256,6 +311,8 @@ class SequentialTransform(Transform):
                     has_key = key in parameters
                     if has_key:
                         setattr(transform, key, value)
+            if self.chunk_executor is not None:
+                transform.chunk_executor = self.chunk_executor
 
             transform._receive_flatten_inputs = True
 
@@ -270,18 +327,82 @@ class SequentialTransform(Transform):
             flat_inputs, spec = tree_flatten(inputs)
         else:
             flat_inputs = list(inputs)
-        for transform in self.transforms:
-            flat_inputs = transform(*flat_inputs)
+        if self.channels_last:
+            flat_inputs = self._to_channels_last(flat_inputs)
+        for i, transform in enumerate(self.transforms):
+            if self.keep_uint8:
+                uint8_indices = [j for j, inpt in enumerate(flat_inputs) if self._is_uint8_image_or_video(inpt)]
+            flat_inputs = _call_transform(i, transform, *flat_inputs)
+            if self.keep_uint8 and i < len(self.transforms) - 1:
+                self._check_upcast(i, transform, [flat_inputs[j] for j in uint8_indices])
+        if self.channels_last:
+            # No-op unless a transform returned a view, e.g. a crop.
+            flat_inputs = self._to_channels_last(flat_inputs)
 
         if not self._receive_flatten_inputs:
             return tree_unflatten(flat_inputs, spec)
 
         return flat_inputs
 
+    @property
+    def upcast_stages(self) -> List[str]:
+        """The transforms that converted ``uint8`` images or videos to another dtype before the last transform.
+
+        Only filled if `keep_uint8` is ``True``.
+        """
+        with _UPCAST_STAGES_LOCK:
+            return list(self._upcast_stages)
+
+    @staticmethod
+    def _is_uint8_image_or_video(inpt: Any) -> bool:
+        return (
+            is_pure_tensor(inpt)
+            or isinstance(
+                inpt,
+                (
+                    ta_tensors.Image,
+                    ta_tensors.Video,
+                    ta_tensors.BatchImages,
+                    ta_tensors.PaddedBatchImages,
+                    ta_tensors.BatchVideos,
+                ),
+            )
+        ) and inpt.dtype == torch.uint8
+
+    def _check_upcast(self, idx: int, transform: nn.Module, outputs: List[Any]) -> None:
+        for output in outputs:
+            if isinstance(output, torch.Tensor) and output.dtype != torch.uint8:
+                stage = f"{idx}: {type(transform).__name__}"
+                with _UPCAST_STAGES_LOCK:
+                    if stage in self._upcast_stages:
+                        return
+                    self._upcast_stages.append(stage)
+                warnings.warn(
+                    f"{type(transform).__name__} at index {idx} converted uint8 data to {output.dtype} before "
+                    f"{len(self.transforms) - idx - 1} other transforms. Convert the data to floats at the end "
+                    "of the pipeline to keep uint8 data between transforms."
+                )
+                return
+
+    @staticmethod
+    def _to_channels_last(flat_inputs: List[Any]) -> List[Any]:
+        return [
+            ta_tensors.wrap(inpt.as_subclass(torch.Tensor).contiguous(memory_format=torch.channels_last), like=inpt)
+            if isinstance(inpt, (ta_tensors.BatchImages, ta_tensors.PaddedBatchImages)) and inpt.ndim == 4
+            else inpt
+            for inpt in flat_inputs
+        ]
+
     def extra_repr(self) -> str:  # type: ignore[override]
         format_string = []
         for t in self.transforms:
             format_string.append(f"    {t}")
-        return f"transforms_attributes_override={self.transforms_attributes_override},\ntransforms=\n" + "\n".join(
-            format_string
+        optimization_plan = f"optimization_plan={self._optimization_plan},\n" if self._optimization_plan else ""
+        return (
+            f"transforms_attributes_override={self.transforms_attributes_override},\noptimize={self.optimize},\n"
+            + (f"channels_last={self.channels_last},\n" if self.channels_last else "")
+            + (f"keep_uint8={self.keep_uint8},\n" if self.keep_uint8 else "")
+            + optimization_plan
+            + "transforms=\n"
+            + "\n".join(format_string)
         )
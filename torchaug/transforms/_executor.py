@@ -0,0 +1,156 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+
+from torchaug.ta_tensors._torch_function_helpers import _LOCAL_RETURN_TYPE
+
+from . import _profiling
+
+
+# Whether the current thread is a thread of a ChunkExecutor, whose chunks are then run serially to avoid deadlocks.
+_WORKER_STATE = threading.local()
+
+
+class ChunkExecutor:
+    """Run the chunks of the batch transforms concurrently in a pool of threads.
+
+    A batch transform with ``num_chunks > 1`` samples random parameters per chunk and transforms the chunks one after
+    the other. The chunks write to disjoint samples of the batch, so with an executor set as its ``chunk_executor``
+    the chunks are transformed concurrently by the threads of the pool and then written back to the batch in order.
+    Many small chunks are often faster this way on CPUs with many cores than serially with all the intra-op threads
+    of PyTorch, which do not scale on small tensors.
+
+    Each thread of the pool uses ``num_threads_per_worker`` intra-op threads of PyTorch, set with
+    :func:`torch.set_num_threads` when the thread starts. It only applies to the thread with the OpenMP backend of
+    PyTorch, the default one, see :func:`torch.__config__.parallel_info`. The pool is started at the first call and
+    started again in the processes forked from the one that started it, e.g. in the workers of a
+    :class:`~torch.utils.data.DataLoader`. The executor can be shared by several transforms and threads, and the
+    chunks of a transform called from a thread of the pool are transformed serially.
+
+    Example:
+        >>> executor = ChunkExecutor(num_workers=4, num_threads_per_worker=2)
+        >>> transforms = SequentialTransform(
+        >>>     [RandomResizedCrop(224), RandomColorJitter(0.4, 0.4, 0.4, p=0.8)],
+        >>>     num_chunks=16,
+        >>>     chunk_executor=executor,
+        >>> )
+
+    Args:
+        num_workers: The number of threads of the pool.
+        num_threads_per_worker: The number of intra-op threads of PyTorch in each thread of the pool. If ``None``,
+            the number of threads of PyTorch when the pool starts divided by ``num_workers``, at least 1.
+    """
+
+    def __init__(self, num_workers: int = 4, num_threads_per_worker: Optional[int] = 1) -> None:
+        if num_workers < 1:
+            raise ValueError(f"num_workers should be a positive integer. Got {num_workers}.")
+        elif num_threads_per_worker is not None and num_threads_per_worker < 1:
+            raise ValueError(
+                f"num_threads_per_worker should be a positive integer or None. Got {num_threads_per_worker}."
+            )
+        self.num_workers = num_workers
+        self.num_threads_per_worker = num_threads_per_worker
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(num_workers={self.num_workers}, "
+            f"num_threads_per_worker={self.num_threads_per_worker})"
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The pool and the lock cannot be pickled, e.g. to send the transforms to the workers of a DataLoader.
+        return {"num_workers": self.num_workers, "num_threads_per_worker": self.num_threads_per_worker}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]
+
+    def __enter__(self) -> ChunkExecutor:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+
+    def _init_worker(self, num_threads: int) -> None:
+        _WORKER_STATE.is_worker = True
+        torch.set_num_threads(num_threads)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            pid = os.getpid()
+            if self._pool is None or self._pid != pid:
+                # The threads of the pool of the parent process do not exist in a forked process.
+                num_threads = self.num_threads_per_worker or max(1, torch.get_num_threads() // self.num_workers)
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.num_workers,
+                    thread_name_prefix="torchaug_chunk",
+                    initializer=self._init_worker,
+                    initargs=(num_threads,),
+                )
+                self._pid = pid
+            return self._pool
+
+    def map(self, fn: Callable[[int], Any], num_tasks: int) -> List[Any]:
+        """Call a function on the indices of the tasks concurrently.
+
+        The return type of the torch operations on :class:`~torchaug.ta_tensors.TATensor` set for the calling thread
+        and the transform profiled by the active :class:`~torchaug.transforms.TransformProfiler` are also set in the
+        threads of the pool.
+
+        Args:
+            fn: The function called on each index.
+            num_tasks: The number of tasks.
+
+        Returns:
+            The outputs of the function in the order of the indices. The first exception raised by the function is
+            raised again once all the tasks are done.
+        """
+        if num_tasks <= 1 or getattr(_WORKER_STATE, "is_worker", False):
+            return [fn(i) for i in range(num_tasks)]
+
+        return_type = getattr(_LOCAL_RETURN_TYPE, "value", None)
+        profiler = _profiling._ACTIVE_PROFILER
+        transform_stats = profiler._stack[-1] if profiler is not None and profiler._stack else None
+
+        def run(i: int) -> Any:
+            # Propagate the state of the calling thread to the thread of the pool.
+            previous_return_type = getattr(_LOCAL_RETURN_TYPE, "value", None)
+            _LOCAL_RETURN_TYPE.value = return_type
+            if transform_stats is not None:
+                profiler._stack.append(transform_stats)  # type: ignore[union-attr]
+            try:
+                return fn(i)
+            finally:
+                if transform_stats is not None:
+                    profiler._stack.pop()  # type: ignore[union-attr]
+                _LOCAL_RETURN_TYPE.value = previous_return_type
+
+        pool = self._get_pool()
+        futures = [pool.submit(run, i) for i in range(num_tasks)]
+        # Wait for all the tasks before raising, so that no task still writes to the inputs.
+        exceptions = [future.exception() for future in futures]
+        for exception in exceptions:
+            if exception is not None:
+                raise exception
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        """Stop the threads of the pool. The pool is started again by the next call."""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=True)
+            self._pool = None
+            self._pid = None
@@ -44,7 +44,7 @@ from torchvision.transforms.v2._utils import (
 from torchvision.transforms.v2.functional._geometry import _parse_pad_padding
 
 from torchaug import ta_tensors
-from torchaug.ta_tensors import set_return_type
+from torchaug.ta_tensors._torch_function_helpers import _local_return_type
 from torchaug.transforms.functional._utils._kernel import _FillType
 
 from . import functional as F
@@ -266,6 +266,13 @@ class RandomResizedCrop(Transform):
 
         self._log_ratio = torch.log(torch.tensor(self.ratio))
 
+    def _check_inputs(self, flat_inputs: List[Any]) -> None:
+        if has_any(flat_inputs, ta_tensors.PaddedBatchImages):
+            raise TypeError(
+                f"{type(self).__name__}() does not support inputs of type PaddedBatchImages: the crops would be "
+                "sampled over the padded canvas instead of the valid regions of the images."
+            )
+
     @property
     def _reshape_transform(self) -> bool:
         return True
@@ -925,6 +932,13 @@ class RandomCrop(Transform):
         self._fill = _setup_fill_arg(fill)
         self.padding_mode = padding_mode
 
+    def _check_inputs(self, flat_inputs: List[Any]) -> None:
+        if has_any(flat_inputs, ta_tensors.PaddedBatchImages):
+            raise TypeError(
+                f"{type(self).__name__}() does not support inputs of type PaddedBatchImages: the crops would be "
+                "sampled over the padded canvas instead of the valid regions of the images."
+            )
+
     @property
     def _reshape_transform(self) -> bool:
         return True
@@ -1212,7 +1226,7 @@ class ElasticTransform(Transform):
         for i in range(num_chunks):
             is_first_input_ta_tensor = isinstance(flat_inputs[0], ta_tensors.TATensor)
             if is_first_input_ta_tensor:
-                with set_return_type("TATensor"):
+                with _local_return_type("TATensor"):
                     chunk_input = flat_inputs[0][chunks_indices]
                 chunk_batch_size = self._get_input_batch_size([chunk_input])
             else:
@@ -19,6 +19,7 @@ from torchvision.transforms.v2._utils import _setup_number_or_seq, _setup_size
 from torchaug import ta_tensors
 from torchaug.ta_tensors import _BatchConcatenatedTATensor
 
+from . import _profiling
 from . import functional as F
 from ._transform import RandomApplyTransform, Transform
 from ._utils import (
@@ -26,6 +27,7 @@ from ._utils import (
     get_sample_or_batch_bounding_boxes,
     is_pure_tensor,
 )
+from .functional._utils import _get_compute_dtype
 
 
 # TODO: do we want/need to expose this?
@@ -62,6 +64,7 @@ class Lambda(Transform):
         elif self.p == 0.0 or torch.rand(1) >= self.p:
             return flat_inputs
 
+        _profiling._report_single(flat_inputs)
         needs_transform_list = self._needs_transform_list(flat_inputs)
         params = self._get_params(
             [inpt for (inpt, needs_transform) in zip(flat_inputs, needs_transform_list) if needs_transform],
@@ -216,6 +219,9 @@ class Normalize(Transform):
         self.std = list(std)
         self.inplace = inplace
 
+    def forward_nested(self, flat_inputs: List[Any]) -> List[Any]:
+        return self._forward_nested_at_once(flat_inputs)
+
     def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
         return self._call_kernel(F.normalize, inpt, mean=self.mean, std=self.std, inplace=self.inplace)
 
@@ -236,6 +242,9 @@ class RandomGaussianBlur(RandomApplyTransform):
         batch_inplace: whether to apply the batch transform in-place.
             Does not prevent functionals to make copy but can reduce time and memory consumption.
         batch_transform: whether to apply the transform in batch mode.
+        compute_dtype: floating dtype used in batch mode to blur integer inputs, e.g. ``torch.bfloat16`` or
+            ``torch.float16`` to trade accuracy for speed and memory. The output keeps the dtype of the input.
+            If ``None``, ``torch.float32`` is used.
     """
 
     def __init__(
@@ -245,8 +254,10 @@ class RandomGaussianBlur(RandomApplyTransform):
         p: float = 0.5,
         batch_inplace: bool = False,
         batch_transform: bool = False,
+        compute_dtype: Optional[torch.dtype] = None,
     ) -> None:
         super().__init__(p=p, batch_inplace=batch_inplace, batch_transform=batch_transform)
+        self.compute_dtype = _get_compute_dtype(compute_dtype)
         self.kernel_size = _setup_size(kernel_size, "Kernel size should be a tuple/list of two integers")
         for ks in self.kernel_size:
             if ks <= 0 or ks % 2 == 0:
@@ -282,12 +293,11 @@ class RandomGaussianBlur(RandomApplyTransform):
         return params
 
     def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
-        return self._call_kernel(
-            F.gaussian_blur_batch if self.batch_transform else F.gaussian_blur,  # type: ignore[arg-type]
-            inpt,
-            self.kernel_size,
-            **params,
-        )
+        if self.batch_transform:
+            return self._call_kernel(
+                F.gaussian_blur_batch, inpt, self.kernel_size, compute_dtype=self.compute_dtype, **params
+            )
+        return self._call_kernel(F.gaussian_blur, inpt, self.kernel_size, **params)
 
 
 class GaussianBlur(RandomGaussianBlur):
@@ -305,6 +315,9 @@ class GaussianBlur(RandomGaussianBlur):
         batch_inplace: whether to apply the batch transform in-place.
             Does not prevent functionals to make copy but can reduce time and memory consumption.
         batch_transform: whether to apply the transform in batch mode.
+        compute_dtype: floating dtype used in batch mode to blur integer inputs, e.g. ``torch.bfloat16`` or
+            ``torch.float16`` to trade accuracy for speed and memory. The output keeps the dtype of the input.
+            If ``None``, ``torch.float32`` is used.
     """
 
     def __init__(
@@ -313,6 +326,7 @@ class GaussianBlur(RandomGaussianBlur):
         sigma: Union[int, float, Sequence[float]] = (0.1, 2.0),
         batch_inplace: bool = False,
         batch_transform: bool = False,
+        compute_dtype: Optional[torch.dtype] = None,
     ) -> None:
         super().__init__(
             kernel_size=kernel_size,
@@ -320,6 +334,7 @@ class GaussianBlur(RandomGaussianBlur):
             p=1,
             batch_inplace=batch_inplace,
             batch_transform=batch_transform,
+            compute_dtype=compute_dtype,
         )
 
 
@@ -358,6 +373,7 @@ class ToDtype(Transform):
                     ta_tensors.Image,
                     ta_tensors.Video,
                     ta_tensors.BatchImages,
+                    ta_tensors.PaddedBatchImages,
                     ta_tensors.BatchVideos,
                 ]
             )
@@ -370,6 +386,11 @@ class ToDtype(Transform):
         self.dtype = dtype
         self.scale = scale
 
+    def forward_nested(self, flat_inputs: List[Any]) -> List[Any]:
+        if isinstance(self.dtype, torch.dtype):
+            return self._forward_nested_at_once(flat_inputs)
+        return super().forward_nested(flat_inputs)
+
     def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
         if isinstance(self.dtype, torch.dtype):
             # For consistency / BC with ConvertImageDtype, we only care about images or videos when dtype
@@ -380,7 +401,10 @@ class ToDtype(Transform):
                     ta_tensors.Image,
                     ta_tensors.Video,
                     ta_tensors.BatchImages,
+                    ta_tensors.PaddedBatchImages,
                     ta_tensors.BatchVideos,
+                    ta_tensors.ImageNestedTensors,
+                    ta_tensors.VideoNestedTensors,
                 ),
             ):
                 return inpt
@@ -405,6 +429,7 @@ class ToDtype(Transform):
             (
                 ta_tensors.Image,
                 ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
                 ta_tensors.Video,
                 ta_tensors.BatchVideos,
             ),
@@ -419,6 +444,68 @@ class ToDtype(Transform):
         return self._call_kernel(F.to_dtype, inpt, dtype=dtype, scale=self.scale)
 
 
+class ToDtypeNormalize(Transform):
+    """Converts images or videos to a floating dtype and normalize them with mean and standard deviation.
+
+    This is equivalent to :class:`~torchaug.transforms.ToDtype` followed by :class:`~torchaug.transforms.Normalize`
+    but the conversion, the scaling and the normalization are performed in a single pass over the data that reads
+    e.g. ``uint8`` and directly writes the normalized ``float16``, ``bfloat16`` or ``float32`` output. Other inputs
+    are passed through.
+
+    .. note::
+        To write the output in a preallocated buffer, e.g. a pinned staging tensor, use
+        :func:`~torchaug.transforms.functional.to_dtype_normalize` with the ``out`` argument.
+
+    Args:
+        mean: Sequence of means for each channel.
+        std: Sequence of standard deviations for each channel.
+        dtype: The floating dtype to convert to.
+        scale: Whether to scale the values from the input dtype range to ``[0, 1]`` before normalization.
+    """
+
+    def __init__(
+        self,
+        mean: Sequence[float],
+        std: Sequence[float],
+        dtype: torch.dtype = torch.float32,
+        scale: bool = True,
+    ) -> None:
+        super().__init__()
+        if not isinstance(dtype, torch.dtype) or not dtype.is_floating_point:
+            raise ValueError(f"dtype should be a floating point torch.dtype, got {dtype} instead.")
+        self.mean = list(mean)
+        self.std = list(std)
+        self.dtype = dtype
+        self.scale = scale
+
+    def forward_nested(self, flat_inputs: List[Any]) -> List[Any]:
+        return self._forward_nested_at_once(flat_inputs)
+
+    def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
+        if not is_pure_tensor(inpt) and not isinstance(
+            inpt,
+            (
+                ta_tensors.Image,
+                ta_tensors.Video,
+                ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
+                ta_tensors.BatchVideos,
+                ta_tensors.ImageNestedTensors,
+                ta_tensors.VideoNestedTensors,
+            ),
+        ):
+            return inpt
+
+        return self._call_kernel(
+            F.to_dtype_normalize, inpt, mean=self.mean, std=self.std, dtype=self.dtype, scale=self.scale
+        )
+
+    def extra_repr(self, exclude_names: List[str] = []) -> str:
+        # The dtype is not a primitive value and is not displayed by default.
+        extra = super().extra_repr(exclude_names)
+        return f"{extra}, dtype={self.dtype}" if extra else f"dtype={self.dtype}"
+
+
 class SanitizeBoundingBoxes(Transform):
     """Remove degenerate/invalid bounding boxes and their corresponding labels and masks.
 
@@ -519,7 +606,9 @@ class SanitizeBoundingBoxes(Transform):
     def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
         is_label = params["labels"] is not None and any(inpt is label for label in params["labels"])
         is_bounding_boxes = isinstance(inpt, (ta_tensors.BoundingBoxes, ta_tensors.BatchBoundingBoxes))
-        is_mask = isinstance(inpt, (ta_tensors.Mask, ta_tensors.BatchMasks))
+        is_mask = isinstance(
+            inpt, (ta_tensors.Mask, ta_tensors.BatchMasks, ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks)
+        )
         is_bounding_boxes_or_mask = is_bounding_boxes or is_mask
 
         if not (is_label or is_bounding_boxes_or_mask):
@@ -528,6 +617,8 @@ class SanitizeBoundingBoxes(Transform):
         if is_bounding_boxes or isinstance(inpt, _BatchConcatenatedTATensor):  # type: ignore[arg-type]
             output = inpt.masked_select(inpt, mask=params["valid"])
             return output
+        elif isinstance(inpt, ta_tensors.PackedMasks):
+            return ta_tensors.PackedMasks.from_masks(inpt.to_masks()[params["valid"]])
         else:
             output = inpt[params["valid"]]
 
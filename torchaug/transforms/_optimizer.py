@@ -0,0 +1,205 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type, Union
+
+import torch
+from torch import nn
+
+from ._geometry import CenterCrop, RandomCrop, RandomHorizontalFlip, RandomVerticalFlip, Resize
+from ._misc import Identity, Normalize, ToDtype, ToDtypeNormalize
+
+
+def _is_image_pointwise(transform: nn.Module) -> bool:
+    """Whether the transform only modifies images and videos pixel by pixel without randomness."""
+    if type(transform) is ToDtype:
+        return isinstance(transform.dtype, torch.dtype)
+    return type(transform) in (Normalize, ToDtypeNormalize)
+
+
+def _commutes_with_image_pointwise(transform: nn.Module) -> bool:
+    """Whether the transform only permutes pixels, hence commutes with pointwise transforms."""
+    return type(transform) in (RandomHorizontalFlip, RandomVerticalFlip)
+
+
+def _is_float_conversion(transform: nn.Module) -> bool:
+    """Whether the transform converts images and videos to a floating dtype."""
+    return (
+        type(transform) is ToDtype and isinstance(transform.dtype, torch.dtype) and transform.dtype.is_floating_point
+    )
+
+
+def _commutes_with_float_conversion(transform: nn.Module) -> bool:
+    """Whether the transform gives the same output before and after a conversion of integers to floats."""
+    if _commutes_with_image_pointwise(transform) or type(transform) is CenterCrop:
+        # Crops pad with zeros which are preserved by the conversion.
+        return True
+    elif type(transform) is RandomCrop:
+        return transform.padding_mode != "constant" or transform.fill in (0, 0.0, None)
+    return False
+
+
+def _broadcast_channels(first: List[float], second: List[float]) -> Optional[Tuple[List[float], List[float]]]:
+    if len(first) == len(second):
+        return first, second
+    elif len(first) == 1:
+        return first * len(second), second
+    elif len(second) == 1:
+        return first, second * len(first)
+    return None
+
+
+def _fuse_to_dtype_normalize(to_dtype: ToDtype, normalize: Normalize) -> Optional[nn.Module]:
+    if not isinstance(to_dtype.dtype, torch.dtype) or not to_dtype.dtype.is_floating_point:
+        return None
+    return ToDtypeNormalize(mean=normalize.mean, std=normalize.std, dtype=to_dtype.dtype, scale=to_dtype.scale)
+
+
+def _compose_normalize(
+    first_mean: List[float], first_std: List[float], second_mean: List[float], second_std: List[float]
+) -> Optional[Tuple[List[float], List[float]]]:
+    # ((x - m1) / s1 - m2) / s2 == (x - (m1 + m2 * s1)) / (s1 * s2)
+    means = _broadcast_channels(first_mean, second_mean)
+    stds = _broadcast_channels(first_std, second_std)
+    if means is None or stds is None or len(means[0]) != len(stds[0]):
+        return None
+    mean = [m1 + m2 * s1 for m1, m2, s1 in zip(means[0], means[1], stds[0])]
+    std = [s1 * s2 for s1, s2 in zip(stds[0], stds[1])]
+    return mean, std
+
+
+def _fuse_normalize_normalize(first: Normalize, second: Normalize) -> Optional[nn.Module]:
+    composed = _compose_normalize(first.mean, first.std, second.mean, second.std)
+    if composed is None:
+        return None
+    return Normalize(mean=composed[0], std=composed[1], inplace=first.inplace and second.inplace)
+
+
+def _fuse_to_dtype_normalize_normalize(first: ToDtypeNormalize, second: Normalize) -> Optional[nn.Module]:
+    composed = _compose_normalize(first.mean, first.std, second.mean, second.std)
+    if composed is None:
+        return None
+    return ToDtypeNormalize(mean=composed[0], std=composed[1], dtype=first.dtype, scale=first.scale)
+
+
+def _fuse_resize_resize(first: Resize, second: Resize) -> Optional[nn.Module]:
+    # Only an identical resize is dropped: the output of the first one already has the requested size, which the
+    # kernels return as is. A different size would resample the pixels of the first resize and change the output.
+    if first.size == second.size and first.max_size == second.max_size:
+        return first
+    return None
+
+
+# Ordered rewrite rules applied on adjacent transforms. Exact types are matched to not fuse subclasses that
+# could have a different behavior.
+_FUSION_RULES: List[Tuple[Type[nn.Module], Type[nn.Module], Callable[[Any, Any], Optional[nn.Module]]]] = [
+    (ToDtype, Normalize, _fuse_to_dtype_normalize),
+    (Normalize, Normalize, _fuse_normalize_normalize),
+    (ToDtypeNormalize, Normalize, _fuse_to_dtype_normalize_normalize),
+    (Resize, Resize, _fuse_resize_resize),
+]
+
+
+def _fuse(first: nn.Module, second: nn.Module) -> Optional[nn.Module]:
+    for first_type, second_type, rule in _FUSION_RULES:
+        if type(first) is first_type and type(second) is second_type:
+            return rule(first, second)
+    return None
+
+
+def _defer_float_conversions(
+    transforms: Sequence[Union[nn.Module, Callable]],
+) -> Tuple[List[nn.Module], List[str]]:
+    """Move the conversions of images to floats after the transforms that are exact on integers.
+
+    Args:
+        transforms: The transforms to rewrite.
+
+    Returns:
+        The rewritten transforms and the description of the rewrites that were applied.
+    """
+    stages = list(transforms)
+    plan: List[str] = []
+
+    for i in range(len(stages) - 2, -1, -1):
+        if not _is_float_conversion(stages[i]):
+            continue
+        last = i
+        while last + 1 < len(stages) and _commutes_with_float_conversion(stages[last + 1]):
+            last += 1
+        if last > i:
+            hopped = ", ".join(type(stage).__name__ for stage in stages[i + 1 : last + 1])
+            plan.append(f"defer {type(stages[i]).__name__} after {hopped}")
+            stages.insert(last, stages.pop(i))
+
+    return stages, plan
+
+
+def _optimize_transforms(
+    transforms: Sequence[Union[nn.Module, Callable]],
+    keep_uint8: bool = False,
+) -> Tuple[List[nn.Module], List[str]]:
+    """Rewrite a list of transforms into an equivalent list with fewer passes over the data.
+
+    The following rewrites are applied:
+
+    - :class:`~torchaug.transforms.Identity` transforms are dropped.
+    - Adjacent pointwise transforms are fused: ``ToDtype`` followed by ``Normalize`` and consecutive ``Normalize``.
+    - Consecutive identical ``Resize`` are collapsed as the second one does not change the output.
+    - Pointwise image transforms are moved before flips, which also affect masks and boxes, when it allows them
+      to be fused with a previous pointwise transform. Flips only permute pixels so the output is unchanged.
+    - If ``keep_uint8``, conversions of images to floats are first moved after the flips and crops that follow
+      them so that these transforms are applied on integers.
+
+    Args:
+        transforms: The transforms to optimize.
+        keep_uint8: Whether to defer the conversions to floats.
+
+    Returns:
+        The optimized transforms and the description of the rewrites that were applied.
+    """
+    stages: List[nn.Module] = []
+    plan: List[str] = []
+
+    if keep_uint8:
+        transforms, plan = _defer_float_conversions(transforms)
+
+    for transform in transforms:
+        if type(transform) is Identity:
+            plan.append("drop Identity")
+            continue
+        stages.append(transform)
+
+        while len(stages) > 1:
+            last = stages[-1]
+            fused = _fuse(stages[-2], last)
+            if fused is not None:
+                plan.append(f"fuse {type(stages[-2]).__name__}+{type(last).__name__} -> {type(fused).__name__}")
+                stages[-2:] = [fused]
+                continue
+
+            if not _is_image_pointwise(last):
+                break
+
+            target = len(stages) - 2
+            while target >= 0 and _commutes_with_image_pointwise(stages[target]):
+                target -= 1
+            if target < 0 or target == len(stages) - 2:
+                break
+            fused = _fuse(stages[target], last)
+            if fused is None:
+                break
+
+            hopped = ", ".join(type(stage).__name__ for stage in stages[target + 1 : -1])
+            plan.append(f"move {type(last).__name__} before {hopped}")
+            plan.append(f"fuse {type(stages[target]).__name__}+{type(last).__name__} -> {type(fused).__name__}")
+            stages[target] = fused
+            stages.pop()
+            break
+
+    return stages, plan
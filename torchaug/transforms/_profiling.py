@@ -0,0 +1,464 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, cast
+
+import torch
+from torch import nn
+from torch.utils._pytree import tree_flatten
+from torch.utils.data import get_worker_info
+
+from torchaug import ta_tensors
+from torchaug.ta_tensors import TANestedTensors, _BatchConcatenatedTATensor
+
+
+_ACTIVE_PROFILER: Optional[TransformProfiler] = None
+_ACTIVE_TRACER: Optional[TransformTracer] = None
+
+
+class TransformStats:
+    """Statistics of a transform aggregated by a :class:`~torchaug.transforms.TransformProfiler`.
+
+    Attributes:
+        name: The name of the transform, prefixed by the names of the containers that called it.
+        calls: The number of calls.
+        total_time: The total wall time of the calls in milliseconds, including the calls of the transforms it
+            contains.
+        num_samples: The number of samples actually transformed given the probability of the transform.
+        num_chunks: The number of chunks executed.
+        bytes_in: The total number of bytes of the tensors passed to the transform.
+        bytes_out: The total number of bytes of the tensors returned by the transform.
+        kernels: The number of calls of each kernel dispatched by the transform.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.num_samples = 0
+        self.num_chunks = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.kernels: Dict[str, int] = {}
+
+    @property
+    def mean_time(self) -> float:
+        """The mean wall time of a call in milliseconds."""
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the statistics as a dictionary that can be serialized to JSON."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "num_samples": self.num_samples,
+            "num_chunks": self.num_chunks,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "kernels": dict(self.kernels),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name}, calls={self.calls}, total_time={self.total_time:.3f}, "
+            f"num_samples={self.num_samples}, num_chunks={self.num_chunks})"
+        )
+
+
+class TransformProfiler:
+    """Record statistics of the transforms called by the containers.
+
+    While the profiler is active, each transform called by a :class:`~torchaug.transforms.SequentialTransform`,
+    :class:`~torchaug.transforms.Compose`, :class:`~torchaug.transforms.RandomApply`,
+    :class:`~torchaug.transforms.RandomChoice` or :class:`~torchaug.transforms.RandomOrder` records its wall time,
+    the number of samples it actually transformed given its probability, the number of chunks it executed, the bytes
+    of its input and output tensors and the kernels it dispatched. The statistics are aggregated across the calls and
+    the activations of the profiler, so they can be queried after any number of iterations.
+
+    Each call is also wrapped in a :func:`torch.profiler.record_function` range named after the transform, so the
+    transforms appear in the traces of :class:`torch.profiler.profile`.
+
+    The transforms are named by their index in their container and their class, e.g. ``"1: RandomColorJitter"``, and
+    the transforms of nested containers are prefixed by the name of their container, e.g.
+    ``"2: RandomApply/0: RandomGaussianBlur"``. The time and bytes of a container include the transforms it contains.
+    The transforms can be called from several threads, each thread tracking its own nested calls, and the statistics
+    of all the threads are aggregated.
+
+    .. note::
+        The wall time of asynchronous CUDA kernels is only measured if `synchronize` is ``True``, which synchronizes
+        the CUDA devices around each transform and slows down the pipeline.
+
+    Example:
+        >>> transforms = SequentialTransform([RandomResizedCrop(224), RandomColorJitter(0.4, 0.4, 0.4, p=0.8)])
+        >>> with TransformProfiler() as profiler:
+        >>>     for _ in range(10):
+        >>>         transforms(images)
+        >>> print(profiler.summary())
+
+    Args:
+        record_functions: Whether to wrap the calls in :func:`torch.profiler.record_function` ranges.
+        synchronize: Whether to synchronize the CUDA devices before and after each transform.
+    """
+
+    def __init__(self, record_functions: bool = True, synchronize: bool = False) -> None:
+        self.record_functions = record_functions
+        self.synchronize = synchronize
+        self._stats: Dict[str, TransformStats] = {}
+        # The transforms being called by each thread and the lock of the statistics shared by the threads.
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._previous_profiler: Optional[TransformProfiler] = None
+
+    def __enter__(self) -> TransformProfiler:
+        global _ACTIVE_PROFILER
+        self._previous_profiler = _ACTIVE_PROFILER
+        _ACTIVE_PROFILER = self
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        global _ACTIVE_PROFILER
+        _ACTIVE_PROFILER = self._previous_profiler
+        self._previous_profiler = None
+
+    @property
+    def _stack(self) -> List[TransformStats]:
+        return self._local.__dict__.setdefault("stack", [])
+
+    @property
+    def stats(self) -> Dict[str, TransformStats]:
+        """The statistics of the transforms indexed by their name in the order of their first call."""
+        return dict(self._stats)
+
+    def reset(self) -> None:
+        """Reset the statistics."""
+        self._stats.clear()
+
+    def summary(self, sort_by: Optional[str] = "total_time") -> str:
+        """Format the statistics as a Markdown table.
+
+        Args:
+            sort_by: The statistic to sort the transforms by in decreasing order. If ``None``, the transforms are
+                in the order of their first call.
+
+        Returns:
+            The table.
+        """
+        stats = list(self._stats.values())
+        if sort_by is not None:
+            stats.sort(key=lambda transform_stats: getattr(transform_stats, sort_by), reverse=True)
+
+        columns = ["name", "calls", "total_time", "mean_time", "num_samples", "num_chunks", "bytes_in", "bytes_out"]
+        rows = [columns + ["kernels"]]
+        for transform_stats in stats:
+            row = []
+            for column in columns:
+                value = getattr(transform_stats, column)
+                row.append(f"{value:.3f}" if isinstance(value, float) else str(value))
+            row.append(", ".join(f"{kernel} x{count}" for kernel, count in transform_stats.kernels.items()))
+            rows.append(row)
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = ["| " + " | ".join(value.ljust(width) for value, width in zip(row, widths)) + " |" for row in rows]
+        lines.insert(1, "|" + "|".join("-" * (width + 2) for width in widths) + "|")
+        return "\n".join(lines)
+
+    def _synchronize(self) -> None:
+        if self.synchronize and torch.cuda.is_available() and torch.cuda.is_initialized():
+            torch.cuda.synchronize()
+
+    def _call(self, name: str, transform: Callable, inputs: Sequence[Any]) -> Any:
+        stack = self._stack
+        if stack:
+            name = f"{stack[-1].name}/{name}"
+        bytes_in = _nbytes(inputs)
+        with self._lock:
+            transform_stats = self._stats.get(name)
+            if transform_stats is None:
+                transform_stats = self._stats[name] = TransformStats(name)
+            transform_stats.calls += 1
+            transform_stats.bytes_in += bytes_in
+
+        stack.append(transform_stats)
+        try:
+            with torch.profiler.record_function(name) if self.record_functions else contextlib.nullcontext():
+                self._synchronize()
+                start = time.perf_counter()
+                outputs = transform(*inputs)
+                self._synchronize()
+                elapsed = (time.perf_counter() - start) * 1000
+        finally:
+            stack.pop()
+        bytes_out = _nbytes(outputs)
+        with self._lock:
+            transform_stats.total_time += elapsed
+            transform_stats.bytes_out += bytes_out
+        return outputs
+
+
+class _Span:
+    def __init__(self, tracer: TransformTracer, name: str, category: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> _Span:
+        self.tracer._enter(self.category)
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.tracer._exit(self, time.monotonic_ns())
+
+
+class TransformTracer:
+    """Trace the transforms, collate functions and datasets to a Chrome trace file.
+
+    While the tracer is active, the following calls are recorded as spans of a timeline that can be opened in
+    `Perfetto <https://ui.perfetto.dev>`_ or ``chrome://tracing``:
+
+    - ``"transform"``: the transforms called by the containers, see :class:`~torchaug.transforms.TransformProfiler`,
+      and by :class:`~torchaug.data.dataloader.TransformCollate`.
+    - ``"chunk"``: the chunks of the batch transforms.
+    - ``"collate"``: :func:`~torchaug.data.dataloader.default_collate`,
+      :func:`~torchaug.data.dataloader.default_nested_collate` and
+      :class:`~torchaug.data.dataloader.TransformCollate`.
+    - ``"dataset"``: the samples loaded by the datasets wrapped by
+      :func:`~torchaug.data.dataset.wrap_dataset_for_transforms_v2`.
+    - ``"user"``: the spans opened with :meth:`span`, e.g. around the training step.
+
+    Each process has its own track, with a track per thread, and each span records the ``worker`` id of the process,
+    ``None`` in the main process, and the index of the ``batch`` it belongs to, which assumes the round-robin order in
+    which the :class:`~torch.utils.data.DataLoader` distributes the batches to its workers. The batches are counted by
+    the outermost collate functions.
+
+    The batches collated by the datasets themselves are ended by the outermost collate function of the
+    :class:`~torch.utils.data.DataLoader`.
+
+    The workers of a :class:`~torch.utils.data.DataLoader` created while the tracer is active inherit it if they are
+    started with ``fork``, the default on Linux. They write their events to a temporary directory after each batch and
+    the events of all processes are merged in the file when the tracer exits. When no tracer is active, each traced
+    call only checks a global variable.
+
+    Example:
+        >>> loader = DataLoader(dataset, batch_size=64, num_workers=8, collate_fn=TransformCollate(transforms))
+        >>> with TransformTracer("trace.json") as tracer:
+        >>>     for batch in loader:
+        >>>         with tracer.span("train_step"):
+        >>>             ...
+
+    Args:
+        path: The path of the Chrome trace JSON file.
+        flush_every: The number of events buffered by a process before they are written to the temporary directory.
+    """
+
+    def __init__(self, path: str, flush_every: int = 10000) -> None:
+        if flush_every < 1:
+            raise ValueError(f"flush_every should be a positive integer. Got {flush_every}.")
+        self.path = path
+        self.flush_every = flush_every
+        self._events: List[Dict[str, Any]] = []
+        self._pid: Optional[int] = None
+        self._worker_id: Optional[int] = None
+        self._num_workers = 1
+        self._num_batches = 0
+        self._depths: Dict[str, int] = {}
+        self._parts_dir: Optional[str] = None
+        self._lock = threading.Lock()
+        self._previous_tracer: Optional[TransformTracer] = None
+
+    def __enter__(self) -> TransformTracer:
+        global _ACTIVE_TRACER
+        if self._parts_dir is not None:
+            raise RuntimeError("The tracer is already active.")
+        self._parts_dir = tempfile.mkdtemp(prefix=".torchaug_trace_", dir=os.path.dirname(os.path.abspath(self.path)))
+        self._events.clear()
+        self._pid = None
+        self._previous_tracer = _ACTIVE_TRACER
+        _ACTIVE_TRACER = self
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        global _ACTIVE_TRACER
+        _ACTIVE_TRACER = self._previous_tracer
+        self._previous_tracer = None
+        with self._lock:
+            self._flush()
+
+        parts_dir = cast(str, self._parts_dir)
+        events = []
+        for file_name in sorted(os.listdir(parts_dir)):
+            with open(os.path.join(parts_dir, file_name)) as f:
+                events.extend(json.loads(line) for line in f)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        self._parts_dir = None
+
+    def span(self, name: str, category: str = "user", **args: Any) -> contextlib.AbstractContextManager:
+        """Record a span of the timeline.
+
+        Args:
+            name: The name of the span.
+            category: The category of the span.
+            args: Additional arguments displayed with the span.
+
+        Returns:
+            The context manager of the span.
+        """
+        return _Span(self, name, category, args)
+
+    def _check_process(self) -> None:
+        # The tracer is copied in the workers with the events of the parent process.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._events.clear()
+        self._pid = pid
+        # The lock could have been held by another thread of the parent process when it forked.
+        self._lock = threading.Lock()
+        self._num_batches = 0
+        self._depths = {"collate": 0, "dataset": 0}
+        worker_info = get_worker_info()
+        self._worker_id = worker_info.id if worker_info is not None else None
+        self._num_workers = worker_info.num_workers if worker_info is not None else 1
+        self._events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "main" if self._worker_id is None else f"worker {self._worker_id}"},
+            }
+        )
+
+    def _enter(self, category: str) -> None:
+        self._check_process()
+        if category in self._depths:
+            with self._lock:
+                self._depths[category] += 1
+
+    def _exit(self, span: _Span, end: int) -> None:
+        self._check_process()
+        with self._lock:
+            self._record(span, end)
+
+    def _record(self, span: _Span, end: int) -> None:
+        worker_id = self._worker_id
+        self._events.append(
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": (end - span.start) / 1000,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": {
+                    "worker": worker_id,
+                    "batch": self._num_batches * self._num_workers + (worker_id or 0),
+                    **span.args,
+                },
+            }
+        )
+        if span.category in self._depths:
+            self._depths[span.category] -= 1
+            if span.category == "collate" and self._depths["collate"] == 0 and self._depths["dataset"] == 0:
+                # The outermost collate function ends the batch, the workers write their events before sending it.
+                self._num_batches += 1
+                if worker_id is not None:
+                    self._flush()
+        if len(self._events) >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._events or self._parts_dir is None:
+            return
+        with open(os.path.join(self._parts_dir, f"{self._pid}.jsonl"), "a") as f:
+            f.writelines(json.dumps(event, default=str) + "\n" for event in self._events)
+        self._events.clear()
+
+
+def _nbytes(inputs: Any) -> int:
+    nbytes = 0
+    for inpt in tree_flatten(inputs)[0]:
+        if isinstance(inpt, TANestedTensors):
+            nbytes += sum(tensor.nbytes for tensor in inpt.tensors)
+        elif isinstance(inpt, torch.Tensor):
+            nbytes += inpt.nbytes
+    return nbytes
+
+
+def _transform_name(idx: int, transform: Callable) -> str:
+    name = type(transform).__name__ if isinstance(transform, nn.Module) else getattr(transform, "__name__", None)
+    return f"{idx}: {name or type(transform).__name__}"
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _trace(name: str, category: str, **args: Any) -> contextlib.AbstractContextManager:
+    # Record a span if a tracer is active.
+    if _ACTIVE_TRACER is None:
+        return _NULL_SPAN
+    return _Span(_ACTIVE_TRACER, name, category, args)
+
+
+def _call_transform(idx: int, transform: Callable, *inputs: Any) -> Any:
+    # Call a transform of a container, recording its statistics if a profiler is active and its span if a tracer is
+    # active.
+    if _ACTIVE_PROFILER is None and _ACTIVE_TRACER is None:
+        return transform(*inputs)
+    name = _transform_name(idx, transform)
+    with _trace(name.split(": ", 1)[1], "transform", index=idx):
+        if _ACTIVE_PROFILER is None:
+            return transform(*inputs)
+        return _ACTIVE_PROFILER._call(name, transform, inputs)
+
+
+def _report_samples(num_samples: int, num_chunks: int) -> None:
+    # Report the samples transformed by the transform being called.
+    profiler = _ACTIVE_PROFILER
+    if profiler is not None and profiler._stack:
+        transform_stats = profiler._stack[-1]
+        with profiler._lock:
+            transform_stats.num_samples += num_samples
+            transform_stats.num_chunks += num_chunks
+
+
+def _report_single(flat_inputs: List[Any]) -> None:
+    # Report the samples transformed with the same parameters by the transform being called, a single sample or a
+    # whole batch.
+    if _ACTIVE_PROFILER is not None and _ACTIVE_PROFILER._stack:
+        num_samples = 1
+        for inpt in flat_inputs:
+            if isinstance(inpt, _BatchConcatenatedTATensor):
+                num_samples = inpt.batch_size
+                break
+            elif isinstance(inpt, (ta_tensors.BatchImages, ta_tensors.PaddedBatchImages, ta_tensors.BatchVideos)):
+                num_samples = inpt.shape[0]
+                break
+        _report_samples(num_samples, 1)
+
+
+def _report_kernel(kernel: Callable) -> None:
+    # Report a kernel dispatched by the transform being called.
+    profiler = _ACTIVE_PROFILER
+    if profiler is not None and profiler._stack:
+        kernels = profiler._stack[-1].kernels
+        name = getattr(kernel, "__name__", type(kernel).__name__)
+        with profiler._lock:
+            kernels[name] = kernels.get(name, 0) + 1
@@ -10,8 +10,9 @@
 from __future__ import annotations
 
 import enum
+import threading
 from math import ceil, floor
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, cast
 
 import torch
 from torch import nn
@@ -20,10 +21,18 @@ from torchvision.transforms.v2._utils import check_type, has_any
 
 from torchaug import ta_tensors
 from torchaug._utils import _log_api_usage_once
-from torchaug.ta_tensors import TANestedTensors, _BatchConcatenatedTATensor, set_return_type
+from torchaug.ta_tensors import TANestedTensors, _BatchConcatenatedTATensor
+from torchaug.ta_tensors._torch_function_helpers import _local_return_type
 
+from . import _profiling
+from ._executor import ChunkExecutor
 from ._utils import is_pure_tensor
-from .functional._utils._kernel import _get_kernel
+from .functional._utils._kernel import _get_kernel, _passthrough
+from .functional._utils._tensor import _is_channels_last
+
+
+# The ids of the transforms called on nested tensors in the current thread, which transform them sample per sample.
+_PER_SAMPLE_CALLS = threading.local()
 
 
 class RandomApplyTransform(nn.Module):
@@ -31,6 +40,10 @@ class RandomApplyTransform(nn.Module):
 
     For more details, please see :ref:`tutorial/transforms:Transforms Tutorial`.
 
+    .. note::
+        The chunks of a batch transform are transformed serially. Set its ``chunk_executor`` attribute to a
+        :class:`~torchaug.transforms.ChunkExecutor` to transform them concurrently in a pool of threads.
+
     Args:
         p: The probability of applying the transform.
         batch_inplace: whether to apply the batch transform in-place.
@@ -64,6 +77,7 @@ class RandomApplyTransform(nn.Module):
         self.p = p
         self.batch_transform = batch_transform
         self.num_chunks = num_chunks
+        self.chunk_executor: Optional[ChunkExecutor] = None
 
         self._receive_flatten_inputs = False
 
@@ -71,6 +85,19 @@ class RandomApplyTransform(nn.Module):
     def _reshape_transform(self) -> bool:
         return False
 
+    @property
+    def batch_transform(self) -> bool:
+        """Whether to apply the transform in batch mode.
+
+        It is ``False`` while the transform is called on nested tensors in the current thread, as they are transformed
+        sample per sample.
+        """
+        return self._batch_transform and id(self) not in getattr(_PER_SAMPLE_CALLS, "ids", ())
+
+    @batch_transform.setter
+    def batch_transform(self, batch_transform: bool) -> None:
+        self._batch_transform = batch_transform
+
     @property
     def num_chunks(self) -> int:
         """Get the number of chunks to split the input into.
@@ -162,6 +189,7 @@ class RandomApplyTransform(nn.Module):
             transform_pure_tensor = not has_any(
                 flat_inputs,
                 ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
                 ta_tensors.BatchVideos,
             )
         else:
@@ -169,6 +197,7 @@ class RandomApplyTransform(nn.Module):
                 flat_inputs,
                 ta_tensors.Image,
                 ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
                 ta_tensors.Video,
                 ta_tensors.BatchVideos,
             )
@@ -226,17 +255,48 @@ class RandomApplyTransform(nn.Module):
 
     def _call_kernel(self, functional: Callable, inpt: Any, *args: Any, **kwargs: Any) -> Any:
         kernel = _get_kernel(functional, type(inpt), allow_passthrough=True)
+        if _profiling._ACTIVE_PROFILER is not None and kernel is not _passthrough:
+            _profiling._report_kernel(kernel)
         return kernel(inpt, *args, **kwargs)
 
     def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
         raise NotImplementedError
 
+    def _transform_chunk(self, inpt: Any, params: Dict[str, Any], chunk_idx: int) -> Any:
+        if _profiling._ACTIVE_TRACER is None:
+            return self._transform(inpt, params)
+        with _profiling._trace(f"{type(self).__name__} chunk {chunk_idx}", "chunk", chunk=chunk_idx):
+            return self._transform(inpt, params)
+
+    def _transform_chunks(
+        self,
+        transform_inpt: Any,
+        chunks_indices: Tuple[torch.Tensor, ...],
+        params: List[Dict[str, Any]],
+        is_ta_inpt: bool,
+    ) -> Iterable[Any]:
+        # Transform the chunks of an input, serially or concurrently by the chunk executor. The chunks are written
+        # back by the caller in order.
+        def transform_chunk(i: int) -> Any:
+            if isinstance(transform_inpt, _BatchConcatenatedTATensor):
+                chunk_inpt = transform_inpt.get_chunk(chunk_indices=chunks_indices[i])
+            else:
+                with _local_return_type("TATensor" if is_ta_inpt else "Tensor"):
+                    chunk_inpt = transform_inpt[chunks_indices[i]]
+            return self._transform_chunk(chunk_inpt, params[i], i)
+
+        if self.chunk_executor is None:
+            # Lazily to write each chunk back before the next one is transformed, as when called serially.
+            return (transform_chunk(i) for i in range(len(chunks_indices)))
+        return self.chunk_executor.map(transform_chunk, len(chunks_indices))
+
     def forward_single(self, flat_inputs: List[Any]) -> List[Any]:
         if self.p == 1.0:
             pass
         elif self.p == 0.0 or torch.rand(1) >= self.p:
             return flat_inputs
 
+        _profiling._report_single(flat_inputs)
         needs_transform_list = self._needs_transform_list(flat_inputs)
         params = self._get_params(
             [inpt for (inpt, needs_transform) in zip(flat_inputs, needs_transform_list) if needs_transform],
@@ -303,7 +363,7 @@ class RandomApplyTransform(nn.Module):
                     pre_output = cast(_BatchConcatenatedTATensor, pre_output)
                     transform_inpt = pre_output.get_chunk(chunk_indices=indices_transform)
                 else:
-                    with set_return_type("TATensor" if is_ta_inpt else "Tensor"):
+                    with _local_return_type("TATensor" if is_ta_inpt else "Tensor"):
                         transform_inpt = pre_output[indices_transform]
                 transform_inpts.append(transform_inpt)
 
@@ -314,6 +374,7 @@ class RandomApplyTransform(nn.Module):
             num_chunks = min(transform_batch_size, self._num_chunks)
 
         chunks_indices = self._get_chunks_indices(transform_batch_size, num_chunks, torch.device("cpu"))
+        _profiling._report_samples(transform_batch_size, len(chunks_indices))
         if self._reshape_transform and self.permute_chunks:
             cat_chunks_indices = torch.cat(chunks_indices)
 
@@ -337,44 +398,31 @@ class RandomApplyTransform(nn.Module):
             is_contatenated_batch_ta_tensors = isinstance(transform_inpt, _BatchConcatenatedTATensor)
 
             if num_chunks == 1:
-                output = self._transform(transform_inpt, params[0])
+                output = self._transform_chunk(transform_inpt, params[0], 0)
             else:
                 if self._reshape_transform:
                     output = []
-                for i, chunk_indices in enumerate(chunks_indices):
-                    if is_contatenated_batch_ta_tensors:
-                        chunk_inpt = transform_inpt.get_chunk(chunk_indices=chunk_indices)
-                        chunk_output = self._transform(chunk_inpt, params[i])
-                        if self._reshape_transform:
-                            output.append(chunk_output)
-                        else:
-                            transform_inpt.update_chunk_(chunk_output, chunk_indices=chunk_indices)
-                            output = transform_inpt
+                for i, chunk_output in enumerate(
+                    self._transform_chunks(transform_inpt, chunks_indices, params, is_ta_inpt)
+                ):
+                    chunk_indices = chunks_indices[i]
+                    if self._reshape_transform:
+                        output.append(chunk_output)
+                    elif is_contatenated_batch_ta_tensors:
+                        transform_inpt.update_chunk_(chunk_output, chunk_indices=chunk_indices)
+                        output = transform_inpt
                     else:
-                        with set_return_type("TATensor" if is_ta_inpt else "Tensor"):
-                            chunk_inpt = transform_inpt[chunk_indices]
-
-                        chunk_output = self._transform(chunk_inpt, params[i])
-
-                        if self._reshape_transform:
-                            output.append(chunk_output)
-                        else:
-                            with set_return_type("TATensor" if is_ta_inpt else "Tensor"):
-                                transform_inpt[chunk_indices] = chunk_output
-                            output = transform_inpt
+                        with _local_return_type("TATensor" if is_ta_inpt else "Tensor"):
+                            transform_inpt[chunk_indices] = chunk_output
+                        output = transform_inpt
                 if self._reshape_transform:
                     if is_contatenated_batch_ta_tensors:
                         output = type(transform_inpt).cat(output)
                         if self.permute_chunks:
-                            data_indices = transform_inpt._get_data_indices_from_chunk_indices(cat_chunks_indices)
-                            order = torch.argsort(data_indices)  # reorder output to match the original order
-                            output = ta_tensors.wrap(
-                                output.data[order],
-                                like=output,
-                                samples_ranges=transform_inpt.samples_ranges,
-                            )
+                            # reorder output to match the original order, along with the metadata of the samples.
+                            output = output.get_chunk(chunk_indices=torch.argsort(cat_chunks_indices))
                     else:
-                        with set_return_type("TATensor" if is_ta_inpt else "Tensor"):
+                        with _local_return_type("TATensor" if is_ta_inpt else "Tensor"):
                             output = torch.cat(output, dim=0)
                             if self.permute_chunks:
                                 order = torch.argsort(cat_chunks_indices)  # reorder output to match the original order
@@ -399,10 +447,11 @@ class RandomApplyTransform(nn.Module):
                 if is_contatenated_batch_ta_tensors:
                     flat_pre_output.update_chunk_(transform_output, chunk_indices=indices_transform)
                 else:
-                    with set_return_type("TATensor" if is_ta_output else "Tensor"):
+                    with _local_return_type("TATensor" if is_ta_output else "Tensor"):
                         flat_pre_output[indices_transform] = transform_output
-                with set_return_type("TATensor" if is_ta_output else "Tensor"):
-                    flat_pre_output = flat_pre_output.contiguous()
+                memory_format = torch.channels_last if _is_channels_last(flat_pre_output) else torch.contiguous_format
+                with _local_return_type("TATensor" if is_ta_output else "Tensor"):
+                    flat_pre_output = flat_pre_output.contiguous(memory_format=memory_format)
                 flat_outputs.append(flat_pre_output)
         else:
             flat_outputs = transform_outputs
@@ -458,6 +507,16 @@ class RandomApplyTransform(nn.Module):
 
         return flat_outputs
 
+    def _forward_nested_at_once(self, flat_inputs: List[Any]) -> List[Any]:
+        # Transforms whose parameters do not depend on the samples can transform each nested tensor at once with the
+        # kernel registered for its type, e.g. on its packed buffer, instead of sample per sample.
+        if not any(isinstance(inpt, TANestedTensors) for inpt in flat_inputs):
+            raise ValueError("Expected at least one nested tensor.")
+        elif any(isinstance(inpt, torch.Tensor) for inpt in flat_inputs):
+            raise ValueError("Expected a nested tensor, but got a single tensor.")
+        _profiling._report_samples(self._get_input_batch_size(flat_inputs), 1)
+        return [self._transform(inpt, {}) if isinstance(inpt, TANestedTensors) else inpt for inpt in flat_inputs]
+
     def forward(self, *inputs: Any) -> Any:
         """Performs forward pass of the transform.
 
@@ -474,19 +533,16 @@ class RandomApplyTransform(nn.Module):
             flat_inputs = list(inputs)
 
         if any(isinstance(inpt, TANestedTensors) for inpt in flat_inputs):
-            batch_transform = self.batch_transform
-            num_chunks = self.num_chunks
-            permute_chunks = self.permute_chunks
-
-            self.batch_transform = False
-            self.num_chunks = 1
-            self.permute_chunks = False
-
-            flat_outputs = self.forward_nested(flat_inputs)
-
-            self.batch_transform = batch_transform
-            self.num_chunks = num_chunks
-            self.permute_chunks = permute_chunks
+            # The samples are transformed one by one in single mode. The mode is stored per thread and not in the
+            # attributes of the transform, so the transform can be called concurrently from several threads.
+            per_sample_ids = _PER_SAMPLE_CALLS.__dict__.setdefault("ids", set())
+            is_outermost_call = id(self) not in per_sample_ids
+            per_sample_ids.add(id(self))
+            try:
+                flat_outputs = self.forward_nested(flat_inputs)
+            finally:
+                if is_outermost_call:
+                    per_sample_ids.discard(id(self))
         elif not self.batch_transform:
             self._check_inputs(flat_inputs)
             flat_outputs = self.forward_single(flat_inputs)
@@ -500,28 +556,31 @@ class RandomApplyTransform(nn.Module):
 
     def extra_repr(self, exclude_names: List[str] = []) -> str:
         """Set the extra representation of the transform."""
-        if not self.batch_transform:
-            exclude_names.extend(["batch_inplace", "num_chunks", "permute_chunks", "batch_transform"])
+        # Copied to not extend the default list shared by the calls.
+        exclude_names = list(exclude_names)
+        if not self._batch_transform:
+            exclude_names.extend(
+                ["batch_inplace", "num_chunks", "permute_chunks", "batch_transform", "chunk_executor"]
+            )
 
+        # Only displayed when not None.
         last_extra: Dict[str, Any] = {
             "p": None,
             "batch_inplace": None,
             "num_chunks": None,
             "permute_chunks": None,
             "batch_transform": None,
+            "chunk_executor": None,
         }
         transform_extra = []
-        parameters_dict = dict(self.__dict__, num_chunks=self.num_chunks)
+        parameters_dict = dict(self.__dict__, num_chunks=self.num_chunks, batch_transform=self._batch_transform)
         for name, value in parameters_dict.items():
             if name.startswith("_") or name == "training" or name in exclude_names:
                 continue
 
-            if not isinstance(value, (bool, int, float, str, tuple, list, enum.Enum)) and value is not None:
-                continue
-
             if name in last_extra:
                 last_extra[name] = value
-            else:
+            elif isinstance(value, (bool, int, float, str, tuple, list, enum.Enum)) or value is None:
                 transform_extra.append(f"{name}={value}")
 
         extra = transform_extra + [f"{name}={value}" for name, value in last_extra.items() if value is not None]
@@ -558,5 +617,4 @@ class Transform(RandomApplyTransform):
         )
 
     def extra_repr(self, exclude_names: List[str] = []) -> str:
-        exclude_names.append("p")
-        return super().extra_repr(exclude_names)
+        return super().extra_repr([*exclude_names, "p"])
@@ -78,7 +78,29 @@ class NestedToBatch(Transform):
     """Convert nested TATensors to nested BatchTensors.
 
     This doesn't scale or change the values, only the type.
+
+    Args:
+        padded: If ``True``, the images of different sizes are padded at the bottom and right in a
+            :class:`~torchaug.ta_tensors.PaddedBatchImages`, and the masks and the canvas of the bounding boxes are
+            padded accordingly. Otherwise, all the images must have the same size.
     """
 
+    def __init__(self, padded: bool = False) -> None:
+        super().__init__()
+        self.padded = padded
+
     def forward_nested(self, flat_inputs: List[Any]):
-        return [x.to_batch() if isinstance(x, ta_tensors.TANestedTensors) else x for x in flat_inputs]
+        if not self.padded:
+            return [x.to_batch() if isinstance(x, ta_tensors.TANestedTensors) else x for x in flat_inputs]
+
+        flat_outputs = []
+        for x in flat_inputs:
+            if isinstance(
+                x,
+                (ta_tensors.ImageNestedTensors, ta_tensors.MaskNestedTensors, ta_tensors.BoundingBoxesNestedTensors),
+            ):
+                x = x.to_padded_batch()
+            elif isinstance(x, ta_tensors.TANestedTensors):
+                x = x.to_batch()
+            flat_outputs.append(x)
+        return flat_outputs
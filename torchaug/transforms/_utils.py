@@ -161,10 +161,13 @@ def query_size(flat_inputs: List[Any]) -> Tuple[int, int]:
                 is_pure_tensor,
                 ta_tensors.Image,
                 ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
                 ta_tensors.Video,
                 ta_tensors.BatchVideos,
                 ta_tensors.Mask,
                 ta_tensors.BatchMasks,
+                ta_tensors.PackedMasks,
+                ta_tensors.BatchPackedMasks,
                 ta_tensors.BoundingBoxes,
                 ta_tensors.BatchBoundingBoxes,
             ),
@@ -189,6 +192,7 @@ def query_chw(flat_inputs: List[Any]) -> Tuple[int, int, int]:
                 ta_tensors.Image,
                 ta_tensors.Video,
                 ta_tensors.BatchImages,
+                ta_tensors.PaddedBatchImages,
                 ta_tensors.BatchVideos,
             ),
         )
@@ -164,6 +164,9 @@ from ._misc import (
     sanitize_bounding_boxes,
     to_dtype,
     to_dtype_image,
+    to_dtype_normalize,
+    to_dtype_normalize_image,
+    to_dtype_normalize_video,
     to_dtype_video,
 )
 from ._temporal import uniform_temporal_subsample, uniform_temporal_subsample_video
@@ -16,7 +16,7 @@ from torchvision.io import decode_jpeg, encode_jpeg
 from torchaug import ta_tensors
 from torchaug._utils import _log_api_usage_once
 
-from ._utils._kernel import _get_kernel, _register_kernel_internal
+from ._utils._kernel import _get_kernel, _register_kernel_internal, _register_unsupported_kernel_internal
 
 
 def erase(
@@ -41,6 +41,7 @@ def erase(
 @_register_kernel_internal(erase, torch.Tensor)
 @_register_kernel_internal(erase, ta_tensors.Image)
 @_register_kernel_internal(erase, ta_tensors.BatchImages)
+@_register_kernel_internal(erase, ta_tensors.PaddedBatchImages)
 def erase_image(
     image: torch.Tensor,
     i: int,
@@ -102,3 +103,10 @@ def jpeg_image(image: torch.Tensor, quality: int) -> torch.Tensor:
 @_register_kernel_internal(jpeg, ta_tensors.BatchVideos)
 def jpeg_video(video: torch.Tensor, quality: int) -> torch.Tensor:
     return jpeg_image(video, quality=quality)
+
+
+_register_unsupported_kernel_internal(
+    jpeg,
+    ta_tensors.PaddedBatchImages,
+    "the padded pixels would be compressed with the valid regions of the images.",
+)
@@ -9,7 +9,7 @@
 
 from __future__ import annotations
 
-from typing import List, Union
+from typing import List, Optional, Union
 
 import torch
 import torchvision.transforms.v2.functional as TVF
@@ -19,8 +19,9 @@ from torchaug import ta_tensors
 from torchaug._utils import _log_api_usage_once
 
 from ._misc import to_dtype_image
-from ._utils._kernel import _get_kernel, _register_kernel_internal
-from ._utils._tensor import _get_batch_factor, _max_value
+from ._utils._kernel import _get_kernel, _register_kernel_internal, _register_unsupported_kernel_internal
+from ._utils._nested import _apply_nested_pointwise, _check_nested_num_channels
+from ._utils._tensor import _get_batch_factor, _get_compute_dtype, _max_value, _preserve_channels_last
 
 
 def _rgb_to_grayscale_image(
@@ -57,6 +58,7 @@ def rgb_to_grayscale(inpt: torch.Tensor, num_output_channels: int = 1) -> torch.
 @_register_kernel_internal(rgb_to_grayscale, torch.Tensor)
 @_register_kernel_internal(rgb_to_grayscale, ta_tensors.Image)
 @_register_kernel_internal(rgb_to_grayscale, ta_tensors.BatchImages)
+@_register_kernel_internal(rgb_to_grayscale, ta_tensors.PaddedBatchImages)
 def rgb_to_grayscale_image(image: torch.Tensor, num_output_channels: int = 1) -> torch.Tensor:
     return _rgb_to_grayscale_image(image=image, num_output_channels=num_output_channels, preserve_dtype=True)
 
@@ -81,6 +83,7 @@ def grayscale_to_rgb(inpt: torch.Tensor) -> torch.Tensor:
 @_register_kernel_internal(grayscale_to_rgb, torch.Tensor)
 @_register_kernel_internal(grayscale_to_rgb, ta_tensors.Image)
 @_register_kernel_internal(grayscale_to_rgb, ta_tensors.BatchImages)
+@_register_kernel_internal(grayscale_to_rgb, ta_tensors.PaddedBatchImages)
 def grayscale_to_rgb_image(image: torch.Tensor) -> torch.Tensor:
     if image.shape[-3] >= 3:
         # Image already has RGB channels. We don't need to do anything.
@@ -95,9 +98,11 @@ def grayscale_to_rgb_video(video: torch.Tensor) -> torch.Tensor:
     return grayscale_to_rgb_image(video)
 
 
-def _batch_blend(images1: torch.Tensor, images2: torch.Tensor, ratio: torch.Tensor) -> torch.Tensor:
-    ratio = ratio.float()
+def _batch_blend(
+    images1: torch.Tensor, images2: torch.Tensor, ratio: torch.Tensor, compute_dtype: Optional[torch.dtype] = None
+) -> torch.Tensor:
     fp = images1.is_floating_point()
+    ratio = ratio.float() if fp else ratio.to(_get_compute_dtype(compute_dtype))
     bound = _max_value(images1.dtype)
     while ratio.ndim < images1.ndim:
         ratio = ratio.unsqueeze(-1)
@@ -120,20 +125,24 @@ def adjust_brightness_batch(
     inpt: torch.Tensor,
     brightness_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     """Adjust brightness."""
     if torch.jit.is_scripting():
-        return adjust_brightness_batch_images(inpt, brightness_factor=brightness_factor, value_check=value_check)
+        return adjust_brightness_batch_images(
+            inpt, brightness_factor=brightness_factor, value_check=value_check, compute_dtype=compute_dtype
+        )
 
     _log_api_usage_once(adjust_brightness_batch)
 
     kernel = _get_kernel(adjust_brightness_batch, type(inpt))
-    return kernel(inpt, brightness_factor=brightness_factor, value_check=value_check)
+    return kernel(inpt, brightness_factor=brightness_factor, value_check=value_check, compute_dtype=compute_dtype)
 
 
 @_register_kernel_internal(adjust_brightness, torch.Tensor)
 @_register_kernel_internal(adjust_brightness, ta_tensors.Image)
 @_register_kernel_internal(adjust_brightness, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_brightness, ta_tensors.PaddedBatchImages)
 def adjust_brightness_image(image: torch.Tensor, brightness_factor: float) -> torch.Tensor:
     return TVF.adjust_brightness_image(image=image, brightness_factor=brightness_factor)
 
@@ -144,12 +153,23 @@ def adjust_brightness_video(video: torch.Tensor, brightness_factor: float) -> to
     return adjust_brightness_image(image=video, brightness_factor=brightness_factor)
 
 
+@_register_kernel_internal(adjust_brightness, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(adjust_brightness, ta_tensors.VideoNestedTensors)
+def _adjust_brightness_nested_dispatch(
+    inpt: ta_tensors.TANestedTensors, brightness_factor: float
+) -> ta_tensors.TANestedTensors:
+    _check_nested_num_channels(inpt, (1, 3))
+    return _apply_nested_pointwise(adjust_brightness_image, inpt, brightness_factor=brightness_factor)
+
+
 @_register_kernel_internal(adjust_brightness_batch, torch.Tensor)
 @_register_kernel_internal(adjust_brightness_batch, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_brightness_batch, ta_tensors.PaddedBatchImages)
 def adjust_brightness_batch_images(
     images: torch.Tensor,
     brightness_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     c = images.shape[-3]
     if c not in [1, 3]:
@@ -158,7 +178,7 @@ def adjust_brightness_batch_images(
     brightness_factor = _get_batch_factor(brightness_factor, images.shape[0], images.device, None, value_check)
 
     fp = images.is_floating_point()
-    brightness_factor = brightness_factor.float()
+    brightness_factor = brightness_factor.float() if fp else brightness_factor.to(_get_compute_dtype(compute_dtype))
     bound = _max_value(images.dtype)
 
     while brightness_factor.ndim < images.ndim:
@@ -174,8 +194,11 @@ def adjust_brightness_batch_videos(
     videos: torch.Tensor,
     brightness_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ):
-    return adjust_brightness_batch_images(images=videos, brightness_factor=brightness_factor, value_check=value_check)
+    return adjust_brightness_batch_images(
+        images=videos, brightness_factor=brightness_factor, value_check=value_check, compute_dtype=compute_dtype
+    )
 
 
 def adjust_saturation(inpt: torch.Tensor, saturation_factor: float) -> torch.Tensor:
@@ -193,20 +216,24 @@ def adjust_saturation_batch(
     inpt: torch.Tensor,
     saturation_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     """Adjust saturation."""
     if torch.jit.is_scripting():
-        return adjust_saturation_batch_images(inpt, saturation_factor=saturation_factor, value_check=value_check)
+        return adjust_saturation_batch_images(
+            inpt, saturation_factor=saturation_factor, value_check=value_check, compute_dtype=compute_dtype
+        )
 
     _log_api_usage_once(adjust_saturation_batch)
 
     kernel = _get_kernel(adjust_saturation_batch, type(inpt))
-    return kernel(inpt, saturation_factor=saturation_factor, value_check=value_check)
+    return kernel(inpt, saturation_factor=saturation_factor, value_check=value_check, compute_dtype=compute_dtype)
 
 
 @_register_kernel_internal(adjust_saturation, torch.Tensor)
 @_register_kernel_internal(adjust_saturation, ta_tensors.Image)
 @_register_kernel_internal(adjust_saturation, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_saturation, ta_tensors.PaddedBatchImages)
 def adjust_saturation_image(image: torch.Tensor, saturation_factor: float) -> torch.Tensor:
     return TVF.adjust_saturation_image(image=image, saturation_factor=saturation_factor)
 
@@ -219,10 +246,12 @@ def adjust_saturation_video(video: torch.Tensor, saturation_factor: float) -> to
 
 @_register_kernel_internal(adjust_saturation_batch, torch.Tensor)
 @_register_kernel_internal(adjust_saturation_batch, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_saturation_batch, ta_tensors.PaddedBatchImages)
 def adjust_saturation_batch_images(
     images: torch.Tensor,
     saturation_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     c = images.shape[-3]
     if c not in [1, 3]:
@@ -233,7 +262,7 @@ def adjust_saturation_batch_images(
 
     saturation_factor = _get_batch_factor(saturation_factor, images.shape[0], images.device, None, value_check)
 
-    return _batch_blend(images, rgb_to_grayscale(images), saturation_factor)
+    return _batch_blend(images, rgb_to_grayscale(images), saturation_factor, compute_dtype=compute_dtype)
 
 
 @_register_kernel_internal(adjust_saturation_batch, ta_tensors.BatchVideos)
@@ -241,8 +270,11 @@ def adjust_saturation_batch_videos(
     video: torch.Tensor,
     saturation_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
-    return adjust_saturation_batch_images(video, saturation_factor=saturation_factor, value_check=value_check)
+    return adjust_saturation_batch_images(
+        video, saturation_factor=saturation_factor, value_check=value_check, compute_dtype=compute_dtype
+    )
 
 
 def adjust_contrast(inpt: torch.Tensor, contrast_factor: float) -> torch.Tensor:
@@ -257,16 +289,21 @@ def adjust_contrast(inpt: torch.Tensor, contrast_factor: float) -> torch.Tensor:
 
 
 def adjust_contrast_batch(
-    inpt: torch.Tensor, contrast_factor: Union[float, torch.Tensor], value_check: bool = False
+    inpt: torch.Tensor,
+    contrast_factor: Union[float, torch.Tensor],
+    value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     """Adjust contrast."""
     if torch.jit.is_scripting():
-        return adjust_contrast_batch_images(inpt, contrast_factor=contrast_factor, value_check=value_check)
+        return adjust_contrast_batch_images(
+            inpt, contrast_factor=contrast_factor, value_check=value_check, compute_dtype=compute_dtype
+        )
 
     _log_api_usage_once(adjust_contrast_batch)
 
     kernel = _get_kernel(adjust_contrast_batch, type(inpt))
-    return kernel(inpt, contrast_factor=contrast_factor, value_check=value_check)
+    return kernel(inpt, contrast_factor=contrast_factor, value_check=value_check, compute_dtype=compute_dtype)
 
 
 @_register_kernel_internal(adjust_contrast, torch.Tensor)
@@ -288,6 +325,19 @@ def adjust_contrast_batch_images(
     images: torch.Tensor,
     contrast_factor: Union[float, torch.Tensor],
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
+) -> torch.Tensor:
+    return _adjust_contrast_batch_images(
+        images, contrast_factor=contrast_factor, value_check=value_check, compute_dtype=compute_dtype
+    )
+
+
+def _adjust_contrast_batch_images(
+    images: torch.Tensor,
+    contrast_factor: Union[float, torch.Tensor],
+    value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
+    valid_mask: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     c = images.shape[-3]
     if c not in [1, 3]:
@@ -302,14 +352,47 @@ def adjust_contrast_batch_images(
             grayscale_images = grayscale_images.floor_()
     else:
         grayscale_images = images if fp else images.to(torch.float32)
-    mean = torch.mean(grayscale_images, dim=(-3, -2, -1), keepdim=True)
+    if valid_mask is None:
+        mean = torch.mean(grayscale_images, dim=(-3, -2, -1), keepdim=True)
+    else:
+        num_valid = valid_mask.sum(dim=(-3, -2, -1), keepdim=True).clamp_(min=1)
+        mean = (grayscale_images * valid_mask).sum(dim=(-3, -2, -1), keepdim=True) / num_valid
+    if not fp:
+        # The mean is reduced in float32 to not accumulate rounding errors.
+        mean = mean.to(_get_compute_dtype(compute_dtype))
+
+    return _batch_blend(images, mean, contrast_factor, compute_dtype=compute_dtype)
 
-    return _batch_blend(images, mean, contrast_factor)
+
+@_register_kernel_internal(adjust_contrast, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+@_register_kernel_internal(adjust_contrast_batch, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _adjust_contrast_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+    contrast_factor: Union[float, torch.Tensor],
+    value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
+) -> ta_tensors.PaddedBatchImages:
+    # The mean of the images is computed on their valid regions only.
+    output = _adjust_contrast_batch_images(
+        inpt.as_subclass(torch.Tensor),
+        contrast_factor=contrast_factor,
+        value_check=value_check,
+        compute_dtype=compute_dtype,
+        valid_mask=inpt.valid_mask(),
+    )
+    return ta_tensors.wrap(output, like=inpt)
 
 
 @_register_kernel_internal(adjust_contrast_batch, ta_tensors.BatchVideos)
-def adjust_contrast_batch_videos(videos: torch.Tensor, contrast_factor: Union[float, torch.Tensor]) -> torch.Tensor:
-    return adjust_contrast_batch_images(videos, contrast_factor=contrast_factor)
+def adjust_contrast_batch_videos(
+    videos: torch.Tensor,
+    contrast_factor: Union[float, torch.Tensor],
+    value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
+) -> torch.Tensor:
+    return adjust_contrast_batch_images(
+        videos, contrast_factor=contrast_factor, value_check=value_check, compute_dtype=compute_dtype
+    )
 
 
 def adjust_sharpness(inpt: torch.Tensor, sharpness_factor: float) -> torch.Tensor:
@@ -363,8 +446,9 @@ def adjust_hue_batch(
 @_register_kernel_internal(adjust_hue, torch.Tensor)
 @_register_kernel_internal(adjust_hue, ta_tensors.Image)
 @_register_kernel_internal(adjust_hue, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_hue, ta_tensors.PaddedBatchImages)
 def adjust_hue_image(image: torch.Tensor, hue_factor: float) -> torch.Tensor:
-    return TVF.adjust_hue_image(image=image, hue_factor=hue_factor)
+    return _preserve_channels_last(TVF.adjust_hue_image(image=image, hue_factor=hue_factor), like=image)
 
 
 @_register_kernel_internal(adjust_hue, ta_tensors.Video)
@@ -375,6 +459,7 @@ def adjust_hue_video(video: torch.Tensor, hue_factor: float) -> torch.Tensor:
 
 @_register_kernel_internal(adjust_hue_batch, torch.Tensor)
 @_register_kernel_internal(adjust_hue_batch, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_hue_batch, ta_tensors.PaddedBatchImages)
 def adjust_hue_batch_images(
     images: torch.Tensor, hue_factor: Union[float, torch.Tensor], value_check: bool = False
 ) -> torch.Tensor:
@@ -399,6 +484,7 @@ def adjust_hue_batch_images(
         max_value=0.5,
     )
 
+    orig_images = images
     orig_dtype = images.dtype
     images = to_dtype_image(images, torch.float32, scale=True)
 
@@ -412,7 +498,7 @@ def adjust_hue_batch_images(
     images = torch.stack((h, s, v), dim=-3)
     images_hue_adj = _hsv_to_rgb(images)
 
-    return to_dtype_image(images_hue_adj, orig_dtype, scale=True)
+    return _preserve_channels_last(to_dtype_image(images_hue_adj, orig_dtype, scale=True), like=orig_images)
 
 
 @_register_kernel_internal(adjust_hue_batch, ta_tensors.BatchVideos)
@@ -440,6 +526,7 @@ def adjust_gamma(
 @_register_kernel_internal(adjust_gamma, torch.Tensor)
 @_register_kernel_internal(adjust_gamma, ta_tensors.Image)
 @_register_kernel_internal(adjust_gamma, ta_tensors.BatchImages)
+@_register_kernel_internal(adjust_gamma, ta_tensors.PaddedBatchImages)
 def adjust_gamma_image(image: torch.Tensor, gamma: float, gain: float = 1.0) -> torch.Tensor:
     return TVF.adjust_gamma_image(image=image, gamma=gamma, gain=gain)
 
@@ -450,6 +537,14 @@ def adjust_gamma_video(video: torch.Tensor, gamma: float, gain: float = 1) -> to
     return adjust_gamma_image(image=video, gamma=gamma, gain=gain)
 
 
+@_register_kernel_internal(adjust_gamma, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(adjust_gamma, ta_tensors.VideoNestedTensors)
+def _adjust_gamma_nested_dispatch(
+    inpt: ta_tensors.TANestedTensors, gamma: float, gain: float = 1
+) -> ta_tensors.TANestedTensors:
+    return _apply_nested_pointwise(adjust_gamma_image, inpt, gamma=gamma, gain=gain)
+
+
 def posterize(inpt: torch.Tensor, bits: int) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomPosterize` for details."""
     if torch.jit.is_scripting():
@@ -464,6 +559,7 @@ def posterize(inpt: torch.Tensor, bits: int) -> torch.Tensor:
 @_register_kernel_internal(posterize, torch.Tensor)
 @_register_kernel_internal(posterize, ta_tensors.Image)
 @_register_kernel_internal(posterize, ta_tensors.BatchImages)
+@_register_kernel_internal(posterize, ta_tensors.PaddedBatchImages)
 def posterize_image(image: torch.Tensor, bits: int) -> torch.Tensor:
     return TVF.posterize_image(image=image, bits=bits)
 
@@ -474,6 +570,12 @@ def posterize_video(video: torch.Tensor, bits: int) -> torch.Tensor:
     return posterize_image(image=video, bits=bits)
 
 
+@_register_kernel_internal(posterize, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(posterize, ta_tensors.VideoNestedTensors)
+def _posterize_nested_dispatch(inpt: ta_tensors.TANestedTensors, bits: int) -> ta_tensors.TANestedTensors:
+    return _apply_nested_pointwise(posterize_image, inpt, bits=bits)
+
+
 def solarize(inpt: torch.Tensor, threshold: float) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomSolarize` for details."""
     if torch.jit.is_scripting():
@@ -488,6 +590,7 @@ def solarize(inpt: torch.Tensor, threshold: float) -> torch.Tensor:
 @_register_kernel_internal(solarize, torch.Tensor)
 @_register_kernel_internal(solarize, ta_tensors.Image)
 @_register_kernel_internal(solarize, ta_tensors.BatchImages)
+@_register_kernel_internal(solarize, ta_tensors.PaddedBatchImages)
 def solarize_image(image: torch.Tensor, threshold: float) -> torch.Tensor:
     return TVF.solarize_image(image=image, threshold=threshold)
 
@@ -498,6 +601,19 @@ def solarize_video(video: torch.Tensor, threshold: float) -> torch.Tensor:
     return solarize_image(image=video, threshold=threshold)
 
 
+@_register_kernel_internal(solarize, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(solarize, ta_tensors.VideoNestedTensors)
+def _solarize_nested_dispatch(inpt: ta_tensors.TANestedTensors, threshold: float) -> ta_tensors.TANestedTensors:
+    return _apply_nested_pointwise(solarize_image, inpt, threshold=threshold)
+
+
+_register_unsupported_kernel_internal(
+    adjust_sharpness,
+    ta_tensors.PaddedBatchImages,
+    "the padded pixels would be blurred into the valid regions of the images.",
+)
+
+
 def autocontrast(inpt: torch.Tensor) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomAutocontrast` for details."""
     if torch.jit.is_scripting():
@@ -522,6 +638,35 @@ def autocontrast_video(video: torch.Tensor) -> torch.Tensor:
     return autocontrast_image(image=video)
 
 
+@_register_kernel_internal(autocontrast, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _autocontrast_padded_batch_images_dispatch(inpt: ta_tensors.PaddedBatchImages) -> ta_tensors.PaddedBatchImages:
+    # The minimum and maximum of the images are computed on their valid regions only.
+    image = inpt.as_subclass(torch.Tensor)
+    c = image.shape[-3]
+    if c not in [1, 3]:
+        raise TypeError(f"Input image tensor permitted channel values are 1 or 3, but found {c}")
+    if image.numel() == 0:
+        return inpt
+
+    bound = _max_value(image.dtype)
+    fp = image.is_floating_point()
+    float_image = image if fp else image.to(torch.float32)
+    valid_mask = inpt.valid_mask()
+
+    minimum = float_image.masked_fill(~valid_mask, float("inf")).amin(dim=(-2, -1), keepdim=True)
+    maximum = float_image.masked_fill(~valid_mask, float("-inf")).amax(dim=(-2, -1), keepdim=True)
+
+    # The images without valid pixels are left as is.
+    eq_idxs = (maximum <= minimum) | minimum.isinf()
+    inv_scale = maximum.sub_(minimum).mul_(1.0 / bound)
+    minimum[eq_idxs] = 0.0
+    inv_scale[eq_idxs] = 1.0
+
+    diff = float_image.sub(minimum) if fp else float_image.sub_(minimum)
+    output = diff.div_(inv_scale).clamp_(0, bound).to(image.dtype)
+    return ta_tensors.wrap(output, like=inpt)
+
+
 def equalize(inpt: torch.Tensor) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomEqualize` for details."""
     if torch.jit.is_scripting():
@@ -537,7 +682,7 @@ def equalize(inpt: torch.Tensor) -> torch.Tensor:
 @_register_kernel_internal(equalize, ta_tensors.Image)
 @_register_kernel_internal(equalize, ta_tensors.BatchImages)
 def equalize_image(image: torch.Tensor) -> torch.Tensor:
-    return TVF.equalize_image(image=image)
+    return _preserve_channels_last(TVF.equalize_image(image=image), like=image)
 
 
 @_register_kernel_internal(equalize, ta_tensors.Video)
@@ -546,6 +691,39 @@ def equalize_video(video: torch.Tensor) -> torch.Tensor:
     return equalize_image(image=video)
 
 
+@_register_kernel_internal(equalize, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _equalize_padded_batch_images_dispatch(inpt: ta_tensors.PaddedBatchImages) -> ta_tensors.PaddedBatchImages:
+    # Same as the equalization of Torchvision with the histograms computed on the valid regions only.
+    image = inpt.as_subclass(torch.Tensor)
+    if image.numel() == 0:
+        return inpt
+
+    output_dtype = image.dtype
+    image = to_dtype_image(image, torch.uint8, scale=True)
+
+    batch_shape = image.shape[:-2]
+    flat_image = image.flatten(start_dim=-2).to(torch.long)
+    flat_valid_mask = inpt.valid_mask().flatten(start_dim=-2).to(torch.int32).expand_as(flat_image)
+    hist = flat_image.new_zeros(batch_shape + (256,), dtype=torch.int32)
+    hist.scatter_add_(dim=-1, index=flat_image, src=flat_valid_mask)
+    cum_hist = hist.cumsum(dim=-1)
+
+    index = cum_hist.argmax(dim=-1)
+    num_non_max_pixels = flat_valid_mask.sum(dim=-1, keepdim=True) - hist.gather(dim=-1, index=index.unsqueeze_(-1))
+    step = num_non_max_pixels.div_(255, rounding_mode="floor")
+    valid_equalization = step.ne(0).unsqueeze_(-1)
+
+    cum_hist = cum_hist[..., :-1]
+    cum_hist.add_(step // 2).div_(step.clamp_(min=1), rounding_mode="floor").clamp_(0, 255)
+    lut = cum_hist.to(torch.uint8)
+    lut = torch.cat([lut.new_zeros(1).expand(batch_shape + (1,)), lut], dim=-1)
+    equalized_image = lut.gather(dim=-1, index=flat_image).view_as(image)
+
+    output = torch.where(valid_equalization, equalized_image, image)
+    output = _preserve_channels_last(to_dtype_image(output, output_dtype, scale=True), like=inpt)
+    return ta_tensors.wrap(output, like=inpt)
+
+
 def invert(inpt: torch.Tensor) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomInvert`."""
     if torch.jit.is_scripting():
@@ -560,6 +738,7 @@ def invert(inpt: torch.Tensor) -> torch.Tensor:
 @_register_kernel_internal(invert, torch.Tensor)
 @_register_kernel_internal(invert, ta_tensors.Image)
 @_register_kernel_internal(invert, ta_tensors.BatchImages)
+@_register_kernel_internal(invert, ta_tensors.PaddedBatchImages)
 def invert_image(image: torch.Tensor) -> torch.Tensor:
     return TVF.invert_image(image=image)
 
@@ -570,6 +749,12 @@ def invert_video(video: torch.Tensor) -> torch.Tensor:
     return invert_image(image=video)
 
 
+@_register_kernel_internal(invert, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(invert, ta_tensors.VideoNestedTensors)
+def _invert_nested_dispatch(inpt: ta_tensors.TANestedTensors) -> ta_tensors.TANestedTensors:
+    return _apply_nested_pointwise(invert_image, inpt)
+
+
 def permute_channels(inpt: torch.Tensor, permutation: List[int]) -> torch.Tensor:
     """Permute the channels of the input according to the given permutation."""
     if torch.jit.is_scripting():
@@ -584,6 +769,7 @@ def permute_channels(inpt: torch.Tensor, permutation: List[int]) -> torch.Tensor
 @_register_kernel_internal(permute_channels, torch.Tensor)
 @_register_kernel_internal(permute_channels, ta_tensors.Image)
 @_register_kernel_internal(permute_channels, ta_tensors.BatchImages)
+@_register_kernel_internal(permute_channels, ta_tensors.PaddedBatchImages)
 def permute_channels_image(image: torch.Tensor, permutation: List[int]) -> torch.Tensor:
     return TVF.permute_channels_image(image=image, permutation=permutation)
 
@@ -27,7 +27,26 @@ from ._utils._kernel import (
     _get_kernel,
     _register_five_ten_crop_kernel_internal,
     _register_kernel_internal,
+    _register_unsupported_kernel_internal,
 )
+from ._utils._tensor import _preserve_channels_last
+
+
+def _get_packed_masks_fill(fill: _FillTypeJIT) -> _FillTypeJIT:
+    # A pixel filled in packed masks belongs to all the masks or to none of them.
+    if fill is None:
+        return None
+    values = fill if isinstance(fill, list) else [fill]
+    if any(value != values[0] for value in values) or values[0] not in (0, 1):
+        raise ValueError(f"Packed masks can only be filled with 0 or 1, got {fill}.")
+    return 255 if values[0] == 1 else 0
+
+
+def _clamp_valid_regions(valid_regions: torch.Tensor, canvas_size: Tuple[int, int]) -> torch.Tensor:
+    # The valid regions of padded images are boxes that cannot leave the canvas.
+    valid_regions[:, 0::2].clamp_(min=0, max=canvas_size[1])
+    valid_regions[:, 1::2].clamp_(min=0, max=canvas_size[0])
+    return valid_regions
 
 
 def horizontal_flip(inpt: torch.Tensor) -> torch.Tensor:
@@ -50,6 +69,8 @@ def horizontal_flip_image(image: torch.Tensor) -> torch.Tensor:
 
 @_register_kernel_internal(horizontal_flip, ta_tensors.Mask)
 @_register_kernel_internal(horizontal_flip, ta_tensors.BatchMasks)
+@_register_kernel_internal(horizontal_flip, ta_tensors.PackedMasks)
+@_register_kernel_internal(horizontal_flip, ta_tensors.BatchPackedMasks)
 def horizontal_flip_mask(mask: torch.Tensor) -> torch.Tensor:
     return horizontal_flip_image(mask)
 
@@ -75,6 +96,17 @@ def _horizontal_flip_bounding_boxes_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(horizontal_flip, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _horizontal_flip_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+) -> ta_tensors.PaddedBatchImages:
+    output = horizontal_flip_image(inpt.as_subclass(torch.Tensor))
+    valid_regions = horizontal_flip_bounding_boxes(
+        inpt.valid_regions, format=ta_tensors.BoundingBoxFormat.XYXY, canvas_size=inpt.shape[-2:]
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=valid_regions)
+
+
 @_register_kernel_internal(horizontal_flip, ta_tensors.Video)
 @_register_kernel_internal(horizontal_flip, ta_tensors.BatchVideos)
 def horizontal_flip_video(video: torch.Tensor) -> torch.Tensor:
@@ -101,6 +133,8 @@ def vertical_flip_image(image: torch.Tensor) -> torch.Tensor:
 
 @_register_kernel_internal(vertical_flip, ta_tensors.Mask)
 @_register_kernel_internal(vertical_flip, ta_tensors.BatchMasks)
+@_register_kernel_internal(vertical_flip, ta_tensors.PackedMasks)
+@_register_kernel_internal(vertical_flip, ta_tensors.BatchPackedMasks)
 def vertical_flip_mask(mask: torch.Tensor) -> torch.Tensor:
     return vertical_flip_image(mask)
 
@@ -126,6 +160,17 @@ def _vertical_flip_bounding_boxes_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(vertical_flip, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _vertical_flip_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+) -> ta_tensors.PaddedBatchImages:
+    output = vertical_flip_image(inpt.as_subclass(torch.Tensor))
+    valid_regions = vertical_flip_bounding_boxes(
+        inpt.valid_regions, format=ta_tensors.BoundingBoxFormat.XYXY, canvas_size=inpt.shape[-2:]
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=valid_regions)
+
+
 @_register_kernel_internal(vertical_flip, ta_tensors.Video)
 @_register_kernel_internal(vertical_flip, ta_tensors.BatchVideos)
 def vertical_flip_video(video: torch.Tensor) -> torch.Tensor:
@@ -186,6 +231,8 @@ def resize_mask(mask: torch.Tensor, size: List[int], max_size: Optional[int] = N
 
 @_register_kernel_internal(resize, ta_tensors.Mask, ta_tensor_wrapper=False)
 @_register_kernel_internal(resize, ta_tensors.BatchMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(resize, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(resize, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
 def _resize_mask_dispatch(
     inpt: ta_tensors.Mask,
     size: List[int],
@@ -224,6 +271,27 @@ def _resize_bounding_boxes_dispatch(
     return ta_tensors.wrap(output, like=inpt, canvas_size=canvas_size)
 
 
+@_register_kernel_internal(resize, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _resize_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+    size: List[int],
+    interpolation: Union[InterpolationMode, int] = InterpolationMode.BILINEAR,
+    max_size: Optional[int] = None,
+    antialias: bool = True,
+) -> ta_tensors.PaddedBatchImages:
+    output = resize_image(
+        inpt.as_subclass(torch.Tensor),
+        size=size,
+        interpolation=interpolation,
+        max_size=max_size,
+        antialias=antialias,
+    )
+    valid_regions, canvas_size = resize_bounding_boxes(
+        inpt.valid_regions, canvas_size=inpt.shape[-2:], size=size, max_size=max_size
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=_clamp_valid_regions(valid_regions, canvas_size))
+
+
 @_register_kernel_internal(resize, ta_tensors.Video)
 @_register_kernel_internal(resize, ta_tensors.BatchVideos)
 def resize_video(
@@ -293,7 +361,7 @@ def affine_image(
     fill: _FillTypeJIT = None,
     center: Optional[List[float]] = None,
 ) -> torch.Tensor:
-    return TVF.affine_image(
+    output = TVF.affine_image(
         image=image,
         angle=angle,
         translate=translate,
@@ -303,6 +371,7 @@ def affine_image(
         fill=fill,
         center=center,
     )
+    return _preserve_channels_last(output, like=image)
 
 
 def affine_bounding_boxes(
@@ -395,6 +464,29 @@ def _affine_mask_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(affine, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(affine, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _affine_packed_masks_dispatch(
+    inpt: Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks],
+    angle: Union[int, float],
+    translate: List[float],
+    scale: float,
+    shear: List[float],
+    fill: _FillTypeJIT = None,
+    center: Optional[List[float]] = None,
+    **kwargs,
+) -> Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks]:
+    return _affine_mask_dispatch(
+        inpt,
+        angle=angle,
+        translate=translate,
+        scale=scale,
+        shear=shear,
+        fill=_get_packed_masks_fill(fill),
+        center=center,
+    )
+
+
 @_register_kernel_internal(affine, ta_tensors.Video)
 @_register_kernel_internal(affine, ta_tensors.BatchVideos)
 def affine_video(
@@ -462,7 +554,7 @@ def rotate_image(
     center: Optional[List[float]] = None,
     fill: _FillTypeJIT = None,
 ) -> torch.Tensor:
-    return TVF.rotate_image(
+    output = TVF.rotate_image(
         image=image,
         angle=angle,
         interpolation=interpolation,
@@ -470,6 +562,7 @@ def rotate_image(
         center=center,
         fill=fill,
     )
+    return _preserve_channels_last(output, like=image)
 
 
 def rotate_bounding_boxes(
@@ -546,6 +639,19 @@ def _rotate_mask_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(rotate, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(rotate, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _rotate_packed_masks_dispatch(
+    inpt: Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks],
+    angle: float,
+    expand: bool = False,
+    center: Optional[List[float]] = None,
+    fill: _FillTypeJIT = None,
+    **kwargs,
+) -> Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks]:
+    return _rotate_mask_dispatch(inpt, angle=angle, expand=expand, center=center, fill=_get_packed_masks_fill(fill))
+
+
 @_register_kernel_internal(rotate, ta_tensors.Video)
 @_register_kernel_internal(rotate, ta_tensors.BatchVideos)
 def rotate_video(
@@ -605,6 +711,23 @@ def pad_mask(
     return TVF.pad_mask(mask=mask, padding=padding, fill=fill, padding_mode=padding_mode)
 
 
+@_register_kernel_internal(pad, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(pad, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _pad_packed_masks_dispatch(
+    inpt: Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks],
+    padding: List[int],
+    fill: Optional[Union[int, float, List[float]]] = None,
+    padding_mode: str = "constant",
+) -> Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks]:
+    output = pad_mask(
+        inpt.as_subclass(torch.Tensor),
+        padding=padding,
+        fill=_get_packed_masks_fill(fill),
+        padding_mode=padding_mode,
+    )
+    return ta_tensors.wrap(output, like=inpt)
+
+
 def pad_bounding_boxes(
     bounding_boxes: torch.Tensor,
     format: ta_tensors.BoundingBoxFormat,
@@ -639,6 +762,24 @@ def _pad_bounding_boxes_dispatch(
     return ta_tensors.wrap(output, like=inpt, canvas_size=canvas_size)
 
 
+@_register_kernel_internal(pad, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _pad_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+    padding: List[int],
+    fill: Optional[Union[int, float, List[float]]] = None,
+    padding_mode: str = "constant",
+) -> ta_tensors.PaddedBatchImages:
+    output = pad_image(inpt.as_subclass(torch.Tensor), padding=padding, fill=fill, padding_mode=padding_mode)
+    # The valid regions are translated the same way whatever the padding mode, the padded pixels are not valid.
+    valid_regions, _ = pad_bounding_boxes(
+        inpt.valid_regions,
+        format=ta_tensors.BoundingBoxFormat.XYXY,
+        canvas_size=inpt.shape[-2:],
+        padding=padding,
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=valid_regions)
+
+
 @_register_kernel_internal(pad, ta_tensors.Video)
 @_register_kernel_internal(pad, ta_tensors.BatchVideos)
 def pad_video(
@@ -704,10 +845,28 @@ def _crop_bounding_boxes_dispatch(
 
 @_register_kernel_internal(crop, ta_tensors.Mask)
 @_register_kernel_internal(crop, ta_tensors.BatchMasks)
+@_register_kernel_internal(crop, ta_tensors.PackedMasks)
+@_register_kernel_internal(crop, ta_tensors.BatchPackedMasks)
 def crop_mask(mask: torch.Tensor, top: int, left: int, height: int, width: int) -> torch.Tensor:
     return TVF.crop_mask(mask=mask, top=top, left=left, height=height, width=width)
 
 
+@_register_kernel_internal(crop, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _crop_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages, top: int, left: int, height: int, width: int
+) -> ta_tensors.PaddedBatchImages:
+    output = crop_image(inpt.as_subclass(torch.Tensor), top=top, left=left, height=height, width=width)
+    valid_regions, canvas_size = crop_bounding_boxes(
+        inpt.valid_regions,
+        format=ta_tensors.BoundingBoxFormat.XYXY,
+        top=top,
+        left=left,
+        height=height,
+        width=width,
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=_clamp_valid_regions(valid_regions, canvas_size))
+
+
 @_register_kernel_internal(crop, ta_tensors.Video)
 @_register_kernel_internal(crop, ta_tensors.BatchVideos)
 def crop_video(video: torch.Tensor, top: int, left: int, height: int, width: int) -> torch.Tensor:
@@ -757,7 +916,7 @@ def perspective_image(
     fill: _FillTypeJIT = None,
     coefficients: Optional[List[float]] = None,
 ) -> torch.Tensor:
-    return TVF.perspective_image(
+    output = TVF.perspective_image(
         image=image,
         startpoints=startpoints,
         endpoints=endpoints,
@@ -765,6 +924,7 @@ def perspective_image(
         fill=fill,
         coefficients=coefficients,
     )
+    return _preserve_channels_last(output, like=image)
 
 
 def perspective_bounding_boxes(
@@ -841,6 +1001,25 @@ def _perspective_mask_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(perspective, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(perspective, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _perspective_packed_masks_dispatch(
+    inpt: Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks],
+    startpoints: Optional[List[List[int]]],
+    endpoints: Optional[List[List[int]]],
+    fill: _FillTypeJIT = None,
+    coefficients: Optional[List[float]] = None,
+    **kwargs,
+) -> Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks]:
+    return _perspective_mask_dispatch(
+        inpt,
+        startpoints=startpoints,
+        endpoints=endpoints,
+        fill=_get_packed_masks_fill(fill),
+        coefficients=coefficients,
+    )
+
+
 @_register_kernel_internal(perspective, ta_tensors.Video)
 @_register_kernel_internal(perspective, ta_tensors.BatchVideos)
 def perspective_video(
@@ -907,7 +1086,8 @@ def elastic_image(
     interpolation: Union[InterpolationMode, int] = InterpolationMode.BILINEAR,
     fill: _FillTypeJIT = None,
 ) -> torch.Tensor:
-    return TVF.elastic_image(image=image, displacement=displacement, interpolation=interpolation, fill=fill)
+    output = TVF.elastic_image(image=image, displacement=displacement, interpolation=interpolation, fill=fill)
+    return _preserve_channels_last(output, like=image)
 
 
 def _create_identity_grid_batch(
@@ -936,6 +1116,7 @@ def _apply_grid_transform_batch(
     if images.numel() == 0:
         return images.reshape(output_shape)
 
+    orig_images = images
     images = images.reshape(batch_size, -1, num_channels, input_height, input_width)
     squashed_dim = images.shape[1]
     images = images.reshape(-1, num_channels, input_height, input_width)
@@ -978,7 +1159,7 @@ def _apply_grid_transform_batch(
 
     images = float_images.round_().to(images.dtype) if not fp else float_images
 
-    return images.reshape(output_shape)
+    return _preserve_channels_last(images.reshape(output_shape), like=orig_images)
 
 
 @_register_kernel_internal(elastic_batch, torch.Tensor)
@@ -1222,6 +1403,27 @@ def _elastic_batch_masks_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(elastic, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(elastic, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _elastic_packed_masks_dispatch(
+    inpt: Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks],
+    displacement: torch.Tensor,
+    fill: _FillTypeJIT = None,
+    **kwargs,
+) -> Union[ta_tensors.PackedMasks, ta_tensors.BatchPackedMasks]:
+    return _elastic_mask_dispatch(inpt, displacement=displacement, fill=_get_packed_masks_fill(fill))
+
+
+@_register_kernel_internal(elastic_batch, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
+def _elastic_batch_packed_masks_dispatch(
+    inpt: ta_tensors.BatchPackedMasks,
+    displacement: torch.Tensor,
+    fill: _FillTypeJIT = None,
+    **kwargs,
+) -> ta_tensors.BatchPackedMasks:
+    return _elastic_batch_masks_dispatch(inpt, displacement=displacement, fill=_get_packed_masks_fill(fill))
+
+
 @_register_kernel_internal(elastic, ta_tensors.Video)
 @_register_kernel_internal(elastic, ta_tensors.BatchVideos)
 def elastic_video(
@@ -1291,6 +1493,8 @@ def _center_crop_bounding_boxes_dispatch(
 
 @_register_kernel_internal(center_crop, ta_tensors.Mask)
 @_register_kernel_internal(center_crop, ta_tensors.BatchMasks)
+@_register_kernel_internal(center_crop, ta_tensors.PackedMasks)
+@_register_kernel_internal(center_crop, ta_tensors.BatchPackedMasks)
 def center_crop_mask(mask: torch.Tensor, output_size: List[int]) -> torch.Tensor:
     if mask.ndim < 3:
         mask = mask.unsqueeze(0)
@@ -1306,6 +1510,20 @@ def center_crop_mask(mask: torch.Tensor, output_size: List[int]) -> torch.Tensor
     return output
 
 
+@_register_kernel_internal(center_crop, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _center_crop_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages, output_size: List[int]
+) -> ta_tensors.PaddedBatchImages:
+    output = center_crop_image(inpt.as_subclass(torch.Tensor), output_size=output_size)
+    valid_regions, canvas_size = center_crop_bounding_boxes(
+        inpt.valid_regions,
+        format=ta_tensors.BoundingBoxFormat.XYXY,
+        canvas_size=inpt.shape[-2:],
+        output_size=output_size,
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=_clamp_valid_regions(valid_regions, canvas_size))
+
+
 @_register_kernel_internal(center_crop, ta_tensors.Video)
 @_register_kernel_internal(center_crop, ta_tensors.BatchVideos)
 def center_crop_video(video: torch.Tensor, output_size: List[int]) -> torch.Tensor:
@@ -1438,6 +1656,8 @@ def resized_crop_mask(
 
 @_register_kernel_internal(resized_crop, ta_tensors.Mask, ta_tensor_wrapper=False)
 @_register_kernel_internal(resized_crop, ta_tensors.BatchMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(resized_crop, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(resized_crop, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
 def _resized_crop_mask_dispatch(
     inpt: Union[ta_tensors.Mask, ta_tensors.BatchMasks],
     top: int,
@@ -1458,6 +1678,39 @@ def _resized_crop_mask_dispatch(
     return ta_tensors.wrap(output, like=inpt)
 
 
+@_register_kernel_internal(resized_crop, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
+def _resized_crop_padded_batch_images_dispatch(
+    inpt: ta_tensors.PaddedBatchImages,
+    top: int,
+    left: int,
+    height: int,
+    width: int,
+    size: List[int],
+    interpolation: Union[InterpolationMode, int] = InterpolationMode.BILINEAR,
+    antialias: bool = True,
+) -> ta_tensors.PaddedBatchImages:
+    output = resized_crop_image(
+        inpt.as_subclass(torch.Tensor),
+        top=top,
+        left=left,
+        height=height,
+        width=width,
+        size=size,
+        interpolation=interpolation,
+        antialias=antialias,
+    )
+    valid_regions, canvas_size = resized_crop_bounding_boxes(
+        inpt.valid_regions,
+        format=ta_tensors.BoundingBoxFormat.XYXY,
+        top=top,
+        left=left,
+        height=height,
+        width=width,
+        size=size,
+    )
+    return ta_tensors.wrap(output, like=inpt, valid_regions=_clamp_valid_regions(valid_regions, canvas_size))
+
+
 @_register_kernel_internal(resized_crop, ta_tensors.Video)
 @_register_kernel_internal(resized_crop, ta_tensors.BatchVideos)
 def resized_crop_video(
@@ -1573,3 +1826,15 @@ def ten_crop_video(
     torch.Tensor,
 ]:
     return ten_crop_image(image=video, size=size, vertical_flip=vertical_flip)
+
+
+for _functional in (affine, rotate, perspective, elastic, elastic_batch):
+    _register_unsupported_kernel_internal(
+        _functional,
+        ta_tensors.PaddedBatchImages,
+        "the padded pixels would be moved inside the valid regions of the images.",
+    )
+for _functional in (five_crop, ten_crop):
+    _register_unsupported_kernel_internal(
+        _functional, ta_tensors.PaddedBatchImages, "the crops would ignore the valid regions of the images."
+    )
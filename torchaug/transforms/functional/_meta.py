@@ -40,6 +40,7 @@ def get_dimensions(inpt: torch.Tensor) -> List[int]:
 @_register_kernel_internal(get_dimensions, torch.Tensor)
 @_register_kernel_internal(get_dimensions, ta_tensors.Image, ta_tensor_wrapper=False)
 @_register_kernel_internal(get_dimensions, ta_tensors.BatchImages, ta_tensor_wrapper=False)
+@_register_kernel_internal(get_dimensions, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
 def get_dimensions_image(image: torch.Tensor) -> List[int]:
     return TVF.get_dimensions_image(image=image)
 
@@ -63,6 +64,7 @@ def get_num_channels(inpt: torch.Tensor) -> int:
 @_register_kernel_internal(get_num_channels, torch.Tensor)
 @_register_kernel_internal(get_num_channels, ta_tensors.Image, ta_tensor_wrapper=False)
 @_register_kernel_internal(get_num_channels, ta_tensors.BatchImages, ta_tensor_wrapper=False)
+@_register_kernel_internal(get_num_channels, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
 def get_num_channels_image(image: torch.Tensor) -> int:
     return TVF.get_num_channels_image(image=image)
 
@@ -86,6 +88,7 @@ def get_size(inpt: torch.Tensor) -> List[int]:
 @_register_kernel_internal(get_size, torch.Tensor)
 @_register_kernel_internal(get_size, ta_tensors.Image, ta_tensor_wrapper=False)
 @_register_kernel_internal(get_size, ta_tensors.BatchImages, ta_tensor_wrapper=False)
+@_register_kernel_internal(get_size, ta_tensors.PaddedBatchImages, ta_tensor_wrapper=False)
 def get_size_image(image: torch.Tensor) -> List[int]:
     return TVF.get_size_image(image=image)
 
@@ -98,6 +101,8 @@ def get_size_video(video: torch.Tensor) -> List[int]:
 
 @_register_kernel_internal(get_size, ta_tensors.Mask, ta_tensor_wrapper=False)
 @_register_kernel_internal(get_size, ta_tensors.BatchMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(get_size, ta_tensors.PackedMasks, ta_tensor_wrapper=False)
+@_register_kernel_internal(get_size, ta_tensors.BatchPackedMasks, ta_tensor_wrapper=False)
 def get_size_mask(mask: torch.Tensor) -> List[int]:
     return get_size_image(mask)
 
@@ -21,8 +21,15 @@ from torchaug import ta_tensors
 from torchaug._utils import _log_api_usage_once
 
 from ._meta import _convert_bounding_box_format
-from ._utils._kernel import _get_kernel, _register_kernel_internal
-from ._utils._tensor import _transfer_tensor_on_device, is_pure_tensor
+from ._utils._kernel import _get_kernel, _register_kernel_internal, _register_unsupported_kernel_internal
+from ._utils._nested import _apply_nested_pointwise, _check_nested_num_channels, _expand_nested_channels
+from ._utils._tensor import (
+    _get_compute_dtype,
+    _max_value,
+    _preserve_channels_last,
+    _transfer_tensor_on_device,
+    is_pure_tensor,
+)
 
 
 def normalize(
@@ -44,6 +51,7 @@ def normalize(
 @_register_kernel_internal(normalize, torch.Tensor)
 @_register_kernel_internal(normalize, ta_tensors.Image)
 @_register_kernel_internal(normalize, ta_tensors.BatchImages)
+@_register_kernel_internal(normalize, ta_tensors.PaddedBatchImages)
 def normalize_image(
     image: torch.Tensor,
     mean: List[float],
@@ -59,6 +67,23 @@ def normalize_video(video: torch.Tensor, mean: List[float], std: List[float], in
     return normalize_image(image=video, mean=mean, std=std, inplace=inplace)
 
 
+@_register_kernel_internal(normalize, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(normalize, ta_tensors.VideoNestedTensors)
+def _normalize_nested_dispatch(
+    inpt: ta_tensors.TANestedTensors, mean: List[float], std: List[float], inplace: bool = False
+) -> ta_tensors.TANestedTensors:
+    if not inpt.dtype.is_floating_point:
+        raise TypeError(f"Input tensor should be a float tensor. Got {inpt.dtype}.")
+    elif inplace and not inpt.is_packed:
+        for tensor in inpt:
+            normalize_image(tensor.as_subclass(torch.Tensor), mean=mean, std=std, inplace=True)
+        return inpt
+
+    return _to_dtype_normalize_nested_dispatch(
+        inpt, mean=mean, std=std, dtype=inpt.dtype, scale=False, out=inpt.packed_data if inplace else None
+    )
+
+
 def gaussian_blur(
     inpt: torch.Tensor,
     kernel_size: List[int],
@@ -79,15 +104,18 @@ def gaussian_blur_batch(
     kernel_size: List[int],
     sigma: Optional[torch.Tensor] = None,
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     """See :class:`~torchaug.transforms.RandomGaussianBlur` for details."""
     if torch.jit.is_scripting():
-        return gaussian_blur_batch_images(inpt, kernel_size=kernel_size, sigma=sigma, value_check=value_check)
+        return gaussian_blur_batch_images(
+            inpt, kernel_size=kernel_size, sigma=sigma, value_check=value_check, compute_dtype=compute_dtype
+        )
 
     _log_api_usage_once(gaussian_blur_batch)
 
     kernel = _get_kernel(gaussian_blur_batch, type(inpt))
-    return kernel(inpt, kernel_size=kernel_size, sigma=sigma, value_check=value_check)
+    return kernel(inpt, kernel_size=kernel_size, sigma=sigma, value_check=value_check, compute_dtype=compute_dtype)
 
 
 def _get_gaussian_kernel1d(
@@ -207,6 +235,7 @@ def gaussian_blur_batch_images(
     kernel_size: List[int],
     sigma: Optional[torch.Tensor] = None,
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
     if not isinstance(sigma, torch.Tensor):
         return gaussian_blur_image(image=images, kernel_size=kernel_size, sigma=sigma)
@@ -228,6 +257,7 @@ def gaussian_blur_batch_images(
         if (sigma < 0).any():
             raise ValueError(f"sigma should have positive values. Got {sigma}")
 
+    orig_images = images
     dtype = images.dtype
     shape = images.shape
 
@@ -247,13 +277,18 @@ def gaussian_blur_batch_images(
     elif sigma.ndim > 2:
         raise ValueError(f"sigma should have 1 or 2 dimensions. Got {sigma.ndim}")
     fp = torch.is_floating_point(images)
+    float_dtype = dtype if fp else _get_compute_dtype(compute_dtype)
+    if float_dtype == torch.float16 and images.device.type == "cpu" and not fp:
+        # Patch: reflect padding does not support (cpu, f16) input
+        float_dtype = torch.float32
     kernel = _get_gaussian_kernel2d(kernel_size, sigma, dtype=dtype if fp else torch.float32, device=images.device)
+    kernel = kernel.to(dtype=float_dtype)
 
     kernel = kernel[:, None, ...]
     kernel = kernel.expand(-1, images.shape[-3], kernel_size[1], kernel_size[0])
     kernel = kernel.reshape(-1, 1, kernel_size[1], kernel_size[0])
 
-    images = images if fp else images.to(dtype=torch.float32)
+    images = images if fp else images.to(dtype=float_dtype)
 
     # padding = (left, right, top, bottom)
     padding = [
@@ -264,14 +299,15 @@ def gaussian_blur_batch_images(
     ]
 
     output = torch_pad(images, padding, mode="reflect")
-    output = output.view(-1, kernel.shape[0], output.shape[-2], output.shape[-1])
+    # The grouped convolution over the whole batch requires a contiguous input, channels_last is restored after.
+    output = output.reshape(-1, kernel.shape[0], output.shape[-2], output.shape[-1])
     output = conv2d(output, kernel, groups=output.shape[-3])
 
     output = output.reshape(shape)
     if not fp:
         output = output.round_().to(dtype=dtype)
 
-    return output
+    return _preserve_channels_last(output, like=orig_images)
 
 
 @_register_kernel_internal(gaussian_blur_batch, ta_tensors.BatchVideos)
@@ -280,8 +316,19 @@ def gaussian_blur_batch_videos(
     kernel_size: List[int],
     sigma: Optional[torch.Tensor] = None,
     value_check: bool = False,
+    compute_dtype: Optional[torch.dtype] = None,
 ) -> torch.Tensor:
-    return gaussian_blur_batch_images(images=videos, kernel_size=kernel_size, sigma=sigma, value_check=value_check)
+    return gaussian_blur_batch_images(
+        images=videos, kernel_size=kernel_size, sigma=sigma, value_check=value_check, compute_dtype=compute_dtype
+    )
+
+
+for _functional in (gaussian_blur, gaussian_blur_batch):
+    _register_unsupported_kernel_internal(
+        _functional,
+        ta_tensors.PaddedBatchImages,
+        "the padded pixels would be blurred into the valid regions of the images.",
+    )
 
 
 def sanitize_bounding_boxes(
@@ -385,6 +432,7 @@ def to_dtype(inpt: torch.Tensor, dtype: torch.dtype = torch.float, scale: bool =
 @_register_kernel_internal(to_dtype, torch.Tensor)
 @_register_kernel_internal(to_dtype, ta_tensors.Image)
 @_register_kernel_internal(to_dtype, ta_tensors.BatchImages)
+@_register_kernel_internal(to_dtype, ta_tensors.PaddedBatchImages)
 def to_dtype_image(image: torch.Tensor, dtype: torch.dtype = torch.float, scale: bool = False) -> torch.Tensor:
     return TVF.to_dtype_image(image=image, dtype=dtype, scale=scale)
 
@@ -395,6 +443,138 @@ def to_dtype_video(video: torch.Tensor, dtype: torch.dtype = torch.float, scale:
     return to_dtype_image(image=video, dtype=dtype, scale=scale)
 
 
+@_register_kernel_internal(to_dtype, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(to_dtype, ta_tensors.VideoNestedTensors)
+def _to_dtype_nested_dispatch(
+    inpt: ta_tensors.TANestedTensors, dtype: torch.dtype = torch.float, scale: bool = False
+) -> ta_tensors.TANestedTensors:
+    return _apply_nested_pointwise(to_dtype_image, inpt, dtype=dtype, scale=scale)
+
+
+def to_dtype_normalize(
+    inpt: torch.Tensor,
+    mean: List[float],
+    std: List[float],
+    dtype: torch.dtype = torch.float32,
+    scale: bool = True,
+    out: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """See :class:`~torchaug.transforms.ToDtypeNormalize` for details."""
+    if torch.jit.is_scripting():
+        return to_dtype_normalize_image(inpt, mean=mean, std=std, dtype=dtype, scale=scale, out=out)
+
+    _log_api_usage_once(to_dtype_normalize)
+
+    kernel = _get_kernel(to_dtype_normalize, type(inpt))
+    return kernel(inpt, mean=mean, std=std, dtype=dtype, scale=scale, out=out)
+
+
+@_register_kernel_internal(to_dtype_normalize, torch.Tensor)
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.Image)
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.BatchImages)
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.PaddedBatchImages)
+def to_dtype_normalize_image(
+    image: torch.Tensor,
+    mean: List[float],
+    std: List[float],
+    dtype: torch.dtype = torch.float32,
+    scale: bool = True,
+    out: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    if torch.jit.is_scripting():
+        float_output = torch.tensor(0, dtype=dtype).is_floating_point()
+    else:
+        float_output = dtype.is_floating_point
+
+    if not float_output:
+        raise ValueError(f"Output dtype should be a floating point dtype, got {str(dtype)}.")
+    elif image.ndim < 3:
+        raise ValueError(f"Expected tensor to be a tensor image of size (..., C, H, W). Got {image.shape}.")
+    for s in std:
+        if s == 0:
+            raise ValueError(f"std contains a zero value, leading to division by zero. Got {std}.")
+
+    if out is None:
+        out = torch.empty_like(image, dtype=dtype)
+    elif out.shape != image.shape or out.dtype != dtype or out.device != image.device:
+        raise ValueError(
+            f"out should be a tensor of shape {image.shape}, dtype {str(dtype)} and device {image.device}. "
+            f"Got shape {out.shape}, dtype {str(out.dtype)} and device {out.device}."
+        )
+
+    # The scaling and the normalization are folded in a single affine transformation
+    # output = image * factor + offset computed in one pass that directly writes in out.
+    compute_dtype = torch.float64 if dtype == torch.float64 or image.dtype == torch.float64 else torch.float32
+    mean_t = torch.as_tensor(mean, dtype=compute_dtype, device=image.device).view(-1, 1, 1)
+    std_t = torch.as_tensor(std, dtype=compute_dtype, device=image.device).view(-1, 1, 1)
+
+    factor = std_t.reciprocal()
+    if scale and not image.is_floating_point():
+        factor = factor / _max_value(image.dtype)
+    offset = -mean_t / std_t
+
+    return torch.addcmul(offset, image, factor, out=out)
+
+
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.Video)
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.BatchVideos)
+def to_dtype_normalize_video(
+    video: torch.Tensor,
+    mean: List[float],
+    std: List[float],
+    dtype: torch.dtype = torch.float32,
+    scale: bool = True,
+    out: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    return to_dtype_normalize_image(video, mean=mean, std=std, dtype=dtype, scale=scale, out=out)
+
+
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.ImageNestedTensors)
+@_register_kernel_internal(to_dtype_normalize, ta_tensors.VideoNestedTensors)
+def _to_dtype_normalize_nested_dispatch(
+    inpt: ta_tensors.TANestedTensors,
+    mean: List[float],
+    std: List[float],
+    dtype: torch.dtype = torch.float32,
+    scale: bool = True,
+    out: Optional[torch.Tensor] = None,
+) -> ta_tensors.TANestedTensors:
+    # The packed buffer of the samples is transformed at once, with the per-channel factor and offset expanded to it.
+    if not dtype.is_floating_point:
+        raise ValueError(f"Output dtype should be a floating point dtype, got {str(dtype)}.")
+    num_channels = _check_nested_num_channels(inpt)
+    if len(mean) not in (1, num_channels) or len(std) not in (1, num_channels):
+        raise ValueError(f"Expected mean and std of {num_channels} channels, got {len(mean)} and {len(std)}.")
+    for s in std:
+        if s == 0:
+            raise ValueError(f"std contains a zero value, leading to division by zero. Got {std}.")
+
+    packed = inpt.pack()
+    data = packed.packed_data.as_subclass(torch.Tensor)
+    if out is None:
+        out = torch.empty_like(data, dtype=dtype)
+    elif out.shape != data.shape or out.dtype != dtype or out.device != data.device:
+        raise ValueError(
+            f"out should be a tensor of shape {data.shape}, dtype {str(dtype)} and device {data.device}. "
+            f"Got shape {out.shape}, dtype {str(out.dtype)} and device {out.device}."
+        )
+
+    compute_dtype = torch.float64 if dtype == torch.float64 or data.dtype == torch.float64 else torch.float32
+    mean_t = torch.as_tensor(mean, dtype=compute_dtype, device=data.device)
+    std_t = torch.as_tensor(std, dtype=compute_dtype, device=data.device)
+
+    factor = std_t.reciprocal()
+    if scale and not data.is_floating_point():
+        factor = factor / _max_value(data.dtype)
+    offset = -mean_t / std_t
+
+    shapes = packed.shapes
+    output = torch.addcmul(
+        _expand_nested_channels(offset, shapes), data, _expand_nested_channels(factor, shapes), out=out
+    )
+    return packed if output.data_ptr() == data.data_ptr() else packed.with_packed_data(output)
+
+
 @_register_kernel_internal(to_dtype, ta_tensors.BoundingBoxes, ta_tensor_wrapper=False)
 @_register_kernel_internal(to_dtype, ta_tensors.Mask, ta_tensor_wrapper=False)
 @_register_kernel_internal(to_dtype, ta_tensors.BatchBoundingBoxes, ta_tensor_wrapper=False)
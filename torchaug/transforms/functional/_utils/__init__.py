@@ -17,9 +17,13 @@ from ._kernel import (
     _register_kernel_internal,
     register_kernel,
 )
+from ._nested import _apply_nested_pointwise, _check_nested_num_channels, _expand_nested_channels
 from ._tensor import (
     _get_batch_factor,
+    _get_compute_dtype,
+    _is_channels_last,
     _max_value,
+    _preserve_channels_last,
     _transfer_tensor_on_device,
     is_pure_tensor,
 )
@@ -59,6 +59,17 @@ def _register_kernel_internal(functional, input_type, *, ta_tensor_wrapper=True)
     return decorator
 
 
+def _register_unsupported_kernel_internal(functional, input_type, reason):
+    # Transforms call the kernels with allow_passthrough=True, so a type without kernel would be silently returned
+    # as is while the other inputs of the sample, e.g. its bounding boxes, are transformed.
+    def kernel(inpt, *args, **kwargs):
+        raise TypeError(
+            f"Functional F.{functional.__name__} does not support inputs of type {input_type.__name__}: {reason}"
+        )
+
+    _register_kernel_internal(functional, input_type, ta_tensor_wrapper=False)(kernel)
+
+
 def _name_to_functional(name):
     import torchvision.transforms.v2.functional  # noqa
 
@@ -121,6 +132,10 @@ def register_kernel(functional, ta_tensor_cls):
     return _register_kernel_internal(functional, ta_tensor_cls, ta_tensor_wrapper=False)
 
 
+def _passthrough(inpt, *args, **kwargs):
+    return inpt
+
+
 def _get_kernel(functional, input_type, *, allow_passthrough=False):
     registry = _KERNEL_REGISTRY.get(functional)
     if not registry:
@@ -136,7 +151,7 @@ def _get_kernel(functional, input_type, *, allow_passthrough=False):
             break
 
     if allow_passthrough:
-        return lambda inpt, *args, **kwargs: inpt
+        return _passthrough
 
     raise TypeError(
         f"Functional F.{functional.__name__} supports inputs of type {registry.keys()}, "
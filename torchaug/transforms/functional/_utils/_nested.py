@@ -0,0 +1,50 @@
+# ==================================
+# Copyright: CEA-LIST/DIASI/SIALV/
+# Author : Torchaug Developers
+# License: CECILL-C
+# ==================================
+
+from __future__ import annotations
+
+import math
+from typing import Callable, Optional, Sequence
+
+import torch
+
+from torchaug import ta_tensors
+
+
+def _check_nested_num_channels(inpt: ta_tensors.TANestedTensors, num_channels: Optional[Sequence[int]] = None) -> int:
+    # Check that nested images or videos of shape [..., C, H, W] have the same number of channels.
+    shapes = inpt.shapes
+    for shape in shapes:
+        if len(shape) < 3:
+            raise ValueError(f"Expected tensors to be tensor images of size (..., C, H, W). Got {shape}.")
+        elif shape[-3] != shapes[0][-3]:
+            raise ValueError("All tensors must have the same number of channels.")
+        elif num_channels is not None and shape[-3] not in num_channels:
+            raise TypeError(
+                f"Input image tensor permitted channel values are {list(num_channels)}, but found {shape[-3]}"
+            )
+    return shapes[0][-3]
+
+
+def _expand_nested_channels(values: torch.Tensor, shapes: Sequence[torch.Size]) -> torch.Tensor:
+    # Expand per-channel values to the packed buffer of nested images or videos of shape [..., C, H, W]: the buffer
+    # is a sequence of planes of H * W elements whose channels cycle over C.
+    plane_numels = [shape[-2] * shape[-1] for shape in shapes for _ in range(math.prod(shape[:-2]))]
+    num_planes = len(plane_numels)
+    plane_numels_tensor = torch.tensor(plane_numels, device=values.device)
+    return values.repeat(num_planes // values.numel()).repeat_interleave(
+        plane_numels_tensor, output_size=sum(plane_numels)
+    )
+
+
+def _apply_nested_pointwise(
+    kernel: Callable[..., torch.Tensor], inpt: ta_tensors.TANestedTensors, **kwargs
+) -> ta_tensors.TANestedTensors:
+    # Apply a channel-independent pointwise kernel to the packed buffer of the nested tensors at once. The buffer is
+    # viewed as a single channel image of one row to satisfy the checks of the image kernels.
+    packed = inpt.pack()
+    output = kernel(packed.packed_data.as_subclass(torch.Tensor).view(1, 1, -1), **kwargs)
+    return packed.with_packed_data(output.view(-1))
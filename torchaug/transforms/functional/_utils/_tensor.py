@@ -70,5 +70,31 @@ def _max_value(dtype: torch.dtype) -> int:
         return 1
 
 
+def _get_compute_dtype(compute_dtype: Optional[torch.dtype]) -> torch.dtype:
+    """Get the floating dtype used by kernels to compute on integer inputs, float32 by default."""
+    if compute_dtype is None:
+        return torch.float32
+    elif (
+        compute_dtype != torch.float16
+        and compute_dtype != torch.bfloat16
+        and compute_dtype != torch.float32
+        and compute_dtype != torch.float64
+    ):
+        raise ValueError(f"compute_dtype should be a floating point dtype, got {str(compute_dtype)}.")
+    return compute_dtype
+
+
+def _is_channels_last(tensor: torch.Tensor) -> bool:
+    # Tensors that are contiguous in both memory formats, e.g. with a single channel, are considered contiguous.
+    return tensor.ndim == 4 and not tensor.is_contiguous() and tensor.is_contiguous(memory_format=torch.channels_last)
+
+
+def _preserve_channels_last(output: torch.Tensor, like: torch.Tensor) -> torch.Tensor:
+    """Convert the output of a kernel that does not support ``channels_last`` to the memory format of its input."""
+    if output.ndim == 4 and _is_channels_last(like) and not output.is_contiguous(memory_format=torch.channels_last):
+        return output.contiguous(memory_format=torch.channels_last)
+    return output
+
+
 def is_pure_tensor(inpt: Any) -> bool:
     return isinstance(inpt, torch.Tensor) and not isinstance(inpt, ta_tensors.TATensor)